@@ -287,6 +287,11 @@ class CompiledSDFG(object):
             Organizes arguments first by `sdfg.arglist`, then data descriptors
             by alphabetical order, then symbols by alphabetical order.
         """
+        # Sparse matrices (e.g., scipy.sparse.csr_matrix) are passed as their
+        # member arrays, along with the sizes that can be inferred from them
+        if self._sdfg.sparse_arrays:
+            kwargs = self._sdfg.expand_sparse_arguments(kwargs)
+
         # Return value initialization (for values that have not been given)
         self._initialize_return_values(kwargs)
         if self._return_arrays is not None:
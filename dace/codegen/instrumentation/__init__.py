@@ -6,3 +6,4 @@ from .papi import PAPIInstrumentation
 from .timer import TimerProvider
 from .gpu_events import GPUEventProvider
 from .fpga import FPGAInstrumentationProvider
+from .allocator import AllocatorStatisticsProvider
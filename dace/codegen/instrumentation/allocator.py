@@ -0,0 +1,83 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+from dace import dtypes, registry
+from dace.sdfg.nodes import CodeNode
+from dace.codegen.instrumentation.provider import InstrumentationProvider
+from dace.codegen.prettycode import CodeIOStream
+
+
+@registry.autoregister_params(type=dtypes.InstrumentationType.Allocator_Statistics)
+class AllocatorStatisticsProvider(InstrumentationProvider):
+    """ Instrumentation that reports how many allocations of the caching
+        allocator (see ``compiler.cpu.caching_allocator``) were performed
+        during the execution of an element, and how many of them were served
+        from the cache. """
+
+    # Reported fields of ``dace::allocator::Statistics``, with counter names
+    COUNTERS = {
+        'allocations': 'Allocations',
+        'cache_hits': 'Allocator cache hits',
+        'cache_misses': 'Allocator cache misses',
+        'releases': 'Allocator releases',
+    }
+
+    def on_sdfg_begin(self, sdfg, local_stream, global_stream):
+        if sdfg.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_abegin(local_stream, sdfg)
+
+    def on_sdfg_end(self, sdfg, local_stream, global_stream):
+        if sdfg.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_aend(local_stream, sdfg)
+
+    def on_abegin(self, stream: CodeIOStream, sdfg=None, state=None, node=None):
+        idstr = self._idstr(sdfg, state, node)
+        stream.write('const auto __dace_astats_%s = dace::allocator::statistics();' % idstr)
+
+    def on_aend(self, stream: CodeIOStream, sdfg=None, state=None, node=None):
+        idstr = self._idstr(sdfg, state, node)
+        stream.write('{\nconst auto __dace_astats_end = dace::allocator::statistics();')
+        for field, title in self.COUNTERS.items():
+            name = '%s (%s)' % (title, idstr)
+            stream.write('__state->report.add_counter("{name}", "Allocator", "{name}", '
+                         '__dace_astats_end.{field} - __dace_astats_{id}.{field});'.format(name=name,
+                                                                                           field=field,
+                                                                                           id=idstr))
+        stream.write('}')
+
+    # Code generation hooks
+    def on_state_begin(self, sdfg, state, local_stream, global_stream):
+        if state.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_abegin(local_stream, sdfg, state)
+
+    def on_state_end(self, sdfg, state, local_stream, global_stream):
+        if state.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_aend(local_stream, sdfg, state)
+
+    def _get_sobj(self, node):
+        # Get object behind scope
+        if hasattr(node, 'consume'):
+            return node.consume
+        else:
+            return node.map
+
+    def on_scope_entry(self, sdfg, state, node, outer_stream, inner_stream, global_stream):
+        s = self._get_sobj(node)
+        if s.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_abegin(outer_stream, sdfg, state, node)
+
+    def on_scope_exit(self, sdfg, state, node, outer_stream, inner_stream, global_stream):
+        entry_node = state.entry_node(node)
+        s = self._get_sobj(node)
+        if s.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_aend(outer_stream, sdfg, state, entry_node)
+
+    def on_node_begin(self, sdfg, state, node, outer_stream, inner_stream, global_stream):
+        if not isinstance(node, CodeNode):
+            return
+        if node.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_abegin(outer_stream, sdfg, state, node)
+
+    def on_node_end(self, sdfg, state, node, outer_stream, inner_stream, global_stream):
+        if not isinstance(node, CodeNode):
+            return
+        if node.instrument == dtypes.InstrumentationType.Allocator_Statistics:
+            self.on_aend(outer_stream, sdfg, state, node)
@@ -0,0 +1,160 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+"""
+NUMA-aware placement of transient CPU arrays (see ``dace.dtypes.NUMAPlacement``).
+
+Pages of an array are placed on the NUMA node of the thread that touches them
+first. With first-touch placement, arrays are initialized in parallel with the
+same OpenMP schedule as the first parallel map that uses them, so that every
+thread later accesses pages on its own node. With interleaved placement, the
+pages are distributed across all nodes, which evens out bandwidth for arrays
+whose access pattern does not match a single map.
+"""
+
+from typing import Optional, Tuple
+
+from dace import data, dtypes, subsets, symbolic
+from dace.config import Config
+from dace.sdfg import nodes
+from dace.sdfg.scope import nested_in_parallel_scope
+from dace.sdfg.sdfg import SDFG
+
+
+def array_placement(sdfg: SDFG, desc: data.Data) -> dtypes.NUMAPlacement:
+    """
+    Returns the effective NUMA placement of a CPU heap array.
+
+    :param sdfg: The SDFG containing the array.
+    :param desc: The array descriptor.
+    :return: The placement, where ``Default`` is resolved from the
+             configuration. Arguments, views, arrays of opaque types and
+             arrays allocated within parallel scopes are ``Unmanaged``.
+    """
+    if not isinstance(desc, data.Array) or isinstance(desc, data.View) or not desc.transient:
+        return dtypes.NUMAPlacement.Unmanaged
+    if (desc.storage not in (dtypes.StorageType.CPU_Heap, dtypes.StorageType.Default)
+            or isinstance(desc.dtype, dtypes.opaque)):
+        return dtypes.NUMAPlacement.Unmanaged
+
+    placement = desc.numa_placement
+    if placement == dtypes.NUMAPlacement.Default:
+        placement = dtypes.NUMAPlacement[Config.get('compiler', 'cpu', 'numa_placement')]
+    if placement in (dtypes.NUMAPlacement.Default, dtypes.NUMAPlacement.Unmanaged):
+        return dtypes.NUMAPlacement.Unmanaged
+
+    # Arrays allocated by multiple threads are already local to them
+    if nested_in_parallel_scope(sdfg):
+        return dtypes.NUMAPlacement.Unmanaged
+    name = next((k for k, v in sdfg.arrays.items() if v is desc), None)
+    for state in sdfg.nodes():
+        for node in state.data_nodes():
+            if node.data == name and state.entry_node(node) is not None:
+                return dtypes.NUMAPlacement.Unmanaged
+    return placement
+
+
+def first_touch_map(sdfg: SDFG, dataname: str) -> Optional[Tuple[nodes.MapEntry, subsets.Range]]:
+    """
+    Finds the first top-level parallel map that accesses an array, and the
+    subset of the array that one iteration of the map accesses.
+
+    :param sdfg: The SDFG containing the array.
+    :param dataname: The name of the array.
+    :return: A 2-tuple of the map entry and the per-iteration subset (in
+             terms of the map parameters), or None if no such map exists or
+             its ranges cannot be evaluated where the array is allocated.
+    """
+    from dace.sdfg import utils as sdutil  # Avoid import loop
+
+    available = set(map(str, sdfg.free_symbols)) | set(sdfg.constants.keys())
+    for state in sdutil.dfs_topological_sort(sdfg, [sdfg.start_state]):
+        scope_dict = state.scope_dict()
+        for node in state.nodes():
+            if not isinstance(node, nodes.MapEntry) or scope_dict[node] is not None:
+                continue
+            if node.map.schedule not in (dtypes.ScheduleType.CPU_Multicore, dtypes.ScheduleType.Default):
+                continue
+            edges = ([e for e in state.out_edges(node) if e.data.data == dataname] +
+                     [e for e in state.in_edges(state.exit_node(node)) if e.data.data == dataname])
+            if not edges:
+                continue
+
+            subset = edges[0].data.subset
+            for e in edges[1:]:
+                subset = subsets.union(subset, e.data.subset)
+            if subset is None:
+                return None
+            subset = subsets.Range.from_indices(subset) if isinstance(subset, subsets.Indices) else subset
+            if not isinstance(subset, subsets.Range) or len(subset) != len(sdfg.arrays[dataname].shape):
+                return None
+
+            # Map ranges and accessed subsets must be defined at allocation time
+            params = set(node.map.params)
+            if any(str(s) not in available for s in node.map.range.free_symbols):
+                return None
+            if any(str(s) not in available | params for s in subset.free_symbols):
+                return None
+            return node, subset
+    return None
+
+
+def first_touch_code(sdfg: SDFG, dataname: str, desc: data.Array, ptrname: str, setzero: bool = False) -> str:
+    """
+    Generates code that initializes (with zeros) an array in parallel,
+    following the schedule of the first map that uses it, or a static
+    schedule over the whole array if there is no such map.
+
+    :param sdfg: The SDFG containing the array.
+    :param dataname: The name of the array.
+    :param desc: The array descriptor.
+    :param ptrname: The name of the array pointer in the generated code.
+    :param setzero: If True, zeroes the whole array, including elements
+                    that the first map does not access.
+    :return: C++ code that touches the elements of the array accessed by
+             the first map, or every element if there is no such map.
+    """
+    from dace.codegen.targets import cpp  # Avoid import loop
+
+    ctype = desc.dtype.ctype
+    static_code = (f'#pragma omp parallel for schedule(static)\n'
+                   f'for (size_t __dace_ft = 0; __dace_ft < {cpp.sym2cpp(desc.total_size)}; ++__dace_ft)\n'
+                   f'    {ptrname}[__dace_ft] = {ctype}();\n')
+    found = first_touch_map(sdfg, dataname)
+    if found is None:
+        return static_code
+
+    map_entry, subset = found
+    collapse = max(map_entry.map.collapse, 1)
+    result = '{\n#pragma omp parallel for'
+    if collapse > 1:
+        result += f' collapse({collapse})'
+    result += '\n'
+    depth = 0
+    used = set(map(str, subset.free_symbols))
+    for i, (param, (begin, end, step)) in enumerate(zip(map_entry.map.params, map_entry.map.range)):
+        # Sequential dimensions that do not index the array (e.g., the
+        # reduction dimension of a matrix product) need not be repeated
+        if i >= collapse and param not in used:
+            continue
+        result += (f'for (auto {param} = {cpp.sym2cpp(begin)}; {param} < {cpp.sym2cpp(end + 1)}; '
+                   f'{param} += {cpp.sym2cpp(step)}) {{\n')
+        depth += 1
+
+    # Loop over the subset accessed by one iteration
+    indices = []
+    for i, (begin, end, step) in enumerate(subset):
+        if begin == end:
+            indices.append((begin, begin, 1))
+            continue
+        var = f'__dace_ft{i}'
+        result += f'for (auto {var} = {cpp.sym2cpp(begin)}; {var} < {cpp.sym2cpp(end + 1)}; {var} += {cpp.sym2cpp(step)}) {{\n'
+        indices.append((symbolic.symbol(var), symbolic.symbol(var), 1))
+        depth += 1
+
+    offset = cpp.cpp_offset_expr(desc, subsets.Range(indices))
+    result += f'{ptrname}[{offset}] = {ctype}();\n'
+    result += '}\n' * depth + '}\n'
+
+    # Pages are already placed at this point, zeroing only writes to them
+    if setzero:
+        result += static_code
+    return result
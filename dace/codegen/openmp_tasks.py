@@ -0,0 +1,243 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+"""
+Analyses that lower the dataflow of SDFG states to OpenMP tasks.
+
+When enabled (``compiler.cpu.openmp_tasks``), every top-level scope and node of
+a state becomes a *task unit*, which is emitted as an ``#pragma omp task`` whose
+``depend`` clauses are derived from the data containers it reads and writes
+(taken from its memlets) and from the edges that order it after other units
+in the state. Independent nodes can then run concurrently, rather than only
+disconnected components of a state (as with OpenMP sections).
+
+If the states of an SDFG form a straight-line sequence (unconditional
+transitions without assignments), the tasks of all states are created in one
+parallel region, so that independent work in consecutive states can overlap.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from dace import data, dtypes
+from dace.sdfg import nodes
+from dace.sdfg.sdfg import SDFG
+from dace.sdfg.state import SDFGState
+
+# Schedules that can be executed within an OpenMP task
+_TASK_SCHEDULES = (dtypes.ScheduleType.Default, dtypes.ScheduleType.Sequential, dtypes.ScheduleType.CPU_Multicore)
+_DEVICE_STORAGES = tuple(dtypes.GPU_STORAGES) + tuple(dtypes.FPGA_STORAGES)
+
+
+@dataclass
+class TaskUnit:
+    """ A top-level node (or scope) of a state that is executed as a task. """
+
+    # The node that is dispatched (an entry node for scopes)
+    node: nodes.Node
+
+    # Data containers read and written by the unit
+    reads: Set[str] = field(default_factory=set)
+    writes: Set[str] = field(default_factory=set)
+
+    # Indices of units in the same state that must finish before this unit
+    predecessors: Set[int] = field(default_factory=set)
+
+
+def _is_cpu_data(desc: data.Data) -> bool:
+    if isinstance(desc, (data.View, data.Stream)):
+        return False
+    return desc.storage not in _DEVICE_STORAGES and desc.storage != dtypes.StorageType.CPU_ThreadLocal
+
+
+def _runs_on_cpu(sdfg: SDFG, graph) -> bool:
+    """ Returns True if a subgraph (recursively) only contains CPU code. """
+    for node, parent in graph.all_nodes_recursive():
+        if isinstance(node, nodes.EntryNode):
+            if not isinstance(node, nodes.MapEntry) or node.map.schedule not in _TASK_SCHEDULES:
+                return False
+        elif isinstance(node, nodes.AccessNode):
+            psdfg = parent.parent if isinstance(parent, SDFGState) else sdfg
+            desc = node.desc(psdfg)
+            if desc.storage in _DEVICE_STORAGES or desc.storage == dtypes.StorageType.CPU_ThreadLocal:
+                return False
+        elif isinstance(node, nodes.NestedSDFG):
+            if node.schedule not in _TASK_SCHEDULES:
+                return False
+    return True
+
+
+def _inside_scope(sdfg: SDFG) -> bool:
+    """ Returns True if an SDFG is (transitively) nested inside a scope. """
+    while sdfg.parent_nsdfg_node is not None:
+        if sdfg.parent.entry_node(sdfg.parent_nsdfg_node) is not None:
+            return True
+        sdfg = sdfg.parent_sdfg
+    return False
+
+
+def task_units(sdfg: SDFG, state: SDFGState) -> Optional[List[TaskUnit]]:
+    """
+    Splits the top-level nodes of a state into task units, in the order in
+    which they are generated.
+
+    :param sdfg: The SDFG containing the state.
+    :param state: The state to analyze.
+    :return: A list of task units, or None if the state cannot be lowered to
+             OpenMP tasks (e.g., if it contains device code, streams, views,
+             or is nested inside a parallel scope).
+    """
+    from dace.sdfg import utils as sdutil  # Avoid import loop
+
+    if _inside_scope(sdfg):
+        return None
+    for node in state.data_nodes():
+        if not _is_cpu_data(node.desc(sdfg)):
+            return None
+    if not _runs_on_cpu(sdfg, state):
+        return None
+
+    scope_dict = state.scope_dict()
+    toplevel = [n for n in sdutil.dfs_topological_sort(state, state.source_nodes()) if scope_dict[n] is None]
+    units: List[TaskUnit] = []
+    unit_of: Dict[nodes.Node, int] = {}
+    for node in toplevel:
+        if isinstance(node, nodes.ExitNode):
+            continue
+        if isinstance(node, nodes.EntryNode):
+            exit_node = state.exit_node(node)
+            in_edges, out_edges = state.in_edges(node), state.out_edges(exit_node)
+            unit_of[exit_node] = len(units)
+        elif isinstance(node, (nodes.CodeNode, nodes.AccessNode)):
+            in_edges, out_edges = state.in_edges(node), state.out_edges(node)
+        else:
+            return None
+        unit = TaskUnit(node)
+
+        if isinstance(node, nodes.AccessNode):
+            # Access nodes copy their data to other access nodes they lead to
+            unit.reads.add(node.data)
+            for e in out_edges:
+                if not e.data.is_empty() and isinstance(e.dst, nodes.AccessNode):
+                    unit.writes.add(e.dst.data)
+        else:
+            for e in in_edges:
+                src = state.memlet_path(e)[0].src
+                if not e.data.is_empty() and isinstance(src, nodes.AccessNode):
+                    unit.reads.add(src.data)
+                elif not e.data.is_empty() and isinstance(src, nodes.CodeNode):
+                    # Code->code edges define local variables shared between nodes
+                    return None
+            for e in out_edges:
+                dst = state.memlet_path(e)[-1].dst
+                if not e.data.is_empty() and isinstance(dst, nodes.AccessNode):
+                    unit.writes.add(dst.data)
+                elif not e.data.is_empty() and isinstance(dst, nodes.CodeNode):
+                    return None
+        unit.reads -= unit.writes
+
+        unit_of[node] = len(units)
+        units.append(unit)
+
+    # Order units along the edges of the state
+    for index, unit in enumerate(units):
+        queue = list(state.in_edges(unit.node))
+        visited = set()
+        while queue:
+            src = queue.pop().src
+            if src in visited:
+                continue
+            visited.add(src)
+            if src in unit_of and unit_of[src] != index:
+                unit.predecessors.add(unit_of[src])
+            else:
+                queue.extend(state.in_edges(src))
+
+    return units
+
+
+def straight_line_states(sdfg: SDFG) -> Optional[List[SDFGState]]:
+    """
+    Returns the states of an SDFG in order if its state machine is a
+    sequence of states with unconditional transitions and no assignments,
+    or None otherwise.
+    """
+    if sdfg.number_of_nodes() == 0:
+        return None
+    result = [sdfg.start_state]
+    while True:
+        out_edges = sdfg.out_edges(result[-1])
+        if len(out_edges) == 0:
+            break
+        if len(out_edges) > 1:
+            return None
+        edge = out_edges[0]
+        if not edge.data.is_unconditional() or edge.data.assignments or edge.dst in result:
+            return None
+        result.append(edge.dst)
+    if len(result) != sdfg.number_of_nodes():
+        return None
+    return result
+
+
+def remove_units(units: List[TaskUnit], removed: Set[int]):
+    """ Removes units (e.g., ones that generated no code) from the ordering
+        of the other units, while keeping the order they transitively
+        induce. Unit indices are preserved. """
+    for unit in units:
+        preds = set()
+        queue = list(unit.predecessors)
+        while queue:
+            pred = queue.pop()
+            if pred in removed:
+                queue.extend(units[pred].predecessors)
+            else:
+                preds.add(pred)
+        unit.predecessors = preds
+
+
+def num_compute_units(units: List[TaskUnit]) -> int:
+    """ Returns the number of units that are not access nodes. """
+    return sum(1 for u in units if not isinstance(u.node, nodes.AccessNode))
+
+
+def dependency_expression(sdfg: SDFG, dataname: str, defined_vars) -> Optional[str]:
+    """ Returns the expression used as a dependency token for a data container
+        in ``depend`` clauses, or None if it cannot be determined. """
+    from dace.codegen.dispatcher import DefinedType  # Avoid import loop
+    from dace.codegen.targets import cpp
+
+    desc = sdfg.arrays[dataname]
+    ptrname = cpp.ptr(dataname, desc, sdfg)
+    try:
+        deftype, _ = defined_vars.get(ptrname)
+    except KeyError:
+        return None
+    if deftype == DefinedType.Pointer:
+        return f'{ptrname}[0]'
+    elif deftype == DefinedType.Scalar:
+        return ptrname
+    return None
+
+
+def task_pragma(sdfg: SDFG, unit: TaskUnit, index: int, token_array: str, defined_vars) -> Optional[str]:
+    """
+    Returns the ``#pragma omp task`` line for a task unit.
+
+    :param sdfg: The SDFG containing the unit.
+    :param unit: The task unit.
+    :param index: The index of the unit in its state.
+    :param token_array: Name of the array whose elements are used as tokens
+                        for the ordering of units within the state.
+    :param defined_vars: The defined variables of the code generator.
+    :return: The pragma, or None if a dependency could not be expressed.
+    """
+    clauses = []
+    for kind, names in (('in', unit.reads), ('inout', unit.writes)):
+        exprs = [dependency_expression(sdfg, name, defined_vars) for name in sorted(names)]
+        if any(e is None for e in exprs):
+            return None
+        if exprs:
+            clauses.append(f'depend({kind}: {", ".join(exprs)})')
+    if unit.predecessors:
+        clauses.append('depend(in: %s)' % ', '.join(f'{token_array}[{p}]' for p in sorted(unit.predecessors)))
+    clauses.append(f'depend(out: {token_array}[{index}])')
+    return '#pragma omp task default(shared) ' + ' '.join(clauses)
@@ -8,7 +8,7 @@ import warnings
 from sympy.functions.elementary.complexes import arg
 
 from dace import data, dtypes, registry, memlet as mmlt, subsets, symbolic, Config
-from dace.codegen import cppunparse, exceptions as cgx
+from dace.codegen import cppunparse, exceptions as cgx, numa
 from dace.codegen.prettycode import CodeIOStream
 from dace.codegen.targets import cpp
 from dace.codegen.targets.common import codeblock_to_cpp
@@ -18,8 +18,9 @@ from dace.frontend import operations
 from dace.sdfg import nodes, utils as sdutils
 from dace.sdfg import (ScopeSubgraphView, SDFG, scope_contains_scope, is_array_stream_view, NodeNotExpandedError,
                        dynamic_map_inputs, local_transients)
-from dace.sdfg.scope import is_devicelevel_gpu, is_devicelevel_fpga
-from typing import Union
+from dace.sdfg.scope import is_devicelevel_gpu, is_devicelevel_fpga, nested_in_parallel_scope
+from dace.sdfg.analysis import alias_analysis, stream_analysis
+from typing import List, Optional, Union
 from dace.codegen.targets import fpga
 
 
@@ -55,6 +56,9 @@ class CPUCodeGen(TargetCodeGenerator):
         # Keep track of generated NestedSDG, and the name of the assigned function
         self._generated_nested_sdfg = dict()
 
+        # Whether the caching allocator is used (see ``_allocator_call``)
+        self._allocator_used = False
+
         # Keeps track of generated connectors, so we know how to access them in
         # nested scopes
         for name, arg_type in self._frame.arglist.items():
@@ -243,6 +247,39 @@ class CPUCodeGen(TargetCodeGenerator):
         else:
             raise NotImplementedError("Unimplemented storage type " + str(nodedesc.storage))
 
+    @staticmethod
+    def _stream_class(sdfg: SDFG, name: str, desc: data.Stream) -> str:
+        """ Returns the runtime class of a stream, based on the number of
+            threads that concurrently push to and pop from it. """
+        if not Config.get_bool('compiler', 'cpu', 'lockfree_streams'):
+            return 'Stream'
+        if desc.is_stream_array():
+            return 'Stream'
+        concurrency = stream_analysis.stream_concurrency(sdfg, name)
+        if concurrency is None:
+            return 'Stream'
+        multi_producer, multi_consumer = concurrency
+        if multi_consumer:
+            return 'Stream'
+        return 'MPSCStream' if multi_producer else 'SPSCStream'
+
+    @staticmethod
+    def _allocator_call(sdfg: SDFG, desc: data.Array) -> Optional[str]:
+        """ Returns the caching allocator function template used for a heap
+            array (or None to use ``new``), based on its lifetime. """
+        if not Config.get_bool('compiler', 'cpu', 'caching_allocator'):
+            return None
+        # Persistent arrays are allocated once
+        if desc.lifetime in (dtypes.AllocationLifetime.Persistent, dtypes.AllocationLifetime.Global):
+            return None
+        if isinstance(desc.dtype, dtypes.opaque):
+            return None
+        if numa.array_placement(sdfg, desc) != dtypes.NUMAPlacement.Unmanaged:
+            return None
+        if Config.get_bool('compiler', 'cpu', 'allocator_hugepages'):
+            return f'dace::allocator::allocate<{desc.dtype.ctype}, true>'
+        return f'dace::allocator::allocate<{desc.dtype.ctype}>'
+
     def allocate_array(self, sdfg, dfg, state_id, node, nodedesc, function_stream, declaration_stream,
                        allocation_stream):
         name = node.data
@@ -312,7 +349,7 @@ class CPUCodeGen(TargetCodeGenerator):
             # Regular stream
 
             dtype = nodedesc.dtype.ctype
-            ctypedef = 'dace::Stream<{}>'.format(dtype)
+            ctypedef = 'dace::{}<{}>'.format(self._stream_class(sdfg, name, nodedesc), dtype)
             if nodedesc.buffer_size != 0:
                 definition = "{} {}({});".format(ctypedef, name, nodedesc.buffer_size)
             else:
@@ -342,12 +379,32 @@ class CPUCodeGen(TargetCodeGenerator):
 
             if not declared:
                 declaration_stream.write(f'{nodedesc.dtype.ctype} *{name};\n', sdfg, state_id, node)
-            allocation_stream.write(
-                "%s = new %s DACE_ALIGN(64)[%s];\n" % (alloc_name, nodedesc.dtype.ctype, cpp.sym2cpp(arrsize)), sdfg,
-                state_id, node)
+            placement = numa.array_placement(sdfg, nodedesc)
+            if placement == dtypes.NUMAPlacement.Interleaved:
+                # Interleaved memory is zero-initialized
+                allocation_stream.write(
+                    "%s = dace::numa::interleaved_alloc<%s>(%s);\n" %
+                    (alloc_name, nodedesc.dtype.ctype, cpp.sym2cpp(arrsize)), sdfg, state_id, node)
+            elif self._allocator_call(sdfg, nodedesc) is not None:
+                allocation_stream.write(
+                    "%s = %s(%s);\n" % (alloc_name, self._allocator_call(sdfg, nodedesc), cpp.sym2cpp(arrsize)), sdfg,
+                    state_id, node)
+                # Cached blocks are returned to the system when the program
+                # is finalized
+                if not self._allocator_used:
+                    self._allocator_used = True
+                    self._frame._exitcode.write('dace::allocator::release();\n', sdfg)
+            else:
+                allocation_stream.write(
+                    "%s = new %s DACE_ALIGN(64)[%s];\n" % (alloc_name, nodedesc.dtype.ctype, cpp.sym2cpp(arrsize)),
+                    sdfg, state_id, node)
             self._dispatcher.defined_vars.add(name, DefinedType.Pointer, ctypedef)
 
-            if node.setzero:
+            if placement == dtypes.NUMAPlacement.FirstTouch:
+                # Parallel initialization places pages near the threads that use them
+                allocation_stream.write(numa.first_touch_code(sdfg, name, nodedesc, alloc_name, node.setzero), sdfg,
+                                        state_id, node)
+            elif node.setzero and placement != dtypes.NUMAPlacement.Interleaved:
                 allocation_stream.write("memset(%s, 0, sizeof(%s)*%s);" %
                                         (alloc_name, nodedesc.dtype.ctype, cpp.sym2cpp(arrsize)))
             return
@@ -419,7 +476,13 @@ class CPUCodeGen(TargetCodeGenerator):
             return
         elif (nodedesc.storage == dtypes.StorageType.CPU_Heap
               or (nodedesc.storage == dtypes.StorageType.Register and symbolic.issymbolic(arrsize, sdfg.constants))):
-            callsite_stream.write("delete[] %s;\n" % alloc_name, sdfg, state_id, node)
+            if numa.array_placement(sdfg, nodedesc) == dtypes.NUMAPlacement.Interleaved:
+                callsite_stream.write("dace::numa::interleaved_free(%s, %s);\n" % (alloc_name, cpp.sym2cpp(arrsize)),
+                                      sdfg, state_id, node)
+            elif self._allocator_call(sdfg, nodedesc) is not None:
+                callsite_stream.write("dace::allocator::deallocate(%s);\n" % alloc_name, sdfg, state_id, node)
+            else:
+                callsite_stream.write("delete[] %s;\n" % alloc_name, sdfg, state_id, node)
         elif nodedesc.storage is dtypes.StorageType.CPU_ThreadLocal:
             # Deallocate in each OpenMP thread
             callsite_stream.write(
@@ -684,19 +747,35 @@ class CPUCodeGen(TargetCodeGenerator):
             if memlet.wcr is not None:
                 nc = not cpp.is_write_conflicted(dfg, edge, sdfg_schedule=self._toplevel_schedule)
             if nc:
-                stream.write(
-                    """
+                copy_call = """
                     dace::CopyND{copy_tmpl}::{shape_tmpl}::{copy_func}(
                         {copy_args});""".format(
-                        copy_tmpl=copy_tmpl,
-                        shape_tmpl=shape_tmpl,
-                        copy_func="Copy" if memlet.wcr is None else "Accumulate",
-                        copy_args=", ".join(copy_args),
-                    ),
-                    sdfg,
-                    state_id,
-                    [src_node, dst_node],
+                    copy_tmpl=copy_tmpl,
+                    shape_tmpl=shape_tmpl,
+                    copy_func="Copy" if memlet.wcr is None else "Accumulate",
+                    copy_args=", ".join(copy_args),
                 )
+
+                # Large copies are split across threads
+                parallel = False
+                if memlet.wcr is None:
+                    parallel = self._parallel_copy_condition(sdfg, state_dfg, src_node, dst_node, copy_shape)
+                if parallel is not False:
+                    parallel_args = []
+                    for shape, src, dst in zip(copy_shape, src_strides, dst_strides):
+                        parallel_args.extend([shape, src, dst])
+                    parallel_call = "dace::ParallelCopyND<{type}, {dims}>::Copy({args});".format(
+                        type=ctype,
+                        dims=len(copy_shape),
+                        args=", ".join([src_expr, dst_expr] + cpp.sym2cpp(parallel_args)))
+                    if parallel is True:
+                        copy_call = parallel_call
+                    else:
+                        copy_call = "if ({cond}) {{\n{pcall}\n}} else {{{call}\n}}".format(cond=parallel,
+                                                                                           pcall=parallel_call,
+                                                                                           call=copy_call)
+
+                stream.write(copy_call, sdfg, state_id, [src_node, dst_node])
             else:  # Conflicted WCR
                 if dynshape == 1:
                     warnings.warn('Performance warning: Emitting dynamically-'
@@ -742,6 +821,41 @@ class CPUCodeGen(TargetCodeGenerator):
                 instr.on_copy_end(sdfg, state_dfg, src_node, dst_node, edge, stream, None)
         #############################################################
 
+    def _parallel_copy_condition(self, sdfg: SDFG, state: SDFGState, src_node: nodes.AccessNode,
+                                 dst_node: nodes.AccessNode,
+                                 copy_shape: List[symbolic.SymbolicType]) -> Union[bool, str]:
+        """
+        Determines whether an array-to-array copy should be split across
+        threads (see ``compiler.cpu.parallel_copy``).
+
+        :return: True or False, or a C++ condition on the copy size if the
+                 size is symbolic.
+        """
+        if not Config.get_bool('compiler', 'cpu', 'parallel_copy'):
+            return False
+        src_desc, dst_desc = src_node.desc(sdfg), dst_node.desc(sdfg)
+        cpu_storage = (dtypes.StorageType.CPU_Heap, dtypes.StorageType.CPU_Pinned, dtypes.StorageType.Default)
+        if src_desc.storage not in cpu_storage or dst_desc.storage not in cpu_storage:
+            return False
+        if src_desc.dtype != dst_desc.dtype or len(copy_shape) == 0:
+            return False
+
+        # Copies within parallel scopes are already distributed
+        if nested_in_parallel_scope(sdfg):
+            return False
+        for node in (src_node, dst_node):
+            scope = state.entry_node(node)
+            while scope is not None:
+                if not isinstance(scope, nodes.MapEntry) or scope.map.schedule != dtypes.ScheduleType.Sequential:
+                    return False
+                scope = state.entry_node(scope)
+
+        threshold = Config.get('compiler', 'cpu', 'parallel_copy_threshold')
+        copy_bytes = functools.reduce(lambda a, b: a * b, copy_shape, 1) * dst_desc.dtype.bytes
+        if not symbolic.issymbolic(copy_bytes, sdfg.constants):
+            return bool(symbolic.evaluate(copy_bytes, sdfg.constants) >= threshold)
+        return f'{cpp.sym2cpp(copy_bytes)} >= {threshold}'
+
     ###########################################################################
     # Memlet handling
 
@@ -896,7 +1010,12 @@ class CPUCodeGen(TargetCodeGenerator):
                         else:
                             desc_dtype = desc.dtype
                             expr = cpp.cpp_array_expr(sdfg, memlet)
-                            write_expr = codegen.make_ptr_assignment(in_local_name, conntype, expr, desc_dtype)
+                            count = self.masked_vector_count(sdfg, memlet, conntype)
+                            if count is not None:
+                                write_expr = (f"dace::simd::store_masked<{desc_dtype.ctype}, {conntype.veclen}>"
+                                              f"(&{expr}, {in_local_name}, {count});")
+                            else:
+                                write_expr = codegen.make_ptr_assignment(in_local_name, conntype, expr, desc_dtype)
 
                     # Write out
                     result.write(write_expr, sdfg, state_id, node)
@@ -1074,8 +1193,13 @@ class CPUCodeGen(TargetCodeGenerator):
 
         if expr != ptr:
             expr = '%s[%s]' % (ptr, expr)
-        # If there is a type mismatch, cast pointer
-        expr = codegen.make_ptr_vector_cast(expr, desc.dtype, conntype, is_scalar, var_type)
+        # Partial vectors (e.g., loop remainders) are read with a masked load
+        count = self.masked_vector_count(sdfg, memlet, conntype) if not output else None
+        if count is not None and var_type == DefinedType.Pointer:
+            expr = f'dace::simd::load_masked<{desc.dtype.ctype}, {conntype.veclen}>(&{expr}, {count})'
+        else:
+            # If there is a type mismatch, cast pointer
+            expr = codegen.make_ptr_vector_cast(expr, desc.dtype, conntype, is_scalar, var_type)
 
         defined = None
 
@@ -1408,6 +1532,12 @@ class CPUCodeGen(TargetCodeGenerator):
                                               out_memlet,
                                               uconn,
                                               conntype=node.out_connectors[uconn]))
+
+        # Qualify pointers to non-overlapping memory
+        if Config.get_bool('compiler', 'cpu', 'alias_analysis'):
+            restrict = alias_analysis.restrict_arguments(sdfg, state, node)
+            memlet_references = [(f'{atype} __restrict__' if aname in restrict and atype.endswith('*') else atype,
+                                  aname, aval) for atype, aname, aval in memlet_references]
         return memlet_references
 
     def _generate_NestedSDFG(
@@ -1608,8 +1738,31 @@ class CPUCodeGen(TargetCodeGenerator):
 
         # TODO: Refactor to generate_scope_preamble once a general code
         #  generator (that CPU inherits from) is implemented
-        if node.map.schedule == dtypes.ScheduleType.CPU_Multicore:
+        # Vectorize the innermost loop if it has no loop-carried dependencies
+        ndims = len(node.map.range)
+        simd = (Config.get_bool('compiler', 'cpu', 'alias_analysis') and not node.map.unroll
+                and node.map.schedule in (dtypes.ScheduleType.Sequential, dtypes.ScheduleType.CPU_Multicore)
+                and alias_analysis.is_vectorizable_map(sdfg, state_dfg, node))
+
+        if node.map.schedule == dtypes.ScheduleType.CPU_Multicore and self._frame.in_openmp_task:
+            # Nested parallel regions are inactive within tasks. Task loops
+            # only take the clauses supported by OpenMP 4.5 (e.g., no
+            # reductions)
+            map_header += "#pragma omp taskloop"
+            if simd and ndims == 1:
+                map_header += " simd"
+            elif node.map.collapse >= ndims:
+                simd = False
+            if node.map.collapse > 1:
+                map_header += ' collapse(%d)' % node.map.collapse
+            map_header += "\n"
+        elif node.map.schedule == dtypes.ScheduleType.CPU_Multicore:
             map_header += "#pragma omp parallel for"
+            if simd and ndims == 1:
+                map_header += " simd"
+            elif node.map.collapse >= ndims:
+                # SIMD pragmas cannot be nested in collapsed loops
+                simd = False
             if node.map.collapse > 1:
                 map_header += ' collapse(%d)' % node.map.collapse
             # Loop over outputs, add OpenMP reduction clauses to detected cases
@@ -1644,6 +1797,8 @@ class CPUCodeGen(TargetCodeGenerator):
 
             if node.map.unroll:
                 result.write("#pragma unroll", sdfg, state_id, node)
+            elif simd and i == ndims - 1 and (node.map.schedule != dtypes.ScheduleType.CPU_Multicore or ndims > 1):
+                result.write("#pragma omp simd", sdfg, state_id, node)
 
             result.write(
                 "for (auto %s = %s; %s < %s; %s += %s) {\n" %
@@ -1969,5 +2124,38 @@ class CPUCodeGen(TargetCodeGenerator):
         """
         pass
 
-    def make_ptr_vector_cast(self, *args, **kwargs):
-        return cpp.make_ptr_vector_cast(*args, **kwargs)
+    def make_ptr_vector_cast(self, dst_expr, dst_dtype, src_dtype, is_scalar, defined_type):
+        # Vectors read from or written to scalar arrays need not be aligned
+        # to the vector size (e.g., in vectorized maps with offsets)
+        if is_scalar and isinstance(src_dtype, dtypes.vector) and src_dtype.base_type == dst_dtype:
+            return '*(dace::vecu<%s, %d> *)(&%s)' % (dst_dtype.ctype, src_dtype.veclen, dst_expr)
+        return cpp.make_ptr_vector_cast(dst_expr, dst_dtype, src_dtype, is_scalar, defined_type)
+
+    @staticmethod
+    def masked_vector_count(sdfg: SDFG, memlet: mmlt.Memlet, conntype: dtypes.typeclass) -> Optional[str]:
+        """
+        Returns the number of elements that a vector connector accesses in a
+        scalar array, if it may be fewer than the vector length (e.g., in the
+        remainder of a vectorized map). Such accesses are generated as masked
+        loads and stores.
+
+        :param sdfg: The SDFG containing the memlet.
+        :param memlet: The memlet attached to the connector.
+        :param conntype: The connector type.
+        :return: A C++ expression of the number of accessed elements, or None
+                 if the connector accesses a full vector.
+        """
+        if not isinstance(conntype, dtypes.vector) or memlet.wcr is not None or memlet.dynamic:
+            return None
+        desc = sdfg.arrays[memlet.data]
+        if (not isinstance(desc, data.Array) or conntype.base_type != desc.dtype or fpga.is_fpga_array(desc)
+                or memlet.subset is None):
+            return None
+        sizes = [s for s in memlet.subset.size() if s != 1]
+        if len(sizes) != 1:
+            # A single element accessed as a vector (the legacy behavior)
+            return None
+        count = sizes[0]
+        if not symbolic.issymbolic(count) and (count >= conntype.veclen or count <= 0):
+            return None
+        return cpp.sym2cpp(count)
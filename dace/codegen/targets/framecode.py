@@ -9,6 +9,7 @@ import functools
 import re
 from dace.codegen import control_flow as cflow
 from dace.codegen import dispatcher as disp
+from dace.codegen import openmp_tasks as omptasks
 from dace.codegen.prettycode import CodeIOStream
 from dace.codegen.targets.common import codeblock_to_cpp, sym2cpp
 from dace.codegen.targets.cpp import unparse_interstate_edge
@@ -32,6 +33,19 @@ def _get_or_eval_sdfg_first_arg(func, sdfg):
     return func
 
 
+def _has_ordered_calls(nodelist) -> bool:
+    """ Returns True if the given nodes (or nested SDFGs among them) contain
+        code whose environment requires calls to be made in program order. """
+    for node in nodelist:
+        if isinstance(node, nodes.NestedSDFG):
+            if any(_has_ordered_calls(state.nodes()) for state in node.sdfg.nodes()):
+                return True
+        elif isinstance(node, nodes.CodeNode):
+            if any(getattr(dace.library.get_environment(env), 'ordered_calls', False) for env in node.environments):
+                return True
+    return False
+
+
 class DaCeCodeGenerator(object):
     """ DaCe code generator class that writes the generated code for SDFG
         state machines, and uses a dispatcher to generate code for
@@ -51,6 +65,15 @@ class DaCeCodeGenerator(object):
         fsyms = self.free_symbols(sdfg)
         self.arglist = sdfg.arglist(scalars_only=False, free_symbols=fsyms)
 
+        # OpenMP task generation (see ``dace.codegen.openmp_tasks``)
+        self._openmp_task_depth = 0
+        self._openmp_task_chain = False
+
+    @property
+    def in_openmp_task(self) -> bool:
+        """ True if code is currently being generated inside an OpenMP task. """
+        return self._openmp_task_depth > 0
+
     # Cached fields
     def symbols_and_constants(self, sdfg: SDFG):
         if sdfg.sdfg_id in self._symbols_and_constants:
@@ -304,7 +327,9 @@ DACE_EXPORTED void __dace_exit_{sdfg.name}({sdfg.name}_t *__state)
         sid = sdfg.node_id(state)
 
         # Emit internal transient array allocation
-        self.allocate_arrays_in_scope(sdfg, state, global_stream, callsite_stream)
+        alloc_stream = CodeIOStream()
+        self.allocate_arrays_in_scope(sdfg, state, global_stream, alloc_stream)
+        callsite_stream.write(alloc_stream.getvalue())
 
         callsite_stream.write('\n')
 
@@ -322,18 +347,44 @@ DACE_EXPORTED void __dace_exit_{sdfg.name}({sdfg.name}_t *__state)
 
         components = dace.sdfg.concurrent_subgraphs(state)
 
-        if len(components) == 1:
+        # Calls to environments that must be made in program order (e.g.,
+        # collective communication) may not run in concurrent components
+        ordered = sum(1 for c in components if _has_ordered_calls(c.nodes())) > 1
+
+        # States in a sequence of task-based states do not open their own
+        # parallel region (see ``generate_states``)
+        in_task_chain = self._openmp_task_chain
+        self._openmp_task_chain = False
+        units = None
+        if config.Config.get_bool('compiler', 'cpu', 'openmp_tasks'):
+            units = omptasks.task_units(sdfg, state)
+            if units is not None and not all(
+                    omptasks.dependency_expression(sdfg, name, self._dispatcher.defined_vars) is not None
+                    for unit in units for name in unit.reads | unit.writes):
+                units = None
+
+        if ordered:
+            units = None
+
+        if units is not None and (in_task_chain or omptasks.num_compute_units(units) > 1):
+            self._generate_state_tasks(sdfg, state, units, global_stream, callsite_stream, not in_task_chain)
+        elif in_task_chain:
+            # Sequential code within a sequence of tasks
+            callsite_stream.write('#pragma omp taskwait', sdfg, sid)
+            self._dispatcher.dispatch_subgraph(sdfg, state, sid, global_stream, callsite_stream, skip_entry_node=False)
+        elif len(components) == 1:
             self._dispatcher.dispatch_subgraph(sdfg, state, sid, global_stream, callsite_stream, skip_entry_node=False)
         else:
-            if sdfg.openmp_sections:
+            sections = sdfg.openmp_sections and not ordered
+            if sections:
                 callsite_stream.write("#pragma omp parallel sections\n{")
             for c in components:
-                if sdfg.openmp_sections:
+                if sections:
                     callsite_stream.write("#pragma omp section\n{")
                 self._dispatcher.dispatch_subgraph(sdfg, c, sid, global_stream, callsite_stream, skip_entry_node=False)
-                if sdfg.openmp_sections:
+                if sections:
                     callsite_stream.write("} // End omp section")
-            if sdfg.openmp_sections:
+            if sections:
                 callsite_stream.write("} // End omp sections")
 
         #####################
@@ -341,13 +392,78 @@ DACE_EXPORTED void __dace_exit_{sdfg.name}({sdfg.name}_t *__state)
 
         if generate_state_footer:
             # Emit internal transient array deallocation
-            self.deallocate_arrays_in_scope(sdfg, state, global_stream, callsite_stream)
+            dealloc_stream = CodeIOStream()
+            self.deallocate_arrays_in_scope(sdfg, state, global_stream, dealloc_stream)
+            if in_task_chain and (alloc_stream.getvalue().strip() or dealloc_stream.getvalue().strip()):
+                # Tasks of this state may still be using the arrays, which
+                # are deallocated or go out of scope with the state
+                callsite_stream.write('#pragma omp taskwait', sdfg, sid)
+            callsite_stream.write(dealloc_stream.getvalue())
 
             # Invoke all instrumentation providers
             for instr in self._dispatcher.instrumentation.values():
                 if instr is not None:
                     instr.on_state_end(sdfg, state, callsite_stream, global_stream)
 
+        self._openmp_task_chain = in_task_chain
+
+    def _open_task_region(self, sdfg: SDFG, callsite_stream: CodeIOStream):
+        """ Opens a region in which OpenMP tasks are created. """
+        if self.in_openmp_task:
+            # Already running as a task: wait for all nested tasks at the end
+            callsite_stream.write('#pragma omp taskgroup\n{', sdfg)
+        else:
+            callsite_stream.write('#pragma omp parallel\n#pragma omp single\n{', sdfg)
+
+    def _close_task_region(self, sdfg: SDFG, callsite_stream: CodeIOStream):
+        # Local variables of the region must outlive its tasks
+        callsite_stream.write('#pragma omp taskwait\n}', sdfg)
+
+    def _generate_state_tasks(self, sdfg: SDFG, state: SDFGState, units: List[omptasks.TaskUnit],
+                              global_stream: CodeIOStream, callsite_stream: CodeIOStream, open_region: bool):
+        """
+        Generates the top-level nodes of a state as OpenMP tasks.
+
+        :param sdfg: The SDFG containing the state.
+        :param state: The state to generate.
+        :param units: The task units of the state (see ``openmp_tasks.task_units``).
+        :param global_stream: Stream for global code.
+        :param callsite_stream: Stream for the state code.
+        :param open_region: If True, creates a parallel region (or task group)
+                            for the tasks of this state. Otherwise, the tasks
+                            are created in an enclosing region.
+        """
+        sid = sdfg.node_id(state)
+        tokens = f'__dace_tasks_{sdfg.sdfg_id}_{sid}'
+
+        # Generate each unit separately, parallel maps become task loops
+        unit_code = []
+        if open_region:
+            self._open_task_region(sdfg, callsite_stream)
+        self._openmp_task_depth += 1
+        for unit in units:
+            stream = CodeIOStream()
+            if isinstance(unit.node, nodes.EntryNode):
+                self._dispatcher.dispatch_scope(unit.node.map.schedule, sdfg, state.scope_subgraph(unit.node), sid,
+                                                global_stream, stream)
+            else:
+                self._dispatcher.dispatch_node(sdfg, state, sid, unit.node, global_stream, stream)
+            unit_code.append(stream.getvalue())
+        self._openmp_task_depth -= 1
+
+        omptasks.remove_units(units, {i for i, code in enumerate(unit_code) if not code.strip()})
+
+        callsite_stream.write(f'char {tokens}[{len(units)}];', sdfg, sid)
+        for i, (unit, code) in enumerate(zip(units, unit_code)):
+            if not code.strip():
+                continue
+            callsite_stream.write(omptasks.task_pragma(sdfg, unit, i, tokens, self._dispatcher.defined_vars), sdfg, sid)
+            callsite_stream.write('{', sdfg, sid)
+            callsite_stream.write(code, sdfg, sid)
+            callsite_stream.write('}', sdfg, sid)
+        if open_region:
+            self._close_task_region(sdfg, callsite_stream)
+
     def generate_states(self, sdfg, global_stream, callsite_stream):
         states_generated = set()
 
@@ -358,6 +474,25 @@ DACE_EXPORTED void __dace_exit_{sdfg.name}({sdfg.name}_t *__state)
             states_generated.add(state)  # For sanity check
             return stream.getvalue()
 
+        # Sequences of states can be generated as one graph of OpenMP tasks
+        if config.Config.get_bool('compiler', 'cpu', 'openmp_tasks'):
+            chain = omptasks.straight_line_states(sdfg)
+            if chain is not None:
+                units = [omptasks.task_units(sdfg, state) for state in chain]
+                if (all(u is not None for u in units) and len(chain) > 1
+                        and sum(omptasks.num_compute_units(u) for u in units) > 1):
+                    # States keep their labels and scopes, as in the
+                    # control flow tree below
+                    self._open_task_region(sdfg, callsite_stream)
+                    for state in chain:
+                        self._openmp_task_chain = True
+                        block = cflow.SingleState(dispatch_state, state, state is chain[-1])
+                        callsite_stream.write(block.as_cpp(self.dispatcher.defined_vars, sdfg.symbols), sdfg)
+                    self._openmp_task_chain = False
+                    self._close_task_region(sdfg, callsite_stream)
+                    callsite_stream.write(f'__state_exit_{sdfg.sdfg_id}:;', sdfg)
+                    return states_generated
+
         # Handle specialized control flow
         if config.Config.get_bool('optimizer', 'detect_control_flow'):
             # Avoid import loop
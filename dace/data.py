@@ -5,7 +5,7 @@ import copy as cp
 import sympy as sp
 import numpy
 from numbers import Number
-from typing import Set, Sequence, Tuple
+from typing import Any, Dict, Set, Sequence, Tuple
 
 import dace.dtypes as dtypes
 from dace.codegen import cppunparse
@@ -393,6 +393,10 @@ class Array(Data):
 
     alignment = Property(dtype=int, default=0, desc='Allocation alignment in bytes (0 uses ' 'compiler-default)')
 
+    numa_placement = EnumProperty(dtype=dtypes.NUMAPlacement,
+                                  default=dtypes.NUMAPlacement.Default,
+                                  desc='Placement of the pages of transient CPU heap arrays on NUMA nodes')
+
     def __init__(self,
                  dtype,
                  shape,
@@ -406,7 +410,8 @@ class Array(Data):
                  lifetime=dtypes.AllocationLifetime.Scope,
                  alignment=0,
                  debuginfo=None,
-                 total_size=None):
+                 total_size=None,
+                 numa_placement=dtypes.NUMAPlacement.Default):
 
         super(Array, self).__init__(dtype, shape, transient, storage, location, lifetime, debuginfo)
 
@@ -416,6 +421,7 @@ class Array(Data):
         self.allow_conflicts = allow_conflicts
         self.may_alias = may_alias
         self.alignment = alignment
+        self.numa_placement = numa_placement
 
         if strides is not None:
             self.strides = cp.copy(strides)
@@ -441,7 +447,7 @@ class Array(Data):
     def clone(self):
         return type(self)(self.dtype, self.shape, self.transient, self.allow_conflicts, self.storage, self.location,
                           self.strides, self.offset, self.may_alias, self.lifetime, self.alignment, self.debuginfo,
-                          self.total_size)
+                          self.total_size, self.numa_placement)
 
     def to_json(self):
         attrs = serialize.all_properties_to_json(self)
@@ -746,3 +752,163 @@ class View(Array):
         copy = cp.deepcopy(self)
         copy.__class__ = Array
         return copy
+
+
+@make_properties
+class Sparse(Data):
+    """
+    Base class of sparse matrix descriptors. A sparse matrix is stored as a
+    set of one-dimensional member arrays (e.g., the values and the index
+    arrays), which are added to an SDFG by ``SDFG.add_sparse`` as
+    ``<name>_<member>``. See ``members`` for the member descriptors.
+    """
+
+    #: Names of the member arrays, in the order of the library node connectors
+    member_names: Tuple[str] = ()
+
+    nnz = SymbolicProperty(default=0, desc='Number of stored (nonzero) elements')
+    index_dtype = TypeClassProperty(default=dtypes.int32,
+                                    choices=dtypes.Typeclasses,
+                                    desc='Data type of the index arrays')
+
+    def __init__(self,
+                 dtype,
+                 shape,
+                 nnz,
+                 index_dtype=dtypes.int32,
+                 transient=False,
+                 storage=dtypes.StorageType.Default,
+                 location=None,
+                 lifetime=dtypes.AllocationLifetime.Scope,
+                 debuginfo=None):
+        self.nnz = nnz
+        self.index_dtype = index_dtype
+        super().__init__(dtype, shape, transient, storage, location, lifetime, debuginfo)
+
+    def validate(self):
+        super().validate()
+        if len(self.shape) != 2:
+            raise TypeError('Sparse matrices must be two-dimensional')
+
+    @staticmethod
+    def from_matrix(matrix) -> 'Sparse':
+        """
+        Creates a descriptor with the type and sizes of a ``scipy.sparse``
+        matrix in CSR or COO format. Such matrices can be passed to compiled
+        SDFGs that contain the descriptor (see ``SDFG.add_sparse``).
+        :param matrix: A ``scipy.sparse`` matrix.
+        """
+        fmt = getattr(matrix, 'format', None)
+        if fmt not in ('csr', 'coo'):
+            raise TypeError('Unsupported sparse matrix format: %s' % fmt)
+        index_array = matrix.indices if fmt == 'csr' else matrix.row
+        desc = CSR if fmt == 'csr' else COO
+        return desc(dtypes.typeclass(matrix.dtype.type),
+                    matrix.shape,
+                    matrix.nnz,
+                    index_dtype=dtypes.typeclass(index_array.dtype.type))
+
+    def __repr__(self):
+        return '%s (dtype=%s, shape=%s, nnz=%s)' % (type(self).__name__, self.dtype, self.shape, self.nnz)
+
+    @classmethod
+    def from_json(cls, json_obj, context=None):
+        # Create dummy object
+        ret = cls(dtypes.int8, (1, 1), 0)
+        serialize.set_properties_from_json(ret, json_obj, context=context)
+
+        # Check validity now
+        ret.validate()
+        return ret
+
+    def clone(self):
+        return type(self)(self.dtype, self.shape, self.nnz, self.index_dtype, self.transient, self.storage,
+                          self.location, self.lifetime, self.debuginfo)
+
+    def is_equivalent(self, other):
+        if not isinstance(other, type(self)):
+            return False
+        return (self.dtype == other.dtype and self.index_dtype == other.index_dtype
+                and tuple(self.shape) == tuple(other.shape))
+
+    @property
+    def free_symbols(self):
+        result = super().free_symbols
+        if isinstance(self.nnz, sp.Expr):
+            result |= set(self.nnz.free_symbols)
+        return result
+
+    @property
+    def members(self) -> Dict[str, Array]:
+        """ Returns the descriptors of the member arrays, by member name. """
+        return {
+            member: Array(dtype,
+                          shape,
+                          transient=self.transient,
+                          storage=self.storage,
+                          location=self.location,
+                          lifetime=self.lifetime,
+                          debuginfo=self.debuginfo)
+            for member, (dtype, shape) in self._member_types().items()
+        }
+
+    def _member_types(self):
+        raise NotImplementedError
+
+    def arguments(self, name: str, matrix) -> Dict[str, Any]:
+        """
+        Returns the member arrays of a ``scipy.sparse`` matrix of the same
+        format as keyword arguments of an SDFG (``<name>_<member>``), along
+        with the values of the symbols that can be inferred from it.
+        :param name: Name of the sparse matrix in the SDFG.
+        :param matrix: A ``scipy.sparse`` matrix in the same format.
+        """
+        if getattr(matrix, 'format', None) != type(self).__name__.lower():
+            raise TypeError('Passing a %s matrix to a %s matrix in argument "%s"' %
+                            (getattr(matrix, 'format',
+                                     type(matrix).__name__), type(self).__name__, name))
+        result = {}
+        for member, (dtype, _) in self._member_types().items():
+            arr = numpy.ascontiguousarray(getattr(matrix, member), dtype=dtype.type)
+            # Member arrays are often views, which compiled SDFGs do not accept
+            if arr.base is not None:
+                arr = numpy.array(arr, copy=True)
+            result[name + '_' + member] = arr
+
+        # Infer symbols that directly correspond to sizes
+        for dim, value in zip(list(self.shape) + [self.nnz], list(matrix.shape) + [matrix.nnz]):
+            if isinstance(dim, symbolic.symbol):
+                result[dim.name] = value
+        return result
+
+
+@make_properties
+class CSR(Sparse):
+    """ Compressed Sparse Row matrix, with the members ``indptr`` (row offsets
+        into ``indices`` and ``data``), ``indices`` (column indices) and
+        ``data`` (values), as in ``scipy.sparse.csr_matrix``. """
+
+    member_names = ('indptr', 'indices', 'data')
+
+    def _member_types(self):
+        return {
+            'indptr': (self.index_dtype, [self.shape[0] + 1]),
+            'indices': (self.index_dtype, [self.nnz]),
+            'data': (self.dtype, [self.nnz]),
+        }
+
+
+@make_properties
+class COO(Sparse):
+    """ Coordinate-format sparse matrix, with the members ``row`` and ``col``
+        (indices of each element) and ``data`` (values), as in
+        ``scipy.sparse.coo_matrix``. Elements may be stored in any order. """
+
+    member_names = ('row', 'col', 'data')
+
+    def _member_types(self):
+        return {
+            'row': (self.index_dtype, [self.nnz]),
+            'col': (self.index_dtype, [self.nnz]),
+            'data': (self.dtype, [self.nnz]),
+        }
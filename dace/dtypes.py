@@ -121,6 +121,17 @@ class AllocationLifetime(aenum.AutoNumberEnum):
     Persistent = ()  #: Allocated throughout multiple invocations (init/exit)
 
 
+@undefined_safe_enum
+@extensible_enum
+class NUMAPlacement(aenum.AutoNumberEnum):
+    """ Options for the placement of CPU array pages on NUMA nodes. """
+
+    Default = ()  #: Placement set by the configuration (compiler.cpu.numa_placement)
+    Unmanaged = ()  #: Pages are placed by the thread that touches them first
+    FirstTouch = ()  #: Parallel first touch, with the schedule of the first map that uses the array
+    Interleaved = ()  #: Pages are interleaved across all NUMA nodes
+
+
 @undefined_safe_enum
 @extensible_enum
 class Language(aenum.AutoNumberEnum):
@@ -145,6 +156,7 @@ class InstrumentationType(aenum.AutoNumberEnum):
     PAPI_Counters = ()
     GPU_Events = ()
     FPGA = ()
+    Allocator_Statistics = ()
 
 
 @undefined_safe_enum
@@ -804,9 +816,88 @@ def ptrtocupy(ptr, inner_ctype, shape):
     return cp.ndarray(shape=shape, dtype=inner_ctype, memptr=cp.cuda.MemoryPointer(umem, 0))
 
 
+#: Maximal number of array wrappers cached per callback argument
+_CALLBACK_CACHE_SIZE = 64
+
+
+class _CachedArrayConverter:
+    """ Converts pointers passed to callbacks into arrays, reusing the array
+        object if the same pointer is passed again. Since the arrays do not
+        own their memory, reusing a wrapper is equivalent to creating a new
+        one, but avoids the (significant) overhead of array construction.
+    """
+    def __init__(self, convert, ctype, shape, other_arguments):
+        self.convert = convert
+        self.ctype = ctype
+        self.shape = shape
+        self.other_arguments = other_arguments
+        self.resolved_shape = None
+        self.cache = {}
+
+    def _resolve_shape(self):
+        from dace import symbolic
+
+        shape = []
+        for s in self.shape:
+            if symbolic.issymbolic(s):
+                syms = {str(fs): self.other_arguments[str(fs)] for fs in symbolic.symlist(s).keys()}
+                s = symbolic.evaluate(s, syms)
+            shape.append(int(s))
+        return tuple(shape)
+
+    def _get(self, ptr, shape):
+        key = (ptr, shape)
+        result = self.cache.get(key)
+        if result is None:
+            if len(self.cache) >= _CALLBACK_CACHE_SIZE:
+                self.cache.clear()
+            result = self.cache[key] = self.convert(ptr, self.ctype, shape)
+        return result
+
+    def __call__(self, ptr):
+        if self.resolved_shape is None:
+            # Symbol values do not change during an SDFG invocation
+            self.resolved_shape = self._resolve_shape()
+        return self._get(ptr, self.resolved_shape)
+
+    def with_length(self, ptr, length):
+        """ Converts a pointer to a one-dimensional array of the given length. """
+        return self._get(ptr, (length, ))
+
+
+def _batched_trampoline(pyfunc, input_converters, output_converters):
+    """ Returns a trampoline for batched callbacks, which calls a scalar
+        function once per element of the argument arrays. NumPy ufuncs and
+        vectorized functions are called once on the entire batch. """
+    import numpy as np
+    vectorized = isinstance(pyfunc, (np.ufunc, np.vectorize))
+
+    def trampoline(length, *args):
+        inputs = [convert(ptr, length) for convert, ptr in zip(input_converters, args)]
+        outputs = [convert(ptr, length) for convert, ptr in zip(output_converters, args[len(input_converters):])]
+        if vectorized:
+            result = pyfunc(*inputs)
+        elif inputs:
+            # Call with Python scalars, as in non-batched callbacks
+            result = [pyfunc(*values) for values in zip(*(a.tolist() for a in inputs))]
+        else:
+            result = [pyfunc() for _ in range(length)]
+        if outputs:
+            outputs[0][:] = result
+
+    return trampoline
+
+
 class callback(typeclass):
-    """ Looks like dace.callback([None, <some_native_type>], *types)"""
-    def __init__(self, return_types, *variadic_args):
+    """ Looks like dace.callback([None, <some_native_type>], *types)
+
+        If ``batched`` is True, the callback represents a batch of calls to a
+        scalar Python function: the first argument is the number of calls,
+        followed by one array per scalar argument and (optionally) an array
+        for the return values. The Python function is then invoked once per
+        element, with a single transition from native code per batch.
+    """
+    def __init__(self, return_types, *variadic_args, batched=False):
         from dace import data
         if return_types is None:
             return_types = []
@@ -815,6 +906,7 @@ class callback(typeclass):
         self.dtype = self
         self.return_types = return_types
         self.input_types = []
+        self.batched = batched
         for arg in variadic_args:
             if isinstance(arg, typeclass):
                 pass
@@ -897,105 +989,71 @@ class callback(typeclass):
         return f'{retval} (*{name})({", ".join(input_type_cstring)})'
 
     def get_trampoline(self, pyfunc, other_arguments):
-        from functools import partial
-        from dace import data, symbolic
-
-        inp_arraypos = []
-        ret_arraypos = []
-        inp_types_and_sizes = []
-        ret_types_and_sizes = []
-        inp_converters = []
-        ret_converters = []
-        for index, arg in enumerate(self.input_types):
-            if isinstance(arg, data.Array):
-                inp_arraypos.append(index)
-                inp_types_and_sizes.append((arg.dtype.as_ctypes(), arg.shape))
-                if arg.storage == StorageType.GPU_Global:
-                    inp_converters.append(ptrtocupy)
-                else:
-                    inp_converters.append(ptrtonumpy)
-            elif isinstance(arg, data.Scalar) and isinstance(arg.dtype, string):
-                inp_arraypos.append(index)
-                inp_types_and_sizes.append((ctypes.c_char_p, []))
-                inp_converters.append(lambda a, *args: ctypes.cast(a, ctypes.c_char_p).value.decode('utf-8'))
-            elif isinstance(arg, data.Scalar) and isinstance(arg.dtype, pointer):
-                inp_arraypos.append(index)
-                inp_types_and_sizes.append((ctypes.c_void_p, []))
-                inp_converters.append(lambda a, *args: ctypes.cast(a, ctypes.c_void_p).value)
-            else:
-                inp_converters.append(lambda a: a)
-        offset = len(self.input_types)
-        for index, arg in enumerate(self.return_types):
+        """ Returns a Python function that can be called from native code
+            with the arguments of this callback type, which converts pointers
+            to arrays (and strings) before calling ``pyfunc``.
+
+            Array wrappers are cached per pointer for the lifetime of the
+            trampoline (i.e., one SDFG invocation), so that callbacks that are
+            called repeatedly with the same arrays do not create new array
+            objects on every call.
+
+            :param pyfunc: The Python function to call.
+            :param other_arguments: The arguments of the SDFG call, used to
+                                    resolve symbolic array shapes.
+        """
+        from dace import data
+
+        num_inputs = len(self.input_types)
+        converters = {}
+        for index, arg in enumerate(itertools.chain(self.input_types, self.return_types)):
             if isinstance(arg, data.Array):
-                ret_arraypos.append(index + offset)
-                ret_types_and_sizes.append((arg.dtype.as_ctypes(), arg.shape))
-                if arg.storage == StorageType.GPU_Global:
-                    ret_converters.append(ptrtocupy)
-                else:
-                    ret_converters.append(ptrtonumpy)
+                convert = ptrtocupy if arg.storage == StorageType.GPU_Global else ptrtonumpy
+                converters[index] = _CachedArrayConverter(convert, arg.dtype.as_ctypes(), arg.shape, other_arguments)
             elif isinstance(arg, data.Scalar) and isinstance(arg.dtype, string):
-                ret_arraypos.append(index + offset)
-                ret_types_and_sizes.append((ctypes.c_char_p, []))
-                ret_converters.append(lambda a, *args: ctypes.cast(a, ctypes.c_char_p).value.decode('utf-8'))
+                converters[index] = lambda a: ctypes.cast(a, ctypes.c_char_p).value.decode('utf-8')
             elif isinstance(arg, data.Scalar) and isinstance(arg.dtype, pointer):
-                ret_arraypos.append(index)
-                ret_types_and_sizes.append((ctypes.c_void_p, []))
-                ret_converters.append(lambda a, *args: ctypes.cast(a, ctypes.c_void_p).value)
-            else:
-                ret_converters.append(lambda a, *args: a)
-        if len(inp_arraypos) == 0 and len(ret_arraypos) == 0:
+                converters[index] = lambda a: ctypes.cast(a, ctypes.c_void_p).value
+
+        if self.batched:
+            # Signature: (length, input arrays..., [output array])
+            return _batched_trampoline(pyfunc, [converters[i].with_length for i in range(1, num_inputs)],
+                                       [c.with_length for i, c in converters.items() if i >= num_inputs])
+
+        if len(converters) == 0:
             return pyfunc
 
-        def trampoline(orig_function, indices, data_types_and_sizes, ret_indices, ret_data_types_and_sizes,
-                       *other_inputs):
-            last_input = len(other_inputs)
-            if ret_indices:
-                last_input = ret_indices[0]
-            list_of_other_inputs = list(other_inputs[:last_input])
-            list_of_outputs = []
-            if ret_indices:
-                list_of_outputs = list(other_inputs[ret_indices[0]:])
-            for j, i in enumerate(indices):
-                data_type, size = data_types_and_sizes[j]
-                non_symbolic_sizes = []
-                for s in size:
-                    if isinstance(s, symbolic.symbol):
-                        non_symbolic_sizes.append(other_arguments[str(s)])
-                    else:
-                        non_symbolic_sizes.append(s)
-                list_of_other_inputs[i] = inp_converters[i](other_inputs[i], data_type, non_symbolic_sizes)
-            for j, i in enumerate(ret_indices):
-                data_type, size = ret_data_types_and_sizes[j]
-                non_symbolic_sizes = []
-                for s in size:
-                    if isinstance(s, symbolic.symbol):
-                        non_symbolic_sizes.append(other_arguments[str(s)])
-                    else:
-                        non_symbolic_sizes.append(s)
-                list_of_outputs[i - ret_indices[0]] = ret_converters[i - ret_indices[0]](other_inputs[i], data_type,
-                                                                                         non_symbolic_sizes)
+        conversions = tuple(converters.items())
+        ret_indices = tuple(i for i in converters.keys() if i >= num_inputs)
+
+        def trampoline(*args):
+            args = list(args)
+            for i, convert in conversions:
+                args[i] = convert(args[i])
             if ret_indices:
-                ret = orig_function(*list_of_other_inputs)
-                if len(list_of_outputs) == 1:
+                outputs = [args[i] for i in ret_indices]
+                ret = pyfunc(*args[:num_inputs])
+                if len(outputs) == 1:
                     ret = [ret]
-                for v, r in zip(list_of_outputs, ret):
+                for v, r in zip(outputs, ret):
                     v[:] = r
                 return
-            return orig_function(*list_of_other_inputs)
+            return pyfunc(*args)
 
-        return partial(trampoline, pyfunc, inp_arraypos, inp_types_and_sizes, ret_arraypos, ret_types_and_sizes)
+        return trampoline
 
     def __hash__(self):
-        return hash((*self.return_types, *self.input_types))
+        return hash((*self.return_types, *self.input_types, self.batched))
 
     def to_json(self):
-        if self.return_types:
-            return {
-                'type': 'callback',
-                'arguments': [i.to_json() for i in self.input_types],
-                'returntypes': [r.to_json() for r in self.return_types]
-            }
-        return {'type': 'callback', 'arguments': [i.to_json() for i in self.input_types], 'returntypes': []}
+        result = {
+            'type': 'callback',
+            'arguments': [i.to_json() for i in self.input_types],
+            'returntypes': [r.to_json() for r in self.return_types] if self.return_types else []
+        }
+        if self.batched:
+            result['batched'] = True
+        return result
 
     @staticmethod
     def from_json(json_obj, context=None):
@@ -1007,7 +1065,8 @@ class callback(typeclass):
         import dace.serialize  # Avoid import loop
 
         return callback([json_to_typeclass(rettype) if rettype else None for rettype in rettypes],
-                        *(dace.serialize.from_json(arg, context) for arg in json_obj['arguments']))
+                        *(dace.serialize.from_json(arg, context) for arg in json_obj['arguments']),
+                        batched=json_obj.get('batched', False))
 
     def __str__(self):
         return "dace.callback"
@@ -1018,7 +1077,8 @@ class callback(typeclass):
     def __eq__(self, other):
         if not isinstance(other, callback):
             return False
-        return self.input_types == other.input_types and self.return_types == other.return_types
+        return (self.input_types == other.input_types and self.return_types == other.return_types
+                and self.batched == other.batched)
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -97,6 +97,27 @@ def _gather(pv: 'ProgramVisitor',
     return None
 
 
+@oprepo.replaces('dace.comm.Allreduce')
+def _allreduce(pv: 'ProgramVisitor',
+               sdfg: SDFG,
+               state: SDFGState,
+               in_buffer: str,
+               out_buffer: str,
+               op: str = 'MPI_SUM'):
+
+    from dace.libraries.mpi.nodes.allreduce import Allreduce
+
+    libnode = Allreduce('_Allreduce_', op=op)
+    in_desc = sdfg.arrays[in_buffer]
+    out_desc = sdfg.arrays[out_buffer]
+    in_node = state.add_read(in_buffer)
+    out_node = state.add_write(out_buffer)
+    state.add_edge(in_node, None, libnode, '_inbuffer', Memlet.from_array(in_buffer, in_desc))
+    state.add_edge(libnode, '_outbuffer', out_node, None, Memlet.from_array(out_buffer, out_desc))
+
+    return None
+
+
 @oprepo.replaces('dace.comm.Send')
 def _send(pv: 'ProgramVisitor',
           sdfg: SDFG,
@@ -466,6 +487,119 @@ def _wait(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, request: str):
     return None
 
 
+def _request_node(sdfg: SDFG, state: SDFGState, request: str):
+    req_range = None
+    if isinstance(request, tuple):
+        req_name, req_range = request
+    else:
+        req_name = request
+    req_desc = sdfg.arrays[req_name]
+    req_node = state.add_write(req_name)
+    if req_range:
+        req_mem = Memlet.simple(req_name, req_range)
+    else:
+        req_mem = Memlet.from_array(req_name, req_desc)
+    return req_node, req_mem
+
+
+@oprepo.replaces('dace.comm.Ibcast')
+def _ibcast(pv: 'ProgramVisitor',
+            sdfg: SDFG,
+            state: SDFGState,
+            buffer: str,
+            request: str,
+            root: Union[str, sp.Expr, Number] = 0):
+
+    from dace.libraries.mpi.nodes.ibcast import Ibcast
+
+    libnode = Ibcast('_Ibcast_')
+    desc = sdfg.arrays[buffer]
+    in_buffer = state.add_read(buffer)
+    out_buffer = state.add_write(buffer)
+    if isinstance(root, str) and root in sdfg.arrays.keys():
+        root_node = state.add_read(root)
+    else:
+        storage = desc.storage
+        root_name = _define_local_scalar(pv, sdfg, state, dace.int32, storage)
+        root_node = state.add_access(root_name)
+        root_tasklet = state.add_tasklet('_set_root_', {}, {'__out'}, '__out = {}'.format(root))
+        state.add_edge(root_tasklet, '__out', root_node, None, Memlet.simple(root_name, '0'))
+    req_node, req_mem = _request_node(sdfg, state, request)
+    state.add_edge(in_buffer, None, libnode, '_inbuffer', Memlet.from_array(buffer, desc))
+    state.add_edge(root_node, None, libnode, '_root', Memlet.simple(root_node.data, '0'))
+    state.add_edge(libnode, '_outbuffer', out_buffer, None, Memlet.from_array(buffer, desc))
+    state.add_edge(libnode, '_request', req_node, None, req_mem)
+
+    return None
+
+
+@oprepo.replaces('dace.comm.Iallreduce')
+def _iallreduce(pv: 'ProgramVisitor',
+                sdfg: SDFG,
+                state: SDFGState,
+                in_buffer: str,
+                out_buffer: str,
+                request: str,
+                op: str = 'MPI_SUM'):
+
+    from dace.libraries.mpi.nodes.iallreduce import Iallreduce
+
+    libnode = Iallreduce('_Iallreduce_', op=op)
+    in_desc = sdfg.arrays[in_buffer]
+    out_desc = sdfg.arrays[out_buffer]
+    in_node = state.add_read(in_buffer)
+    out_node = state.add_write(out_buffer)
+    req_node, req_mem = _request_node(sdfg, state, request)
+    state.add_edge(in_node, None, libnode, '_inbuffer', Memlet.from_array(in_buffer, in_desc))
+    state.add_edge(libnode, '_outbuffer', out_node, None, Memlet.from_array(out_buffer, out_desc))
+    state.add_edge(libnode, '_request', req_node, None, req_mem)
+
+    return None
+
+
+@oprepo.replaces('dace.comm.Iallgather')
+def _iallgather(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, in_buffer: str, out_buffer: str, request: str):
+
+    from dace.libraries.mpi.nodes.iallgather import Iallgather
+
+    libnode = Iallgather('_Iallgather_')
+    in_desc = sdfg.arrays[in_buffer]
+    out_desc = sdfg.arrays[out_buffer]
+    in_node = state.add_read(in_buffer)
+    out_node = state.add_write(out_buffer)
+    req_node, req_mem = _request_node(sdfg, state, request)
+    state.add_edge(in_node, None, libnode, '_inbuffer', Memlet.from_array(in_buffer, in_desc))
+    state.add_edge(libnode, '_outbuffer', out_node, None, Memlet.from_array(out_buffer, out_desc))
+    state.add_edge(libnode, '_request', req_node, None, req_mem)
+
+    return None
+
+
+@oprepo.replaces('dace.comm.HaloExchange')
+def _halo_exchange(pv: 'ProgramVisitor',
+                   sdfg: SDFG,
+                   state: SDFGState,
+                   buffer: str,
+                   halo: Sequence[Number],
+                   grid: Sequence[Number] = None,
+                   periodic: Union[bool, Sequence[bool]] = False):
+
+    from dace.libraries.mpi.nodes.halo_exchange import HaloExchange
+
+    desc = sdfg.arrays[buffer]
+    if isinstance(halo, Number):
+        halo = [halo] * len(desc.shape)
+    if not isinstance(periodic, (list, tuple)):
+        periodic = [bool(periodic)] * len(desc.shape)
+    libnode = HaloExchange('_HaloExchange_', halo=halo, grid=grid, periodic=periodic)
+    in_buffer = state.add_read(buffer)
+    out_buffer = state.add_write(buffer)
+    state.add_edge(in_buffer, None, libnode, '_inbuffer', Memlet.from_array(buffer, desc))
+    state.add_edge(libnode, '_outbuffer', out_buffer, None, Memlet.from_array(buffer, desc))
+
+    return None
+
+
 @oprepo.replaces('dace.comm.BCScatter')
 def _bcscatter(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, in_buffer: str, out_buffer: str,
                block_sizes: Union[str, Sequence[Union[sp.Expr, Number]]]):
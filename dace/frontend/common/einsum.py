@@ -1,9 +1,10 @@
 # Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
 """ Classes to handle Einstein-notation sums (einsum) as a library node. """
 from functools import reduce
+import itertools
 from itertools import chain
 from string import ascii_letters
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import dace
 from dace import dtypes, symbolic
@@ -82,6 +83,20 @@ class EinsumParser(object):
         self.c_b_only = [i for i, d in enumerate(c) if d in b_only_vars]
         self.c_batch = [i for i, d in enumerate(c) if d in batch_vars]
 
+    def is_contraction(self):
+        """ Returns True if this einsum is a contraction of two tensors that
+            can be expressed as a (batched) matrix multiplication, possibly
+            after permuting the dimensions of the operands. """
+        if len(self.inputs) != 2:
+            return False
+        a, b = self.inputs
+        c = self.output
+        # Repeated subscripts (diagonals) cannot be expressed as GEMM
+        if len(set(a)) != len(a) or len(set(b)) != len(b) or len(set(c)) != len(c):
+            return False
+        # Indices that are summed within a single operand cannot either
+        return all(var in b or var in c for var in a) and all(var in a or var in c for var in b)
+
     def is_bmm(self):
         if len(self.inputs) != 2:
             return False
@@ -142,6 +157,175 @@ def prod(iterable):
     return reduce(lambda x, y: x * y, iterable, 1)
 
 
+# Value assumed for symbolic dimensions when comparing contraction costs
+SYMBOLIC_SIZE_ESTIMATE = 1024
+
+
+def _estimate(expr) -> float:
+    """ Estimates the value of a (possibly symbolic) size expression, assuming
+        every symbolic dimension is large. """
+    if not symbolic.issymbolic(expr):
+        return float(expr)
+    expr = symbolic.pystr_to_symbolic(expr)
+    return float(expr.subs({s: SYMBOLIC_SIZE_ESTIMATE for s in expr.free_symbols}))
+
+
+def plan_contraction(inputs: List[str], output: str,
+                     chardict: Dict[str, symbolic.SymbolicType]) -> List[Tuple[Tuple[int, int], str]]:
+    """ Greedily plans the order in which to contract the operands of a
+        multi-operand einsum in pairs. At every step, the pair producing the
+        smallest intermediate result (and, for ties, the fewest
+        multiply-adds) is contracted first. Symbolic dimensions are supported
+        and are assumed to be large (see ``SYMBOLIC_SIZE_ESTIMATE``).
+
+        :param inputs: Subscripts of each einsum input.
+        :param output: Subscripts of the einsum output.
+        :param chardict: Mapping from subscript to dimension size.
+        :return: A list of ``((i, j), expression)`` tuples. Operands ``i`` and
+                 ``j`` are removed from the list of remaining operands and the
+                 result of the pairwise einsum ``expression`` is appended to
+                 its end (as in ``opt_einsum.contract_path``).
+    """
+    remaining = list(inputs)
+    contraction_list = []
+    while len(remaining) > 1:
+        best = None
+        for i, j in itertools.combinations(range(len(remaining)), 2):
+            others = ''.join(r for k, r in enumerate(remaining) if k not in (i, j))
+            if len(remaining) == 2:
+                result = output
+            else:
+                result = ''.join(dict.fromkeys(c for c in remaining[i] + remaining[j] if c in others or c in output))
+            allchars = set(remaining[i]) | set(remaining[j])
+            cost = (_estimate(prod(chardict[c] for c in result)), _estimate(prod(chardict[c] for c in allchars)))
+            if best is None or cost < best[0]:
+                best = (cost, (i, j), '%s,%s->%s' % (remaining[i], remaining[j], result), result)
+
+        _, pair, expr, result = best
+        contraction_list.append((pair, expr))
+        remaining = [r for k, r in enumerate(remaining) if k not in pair] + [result]
+
+    return contraction_list
+
+
+def _group_stride(desc: dace.data.Data, subscript: str,
+                  chars: Sequence[str]) -> Tuple[bool, Optional[symbolic.SymbolicType]]:
+    """ Tries to view the dimensions of an operand that correspond to the
+        given subscript characters (outermost first) as a single dimension.
+
+        :return: A 2-tuple of (success, stride of the viewed dimension). The
+                 stride is None if all the dimensions are of size 1.
+    """
+    dims = [subscript.index(ch) for ch in chars if desc.shape[subscript.index(ch)] != 1]
+    for outer, inner in zip(dims, dims[1:]):
+        if symbolic.inequal_symbols(desc.strides[outer], desc.strides[inner] * desc.shape[inner]):
+            return False, None
+    if not dims:
+        return True, None
+    return True, desc.strides[dims[-1]]
+
+
+def _bmm_strides(desc: dace.data.Data, subscript: str, groups: Dict[str, List[str]],
+                 names: Tuple[str, str, str]) -> Optional[List[symbolic.SymbolicType]]:
+    """ Returns the batch and matrix strides of an operand of a batched matrix
+        multiplication, given as the groups of einsum subscripts that form the
+        batch and matrix dimensions, or None if the operand cannot be viewed
+        as such (and must be permuted first). """
+    result = []
+    for name in names:
+        success, stride = _group_stride(desc, subscript, groups[name])
+        if not success:
+            return None
+        result.append(stride)
+
+    # Fill in strides of empty (unit-sized) dimensions
+    sbatch, s1, s2 = result
+    size1 = prod(desc.shape[subscript.index(ch)] for ch in groups[names[1]])
+    size2 = prod(desc.shape[subscript.index(ch)] for ch in groups[names[2]])
+    if s1 is None and s2 is None:
+        s1, s2 = 1, 1
+    elif s1 is None:
+        s1 = size2 if not symbolic.inequal_symbols(s2, 1) else 1
+    elif s2 is None:
+        s2 = size1 if not symbolic.inequal_symbols(s1, 1) else 1
+    if sbatch is None:
+        sbatch = 1
+
+    # BLAS requires one of the matrix dimensions to be contiguous
+    if symbolic.inequal_symbols(s1, 1) and symbolic.inequal_symbols(s2, 1):
+        return None
+    return [sbatch, s1, s2]
+
+
+def _create_einsum_bmm(sdfg: SDFG, state: SDFGState, einsum: EinsumParser, arrays: Sequence[str], output: str,
+                       chardict: Dict[str, symbolic.SymbolicType], dtype: dtypes.typeclass,
+                       input_nodes: Dict[str, AccessNode]) -> AccessNode:
+    """ Lowers a two-operand tensor contraction to a (batched) matrix
+        multiplication. Operand dimensions are grouped into batch, M, K, and N
+        dimensions, which are viewed in-place through strides wherever
+        possible. Operands whose layout cannot be viewed as a matrix are
+        first permuted into a contiguous transient (and, for the output,
+        permuted back after the multiplication). """
+    a, b = einsum.inputs
+    c = einsum.output
+    subscripts = [a, b, c]
+    descs = [sdfg.arrays[arrays[0]], sdfg.arrays[arrays[1]], sdfg.arrays[output]]
+    operand_groups = [('BATCH', 'M', 'K'), ('BATCH', 'K', 'N'), ('BATCH', 'M', 'N')]
+    groups = {
+        'BATCH': [a[i] for i in einsum.a_batch],
+        'M': [a[i] for i in einsum.a_only],
+        'K': [a[i] for i in einsum.a_sum],
+        'N': [b[i] for i in einsum.b_only]
+    }
+
+    # Order each group such that as many operands as possible can be viewed
+    for gname, chars in groups.items():
+        users = [i for i in range(3) if gname in operand_groups[i]]
+        candidates = [[ch for ch in subscripts[i] if ch in chars] for i in users]
+        groups[gname] = max(candidates,
+                            key=lambda order: sum(1 for i in users if _group_stride(descs[i], subscripts[i], order)[0]))
+
+    # Permute operands that cannot be viewed as (batched) matrices
+    nodes = [input_nodes[arrays[0]], input_nodes[arrays[1]], state.add_write(output)]
+    gemm_nodes = list(nodes)
+    strides = []
+    for i in range(3):
+        opstrides = _bmm_strides(descs[i], subscripts[i], groups, operand_groups[i])
+        if opstrides is None:
+            layout = ''.join(ch for gname in operand_groups[i] for ch in groups[gname])
+            tmp, tmpdesc = sdfg.add_temp_transient([chardict[ch] for ch in layout], dtype, descs[i].storage)
+            gemm_nodes[i] = state.add_access(tmp)
+            src, dst = (nodes[i], gemm_nodes[i]) if i < 2 else (gemm_nodes[i], nodes[i])
+            src_index, dst_index = (subscripts[i], layout) if i < 2 else (layout, subscripts[i])
+            state.add_mapped_tasklet('einsum_permute', {'__%s' % ch: '0:%s' % chardict[ch]
+                                                        for ch in layout},
+                                     {'__inp': Memlet.simple(src.data, ','.join('__%s' % ch for ch in src_index))},
+                                     '__out = __inp',
+                                     {'__out': Memlet.simple(dst.data, ','.join('__%s' % ch for ch in dst_index))},
+                                     input_nodes={src.data: src},
+                                     output_nodes={dst.data: dst},
+                                     external_edges=True)
+            opstrides = _bmm_strides(tmpdesc, layout, groups, operand_groups[i])
+        strides.append(opstrides)
+
+    # Compute GEMM dimensions and strides
+    gemm_strides = {gname: prod(chardict[ch] for ch in chars) for gname, chars in groups.items()}
+    for opname, opstrides, gnames in zip('ABC', strides, operand_groups):
+        for gname, stride in zip(gnames, opstrides):
+            gemm_strides['s%s%s' % (opname, gname[0])] = stride
+
+    # Create nested SDFG for GEMM
+    nsdfg = create_batch_gemm_sdfg(dtype, gemm_strides)
+
+    x, y, z = gemm_nodes
+    nsdfg_node = state.add_nested_sdfg(nsdfg, None, {'X', 'Y'}, {'Z'}, gemm_strides)
+    state.add_edge(x, None, nsdfg_node, 'X', Memlet.from_array(x.data, x.desc(sdfg)))
+    state.add_edge(y, None, nsdfg_node, 'Y', Memlet.from_array(y.data, y.desc(sdfg)))
+    state.add_edge(nsdfg_node, 'Z', z, None, Memlet.from_array(z.data, z.desc(sdfg)))
+
+    return nodes[2]
+
+
 @oprepo.replaces('numpy.einsum')
 def create_einsum_sdfg(pv: 'dace.frontend.python.newast.ProgramVisitor',
                        sdfg: SDFG,
@@ -181,28 +365,15 @@ def _create_einsum_internal(sdfg: SDFG,
                 raise ValueError('Dimension mismatch in einsum expression')
             chardict[char] = shp
 
-    if optimize:
-        # Try to import opt_einsum
-        try:
-            import opt_einsum as oe
-        except (ModuleNotFoundError, NameError, ImportError):
-            raise ImportError('To optimize einsum expressions, please install ' 'the "opt_einsum" package.')
-
-        for char, shp in chardict.items():
-            if symbolic.issymbolic(shp):
-                raise ValueError('Einsum optimization cannot be performed '
-                                 'on symbolically-sized array dimension "%s" '
-                                 'for subscript character "%s"' % (shp, char))
-
-        # Create optimal contraction path
-        # noinspection PyTypeChecker
-        _, path_info = oe.contract_path(einsum_string, *oe.helpers.build_views(einsum_string, chardict))
+    if optimize and len(einsum.inputs) > 2:
+        # Create a contraction path
+        contraction_list = plan_contraction(einsum.inputs, einsum.output, chardict)
 
         input_nodes = nodes or {arr: state.add_read(arr) for arr in arrays}
         result_node = None
 
         # Follow path and create a chain of operation SDFG states
-        for pair, nonfree, expr, after, blas in path_info.contraction_list:
+        for pair, expr in contraction_list:
             result, result_node = _create_einsum_internal(sdfg,
                                                           state,
                                                           expr,
@@ -237,7 +408,14 @@ def _create_einsum_internal(sdfg: SDFG,
     if not is_conflicted and init_output is None:
         to_init = False
 
-    if not einsum.is_bmm():
+    # Contractions are lowered to (batched) matrix multiplication. Batched
+    # matrix-vector products and batched dot products are not, since their
+    # unit-sized matrix dimensions would be squeezed away.
+    use_bmm = einsum.is_contraction() and (einsum.is_bmm() or len(einsum.a_sum) > 0)
+    if use_bmm and einsum.a_batch and (not einsum.a_only or not einsum.b_only):
+        use_bmm = False
+
+    if not use_bmm:
         # Fall back to "pure" SDFG einsum with conflict resolution
         c = state.add_write(output)
 
@@ -269,47 +447,38 @@ def _create_einsum_internal(sdfg: SDFG,
             external_edges=True)
     else:
         # Represent einsum as a GEMM or batched GEMM (using library nodes)
-        a_shape = sdfg.arrays[arrays[0]].shape
-        b_shape = sdfg.arrays[arrays[1]].shape
-        c_shape = output_shape
+        c = _create_einsum_bmm(sdfg, state, einsum, arrays, output, chardict, dtype, input_nodes)
 
-        a = input_nodes[arrays[0]]
-        b = input_nodes[arrays[1]]
-        c = state.add_write(output)
+    return output, c
 
-        # Compute GEMM dimensions and strides
-        strides = dict(BATCH=prod([c_shape[dim] for dim in einsum.c_batch]),
-                       M=prod([a_shape[dim] for dim in einsum.a_only]),
-                       K=prod([a_shape[dim] for dim in einsum.a_sum]),
-                       N=prod([b_shape[dim] for dim in einsum.b_only]),
-                       sAM=prod(a_shape[einsum.a_only[-1] + 1:]) if einsum.a_only else 1,
-                       sAK=prod(a_shape[einsum.a_sum[-1] + 1:]) if einsum.a_sum else 1,
-                       sAB=prod(a_shape[einsum.a_batch[-1] + 1:]) if einsum.a_batch else 1,
-                       sBK=prod(b_shape[einsum.b_sum[-1] + 1:]) if einsum.b_sum else 1,
-                       sBN=prod(b_shape[einsum.b_only[-1] + 1:]) if einsum.b_only else 1,
-                       sBB=prod(b_shape[einsum.b_batch[-1] + 1:]) if einsum.b_batch else 1,
-                       sCM=prod(c_shape[einsum.c_a_only[-1] + 1:]) if einsum.c_a_only else 1,
-                       sCN=prod(c_shape[einsum.c_b_only[-1] + 1:]) if einsum.c_b_only else 1,
-                       sCB=prod(c_shape[einsum.c_batch[-1] + 1:]) if einsum.c_batch else 1)
-
-        # Complement strides to make matrices as necessary
-        if len(a_shape) == 1 and len(einsum.a_sum) == 1:
-            strides['sAK'] = 1
-            strides['sAB'] = strides['sAM'] = strides['K']
-        if len(b_shape) == 1 and len(einsum.b_sum) == 1:
-            strides['sBN'] = 1
-            strides['sBK'] = 1
-            strides['sBB'] = strides['K']
-        if len(c_shape) == 1 and len(einsum.a_sum) == len(einsum.b_sum):
-            strides['sCN'] = 1
-            strides['sCB'] = strides['sCM'] = strides['N']
-
-        # Create nested SDFG for GEMM
-        nsdfg = create_batch_gemm_sdfg(dtype, strides)
-
-        nsdfg_node = state.add_nested_sdfg(nsdfg, None, {'X', 'Y'}, {'Z'}, strides)
-        state.add_edge(a, None, nsdfg_node, 'X', Memlet.from_array(a.data, a.desc(sdfg)))
-        state.add_edge(b, None, nsdfg_node, 'Y', Memlet.from_array(b.data, b.desc(sdfg)))
-        state.add_edge(nsdfg_node, 'Z', c, None, Memlet.from_array(c.data, c.desc(sdfg)))
 
-    return output, c
+@oprepo.replaces('numpy.tensordot')
+def _tensordot(pv: 'dace.frontend.python.newast.ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, b: str, axes=2):
+    """ Implements ``numpy.tensordot`` as an einsum contraction. """
+    ndim_a = len(sdfg.arrays[a].shape)
+    ndim_b = len(sdfg.arrays[b].shape)
+    if isinstance(axes, (list, tuple)):
+        a_axes, b_axes = axes
+        if not isinstance(a_axes, (list, tuple)):
+            a_axes = [a_axes]
+        if not isinstance(b_axes, (list, tuple)):
+            b_axes = [b_axes]
+    else:
+        a_axes = list(range(ndim_a - axes, ndim_a))
+        b_axes = list(range(axes))
+    a_axes = [ax + ndim_a if ax < 0 else ax for ax in a_axes]
+    b_axes = [ax + ndim_b if ax < 0 else ax for ax in b_axes]
+    if len(a_axes) != len(b_axes):
+        raise ValueError('Shape mismatch for sum in tensordot')
+    if ndim_a + ndim_b - len(a_axes) > len(ascii_letters):
+        raise ValueError('Too many dimensions in tensordot')
+
+    # Create einsum subscripts
+    a_subscript = ascii_letters[:ndim_a]
+    b_letters = iter(ascii_letters[ndim_a:])
+    b_subscript = ''.join(a_subscript[a_axes[b_axes.index(i)]] if i in b_axes else next(b_letters)
+                          for i in range(ndim_b))
+    out_subscript = ''.join(ch for i, ch in enumerate(a_subscript) if i not in a_axes)
+    out_subscript += ''.join(ch for i, ch in enumerate(b_subscript) if i not in b_axes)
+
+    return _create_einsum_internal(sdfg, state, '%s,%s->%s' % (a_subscript, b_subscript, out_subscript), a, b)[0]
@@ -732,6 +732,49 @@ def _min(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, axis=None):
                    identity=dtypes.max_value(sdfg.arrays[a].dtype))
 
 
+def _scan(pv: 'ProgramVisitor',
+          sdfg: SDFG,
+          state: SDFGState,
+          scanfunction: str,
+          a: str,
+          axis=None,
+          dtype=None,
+          identity=None,
+          exclusive=False):
+    desc = sdfg.arrays[a]
+
+    # A scan without an axis operates on the flattened array
+    if axis is None:
+        axis = 0
+        if len(desc.shape) > 1:
+            a = reshape(pv, sdfg, state, a, [data._prod(desc.shape)])
+            desc = sdfg.arrays[a]
+    else:
+        axis = normalize_axes([axis], len(desc.shape))[0]
+
+    outarr, arr = sdfg.add_temp_transient(desc.shape, dtype or desc.dtype, desc.storage)
+
+    from dace.libraries.standard.nodes.scan import Scan  # Avoid import loop
+    inpnode = state.add_read(a)
+    scannode = Scan(scanfunction, axis=axis, identity=identity, exclusive=exclusive)
+    state.add_node(scannode)
+    outnode = state.add_write(outarr)
+    state.add_edge(inpnode, None, scannode, '_in', Memlet.from_array(a, desc))
+    state.add_edge(scannode, '_out', outnode, None, Memlet.from_array(outarr, arr))
+
+    return outarr
+
+
+@oprepo.replaces('numpy.cumsum')
+def _cumsum(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, axis=None, dtype=None):
+    return _scan(pv, sdfg, state, "lambda x, y: x + y", a, axis=axis, dtype=dtype, identity=0)
+
+
+@oprepo.replaces('numpy.cumprod')
+def _cumprod(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, axis=None, dtype=None):
+    return _scan(pv, sdfg, state, "lambda x, y: x * y", a, axis=axis, dtype=dtype, identity=1)
+
+
 def _minmax2(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, b: str, ismin=True):
     """ Implements the min or max function with 2 scalar arguments. """
 
@@ -3932,6 +3975,192 @@ def view(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, arr: str, dtype, ty
     return newarr
 
 
+def _normalize_axis(pv: 'ProgramVisitor', axis: Integral, ndim: int) -> int:
+    if not isinstance(axis, Integral):
+        raise mem_parser.DaceSyntaxError(pv, None, 'Axis must be a constant integer')
+    if axis < -ndim or axis >= ndim:
+        raise mem_parser.DaceSyntaxError(pv, None, 'Axis {} is out of bounds for {} dimensions'.format(axis, ndim))
+    return axis % ndim
+
+
+def _join_arrays(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, arrays: Sequence[str], axis: int, new_axis: bool,
+                 out: Optional[str]) -> str:
+    """ Joins arrays along an (existing or new) axis. Every input is copied
+        directly into a strided slice of the output, so that simplification
+        (RedundantArray) can redirect the producers of transient inputs to
+        write into the output in place, avoiding any intermediate buffers.
+    """
+    if isinstance(arrays, str) or len(arrays) == 0:
+        raise mem_parser.DaceSyntaxError(pv, None, 'Expected a non-empty sequence of arrays')
+    for arr in arrays:
+        if not isinstance(arr, str) or arr not in sdfg.arrays:
+            raise mem_parser.DaceSyntaxError(pv, None, 'Prototype argument {} is not SDFG data!'.format(arr))
+    descs = [sdfg.arrays[arr] for arr in arrays]
+    if any(isinstance(desc, data.Stream) for desc in descs):
+        raise mem_parser.DaceSyntaxError(pv, None, 'Streams are not supported!')
+    dtype = descs[0].dtype
+    if any(desc.dtype != dtype for desc in descs):
+        raise mem_parser.DaceSyntaxError(pv, None, 'Joining arrays of different data types is not supported')
+
+    shape = list(descs[0].shape)
+    ndim = len(shape) + 1 if new_axis else len(shape)
+    if ndim == 0:
+        raise mem_parser.DaceSyntaxError(pv, None, 'Zero-dimensional arrays cannot be concatenated')
+    axis = _normalize_axis(pv, axis, ndim)
+    for desc in descs[1:]:
+        if len(desc.shape) != len(shape) or any(
+                s != o for i, (s, o) in enumerate(zip(desc.shape, shape)) if new_axis or i != axis):
+            raise mem_parser.DaceSyntaxError(pv, None, 'All input array dimensions must match')
+
+    # Compute output shape
+    if new_axis:
+        out_shape = shape[:axis] + [len(arrays)] + shape[axis:]
+    else:
+        out_shape = list(shape)
+        out_shape[axis] = sum(desc.shape[axis] for desc in descs)
+
+    if out is None:
+        out, outdesc = sdfg.add_temp_transient(out_shape, dtype, storage=descs[0].storage)
+    else:
+        if isinstance(out, (list, tuple)) and len(out) == 1:
+            out = out[0]
+        outdesc = sdfg.arrays[out]
+        if len(outdesc.shape) != ndim or any(symbolic.inequal_symbols(s, o) for s, o in zip(outdesc.shape, out_shape)):
+            raise mem_parser.DaceSyntaxError(pv, None, 'Output array has wrong shape')
+
+    wnode = state.add_write(out)
+    offset = 0
+    for i, (arr, desc) in enumerate(zip(arrays, descs)):
+        rng = [(0, s - 1, 1) for s in out_shape]
+        if new_axis:
+            rng[axis] = (i, i, 1)
+        else:
+            rng[axis] = (offset, offset + desc.shape[axis] - 1, 1)
+            offset += desc.shape[axis]
+        rnode = state.add_read(arr)
+        state.add_nedge(rnode, wnode,
+                        Memlet(data=out, subset=subsets.Range(rng), other_subset=subsets.Range.from_array(desc)))
+
+    return out
+
+
+@oprepo.replaces('numpy.concatenate')
+def _concatenate(pv: 'ProgramVisitor',
+                 sdfg: SDFG,
+                 state: SDFGState,
+                 arrays: Sequence[str],
+                 axis: Integral = 0,
+                 out: Optional[str] = None) -> str:
+    """ Joins a sequence of arrays along an existing axis. """
+    return _join_arrays(pv, sdfg, state, arrays, axis, False, out)
+
+
+@oprepo.replaces('numpy.stack')
+def _stack(pv: 'ProgramVisitor',
+           sdfg: SDFG,
+           state: SDFGState,
+           arrays: Sequence[str],
+           axis: Integral = 0,
+           out: Optional[str] = None) -> str:
+    """ Joins a sequence of arrays along a new axis. """
+    return _join_arrays(pv, sdfg, state, arrays, axis, True, out)
+
+
+def _split_array(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, ary: str,
+                 indices_or_sections: Union[Integral,
+                                            Sequence[Integral]], axis: Integral, allow_uneven: bool) -> List[str]:
+    """ Splits an array into views of its sub-arrays along an axis. No data is
+        copied, each returned sub-array is a View with the strides of ``ary``.
+    """
+    if isinstance(ary, (list, tuple)) and len(ary) == 1:
+        ary = ary[0]
+    if ary not in sdfg.arrays:
+        raise mem_parser.DaceSyntaxError(pv, None, 'Prototype argument {} is not SDFG data!'.format(ary))
+    desc = sdfg.arrays[ary]
+    if isinstance(desc, (data.Stream, data.Scalar)):
+        raise mem_parser.DaceSyntaxError(pv, None, 'Only arrays can be split')
+    axis = _normalize_axis(pv, axis, len(desc.shape))
+    length = desc.shape[axis]
+
+    # Compute split points
+    if isinstance(indices_or_sections, Integral):
+        sections = int(indices_or_sections)
+        if sections <= 0:
+            raise mem_parser.DaceSyntaxError(pv, None, 'Number of sections must be larger than 0')
+        if issymbolic(length, sdfg.constants):
+            if allow_uneven:
+                raise mem_parser.DaceSyntaxError(pv, None,
+                                                 'array_split with a symbolic axis length requires explicit indices')
+            # Assume evenly divisible, as NumPy would otherwise raise an error
+            sizes = [length / sections] * sections
+        else:
+            length = int(symbolic.evaluate(length, sdfg.constants))
+            if not allow_uneven and length % sections != 0:
+                raise mem_parser.DaceSyntaxError(pv, None, 'Array split does not result in an equal division')
+            sizes = [length // sections + (1 if i < length % sections else 0) for i in range(sections)]
+        points = [0]
+        for size in sizes:
+            points.append(points[-1] + size)
+    else:
+        # Negative indices count from the end and out-of-bounds indices are
+        # clamped, as in NumPy
+        points = []
+        for i in indices_or_sections:
+            point = symbolic.pystr_to_symbolic(i)
+            if point.is_negative:
+                point += length
+            points.append(sp.Max(sp.Min(point, length), 0))
+        points = [0] + points + [length]
+
+    # Create a view for every sub-array
+    results = []
+    for begin, end in zip(points[:-1], points[1:]):
+        size = sp.Max(end - begin, 0)
+        rng = list(subsets.Range.from_array(desc).ranges)
+        rng[axis] = (begin, begin + size - 1, 1)
+        shape = list(desc.shape)
+        shape[axis] = size
+        newarr, newdesc = sdfg.add_view(ary,
+                                        shape,
+                                        desc.dtype,
+                                        storage=desc.storage,
+                                        strides=desc.strides,
+                                        allow_conflicts=desc.allow_conflicts,
+                                        total_size=desc.total_size,
+                                        may_alias=desc.may_alias,
+                                        alignment=desc.alignment,
+                                        find_new_name=True)
+
+        # Register view with DaCe program visitor
+        pv.views[newarr] = (ary,
+                            Memlet(data=ary, subset=subsets.Range(rng), other_subset=subsets.Range.from_array(newdesc)))
+        results.append(newarr)
+
+    return results
+
+
+@oprepo.replaces('numpy.split')
+def _split(pv: 'ProgramVisitor',
+           sdfg: SDFG,
+           state: SDFGState,
+           ary: str,
+           indices_or_sections: Union[Integral, Sequence[Integral]],
+           axis: Integral = 0) -> List[str]:
+    """ Splits an array into multiple sub-array views of equal size. """
+    return _split_array(pv, sdfg, state, ary, indices_or_sections, axis, False)
+
+
+@oprepo.replaces('numpy.array_split')
+def _array_split(pv: 'ProgramVisitor',
+                 sdfg: SDFG,
+                 state: SDFGState,
+                 ary: str,
+                 indices_or_sections: Union[Integral, Sequence[Integral]],
+                 axis: Integral = 0) -> List[str]:
+    """ Splits an array into multiple sub-array views, allowing unequal division. """
+    return _split_array(pv, sdfg, state, ary, indices_or_sections, axis, True)
+
+
 @oprepo.replaces_attribute('Array', 'size')
 @oprepo.replaces_attribute('Scalar', 'size')
 @oprepo.replaces_attribute('View', 'size')
@@ -4359,3 +4588,129 @@ def _inv(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, inp_op: str):
     state.add_memlet_path(chlsky_node, out, src_conn="_b", memlet=Memlet.from_array(*out_arr))
 
     return out_arr[0]
+
+
+# NumPy FFT replacements ######################################################
+
+
+def _fft(pv: 'ProgramVisitor',
+         sdfg: SDFG,
+         state: SDFGState,
+         a: str,
+         lengths: Optional[Sequence[Integral]],
+         axes: Optional[Sequence[Integral]],
+         inverse: bool,
+         kind: str,
+         norm: Optional[str] = None) -> str:
+    """ Adds an FFT library node to the state. Single-precision inputs are
+        transformed in single precision, all other inputs in double precision.
+    """
+    from dace.libraries.fft import FFT  # Avoid import loop
+
+    if isinstance(a, (list, tuple)) and len(a) == 1:
+        a = a[0]
+    if not isinstance(a, str) or a not in sdfg.arrays:
+        raise mem_parser.DaceSyntaxError(pv, None, 'Prototype argument {} is not SDFG data!'.format(a))
+    desc = sdfg.arrays[a]
+    if isinstance(desc, (data.Stream, data.Scalar)) or len(desc.shape) == 0:
+        raise mem_parser.DaceSyntaxError(pv, None, 'FFT input must be an array')
+    ndim = len(desc.shape)
+
+    # Axes and lengths (numpy.fft semantics)
+    if axes is None:
+        axes = list(range(ndim)) if lengths is None else list(range(ndim - len(lengths), ndim))
+    axes = [_normalize_axis(pv, ax, ndim) for ax in axes]
+    if len(set(axes)) != len(axes):
+        raise mem_parser.DaceSyntaxError(pv, None, 'FFT axes must be unique')
+    if lengths is not None and len(lengths) != len(axes):
+        raise mem_parser.DaceSyntaxError(pv, None, 'Shape and axes have different lengths')
+
+    single = desc.dtype in (dace.float32, dace.complex64)
+    out_shape = list(desc.shape)
+    if kind == 'c2r':
+        # The length of the last axis cannot be inferred from the half spectrum
+        last = axes[-1]
+        n = lengths[-1] if lengths is not None and lengths[-1] is not None else 2 * (desc.shape[last] - 1)
+        if (n // 2 + 1 != desc.shape[last]) == True:
+            raise mem_parser.DaceSyntaxError(pv, None, 'Cropping or padding the FFT input is not supported')
+        out_shape[last] = n
+        lengths = None if lengths is None else lengths[:-1]
+        axes_to_check = axes[:-1]
+        out_dtype = dace.float32 if single else dace.float64
+    else:
+        axes_to_check = axes
+        out_dtype = dace.complex64 if single else dace.complex128
+        if kind == 'r2c':
+            if desc.dtype in (dace.complex64, dace.complex128):
+                raise mem_parser.DaceSyntaxError(pv, None, 'Real FFT input must be real')
+            out_shape[axes[-1]] = desc.shape[axes[-1]] // 2 + 1
+    if lengths is not None:
+        for ax, n in zip(axes_to_check, lengths):
+            if n is not None and (n != desc.shape[ax]) == True:
+                raise mem_parser.DaceSyntaxError(pv, None, 'Cropping or padding the FFT input is not supported')
+
+    out, outdesc = sdfg.add_temp_transient(out_shape, out_dtype, storage=desc.storage)
+    node = FFT('fft', axes=axes, inverse=inverse, kind=kind, norm=norm or 'backward')
+    state.add_edge(state.add_read(a), None, node, '_in', Memlet.from_array(a, desc))
+    state.add_edge(node, '_out', state.add_write(out), None, Memlet.from_array(out, outdesc))
+    return out
+
+
+@oprepo.replaces('numpy.fft.fft')
+def _numpy_fft_fft(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, n=None, axis=-1, norm=None):
+    return _fft(pv, sdfg, state, a, None if n is None else [n], [axis], False, 'c2c', norm)
+
+
+@oprepo.replaces('numpy.fft.ifft')
+def _numpy_fft_ifft(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, n=None, axis=-1, norm=None):
+    return _fft(pv, sdfg, state, a, None if n is None else [n], [axis], True, 'c2c', norm)
+
+
+@oprepo.replaces('numpy.fft.fft2')
+def _numpy_fft_fft2(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=(-2, -1), norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, False, 'c2c', norm)
+
+
+@oprepo.replaces('numpy.fft.ifft2')
+def _numpy_fft_ifft2(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=(-2, -1), norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, True, 'c2c', norm)
+
+
+@oprepo.replaces('numpy.fft.fftn')
+def _numpy_fft_fftn(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=None, norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, False, 'c2c', norm)
+
+
+@oprepo.replaces('numpy.fft.ifftn')
+def _numpy_fft_ifftn(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=None, norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, True, 'c2c', norm)
+
+
+@oprepo.replaces('numpy.fft.rfft')
+def _numpy_fft_rfft(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, n=None, axis=-1, norm=None):
+    return _fft(pv, sdfg, state, a, None if n is None else [n], [axis], False, 'r2c', norm)
+
+
+@oprepo.replaces('numpy.fft.irfft')
+def _numpy_fft_irfft(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, n=None, axis=-1, norm=None):
+    return _fft(pv, sdfg, state, a, None if n is None else [n], [axis], True, 'c2r', norm)
+
+
+@oprepo.replaces('numpy.fft.rfft2')
+def _numpy_fft_rfft2(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=(-2, -1), norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, False, 'r2c', norm)
+
+
+@oprepo.replaces('numpy.fft.irfft2')
+def _numpy_fft_irfft2(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=(-2, -1), norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, True, 'c2r', norm)
+
+
+@oprepo.replaces('numpy.fft.rfftn')
+def _numpy_fft_rfftn(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=None, norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, False, 'r2c', norm)
+
+
+@oprepo.replaces('numpy.fft.irfftn')
+def _numpy_fft_irfftn(pv: 'ProgramVisitor', sdfg: SDFG, state: SDFGState, a: str, s=None, axes=None, norm=None):
+    return _fft(pv, sdfg, state, a, s, axes, True, 'c2r', norm)
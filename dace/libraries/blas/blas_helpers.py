@@ -212,3 +212,39 @@ def check_access(schedule: dtypes.ScheduleType, *descs: data.Data):
     for desc in descs:
         if not dtypes.can_access(schedule, desc.storage):
             raise ValueError(f"Schedule mismatch: {schedule} cannot access {desc.storage}")
+
+
+def to_cpp_scalar(value: Any, dtype: dtypes.typeclass) -> str:
+    """ Returns a C++ expression for a scalar factor (e.g., alpha or beta)
+        of the given data type.
+
+        :param value: the scalar value, which may be complex or symbolic.
+        :param dtype: the data type of the factor.
+    """
+    # Avoid import loops
+    from dace.codegen.targets.common import sym2cpp
+
+    if isinstance(value, complex):
+        return f'{dtype.ctype}({value.real}, {value.imag})'
+    return f'{dtype.ctype}({sym2cpp(value)})'
+
+
+def can_use_blocked_kernels(node, state, sdfg, *descs: data.Data) -> bool:
+    """ Returns True if the portable blocked BLAS kernels (see
+        ``dace_blas_kernels.h``) can compute the given library node, i.e., if
+        all operands have the same scalar floating-point type and are
+        accessible from the host.
+
+        :param node: the BLAS library node.
+        :param state: the state of the library node.
+        :param sdfg: the SDFG of the library node.
+        :param descs: the data descriptors of the operands.
+    """
+    from dace.sdfg.scope import is_devicelevel_gpu, is_devicelevel_fpga
+    if is_devicelevel_gpu(sdfg, state, node) or is_devicelevel_fpga(sdfg, state, node):
+        return False
+    dtype = descs[0].dtype
+    if dtype not in (dtypes.float32, dtypes.float64, dtypes.complex64, dtypes.complex128):
+        return False
+    return all(desc.dtype == dtype and dtypes.can_access(dtypes.ScheduleType.CPU_Multicore, desc.storage)
+               for desc in descs)
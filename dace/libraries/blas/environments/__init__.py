@@ -2,3 +2,4 @@
 from .openblas import *
 from .intel_mkl import *
 from .cublas import *
+from .blocked_blas import *
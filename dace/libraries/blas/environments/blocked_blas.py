@@ -0,0 +1,26 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace.library
+
+
+@dace.library.environment
+class BlockedBLAS:
+    """ 
+    An environment for the portable, cache-blocked BLAS kernels that are
+    shipped with DaCe. The kernels are header-only and require no external
+    library.
+    """
+
+    cmake_minimum_version = None
+    cmake_packages = []
+    cmake_variables = {}
+    cmake_includes = []
+    cmake_libraries = []
+    cmake_compile_flags = []
+    cmake_link_flags = []
+    cmake_files = []
+
+    headers = ["../include/dace_blas_kernels.h"]
+    state_fields = []
+    init_code = ""
+    finalize_code = ""
+    dependencies = []
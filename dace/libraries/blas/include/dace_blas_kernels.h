@@ -0,0 +1,349 @@
+// Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+#pragma once
+
+// Portable, cache-blocked BLAS kernels for CPUs, used by the "blocked"
+// implementations of the BLAS library nodes when no vendor library is
+// available. Matrix multiplication follows the BLIS design: the operands are
+// blocked for the cache hierarchy (KC x NC panels of B in the L3 cache, MC x KC
+// blocks of A in the L2 cache), packed into contiguous micro-panels, and
+// multiplied by a register-blocked MR x NR micro-kernel written with dace::vec
+// types. Macro-tiles of C are distributed among OpenMP threads.
+// All matrices are given with general row and column strides (in elements),
+// so transposed and sliced operands do not require copies.
+
+#include <algorithm>  // std::min, std::max
+#include <cstddef>    // std::ptrdiff_t
+#include <cstdint>    // std::uintptr_t
+#include <memory>     // std::unique_ptr
+#include <type_traits>
+
+#include <dace/types.h>
+#include <dace/vector.h>
+#include <dace/simd.h>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+#if defined(__AVX512F__)
+#define DACE_BLAS_VECTOR_BYTES 64
+#elif defined(__AVX__)
+#define DACE_BLAS_VECTOR_BYTES 32
+#else
+#define DACE_BLAS_VECTOR_BYTES 16
+#endif
+
+namespace dace {
+
+namespace blas {
+
+// Blocking parameters. Real floating-point types use the vector units, other
+// types (e.g., complex numbers) use a scalar micro-kernel.
+template <typename T, bool = std::is_same<T, float>::value || std::is_same<T, double>::value>
+struct gemm_blocking {
+    enum : int {
+        VL = 1,    // Vector length
+        MR = 4,    // Micro-tile rows
+        NR = 4,    // Micro-tile columns
+        KC = 256,  // Depth of packed panels
+        MC = 64,   // Rows of a packed block of A
+        NC = 2048  // Columns of a packed panel of B
+    };
+};
+
+template <typename T>
+struct gemm_blocking<T, true> {
+    enum : int {
+        VL = DACE_BLAS_VECTOR_BYTES / sizeof(T),
+        MR = 6,
+        NR = 2 * VL,  // 12 vector accumulators
+        KC = 256,
+        MC = 96,
+        NC = 4096
+    };
+};
+
+namespace detail {
+
+// Uninitialized, cache-line aligned scratch memory
+template <typename T>
+class aligned_buffer {
+public:
+    explicit aligned_buffer(std::size_t size) : storage_(new char[size * sizeof(T) + 64]) {
+        auto address = reinterpret_cast<std::uintptr_t>(storage_.get());
+        data_ = reinterpret_cast<T*>((address + 63) & ~std::uintptr_t(63));
+    }
+    T* get() const { return data_; }
+
+private:
+    std::unique_ptr<char[]> storage_;
+    T* data_;
+};
+
+template <typename T, int VL>
+static inline dace::vec<T, VL> zero() {
+    const T zeros[VL] = {};
+    return dace::simd::load<T, VL>(zeros);
+}
+
+static inline int round_up(int value, int multiple) { return ((value + multiple - 1) / multiple) * multiple; }
+
+static inline int num_threads(double work) {
+#ifdef _OPENMP
+    // Small problems and calls from within parallel regions run sequentially
+    if (omp_in_parallel() || work < 64.0 * 64.0 * 64.0) return 1;
+    return omp_get_max_threads();
+#else
+    return 1;
+#endif
+}
+
+// Micro-kernel: computes an m x n (m <= MR, n <= NR) tile
+//   C = alpha * A * B + beta * C,
+// where row `r` of A at depth `k` is a[k * lda + r] and B is stored in rows of
+// NR contiguous elements with a distance of `ldb`. Packed panels are
+// zero-padded, so the kernel always computes full MR x NR tiles. If beta is
+// zero, C is not read.
+template <typename T, int MR, int NR, int VL>
+static inline void micro_kernel(int kc, T alpha, const T* a, std::ptrdiff_t lda, const T* b, std::ptrdiff_t ldb,
+                                T beta, T* c, std::ptrdiff_t rsc, std::ptrdiff_t csc, int m, int n) {
+    constexpr int NV = NR / VL;
+    using vec_t = dace::vec<T, VL>;
+    static_assert(NR % VL == 0, "Micro-tile width must be a multiple of the vector length");
+
+    vec_t acc[MR][NV];
+    for (int r = 0; r < MR; ++r)
+        for (int v = 0; v < NV; ++v) acc[r][v] = zero<T, VL>();
+
+    for (int k = 0; k < kc; ++k) {
+        vec_t bv[NV];
+        for (int v = 0; v < NV; ++v) bv[v] = dace::simd::load<T, VL>(b + v * VL);
+        for (int r = 0; r < MR; ++r) {
+            const T ar = a[r];
+            for (int v = 0; v < NV; ++v) acc[r][v] += bv[v] * ar;
+        }
+        a += lda;
+        b += ldb;
+    }
+
+    if (m == MR && n == NR && csc == 1) {
+        for (int r = 0; r < MR; ++r) {
+            T* crow = c + r * rsc;
+            for (int v = 0; v < NV; ++v) {
+                vec_t result = acc[r][v] * alpha;
+                if (beta != T(0)) result += dace::simd::load<T, VL>(crow + v * VL) * beta;
+                dace::simd::store<T, VL>(crow + v * VL, result);
+            }
+        }
+    } else {
+        // Partial tile or non-contiguous rows
+        T tile[MR][NR];
+        for (int r = 0; r < MR; ++r)
+            for (int v = 0; v < NV; ++v) dace::simd::store<T, VL>(&tile[r][v * VL], acc[r][v]);
+        for (int r = 0; r < m; ++r) {
+            for (int j = 0; j < n; ++j) {
+                T& cval = c[r * rsc + j * csc];
+                cval = (beta != T(0)) ? T(alpha * tile[r][j] + beta * cval) : T(alpha * tile[r][j]);
+            }
+        }
+    }
+}
+
+// Packs an m x k block of A into micro-panels of MR rows
+template <typename T, int MR>
+static void pack_a(int m, int k, const T* A, std::ptrdiff_t rsa, std::ptrdiff_t csa, T* packed) {
+    for (int ir = 0; ir < m; ir += MR) {
+        const int rows = std::min(int(MR), m - ir);
+        for (int p = 0; p < k; ++p) {
+            for (int r = 0; r < rows; ++r) packed[r] = A[(ir + r) * rsa + p * csa];
+            for (int r = rows; r < MR; ++r) packed[r] = T(0);
+            packed += MR;
+        }
+    }
+}
+
+// Packs a k x n panel of B into micro-panels of NR columns
+template <typename T, int NR>
+static void pack_b(int k, int n, const T* B, std::ptrdiff_t rsb, std::ptrdiff_t csb, T* packed) {
+    for (int p = 0; p < k; ++p) {
+        const T* brow = B + p * rsb;
+        int j = 0;
+        if (csb == 1) {
+            for (; j < n; ++j) packed[j] = brow[j];
+        } else {
+            for (; j < n; ++j) packed[j] = brow[j * csb];
+        }
+        for (; j < NR; ++j) packed[j] = T(0);
+        packed += NR;
+    }
+}
+
+template <typename T>
+static void scale(int M, int N, T beta, T* C, std::ptrdiff_t rsc, std::ptrdiff_t csc) {
+    for (int i = 0; i < M; ++i)
+        for (int j = 0; j < N; ++j) {
+            T& cval = C[i * rsc + j * csc];
+            cval = (beta != T(0)) ? T(beta * cval) : T(0);
+        }
+}
+
+}  // namespace detail
+
+// C (M x N) = alpha * A (M x K) * B (K x N) + beta * C
+template <typename T>
+void gemm(int M, int N, int K, T alpha, const T* A, std::ptrdiff_t rsa, std::ptrdiff_t csa, const T* B,
+          std::ptrdiff_t rsb, std::ptrdiff_t csb, T beta, T* C, std::ptrdiff_t rsc, std::ptrdiff_t csc) {
+    using blocking = gemm_blocking<T>;
+    constexpr int MR = blocking::MR, NR = blocking::NR, VL = blocking::VL;
+    constexpr int KC = blocking::KC, MC = blocking::MC;
+
+    if (M <= 0 || N <= 0) return;
+    if (K <= 0 || alpha == T(0)) {
+        if (beta != T(1)) detail::scale(M, N, beta, C, rsc, csc);
+        return;
+    }
+
+    // A panel of B is shared by all threads. Each thread packs its own blocks
+    // of A and computes macro-tiles of MC x NT elements of C.
+    const int nc = std::min(int(blocking::NC), detail::round_up(N, NR));
+    const int nt = std::max(int(NR), (256 / NR) * NR);
+    detail::aligned_buffer<T> bpack(std::size_t(KC) * nc);
+    T* packed_b = bpack.get();
+
+    const int nthreads = detail::num_threads(double(M) * N * K);
+
+#pragma omp parallel num_threads(nthreads)
+    {
+        detail::aligned_buffer<T> apack(std::size_t(MC) * KC);
+        T* packed_a = apack.get();
+
+        for (int jc = 0; jc < N; jc += nc) {
+            const int ncur = std::min(nc, N - jc);
+            const int mtiles = (M + MC - 1) / MC, ntiles = (ncur + nt - 1) / nt;
+
+            for (int pc = 0; pc < K; pc += KC) {
+                const int kcur = std::min(int(KC), K - pc);
+                const T cur_beta = (pc == 0) ? beta : T(1);
+
+#pragma omp for schedule(static)
+                for (int jr = 0; jr < ncur; jr += NR) {
+                    detail::pack_b<T, NR>(kcur, std::min(int(NR), ncur - jr), B + pc * rsb + (jc + jr) * csb, rsb,
+                                          csb, packed_b + std::size_t(jr) * kcur);
+                }
+
+                // Consecutive tiles share a block of A, which is only packed once
+                int packed_ic = -1;
+#pragma omp for schedule(static)
+                for (int tile = 0; tile < mtiles * ntiles; ++tile) {
+                    const int ic = (tile / ntiles) * MC, jt = (tile % ntiles) * nt;
+                    const int mcur = std::min(int(MC), M - ic), ntcur = std::min(nt, ncur - jt);
+                    if (ic != packed_ic) {
+                        detail::pack_a<T, MR>(mcur, kcur, A + ic * rsa + pc * csa, rsa, csa, packed_a);
+                        packed_ic = ic;
+                    }
+
+                    for (int jr = jt; jr < jt + ntcur; jr += NR) {
+                        const T* bpanel = packed_b + std::size_t(jr) * kcur;
+                        for (int ir = 0; ir < mcur; ir += MR) {
+                            detail::micro_kernel<T, MR, NR, VL>(
+                                kcur, alpha, packed_a + std::size_t(ir) * kcur, MR, bpanel, NR, cur_beta,
+                                C + (ic + ir) * rsc + (jc + jr) * csc, rsc, csc, std::min(int(MR), mcur - ir),
+                                std::min(int(NR), ncur - jr));
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+// GEMM with a separate input matrix Cin, which may be broadcast to M x N
+// through zero strides
+template <typename T>
+void gemm(int M, int N, int K, T alpha, const T* A, std::ptrdiff_t rsa, std::ptrdiff_t csa, const T* B,
+          std::ptrdiff_t rsb, std::ptrdiff_t csb, T beta, const T* Cin, std::ptrdiff_t rsci, std::ptrdiff_t csci,
+          T* C, std::ptrdiff_t rsc, std::ptrdiff_t csc) {
+    if (beta != T(0) && (Cin != C || rsci != rsc || csci != csc)) {
+        for (int i = 0; i < M; ++i)
+            for (int j = 0; j < N; ++j) C[i * rsc + j * csc] = Cin[i * rsci + j * csci];
+    }
+    gemm<T>(M, N, K, alpha, A, rsa, csa, B, rsb, csb, beta, C, rsc, csc);
+}
+
+// Batched GEMM, where the matrices of batch `b` start at A + b * sa, B + b * sb,
+// and C + b * sc. Many small multiplications are distributed over threads,
+// otherwise every multiplication is parallelized.
+template <typename T>
+void gemm_batched(int batch, int M, int N, int K, T alpha, const T* A, std::ptrdiff_t sa, std::ptrdiff_t rsa,
+                  std::ptrdiff_t csa, const T* B, std::ptrdiff_t sb, std::ptrdiff_t rsb, std::ptrdiff_t csb, T beta,
+                  T* C, std::ptrdiff_t sc, std::ptrdiff_t rsc, std::ptrdiff_t csc) {
+    const int nthreads = detail::num_threads(double(batch) * M * N * K);
+#pragma omp parallel for schedule(dynamic) num_threads(nthreads) if (batch >= nthreads)
+    for (int b = 0; b < batch; ++b) {
+        gemm<T>(M, N, K, alpha, A + b * sa, rsa, csa, B + b * sb, rsb, csb, beta, C + b * sc, rsc, csc);
+    }
+}
+
+// y (M) = alpha * A (M x N) * x (N) + beta * y
+template <typename T>
+void gemv(int M, int N, T alpha, const T* A, std::ptrdiff_t rsa, std::ptrdiff_t csa, const T* x,
+          std::ptrdiff_t incx, T beta, T* y, std::ptrdiff_t incy) {
+    using blocking = gemm_blocking<T>;
+    constexpr int VL = blocking::VL;
+
+    if (M <= 0) return;
+    if (N <= 0 || alpha == T(0)) {
+        if (beta != T(1)) detail::scale(M, 1, beta, y, incy, 1);
+        return;
+    }
+    const int nthreads = detail::num_threads(double(M) * N * 64);
+
+    if (rsa == 1) {
+        // Columns of A are contiguous: y^T = x^T * A^T is a GEMM with a single
+        // row, computed with the micro-kernel directly on A (no packing)
+        constexpr int NR = 4 * VL;
+        const int full = M - M % NR;
+#pragma omp parallel for schedule(static) num_threads(nthreads)
+        for (int i = 0; i < full; i += NR) {
+            detail::micro_kernel<T, 1, NR, VL>(N, alpha, x, incx, A + i, csa, beta, y + i * incy, 1, incy, 1, NR);
+        }
+        for (int i = full; i < M; ++i) {
+            T sum = T(0);
+            for (int j = 0; j < N; ++j) sum += A[i + j * csa] * x[j * incx];
+            y[i * incy] = (beta != T(0)) ? T(alpha * sum + beta * y[i * incy]) : T(alpha * sum);
+        }
+    } else if (csa == 1 && incx == 1) {
+        // Rows of A are contiguous: dot products of blocks of rows with x
+        constexpr int MR = 4;
+        using vec_t = dace::vec<T, VL>;
+        const int nfull = N - N % VL;
+#pragma omp parallel for schedule(static) num_threads(nthreads)
+        for (int i = 0; i < M; i += MR) {
+            const int rows = std::min(MR, M - i);
+            vec_t acc[MR];
+            for (int r = 0; r < MR; ++r) acc[r] = detail::zero<T, VL>();
+            for (int j = 0; j < nfull; j += VL) {
+                const vec_t xv = dace::simd::load<T, VL>(x + j);
+                for (int r = 0; r < rows; ++r) acc[r] += dace::simd::load<T, VL>(A + (i + r) * rsa + j) * xv;
+            }
+            for (int r = 0; r < rows; ++r) {
+                T sum = dace::simd::reduce_sum<T, VL>(acc[r]);
+                for (int j = nfull; j < N; ++j) sum += A[(i + r) * rsa + j] * x[j];
+                T& yval = y[(i + r) * incy];
+                yval = (beta != T(0)) ? T(alpha * sum + beta * yval) : T(alpha * sum);
+            }
+        }
+    } else {
+        // General strides
+#pragma omp parallel for schedule(static) num_threads(nthreads)
+        for (int i = 0; i < M; ++i) {
+            T sum = T(0);
+            for (int j = 0; j < N; ++j) sum += A[i * rsa + j * csa] * x[j * incx];
+            y[i * incy] = (beta != T(0)) ? T(alpha * sum + beta * y[i * incy]) : T(alpha * sum);
+        }
+    }
+}
+
+}  // namespace blas
+
+}  // namespace dace
@@ -7,9 +7,10 @@ import dace.library
 import dace.properties
 from dace.frontend.common import op_repository as oprepo
 import dace.sdfg.nodes
+import warnings
 from dace.transformation.transformation import ExpandTransformation
 from dace.libraries.blas.blas_helpers import (to_blastype, get_gemm_opts, check_access, dtype_to_cudadatatype,
-                                              to_cublas_computetype)
+                                              to_cublas_computetype, to_cpp_scalar, can_use_blocked_kernels)
 from dace.libraries.blas.nodes.matmul import (_get_matmul_operands, _get_batchmm_opts, _get_codegen_gemm_opts)
 from .. import environments
 
@@ -79,6 +80,51 @@ class ExpandBatchedMatMulPure(ExpandTransformation):
         return ExpandBatchedMatMulPure.make_sdfg(node, state, sdfg)
 
 
+@dace.library.expansion
+class ExpandBatchedMatMulBlocked(ExpandTransformation):
+    """
+    Expands batched matrix multiplication to the portable, cache-blocked GEMM
+    kernel shipped with DaCe. Batches of small matrices are distributed among
+    threads, larger multiplications are parallelized internally.
+    """
+
+    environments = [environments.blocked_blas.BlockedBLAS]
+
+    @staticmethod
+    def expansion(node, state, sdfg):
+        node.validate(sdfg, state)
+        ((_, adesc, ashape, astrides), (_, bdesc, bshape, bstrides),
+         (_, cdesc, cshape, cstrides)) = _get_matmul_operands(node, state, sdfg)
+        if not can_use_blocked_kernels(node, state, sdfg, adesc, bdesc, cdesc):
+            warnings.warn('Blocked batched GEMM requires host-accessible operands of the same floating-point type. '
+                          'Falling back to pure expansion.')
+            return ExpandBatchedMatMulPure.expansion(node, state, sdfg)
+
+        from dace.codegen.targets.common import sym2cpp
+        bopt = _get_batchmm_opts(ashape, astrides, bshape, bstrides, cshape, cstrides)
+        ashape, astrides = list(ashape[-2:]), list(astrides[-2:])
+        bshape, bstrides = list(bshape[-2:]), list(bstrides[-2:])
+        if node.transA:
+            ashape, astrides = list(reversed(ashape)), list(reversed(astrides))
+        if node.transB:
+            bshape, bstrides = list(reversed(bshape)), list(reversed(bstrides))
+        M, K, N = ashape[0], ashape[1], bshape[1]
+        dtype = cdesc.dtype
+
+        args = [
+            bopt['b'], M, N, K,
+            to_cpp_scalar(node.alpha, dtype), '_a', bopt['sa'], *astrides, '_b', bopt['sb'], *bstrides,
+            to_cpp_scalar(0, dtype), '_c', bopt['sc'], *cstrides[-2:]
+        ]
+        code = 'dace::blas::gemm_batched<{}>({});'.format(
+            dtype.ctype, ', '.join(a if isinstance(a, str) else sym2cpp(a) for a in args))
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       code,
+                                       language=dace.dtypes.Language.CPP)
+
+
 @dace.library.expansion
 class ExpandBatchedMatMulMKL(ExpandTransformation):
 
@@ -320,6 +366,7 @@ class BatchedMatMul(dace.sdfg.nodes.LibraryNode):
     # Global properties
     implementations = {
         "pure": ExpandBatchedMatMulPure,
+        "blocked": ExpandBatchedMatMulBlocked,
         "MKL": ExpandBatchedMatMulMKL,
         "OpenBLAS": ExpandBatchedMatMulOpenBLAS,
         "cuBLAS": ExpandBatchedMatMulCuBLAS
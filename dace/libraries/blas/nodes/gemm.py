@@ -9,11 +9,12 @@ from dace.frontend.common import op_repository as oprepo
 import dace.sdfg.nodes
 from dace.transformation.transformation import ExpandTransformation
 from dace.libraries.blas.blas_helpers import (to_blastype, get_gemm_opts, check_access, dtype_to_cudadatatype,
-                                              to_cublas_computetype)
+                                              to_cublas_computetype, to_cpp_scalar, can_use_blocked_kernels)
 from dace.libraries.blas.nodes.matmul import (_get_matmul_operands, _get_codegen_gemm_opts)
 from .. import environments
 import numpy as np
 from numbers import Number
+import warnings
 
 
 def _is_complex(dtype):
@@ -146,6 +147,70 @@ class ExpandGemmPure(ExpandTransformation):
         return ExpandGemmPure.make_sdfg(node, state, sdfg)
 
 
+def _broadcast_strides(edge, desc, M, N):
+    """ Returns the row and column strides of an input matrix that is
+        unidirectionally broadcast to [M, N], with zero strides in broadcast
+        dimensions. """
+    size = edge.data.subset.size()
+    strides = [s for s, sz in zip(desc.strides, size) if sz != 1]
+    size = [sz for sz in size if sz != 1]
+    if len(size) == 2:
+        return strides[0], strides[1]
+    elif len(size) == 1 and size[0] == N:
+        return 0, strides[0]
+    elif len(size) == 1 and size[0] == M:
+        return strides[0], 0
+    elif len(size) == 0:
+        return 0, 0
+    raise ValueError("Could not broadcast input _cin to ({}, {})".format(M, N))
+
+
+@dace.library.expansion
+class ExpandGemmBlocked(ExpandTransformation):
+    """
+    Expands GEMM to the portable, cache-blocked kernel shipped with DaCe, which
+    packs the operands into contiguous panels, multiplies them with a
+    register-blocked vector micro-kernel, and parallelizes macro-tiles with
+    OpenMP. Suitable for CPUs without a vendor BLAS library.
+    """
+
+    environments = [environments.blocked_blas.BlockedBLAS]
+
+    @staticmethod
+    def expansion(node, state, sdfg):
+        node.validate(sdfg, state)
+        ((_, adesc, ashape, astrides), (_, bdesc, bshape, bstrides),
+         (_, cdesc, cshape, cstrides)) = _get_matmul_operands(node, state, sdfg)
+        if not can_use_blocked_kernels(node, state, sdfg, adesc, bdesc, cdesc):
+            warnings.warn('Blocked GEMM requires host-accessible operands of the same floating-point type. '
+                          'Falling back to pure expansion.')
+            return ExpandGemmPure.expansion(node, state, sdfg)
+
+        from dace.codegen.targets.common import sym2cpp
+        if node.transA:
+            ashape, astrides = list(reversed(ashape)), list(reversed(astrides))
+        if node.transB:
+            bshape, bstrides = list(reversed(bshape)), list(reversed(bstrides))
+        M, K, N = ashape[0], ashape[1], bshape[1]
+        dtype = cdesc.dtype
+
+        args = [M, N, K, to_cpp_scalar(node.alpha, dtype), '_a', *astrides, '_b', *bstrides]
+        args.append(to_cpp_scalar(node.beta, dtype))
+        cin_edges = [e for e in state.in_edges(node) if e.dst_conn == '_cin']
+        if node.beta != 0 and cin_edges:
+            cin_desc = sdfg.arrays[cin_edges[0].data.data]
+            args += ['_cin', *_broadcast_strides(cin_edges[0], cin_desc, M, N)]
+        args += ['_c', *cstrides]
+
+        code = 'dace::blas::gemm<{}>({});'.format(dtype.ctype,
+                                                  ', '.join(a if isinstance(a, str) else sym2cpp(a) for a in args))
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       code,
+                                       language=dace.dtypes.Language.CPP)
+
+
 @dace.library.expansion
 class ExpandGemmOpenBLAS(ExpandTransformation):
 
@@ -908,6 +973,7 @@ class Gemm(dace.sdfg.nodes.LibraryNode):
     # Global properties
     implementations = {
         "pure": ExpandGemmPure,
+        "blocked": ExpandGemmBlocked,
         "MKL": ExpandGemmMKL,
         "OpenBLAS": ExpandGemmOpenBLAS,
         "cuBLAS": ExpandGemmCuBLAS,
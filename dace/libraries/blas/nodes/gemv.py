@@ -106,6 +106,51 @@ class ExpandGemvPure(ExpandTransformation):
         return sdfg
 
 
+@dace.library.expansion
+class ExpandGemvBlocked(ExpandTransformation):
+    """
+    Expands GEMV to the portable BLAS kernels shipped with DaCe. If the columns
+    of the matrix are contiguous, the register-blocked GEMM micro-kernel is
+    used directly on the matrix; if the rows are contiguous, blocks of rows are
+    multiplied with vectorized dot products.
+    """
+
+    environments = [environments.blocked_blas.BlockedBLAS]
+
+    @staticmethod
+    def expansion(node: 'Gemv', state, sdfg, **kwargs):
+        node.validate(sdfg, state)
+        ((_, adesc, shape_a, strides_a), (_, xdesc, shape_x, strides_x),
+         (_, ydesc, shape_y, strides_y)) = _get_matmul_operands(node,
+                                                                state,
+                                                                sdfg,
+                                                                name_lhs="_A",
+                                                                name_rhs="_x",
+                                                                name_out="_y")
+        if not blas_helpers.can_use_blocked_kernels(node, state, sdfg, adesc, xdesc, ydesc):
+            warnings.warn('Blocked GEMV requires host-accessible operands of the same floating-point type. '
+                          'Falling back to pure expansion.')
+            return ExpandGemvPure.expansion(node, state, sdfg, **kwargs)
+
+        from dace.codegen.targets.common import sym2cpp
+        if node.transA:
+            shape_a, strides_a = list(reversed(shape_a)), list(reversed(strides_a))
+        dtype = ydesc.dtype
+
+        args = [
+            shape_a[0], shape_a[1],
+            blas_helpers.to_cpp_scalar(node.alpha, dtype), '_A', *strides_a, '_x', strides_x[0],
+            blas_helpers.to_cpp_scalar(node.beta, dtype), '_y', strides_y[0]
+        ]
+        code = 'dace::blas::gemv<{}>({});'.format(dtype.ctype,
+                                                  ', '.join(a if isinstance(a, str) else sym2cpp(a) for a in args))
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       code,
+                                       language=dace.dtypes.Language.CPP)
+
+
 @dace.library.expansion
 class ExpandGemvFpgaAccumulate(ExpandTransformation):
     """
@@ -845,6 +890,7 @@ class Gemv(dace.sdfg.nodes.LibraryNode):
     # Global properties
     implementations = {
         "pure": ExpandGemvPure,
+        "blocked": ExpandGemvBlocked,
         "OpenBLAS": ExpandGemvOpenBLAS,
         "MKL": ExpandGemvMKL,
         "cuBLAS": ExpandGemvCuBLAS,
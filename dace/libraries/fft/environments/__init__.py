@@ -0,0 +1,2 @@
+# Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+from .fftw import *
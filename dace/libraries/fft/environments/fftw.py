@@ -0,0 +1,39 @@
+# Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+import dace.library
+import ctypes.util
+
+
+@dace.library.environment
+class FFTW:
+    """ An environment for the FFTW library (double and single precision).
+        Plans are cached in the SDFG state struct across calls and destroyed
+        in the SDFG exit code. """
+
+    cmake_minimum_version = None
+    cmake_packages = []
+    cmake_variables = {}
+    cmake_includes = []
+    cmake_compile_flags = []
+    cmake_link_flags = []
+    cmake_files = []
+
+    headers = ["fftw3.h", "../include/dace_fftw.h"]
+    state_fields = ["dace::fft::FFTWPlanCache fftw_plans;"]
+    init_code = ""
+    finalize_code = "__state->fftw_plans.Clear();"
+    dependencies = []
+
+    # Double- and single-precision FFTW libraries
+    libraries = ['fftw3', 'fftw3f']
+
+    @staticmethod
+    def cmake_libraries():
+        paths = [ctypes.util.find_library(lib) for lib in FFTW.libraries]
+        if all(paths):
+            return paths
+        # If all else fails, let CMake find the libraries
+        return list(FFTW.libraries)
+
+    @staticmethod
+    def is_installed():
+        return all(ctypes.util.find_library(lib) is not None for lib in FFTW.libraries)
@@ -0,0 +1,279 @@
+// Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+#pragma once
+
+#include <fftw3.h>
+
+#include <cstddef>    // ptrdiff_t
+#include <cstdint>    // int64_t
+#include <cstdlib>    // std::abs
+#include <map>
+#include <mutex>
+#include <stdexcept>  // std::runtime_error
+#include <vector>
+
+namespace dace {
+
+namespace fft {
+
+enum class Kind { C2C = 0, R2C = 1, C2R = 2 };
+
+/**
+ * Maps a real type to the respective FFTW API (fftw_* for double precision,
+ * fftwf_* for single precision).
+ **/
+template <typename T>
+struct FFTWTraits;
+
+template <>
+struct FFTWTraits<double> {
+  typedef fftw_plan Plan;
+  typedef fftw_complex Complex;
+  typedef fftw_iodim64 IODim;
+
+  static Plan PlanDFT(int rank, const IODim* dims, int howmany_rank,
+                      const IODim* howmany, void* in, void* out, int sign,
+                      unsigned flags) {
+    return fftw_plan_guru64_dft(rank, dims, howmany_rank, howmany,
+                                (Complex*)in, (Complex*)out, sign, flags);
+  }
+  static Plan PlanR2C(int rank, const IODim* dims, int howmany_rank,
+                      const IODim* howmany, void* in, void* out,
+                      unsigned flags) {
+    return fftw_plan_guru64_dft_r2c(rank, dims, howmany_rank, howmany,
+                                    (double*)in, (Complex*)out, flags);
+  }
+  static Plan PlanC2R(int rank, const IODim* dims, int howmany_rank,
+                      const IODim* howmany, void* in, void* out,
+                      unsigned flags) {
+    return fftw_plan_guru64_dft_c2r(rank, dims, howmany_rank, howmany,
+                                    (Complex*)in, (double*)out, flags);
+  }
+  static void Execute(Kind kind, Plan plan, void* in, void* out) {
+    switch (kind) {
+      case Kind::C2C:
+        fftw_execute_dft(plan, (Complex*)in, (Complex*)out);
+        break;
+      case Kind::R2C:
+        fftw_execute_dft_r2c(plan, (double*)in, (Complex*)out);
+        break;
+      case Kind::C2R:
+        fftw_execute_dft_c2r(plan, (Complex*)in, (double*)out);
+        break;
+    }
+  }
+  static int AlignmentOf(void* ptr) { return fftw_alignment_of((double*)ptr); }
+  static void* Malloc(size_t bytes) { return fftw_malloc(bytes); }
+  static void Free(void* ptr) { fftw_free(ptr); }
+  static void Destroy(Plan plan) { fftw_destroy_plan(plan); }
+};
+
+template <>
+struct FFTWTraits<float> {
+  typedef fftwf_plan Plan;
+  typedef fftwf_complex Complex;
+  typedef fftwf_iodim64 IODim;
+
+  static Plan PlanDFT(int rank, const IODim* dims, int howmany_rank,
+                      const IODim* howmany, void* in, void* out, int sign,
+                      unsigned flags) {
+    return fftwf_plan_guru64_dft(rank, dims, howmany_rank, howmany,
+                                 (Complex*)in, (Complex*)out, sign, flags);
+  }
+  static Plan PlanR2C(int rank, const IODim* dims, int howmany_rank,
+                      const IODim* howmany, void* in, void* out,
+                      unsigned flags) {
+    return fftwf_plan_guru64_dft_r2c(rank, dims, howmany_rank, howmany,
+                                     (float*)in, (Complex*)out, flags);
+  }
+  static Plan PlanC2R(int rank, const IODim* dims, int howmany_rank,
+                      const IODim* howmany, void* in, void* out,
+                      unsigned flags) {
+    return fftwf_plan_guru64_dft_c2r(rank, dims, howmany_rank, howmany,
+                                     (Complex*)in, (float*)out, flags);
+  }
+  static void Execute(Kind kind, Plan plan, void* in, void* out) {
+    switch (kind) {
+      case Kind::C2C:
+        fftwf_execute_dft(plan, (Complex*)in, (Complex*)out);
+        break;
+      case Kind::R2C:
+        fftwf_execute_dft_r2c(plan, (float*)in, (Complex*)out);
+        break;
+      case Kind::C2R:
+        fftwf_execute_dft_c2r(plan, (Complex*)in, (float*)out);
+        break;
+    }
+  }
+  static int AlignmentOf(void* ptr) { return fftwf_alignment_of((float*)ptr); }
+  static void* Malloc(size_t bytes) { return fftwf_malloc(bytes); }
+  static void Free(void* ptr) { fftwf_free(ptr); }
+  static void Destroy(Plan plan) { fftwf_destroy_plan(plan); }
+};
+
+/**
+ * Persistent cache of FFTW plans, stored in the SDFG state struct. Plans are
+ * created once per transform descriptor (kind, direction, dimensions,
+ * strides, planner flags, alignment and placement of the arrays) and
+ * executed with the new-array execute interface on subsequent calls. Plans
+ * that use an expensive planner (anything but FFTW_ESTIMATE) are created on
+ * scratch buffers, since the planner overwrites its arrays.
+ **/
+class FFTWPlanCache {
+ public:
+  FFTWPlanCache() = default;
+  FFTWPlanCache(FFTWPlanCache const&) = delete;
+  FFTWPlanCache& operator=(FFTWPlanCache const&) = delete;
+
+  ~FFTWPlanCache() { Clear(); }
+
+  /**
+   * Executes a transform, creating and caching its plan if necessary.
+   * @param kind Transform kind.
+   * @param sign FFTW_FORWARD or FFTW_BACKWARD (ignored for real transforms).
+   * @param dims Flattened (n, input stride, output stride) triplets of the
+   *             transformed dimensions, in elements. For real transforms,
+   *             n is the logical (real) size.
+   * @param howmany Flattened triplets of the batch dimensions.
+   * @param flags FFTW planner flags.
+   **/
+  template <typename T>
+  void Execute(Kind kind, int sign, std::vector<int64_t> const& dims,
+               std::vector<int64_t> const& howmany, unsigned flags, void* in,
+               void* out) {
+    typedef FFTWTraits<T> Traits;
+    const bool aligned =
+        Traits::AlignmentOf(in) == 0 && Traits::AlignmentOf(out) == 0;
+    if (!aligned) {
+      flags |= FFTW_UNALIGNED;
+    }
+
+    Key key{static_cast<int64_t>(kind), sign, static_cast<int64_t>(flags),
+            in == out ? 1 : 0};
+    key.insert(key.end(), dims.begin(), dims.end());
+    key.push_back(-1);
+    key.insert(key.end(), howmany.begin(), howmany.end());
+
+    typename Traits::Plan plan;
+    {
+      // The FFTW planner is not thread-safe, plan execution is
+      std::lock_guard<std::mutex> guard(mutex_);
+      auto& plans = Plans(T());
+      auto it = plans.find(key);
+      if (it == plans.end()) {
+        plan = CreatePlan<T>(kind, sign, dims, howmany, flags, in, out);
+        plans.emplace(key, plan);
+      } else {
+        plan = it->second;
+      }
+    }
+    Traits::Execute(kind, plan, in, out);
+  }
+
+  /// Destroys all cached plans.
+  void Clear() {
+    std::lock_guard<std::mutex> guard(mutex_);
+    for (auto& kv : double_plans_) FFTWTraits<double>::Destroy(kv.second);
+    for (auto& kv : single_plans_) FFTWTraits<float>::Destroy(kv.second);
+    double_plans_.clear();
+    single_plans_.clear();
+  }
+
+ private:
+  typedef std::vector<int64_t> Key;
+
+  std::map<Key, fftw_plan>& Plans(double) { return double_plans_; }
+  std::map<Key, fftwf_plan>& Plans(float) { return single_plans_; }
+
+  static std::vector<fftw_iodim64> ToIODims(std::vector<int64_t> const& v) {
+    std::vector<fftw_iodim64> result(v.size() / 3);
+    for (size_t i = 0; i < result.size(); ++i) {
+      result[i].n = static_cast<ptrdiff_t>(v[3 * i]);
+      result[i].is = static_cast<ptrdiff_t>(v[3 * i + 1]);
+      result[i].os = static_cast<ptrdiff_t>(v[3 * i + 2]);
+    }
+    return result;
+  }
+
+  /// Number of elements spanned by the input (is_input) or output array.
+  static int64_t Extent(Kind kind, std::vector<int64_t> const& dims,
+                        std::vector<int64_t> const& howmany, bool is_input) {
+    int64_t extent = 1;
+    const int offset = is_input ? 1 : 2;
+    const bool halved = (kind == Kind::R2C && !is_input) ||
+                        (kind == Kind::C2R && is_input);
+    for (size_t i = 0; i < dims.size(); i += 3) {
+      int64_t n = dims[i];
+      if (halved && i + 3 == dims.size()) {
+        n = n / 2 + 1;
+      }
+      extent += (n - 1) * std::abs(dims[i + offset]);
+    }
+    for (size_t i = 0; i < howmany.size(); i += 3) {
+      extent += (howmany[i] - 1) * std::abs(howmany[i + offset]);
+    }
+    return extent;
+  }
+
+  template <typename T>
+  static typename FFTWTraits<T>::Plan CreatePlan(
+      Kind kind, int sign, std::vector<int64_t> const& dims,
+      std::vector<int64_t> const& howmany, unsigned flags, void* in,
+      void* out) {
+    typedef FFTWTraits<T> Traits;
+    // fftw_iodim64 and fftwf_iodim64 share the same layout
+    auto fdims = ToIODims(dims);
+    auto fhowmany = ToIODims(howmany);
+    const auto* pdims =
+        reinterpret_cast<const typename Traits::IODim*>(fdims.data());
+    const auto* phowmany =
+        reinterpret_cast<const typename Traits::IODim*>(fhowmany.data());
+    const int rank = static_cast<int>(fdims.size());
+    const int howmany_rank = static_cast<int>(fhowmany.size());
+
+    // Plan on scratch buffers if the planner would overwrite the arrays
+    void* plan_in = in;
+    void* plan_out = out;
+    const bool scratch = (flags & FFTW_ESTIMATE) == 0;
+    if (scratch) {
+      // Over-allocate as complex numbers for simplicity
+      const size_t elem = 2 * sizeof(T);
+      plan_in = Traits::Malloc(elem * Extent(kind, dims, howmany, true));
+      plan_out = (in == out) ? plan_in
+                             : Traits::Malloc(
+                                   elem * Extent(kind, dims, howmany, false));
+    }
+
+    typename Traits::Plan plan = nullptr;
+    switch (kind) {
+      case Kind::C2C:
+        plan = Traits::PlanDFT(rank, pdims, howmany_rank, phowmany, plan_in,
+                               plan_out, sign, flags);
+        break;
+      case Kind::R2C:
+        plan = Traits::PlanR2C(rank, pdims, howmany_rank, phowmany, plan_in,
+                               plan_out, flags);
+        break;
+      case Kind::C2R:
+        plan = Traits::PlanC2R(rank, pdims, howmany_rank, phowmany, plan_in,
+                               plan_out, flags);
+        break;
+    }
+
+    if (scratch) {
+      if (plan_out != plan_in) Traits::Free(plan_out);
+      Traits::Free(plan_in);
+    }
+    if (plan == nullptr) {
+      throw std::runtime_error("Failed to create FFTW plan.");
+    }
+    return plan;
+  }
+
+  std::map<Key, fftw_plan> double_plans_;
+  std::map<Key, fftwf_plan> single_plans_;
+  std::mutex mutex_;
+};
+
+}  // namespace fft
+
+}  // namespace dace
@@ -0,0 +1,519 @@
+# Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+""" File defining the fast Fourier transform (FFT) library node. """
+
+import math
+from typing import List, Optional, Tuple
+
+import dace
+import dace.library
+import dace.serialize
+from dace import data, dtypes
+from dace.libraries.fft import environments
+from dace.properties import ListProperty, Property
+from dace.sdfg import SDFG, SDFGState, graph
+from dace.symbolic import symstr
+from dace.transformation import transformation as pm
+
+#: Radices of the unrolled Stockham butterflies, in order of preference
+_RADICES = (4, 2, 3, 5, 7, 11, 13)
+
+_FFTW_FLAGS = {
+    'estimate': 'FFTW_ESTIMATE',
+    'measure': 'FFTW_MEASURE',
+    'patient': 'FFTW_PATIENT',
+    'exhaustive': 'FFTW_EXHAUSTIVE',
+}
+
+
+def _fft_edges(node: 'FFT', state: SDFGState, sdfg: SDFG):
+    """ Returns the input/output edges and data descriptors of an FFT node. """
+    inedge: graph.MultiConnectorEdge = state.in_edges(node)[0]
+    outedge: graph.MultiConnectorEdge = state.out_edges(node)[0]
+    return inedge, outedge, sdfg.arrays[inedge.data.data], sdfg.arrays[outedge.data.data]
+
+
+def _factorize(n: int) -> Optional[List[int]]:
+    """ Factorizes a transform length into Stockham radices.
+
+        :return: A list of radices, or None if ``n`` has a prime factor that
+                 is not supported by the unrolled butterflies.
+    """
+    radices = []
+    for r in _RADICES:
+        while n % r == 0:
+            radices.append(r)
+            n //= r
+    return radices if n == 1 else None
+
+
+def _real_type(cdtype: dtypes.typeclass) -> dtypes.typeclass:
+    """ Returns the real type that corresponds to a complex type. """
+    return dace.float32 if cdtype == dace.complex64 else dace.float64
+
+
+def _scale_code(node: 'FFT', in_shape, out_shape, rtype: str) -> Optional[str]:
+    """ Returns C++ code of the normalization factor of the transform, or
+        None if the transform is unnormalized. """
+    from dace.codegen.targets.cpp import sym2cpp
+
+    length = sym2cpp(node.transform_length(in_shape, out_shape))
+    if node.norm == 'ortho':
+        return '(%s(1) / std::sqrt(%s(%s)))' % (rtype, rtype, length)
+    if (node.norm == 'backward') == node.inverse:
+        return '(%s(1) / %s(%s))' % (rtype, rtype, length)
+    return None
+
+
+def _rotate(x: str, e: int, r: int, sign: int, ctype: str) -> Tuple[str, str]:
+    """ Returns a (sign, expression) pair multiplying ``x`` by the twiddle
+        factor ``exp(sign * 2 * pi * i * e / r)``, with exact special cases. """
+    e %= r
+    if e == 0:
+        return '+', x
+    if 2 * e == r:
+        return '-', x
+    if 4 * e == r or 4 * e == 3 * r:
+        # Multiplication by +i or -i
+        if (4 * e == r) == (sign > 0):
+            return '+', '%s(-%s.imag(), %s.real())' % (ctype, x, x)
+        return '+', '%s(%s.imag(), -%s.real())' % (ctype, x, x)
+    angle = sign * 2 * math.pi * e / r
+    return '+', '%s * %s(%r, %r)' % (x, ctype, math.cos(angle), math.sin(angle))
+
+
+class _FFTBuilder:
+    """ Helper that builds the states of the pure FFT expansion. """
+    def __init__(self, sdfg: SDFG, cdtype: dtypes.typeclass, sign: int):
+        self.sdfg = sdfg
+        self.ctype = cdtype.ctype
+        self.rtype = _real_type(cdtype).ctype
+        self.sign = sign
+        self.last_state: Optional[SDFGState] = None
+
+    def new_state(self, label: str) -> SDFGState:
+        if self.last_state is None:
+            self.last_state = self.sdfg.add_state(label)
+        else:
+            self.last_state = self.sdfg.add_state_after(self.last_state, label)
+        return self.last_state
+
+    def add_map(self, label: str, shape, index: dict, inputs: dict, code: str, outputs: dict, axis: int = -1):
+        """ Adds a state with a mapped CPP tasklet over all dimensions of
+            ``shape`` except ``axis``, and the given extra map parameters. """
+        ranges = {'_o%d' % i: '0:%s' % symstr(s) for i, s in enumerate(shape) if i != axis}
+        ranges.update(index)
+        state = self.new_state(label)
+        state.add_mapped_tasklet(label, ranges, inputs, code, outputs, language=dace.Language.CPP, external_edges=True)
+        return state
+
+    @staticmethod
+    def index(ndim: int, axis: int, axis_index: str) -> str:
+        return ', '.join(axis_index if i == axis else '_o%d' % i for i in range(ndim))
+
+    def transform_axis(self,
+                       src: str,
+                       buffers: Tuple[str, str],
+                       axis: int,
+                       dst: Optional[str] = None,
+                       scale: Optional[str] = None) -> str:
+        """ Transforms an axis of ``src``, alternating between two buffers.
+
+            :param src: Name of the source array.
+            :param buffers: Names of two buffers of the same shape as ``src``.
+            :param axis: Axis to transform.
+            :param dst: If not None, the array that the last stage writes to.
+            :param scale: Optional scaling factor applied by the last stage.
+            :return: The name of the array that contains the result.
+        """
+        shape = self.sdfg.arrays[buffers[0]].shape
+        n = shape[axis]
+        radices = _factorize(int(n)) if not dace.symbolic.issymbolic(n) else None
+
+        if radices == []:
+            # Length-1 axis: the transform only copies and scales
+            if dst is None and scale is None:
+                return src
+            target = dst or (buffers[0] if src != buffers[0] else buffers[1])
+            self.elementwise('fft_copy', src, target, '__y = __x * %s;' % scale if scale is not None else '__y = __x;',
+                             shape)
+            return target
+
+        if radices is None:
+            # Direct DFT for symbolic lengths and large prime factors
+            target = dst or (buffers[0] if src != buffers[0] else buffers[1])
+            self._direct_dft(src, target, shape, axis, scale)
+            return target
+
+        s = 1
+        for stage, r in enumerate(radices):
+            if dst is not None and stage == len(radices) - 1:
+                target = dst
+            else:
+                target = buffers[0] if src != buffers[0] else buffers[1]
+            last = stage == len(radices) - 1
+            self._stockham_stage(src, target, shape, axis, int(n), r, s, scale if last else None)
+            src = target
+            s *= r
+        return src
+
+    def _stockham_stage(self, src: str, dst: str, shape, axis: int, n: int, r: int, s: int, scale: Optional[str]):
+        """ Adds one self-sorting radix-``r`` stage, where ``s`` is the product
+            of the radices of the previous stages. """
+        ncur = n // s
+        m = ncur // r
+        ndim = len(shape)
+        params = {'_p': '0:%d' % m}
+        q = '0'
+        if s > 1:
+            params['_q'] = '0:%d' % s
+            q = '_q'
+
+        inputs = {
+            '__x%d' % j: dace.Memlet('%s[%s]' % (src, self.index(ndim, axis, '%s + %d * _p + %d' % (q, s, s * j * m))))
+            for j in range(r)
+        }
+        outputs = {
+            '__y%d' % k: dace.Memlet('%s[%s]' % (dst, self.index(ndim, axis, '%s + %d * _p + %d' % (q, s * r, s * k))))
+            for k in range(r)
+        }
+
+        code = ''
+        for k in range(r):
+            expr = ''
+            for j in range(r):
+                op, term = _rotate('__x%d' % j, j * k, r, self.sign, self.ctype)
+                expr += (term if op == '+' else '-' + term) if j == 0 else ' %s %s' % (op, term)
+            factors = []
+            if k > 0 and m > 1:
+                angle = self.sign * 2 * math.pi * k / ncur
+                factors.append('std::polar({rt}(1), {rt}({angle!r} * _p))'.format(rt=self.rtype, angle=angle))
+            if scale is not None:
+                factors.append(scale)
+            if factors:
+                expr = '(%s) * %s' % (expr, ' * '.join(factors))
+            code += '__y%d = %s;\n' % (k, expr)
+
+        self.add_map('fft_radix%d' % r, shape, params, inputs, code, outputs, axis)
+
+    def _direct_dft(self, src: str, dst: str, shape, axis: int, scale: Optional[str]):
+        from dace.codegen.targets.cpp import sym2cpp
+
+        ndim = len(shape)
+        n = sym2cpp(shape[axis])
+        stride = sym2cpp(self.sdfg.arrays[src].strides[axis])
+        code = '''
+{ct} __sum = 0;
+for (long long __j = 0; __j < {n}; ++__j) {{
+    __sum += __x[__j * {stride}] * std::polar({rt}(1), {rt}({twopi!r} * ((_k * __j) % ({n})) / ({n})));
+}}
+__y = __sum{scale};'''.format(ct=self.ctype,
+                              rt=self.rtype,
+                              n=n,
+                              stride=stride,
+                              twopi=self.sign * 2 * math.pi,
+                              scale=(' * %s' % scale) if scale is not None else '')
+        self.add_map('fft_dft', shape, {'_k': '0:%s' % symstr(shape[axis])},
+                     {'__x': dace.Memlet('%s[%s]' % (src, self.index(ndim, axis, '0:%s' % symstr(shape[axis]))))}, code,
+                     {'__y': dace.Memlet('%s[%s]' % (dst, self.index(ndim, axis, '_k')))}, axis)
+
+    def elementwise(self, label: str, src: str, dst: str, code: str, shape):
+        """ Adds an elementwise map from ``src`` to ``dst`` over ``shape``. """
+        idx = self.index(len(shape), -1, '')
+        self.add_map(label, shape, {}, {'__x': dace.Memlet('%s[%s]' % (src, idx))}, code,
+                     {'__y': dace.Memlet('%s[%s]' % (dst, idx))})
+
+
+@dace.library.expansion
+class ExpandFFTPure(pm.ExpandTransformation):
+    """
+        Pure SDFG FFT expansion. Each transformed axis with a known length is
+        computed by a sequence of self-sorting (Stockham) mixed-radix stages,
+        each of which is a parallel map of unrolled radix-2/3/4/5/7/11/13
+        butterflies that alternates between two complex buffers. Axes with
+        symbolic lengths or larger prime factors use a direct DFT. Real
+        transforms are computed on complex buffers.
+    """
+    environments = []
+
+    @staticmethod
+    def expansion(node: 'FFT', state: SDFGState, sdfg: SDFG):
+        node.validate(sdfg, state)
+        inedge, outedge, input_data, output_data = _fft_edges(node, state, sdfg)
+        in_shape = inedge.data.subset.size()
+        out_shape = outedge.data.subset.size()
+        axes = node.transform_axes(len(in_shape))
+        cdtype = node.complex_type(input_data, output_data)
+        work_shape = out_shape if node.kind == 'c2r' else in_shape
+
+        nsdfg = SDFG('fft')
+        nsdfg.add_array('_in', in_shape, input_data.dtype, strides=input_data.strides, storage=input_data.storage)
+        nsdfg.add_array('_out', out_shape, output_data.dtype, strides=output_data.strides, storage=output_data.storage)
+        nsdfg.add_transient('_buf0', work_shape, cdtype)
+        nsdfg.add_transient('_buf1', work_shape, cdtype)
+        builder = _FFTBuilder(nsdfg, cdtype, 1 if node.inverse else -1)
+        buffers = ('_buf0', '_buf1')
+
+        scale = _scale_code(node, in_shape, out_shape, builder.rtype)
+
+        src = '_in'
+        if node.kind == 'c2c':
+            # Stages may read the input directly if no conversion is necessary,
+            # and write the output directly if it does not alias the input
+            if input_data.dtype != cdtype:
+                builder.elementwise('fft_load', '_in', '_buf0', '__y = __x;', in_shape)
+                src = '_buf0'
+            direct_out = inedge.data.data != outedge.data.data
+            for i, axis in enumerate(axes):
+                last = i == len(axes) - 1
+                src = builder.transform_axis(src,
+                                             buffers,
+                                             axis,
+                                             dst='_out' if last and direct_out else None,
+                                             scale=scale if last else None)
+            if src != '_out':
+                builder.elementwise('fft_store', src, '_out', '__y = __x;', out_shape)
+
+        elif node.kind == 'r2c':
+            builder.elementwise('fft_load', '_in', '_buf0', '__y = __x;', in_shape)
+            src = '_buf0'
+            for axis in axes:
+                src = builder.transform_axis(src, buffers, axis)
+            # Keep the non-redundant half of the last axis
+            builder.elementwise('fft_store', src, '_out',
+                                '__y = __x * %s;' % scale if scale is not None else '__y = __x;', out_shape)
+
+        else:  # c2r
+            # Transform all but the last axis on the half spectrum
+            nsdfg.add_transient('_half0', in_shape, cdtype)
+            nsdfg.add_transient('_half1', in_shape, cdtype)
+            if input_data.dtype != cdtype:
+                builder.elementwise('fft_load', '_in', '_half0', '__y = __x;', in_shape)
+                src = '_half0'
+            for axis in axes[:-1]:
+                src = builder.transform_axis(src, ('_half0', '_half1'), axis)
+
+            # Reconstruct the full spectrum of the last axis from its Hermitian symmetry
+            last = axes[-1]
+            ndim = len(in_shape)
+            half, full = in_shape[last], out_shape[last]
+            outer = {'_o%d' % i: '0:%s' % symstr(s) for i, s in enumerate(out_shape) if i != last}
+            state = builder.new_state('fft_hermitian')
+            state.add_mapped_tasklet('fft_hermitian_low',
+                                     dict(outer, _k='0:%s' % symstr(half)),
+                                     {'__x': dace.Memlet('%s[%s]' % (src, builder.index(ndim, last, '_k')))},
+                                     '__y = __x;', {'__y': dace.Memlet('_buf0[%s]' % builder.index(ndim, last, '_k'))},
+                                     language=dace.Language.CPP,
+                                     external_edges=True)
+            if full - half != 0:
+                state.add_mapped_tasklet(
+                    'fft_hermitian_high',
+                    dict(outer, _k='%s:%s' % (symstr(half), symstr(full))),
+                    {'__x': dace.Memlet('%s[%s]' % (src, builder.index(ndim, last, '%s - _k' % symstr(full))))},
+                    '__y = std::conj(__x);', {'__y': dace.Memlet('_buf0[%s]' % builder.index(ndim, last, '_k'))},
+                    language=dace.Language.CPP,
+                    external_edges=True)
+
+            src = builder.transform_axis('_buf0', buffers, last)
+            builder.elementwise('fft_store', src, '_out',
+                                '__y = __x.real() * %s;' % scale if scale is not None else '__y = __x.real();',
+                                out_shape)
+
+        # Rename outer connectors
+        inedge._dst_conn = '_in'
+        outedge._src_conn = '_out'
+
+        return nsdfg
+
+
+@dace.library.expansion
+class ExpandFFTFFTW(pm.ExpandTransformation):
+    """
+        FFT expansion that calls FFTW through its guru interface, which
+        supports arbitrary strides and batch dimensions. Plans are created on
+        the first call and cached in the SDFG state for subsequent calls.
+    """
+    environments = [environments.FFTW]
+
+    @staticmethod
+    def expansion(node: 'FFT', state: SDFGState, sdfg: SDFG):
+        from dace.codegen.targets.cpp import sym2cpp
+
+        node.validate(sdfg, state)
+        inedge, outedge, input_data, output_data = _fft_edges(node, state, sdfg)
+        in_shape = inedge.data.subset.size()
+        out_shape = outedge.data.subset.size()
+        axes = node.transform_axes(len(in_shape))
+        cdtype = node.complex_type(input_data, output_data)
+        rtype = _real_type(cdtype)
+
+        nsdfg = SDFG('fft')
+        nsdfg.add_array('_in', in_shape, input_data.dtype, strides=input_data.strides, storage=input_data.storage)
+        nsdfg.add_array('_out', out_shape, output_data.dtype, strides=output_data.strides, storage=output_data.storage)
+        state = nsdfg.add_state('fft')
+        src = '_in'
+        read = state.add_read('_in')
+
+        # Convert the input to the expected type. Complex-to-real transforms
+        # always operate on a copy, since FFTW overwrites their input.
+        expected = rtype if node.kind == 'r2c' else cdtype
+        if input_data.dtype != expected or node.kind == 'c2r':
+            nsdfg.add_transient('_tmp', in_shape, expected)
+            tmp = state.add_access('_tmp')
+            state.add_mapped_tasklet('fft_load', {'_o%d' % i: '0:%s' % symstr(s)
+                                                  for i, s in enumerate(in_shape)},
+                                     {'__x': dace.Memlet('_in[%s]' % _FFTBuilder.index(len(in_shape), -1, ''))},
+                                     '__y = __x;',
+                                     {'__y': dace.Memlet('_tmp[%s]' % _FFTBuilder.index(len(in_shape), -1, ''))},
+                                     language=dace.Language.CPP,
+                                     external_edges=True,
+                                     input_nodes={'_in': read},
+                                     output_nodes={'_tmp': tmp})
+            src, read = '_tmp', tmp
+
+        in_strides = nsdfg.arrays[src].strides
+        out_strides = output_data.strides
+        logical = out_shape if node.kind == 'c2r' else in_shape
+
+        def triplets(dims):
+            return ', '.join('(int64_t)(%s), (int64_t)(%s), (int64_t)(%s)' %
+                             (sym2cpp(logical[i]), sym2cpp(in_strides[i]), sym2cpp(out_strides[i])) for i in dims)
+
+        code = '__state->fftw_plans.Execute<{rt}>(dace::fft::Kind::{kind}, {sign}, {{{dims}}}, {{{howmany}}}, ' \
+               '{flags}, (void *)__in, (void *)__out);'.format(
+                   rt=rtype.ctype,
+                   kind=node.kind.upper(),
+                   sign='FFTW_BACKWARD' if node.inverse else 'FFTW_FORWARD',
+                   dims=triplets(axes),
+                   howmany=triplets([i for i in range(len(in_shape)) if i not in axes]),
+                   flags=_FFTW_FLAGS[node.plan_effort])
+        tasklet = state.add_tasklet('fftw', {'__in'}, {'__out'}, code, language=dace.Language.CPP)
+        write = state.add_write('_out')
+        state.add_edge(read, None, tasklet, '__in', dace.Memlet.from_array(src, nsdfg.arrays[src]))
+        state.add_edge(tasklet, '__out', write, None, dace.Memlet.from_array('_out', nsdfg.arrays['_out']))
+
+        # FFTW computes unnormalized transforms
+        scale = _scale_code(node, in_shape, out_shape, rtype.ctype)
+        if scale is not None:
+            idx = _FFTBuilder.index(len(out_shape), -1, '')
+            nsdfg.add_state_after(state, 'fft_scale').add_mapped_tasklet(
+                'fft_scale', {'_o%d' % i: '0:%s' % symstr(s)
+                              for i, s in enumerate(out_shape)}, {'__x': dace.Memlet('_out[%s]' % idx)},
+                '__y = __x * %s;' % scale, {'__y': dace.Memlet('_out[%s]' % idx)},
+                language=dace.Language.CPP,
+                external_edges=True)
+
+        # Rename outer connectors
+        inedge._dst_conn = '_in'
+        outedge._src_conn = '_out'
+
+        return nsdfg
+
+
+@dace.library.node
+class FFT(dace.sdfg.nodes.LibraryNode):
+    """ An SDFG node that computes the discrete Fourier transform of an
+        N-dimensional array over a set of axes, with the same conventions as
+        ``numpy.fft``. Complex-to-complex transforms preserve the shape,
+        real-to-complex transforms store the non-redundant half
+        (``n // 2 + 1`` elements) of the last transformed axis, and
+        complex-to-real transforms take that half as input. """
+
+    # Global properties
+    implementations = {
+        'pure': ExpandFFTPure,
+        'FFTW': ExpandFFTFFTW,
+    }
+    default_implementation = 'pure'
+
+    # Properties
+    axes = ListProperty(element_type=int, allow_none=True, desc='Axes to transform (all axes if None)')
+    inverse = Property(dtype=bool, default=False, desc='If True, computes the inverse transform')
+    kind = Property(dtype=str,
+                    default='c2c',
+                    choices=['c2c', 'r2c', 'c2r'],
+                    desc='Transform kind: complex-to-complex, real-to-complex or complex-to-real')
+    norm = Property(dtype=str,
+                    default='backward',
+                    choices=['backward', 'ortho', 'forward'],
+                    desc='Normalization mode, as in numpy.fft')
+    plan_effort = Property(dtype=str,
+                           default='measure',
+                           choices=list(_FFTW_FLAGS.keys()),
+                           desc='Planner effort for library implementations that create plans (e.g., FFTW)')
+
+    def __init__(self, name='FFT', axes=None, inverse=False, kind='c2c', norm='backward', debuginfo=None, **kwargs):
+        super().__init__(name, inputs={'_in'}, outputs={'_out'}, **kwargs)
+        self.axes = axes
+        self.inverse = inverse
+        self.kind = kind
+        self.norm = norm
+        self.debuginfo = debuginfo
+
+    @staticmethod
+    def from_json(json_obj, context=None):
+        ret = FFT()
+        dace.serialize.set_properties_from_json(ret, json_obj, context=context)
+        return ret
+
+    def __label__(self, sdfg, state):
+        return '%s%s (%s)\nAxes: %s' % ('I' if self.inverse else '', self.kind.upper(), self.norm,
+                                        'all' if self.axes is None else self.axes)
+
+    def transform_axes(self, ndim: int) -> List[int]:
+        """ Returns the (non-negative) transformed axes. """
+        if self.axes is None:
+            return list(range(ndim))
+        return [a % ndim for a in self.axes]
+
+    def complex_type(self, input_data: data.Data, output_data: data.Data) -> dtypes.typeclass:
+        """ Returns the complex data type in which the transform is computed. """
+        if self.kind == 'c2r':
+            return dace.complex64 if output_data.dtype == dace.float32 else dace.complex128
+        return output_data.dtype
+
+    def transform_length(self, in_shape, out_shape):
+        """ Returns the total (logical) number of transformed elements. """
+        axes = self.transform_axes(len(in_shape))
+        shape = out_shape if self.kind == 'c2r' else in_shape
+        return data._prod([shape[a] for a in axes])
+
+    def validate(self, sdfg, state):
+        if len(state.in_edges(self)) != 1:
+            raise ValueError('FFT node must have one input')
+        if len(state.out_edges(self)) != 1:
+            raise ValueError('FFT node must have one output')
+        inedge, outedge, input_data, output_data = _fft_edges(self, state, sdfg)
+        insize = inedge.data.subset.size()
+        outsize = outedge.data.subset.size()
+        if len(insize) != len(outsize):
+            raise ValueError('FFT input and output must have the same number of dimensions')
+        if self.axes is not None:
+            if len(self.axes) == 0 or len(set(a % len(insize) for a in self.axes)) != len(self.axes):
+                raise ValueError('FFT axes must be unique and non-empty')
+            if any(a < -len(insize) or a >= len(insize) for a in self.axes):
+                raise ValueError('FFT axes out of bounds for %d-dimensional input' % len(insize))
+        axes = self.transform_axes(len(insize))
+
+        complex_types = (dace.complex64, dace.complex128)
+        real_types = (dace.float32, dace.float64)
+        if self.kind == 'c2c':
+            if output_data.dtype not in complex_types:
+                raise TypeError('Complex FFT output must be complex64 or complex128')
+        elif self.kind == 'r2c':
+            if self.inverse:
+                raise ValueError('Real-to-complex FFT must be a forward transform')
+            if input_data.dtype in complex_types or output_data.dtype not in complex_types:
+                raise TypeError('Real-to-complex FFT requires a real input and a complex output')
+        else:
+            if not self.inverse:
+                raise ValueError('Complex-to-real FFT must be an inverse transform')
+            if input_data.dtype not in complex_types or output_data.dtype not in real_types:
+                raise TypeError('Complex-to-real FFT requires a complex input and a real output')
+
+        for i, (a, b) in enumerate(zip(insize, outsize)):
+            if self.kind == 'r2c' and i == axes[-1]:
+                a = a // 2 + 1
+            elif self.kind == 'c2r' and i == axes[-1]:
+                b = b // 2 + 1
+            if (a != b) == True:
+                raise ValueError('FFT output shape does not match the input shape')
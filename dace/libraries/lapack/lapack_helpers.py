@@ -0,0 +1,272 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Helpers to build the portable, blocked ("pure") LAPACK expansions out of
+    state machines, maps and BLAS library nodes. """
+import copy
+from typing import Callable, Optional, Tuple
+
+import dace
+from dace import dtypes, Memlet, SDFG, SDFGState
+from dace.libraries.blas.nodes.gemm import Gemm
+from dace.libraries.blas.nodes.gemv import Gemv
+from dace.symbolic import symstr
+
+#: Default panel width of the blocked factorizations and solves
+DEFAULT_BLOCK_SIZE = 64
+
+
+def matrix_operand(state: SDFGState, sdfg: SDFG, node: dace.nodes.LibraryNode, conn: str):
+    """ Returns the data name, shape, and strides of the (squeezed) operand
+        connected to ``conn`` of a library node.
+        One-dimensional operands are viewed as column vectors.
+        :return: A 3-tuple (name, [rows, cols], [row stride, column stride]).
+    """
+    edges = [e for e in state.in_edges(node) if e.dst_conn == conn]
+    edges += [e for e in state.out_edges(node) if e.src_conn == conn]
+    if len(edges) != 1:
+        raise ValueError(f'Expected exactly one edge on connector {conn}')
+    memlet = edges[0].data
+    desc = sdfg.arrays[memlet.data]
+    subset = copy.deepcopy(memlet.subset)
+    dims = subset.squeeze()
+    shape = subset.size()
+    strides = [desc.strides[d] for d in dims]
+    if len(shape) == 1:
+        shape, strides = [shape[0], 1], [strides[0], 1]
+    if len(shape) != 2:
+        raise ValueError(f'Operand {conn} must be a matrix or a vector')
+    return memlet.data, shape, strides
+
+
+def in_place(state: SDFGState, node: dace.nodes.LibraryNode, in_conn: str, out_conn: str) -> bool:
+    """ Returns True if the given input and output connectors of a library
+        node refer to the same data and subset, i.e., no copy is needed. """
+    ie = next(e for e in state.in_edges(node) if e.dst_conn == in_conn)
+    oe = next(e for e in state.out_edges(node) if e.src_conn == out_conn)
+    return ie.data.data == oe.data.data and ie.data.subset == oe.data.subset
+
+
+def add_state_after(sdfg: SDFG, state: SDFGState, label: str, condition=None, assignments=None) -> SDFGState:
+    """ Adds a new state that is executed after ``state``. """
+    new_state = sdfg.add_state(label)
+    sdfg.add_edge(state, new_state, dace.InterstateEdge(condition, assignments))
+    return new_state
+
+
+def add_for(sdfg: SDFG,
+            before: SDFGState,
+            label: str,
+            var: str,
+            begin,
+            end,
+            step,
+            body: Callable[[SDFGState], SDFGState],
+            reverse: bool = False) -> SDFGState:
+    """ Appends the loop ``for var in range(begin, end, step)`` (or, if
+        ``reverse`` is set, ``for var = begin; var > end; var -= step``) after
+        ``before``.
+        :param body: A function that receives the (empty) first state of the
+                     loop body, appends the body to it, and returns its last
+                     state.
+        :return: The state following the loop.
+    """
+    first = sdfg.add_state(label + '_body')
+    last = body(first)
+    after = sdfg.add_state(label + '_end')
+    if reverse:
+        condition, increment = f'{var} > {symstr(end)}', f'{var} - {symstr(step)}'
+    else:
+        condition, increment = f'{var} < {symstr(end)}', f'{var} + {symstr(step)}'
+    sdfg.add_loop(before, first, after, var, symstr(begin), condition, increment, last)
+    return after
+
+
+def add_if(sdfg: SDFG, before: SDFGState, label: str, condition: str, body: Callable[[SDFGState],
+                                                                                     SDFGState]) -> SDFGState:
+    """ Appends a branch that only executes ``body`` if ``condition`` holds.
+        :return: The state where both branches join.
+    """
+    first = add_state_after(sdfg, before, label, condition)
+    last = body(first)
+    join = sdfg.add_state(label + '_join')
+    sdfg.add_edge(last, join, dace.InterstateEdge())
+    sdfg.add_edge(before, join, dace.InterstateEdge(f'not ({condition})'))
+    return join
+
+
+def add_gemm_update(state: SDFGState,
+                    c: Tuple[str, str],
+                    a: Tuple[str, str],
+                    b: Tuple[str, str],
+                    alpha=-1,
+                    beta=1,
+                    transB: bool = False,
+                    vector: bool = False,
+                    implementation: Optional[str] = 'blocked'):
+    """ Adds ``c = alpha * a @ b + beta * c`` to a state, where each operand
+        is given as a tuple of (data name, subset string) and ``c`` is updated
+        in place. The product is computed by a ``Gemm`` library node, by
+        default with the cache-blocked BLAS kernels, or by a ``Gemv`` node if
+        ``vector`` is set and ``b`` and ``c`` are vectors.
+    """
+    if vector:
+        # The in-place update of y requires the nested-SDFG expansion of GEMV
+        node = Gemv('gemv', alpha=alpha, beta=beta)
+        node.implementation = 'pure'
+        conns = ('_A', '_x', '_y')
+    else:
+        node = Gemm('gemm', alpha=alpha, beta=beta, transB=transB, cin=False)
+        node.implementation = implementation
+        conns = ('_a', '_b', '_c')
+    state.add_edge(state.add_read(a[0]), None, node, conns[0], Memlet(f'{a[0]}[{a[1]}]'))
+    state.add_edge(state.add_read(b[0]), None, node, conns[1], Memlet(f'{b[0]}[{b[1]}]'))
+    if vector and beta != 0:
+        state.add_edge(state.add_read(c[0]), None, node, conns[2], Memlet(f'{c[0]}[{c[1]}]'))
+    state.add_edge(node, conns[2], state.add_write(c[0]), None, Memlet(f'{c[0]}[{c[1]}]'))
+    return node
+
+
+def add_update_map(state: SDFGState, label: str, ranges: dict, code: str, inputs: dict, output: str, **kwargs):
+    """ Adds a mapped tasklet that updates one element in place, where the
+        updated element is read through the ``_x`` connector and written through
+        ``_y``. """
+    inputs = {k: Memlet(v) for k, v in inputs.items()}
+    inputs['_x'] = Memlet(output)
+    state.add_mapped_tasklet(label, ranges, inputs, code, {'_y': Memlet(output)}, external_edges=True, **kwargs)
+
+
+def add_unit_lower_solve(sdfg: SDFG, before: SDFGState, a: str, b: str, n, nrhs, block_size: int,
+                         prefix: str) -> SDFGState:
+    """ Appends a blocked forward substitution ``b = inv(L) @ b`` after
+        ``before``, where ``L`` is the unit lower triangle of ``a``. Diagonal
+        blocks are solved with maps, the remaining rows are updated with GEMM.
+        :return: The last state of the solve.
+    """
+    vector = nrhs == 1
+    n, nrhs = symstr(n), symstr(nrhs)
+    cols = '0' if vector else f'0:{nrhs}'
+    k0, kend, t = f'{prefix}_k0', f'{prefix}_kend', f'{prefix}_t'
+
+    def block(first: SDFGState) -> SDFGState:
+        start = add_state_after(sdfg, first, prefix + '_block', assignments={kend: f'min({k0} + {block_size}, {n})'})
+
+        def column(cfirst: SDFGState) -> SDFGState:
+            st = add_state_after(sdfg, cfirst, prefix + '_column')
+            add_update_map(st, prefix + '_diag', {
+                '__i': f'{t} + 1:{kend}',
+                '__c': f'0:{nrhs}'
+            }, '_y = _x - _l * _v', {
+                '_l': f'{a}[__i, {t}]',
+                '_v': f'{b}[{t}, __c]'
+            }, f'{b}[__i, __c]')
+            return st
+
+        last = add_for(sdfg, start, prefix + '_columns', t, k0, kend, 1, column)
+
+        def update(ufirst: SDFGState) -> SDFGState:
+            add_gemm_update(ufirst, (b, f'{kend}:{n}, {cols}'), (a, f'{kend}:{n}, {k0}:{kend}'),
+                            (b, f'{k0}:{kend}, {cols}'),
+                            vector=vector)
+            return ufirst
+
+        return add_if(sdfg, last, prefix + '_update', f'{kend} < {n}', update)
+
+    return add_for(sdfg, before, prefix, k0, 0, n, block_size, block)
+
+
+def add_upper_solve(sdfg: SDFG, before: SDFGState, a: str, b: str, n, nrhs, block_size: int, prefix: str) -> SDFGState:
+    """ Appends a blocked backward substitution ``b = inv(U) @ b`` after
+        ``before``, where ``U`` is the upper triangle of ``a``. Blocks are
+        processed from the bottom up; the rows above each block are updated
+        with GEMM.
+        :return: The last state of the solve.
+    """
+    vector = nrhs == 1
+    n, nrhs = symstr(n), symstr(nrhs)
+    cols = '0' if vector else f'0:{nrhs}'
+    k0, kend, t = f'{prefix}_k0', f'{prefix}_kend', f'{prefix}_t'
+
+    def block(first: SDFGState) -> SDFGState:
+        start = add_state_after(sdfg, first, prefix + '_block', assignments={k0: f'max({kend} - {block_size}, 0)'})
+
+        def column(cfirst: SDFGState) -> SDFGState:
+            st = add_state_after(sdfg, cfirst, prefix + '_scale')
+            add_update_map(st, prefix + '_scale', {'__c': f'0:{nrhs}'}, '_y = _x / _d', {'_d': f'{a}[{t}, {t}]'},
+                           f'{b}[{t}, __c]')
+            st = add_state_after(sdfg, st, prefix + '_column')
+            add_update_map(st, prefix + '_diag', {
+                '__i': f'{k0}:{t}',
+                '__c': f'0:{nrhs}'
+            }, '_y = _x - _u * _v', {
+                '_u': f'{a}[__i, {t}]',
+                '_v': f'{b}[{t}, __c]'
+            }, f'{b}[__i, __c]')
+            return st
+
+        last = add_for(sdfg, start, prefix + '_columns', t, f'{kend} - 1', f'{k0} - 1', 1, column, reverse=True)
+
+        def update(ufirst: SDFGState) -> SDFGState:
+            add_gemm_update(ufirst, (b, f'0:{k0}, {cols}'), (a, f'0:{k0}, {k0}:{kend}'), (b, f'{k0}:{kend}, {cols}'),
+                            vector=vector)
+            return ufirst
+
+        return add_if(sdfg, last, prefix + '_update', f'{k0} > 0', update)
+
+    return add_for(sdfg, before, prefix, kend, n, 0, block_size, block, reverse=True)
+
+
+def add_row_interchanges(state: SDFGState, b: str, ipiv: str, n, nrhs, ldb, dtype: dtypes.typeclass):
+    """ Applies the row interchanges of a pivoted LU factorization
+        (``ipiv``, one-based as in LAPACK) to the rows of ``b``, in parallel
+        over its columns. """
+    n, nrhs, ldb = symstr(n), symstr(nrhs), symstr(ldb)
+    state.add_mapped_tasklet('laswp', {'__c': f'0:{nrhs}'}, {
+        '_p': Memlet(f'{ipiv}[0:{n}]'),
+        '_bin': Memlet(f'{b}[0:{n}, __c]')
+    },
+                             f'''
+for (int __i = 0; __i < {n}; ++__i) {{
+    const int __p = _p[__i] - 1;
+    if (__p != __i) {{
+        const {dtype.ctype} __tmp = _bout[__i * ({ldb})];
+        _bout[__i * ({ldb})] = _bout[__p * ({ldb})];
+        _bout[__p * ({ldb})] = __tmp;
+    }}
+}}''', {'_bout': Memlet(f'{b}[0:{n}, __c]')},
+                             language=dtypes.Language.CPP,
+                             external_edges=True)
+
+
+def make_lu_solve_sdfg(label: str, dtype: dtypes.typeclass, n, nrhs, lu_strides, rhs_strides, block_size: int) -> SDFG:
+    """ Creates an SDFG that solves ``A @ X = B`` in place, given the pivoted
+        LU factorization of ``A``. The SDFG takes the factorization ``_lu``,
+        the one-based pivots ``_perm``, and the right-hand sides ``_rhs``, which
+        are overwritten with the solution.
+    """
+    sdfg = SDFG(label)
+    sdfg.add_array('_lu', [n, n], dtype, strides=lu_strides)
+    sdfg.add_array('_perm', [n], dace.int32)
+    sdfg.add_array('_rhs', [n, nrhs], dtype, strides=rhs_strides)
+
+    state = sdfg.add_state('laswp')
+    add_row_interchanges(state, '_rhs', '_perm', n, nrhs, rhs_strides[0], dtype)
+    state = add_unit_lower_solve(sdfg, state, '_lu', '_rhs', n, nrhs, block_size, '__lower')
+    add_upper_solve(sdfg, state, '_lu', '_rhs', n, nrhs, block_size, '__upper')
+    return sdfg
+
+
+def add_lu_solve(state: SDFGState, solve: SDFG, lu: str, ipiv: str, rhs_in, rhs_out: str):
+    """ Adds a nested LU solve SDFG (see ``make_lu_solve_sdfg``) to a state,
+        operating on the given data. """
+    nsdfg = state.add_nested_sdfg(solve, state.parent, {'_lu', '_perm', '_rhs'}, {'_rhs'})
+    for name, conn in ((lu, '_lu'), (ipiv, '_perm'), (rhs_in, '_rhs')):
+        read = name if isinstance(name, dace.nodes.AccessNode) else state.add_read(name)
+        state.add_edge(read, None, nsdfg, conn, Memlet.from_array(read.data, state.parent.arrays[read.data]))
+    state.add_edge(nsdfg, '_rhs', state.add_write(rhs_out), None,
+                   Memlet.from_array(rhs_out, state.parent.arrays[rhs_out]))
+    return nsdfg
+
+
+def add_result(state: SDFGState, value='0'):
+    """ Writes a status value to the ``_res`` output of an expansion. """
+    tasklet = state.add_tasklet('set_result', {}, {'_out'}, f'_out = {value}')
+    state.add_edge(tasklet, '_out', state.add_write('_res'), None, Memlet('_res[0]'))
@@ -8,19 +8,145 @@ from dace.transformation.transformation import ExpandTransformation
 from .. import environments
 from dace.libraries.blas import environments as blas_environments
 from dace.libraries.blas import blas_helpers
+from dace.libraries.lapack import lapack_helpers
+from dace.symbolic import symstr
 
 
 @dace.library.expansion
 class ExpandGetrfPure(ExpandTransformation):
     """
-    Naive backend-agnostic expansion of LAPACK GETRF.
+    Backend-agnostic expansion of LAPACK GETRF. Computes a right-looking,
+    blocked LU factorization with partial pivoting: each panel of
+    ``block_size`` columns is factorized column by column with maps, the block
+    row of U is obtained with a triangular solve, and the trailing matrix is
+    updated with a ``Gemm`` library node.
     """
 
     environments = []
 
     @staticmethod
-    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
-        raise (NotImplementedError)
+    def expansion(node, parent_state, parent_sdfg, n=None, block_size=lapack_helpers.DEFAULT_BLOCK_SIZE, **kwargs):
+        (desc_x, stride_x, rows_x, cols_x), desc_ipiv, desc_result = node.validate(parent_sdfg, parent_state)
+        if desc_x.dtype.veclen > 1:
+            raise (NotImplementedError)
+        dtype = desc_x.dtype
+        _, shape, strides = lapack_helpers.matrix_operand(parent_state, parent_sdfg, node, '_xin')
+        m, n = symstr(shape[0]), symstr(shape[1])
+        kmax = f'min({m}, {n})'
+
+        sdfg = dace.SDFG(node.label + '_sdfg')
+        sdfg.add_array('_xin', shape, dtype, strides=strides)
+        sdfg.add_array('_xout', shape, dtype, strides=strides)
+        ipiv_edge = next(e for e in parent_state.out_edges(node) if e.src_conn == '_ipiv')
+        sdfg.add_array('_ipiv', [ipiv_edge.data.subset.num_elements()], dace.int32)
+        sdfg.add_array('_res', [1], dace.int32)
+        sdfg.add_scalar('_piv', dace.int32, transient=True)
+
+        init = sdfg.add_state('init')
+        lapack_helpers.add_result(init)
+        if not lapack_helpers.in_place(parent_state, node, '_xin', '_xout'):
+            init.add_nedge(init.add_read('_xin'), init.add_write('_xout'), dace.Memlet(f'_xin[0:{m}, 0:{n}]'))
+
+        if dtype in (dace.complex64, dace.complex128):
+            magnitude = 'std::abs(__v.real()) + std::abs(__v.imag())'
+        else:
+            magnitude = 'std::abs(__v)'
+        lda = symstr(strides[0])
+        pivot_code = f"""
+int __q = 0;
+{dtype.base_type.ctype} __v = _col[0];
+auto __best = {magnitude};
+for (int __i = 1; __i < {m} - __j; ++__i) {{
+    __v = _col[__i * ({lda})];
+    if ({magnitude} > __best) {{
+        __best = {magnitude};
+        __q = __i;
+    }}
+}}
+_pout = __j + __q;
+_ip = __j + __q + 1;
+_rout = (_rin == 0 && __best == 0) ? __j + 1 : _rin;
+"""
+
+        def panel_column(first):
+            # Find the pivot of column j, then swap the rows
+            state = lapack_helpers.add_state_after(sdfg, first, 'pivot')
+            tasklet = state.add_tasklet('pivot', {'_col', '_rin'}, {'_pout', '_ip', '_rout'},
+                                        pivot_code,
+                                        language=dace.dtypes.Language.CPP)
+            state.add_edge(state.add_read('_xout'), None, tasklet, '_col', dace.Memlet(f'_xout[__j:{m}, __j]'))
+            state.add_edge(state.add_read('_res'), None, tasklet, '_rin', dace.Memlet('_res[0]'))
+            state.add_edge(tasklet, '_pout', state.add_write('_piv'), None, dace.Memlet('_piv[0]'))
+            state.add_edge(tasklet, '_ip', state.add_write('_ipiv'), None, dace.Memlet('_ipiv[__j]'))
+            state.add_edge(tasklet, '_rout', state.add_write('_res'), None, dace.Memlet('_res[0]'))
+
+            def swap(sfirst):
+                sfirst.add_mapped_tasklet('swap', {'__c': f'0:{n}'}, {
+                    '_a': dace.Memlet('_xout[__j, __c]'),
+                    '_b': dace.Memlet('_xout[__p, __c]')
+                },
+                                          '_ao = _b; _bo = _a', {
+                                              '_ao': dace.Memlet('_xout[__j, __c]'),
+                                              '_bo': dace.Memlet('_xout[__p, __c]')
+                                          },
+                                          external_edges=True)
+                return sfirst
+
+            state = lapack_helpers.add_state_after(sdfg, state, 'read_pivot', assignments={'__p': '_piv'})
+            state = lapack_helpers.add_if(sdfg, state, 'swap', '__p != __j', swap)
+
+            # Compute the column of L and update the rest of the panel
+            state = lapack_helpers.add_state_after(sdfg, state, 'scale')
+            lapack_helpers.add_update_map(state,
+                                          'scale', {'__i': f'__j + 1:{m}'},
+                                          f'_y = (_d != {dtype.ctype}(0)) ? _x / _d : _x;', {'_d': '_xout[__j, __j]'},
+                                          '_xout[__i, __j]',
+                                          language=dace.dtypes.Language.CPP)
+            state = lapack_helpers.add_state_after(sdfg, state, 'panel_update')
+            lapack_helpers.add_update_map(state, 'panel_update', {
+                '__i': f'__j + 1:{m}',
+                '__c': '__j + 1:__kend'
+            }, '_y = _x - _l * _u', {
+                '_l': '_xout[__i, __j]',
+                '_u': '_xout[__j, __c]'
+            }, '_xout[__i, __c]')
+            return state
+
+        def block(first):
+            state = lapack_helpers.add_state_after(sdfg,
+                                                   first,
+                                                   'block',
+                                                   assignments={'__kend': f'min(__k0 + {block_size}, {kmax})'})
+            state = lapack_helpers.add_for(sdfg, state, 'panel', '__j', '__k0', '__kend', 1, panel_column)
+
+            def trailing(tfirst):
+                # Block row of U: inv(L11) @ A12
+                def column(cfirst):
+                    st = lapack_helpers.add_state_after(sdfg, cfirst, 'trsm')
+                    lapack_helpers.add_update_map(st, 'trsm', {
+                        '__i': '__t + 1:__kend',
+                        '__c': f'__kend:{n}'
+                    }, '_y = _x - _l * _u', {
+                        '_l': '_xout[__i, __t]',
+                        '_u': '_xout[__t, __c]'
+                    }, '_xout[__i, __c]')
+                    return st
+
+                st = lapack_helpers.add_for(sdfg, tfirst, 'trsm', '__t', '__k0', '__kend', 1, column)
+
+                # Trailing matrix: A22 -= A21 @ A12
+                def update(ufirst):
+                    lapack_helpers.add_gemm_update(ufirst, ('_xout', f'__kend:{m}, __kend:{n}'),
+                                                   ('_xout', f'__kend:{m}, __k0:__kend'),
+                                                   ('_xout', f'__k0:__kend, __kend:{n}'))
+                    return ufirst
+
+                return lapack_helpers.add_if(sdfg, st, 'trailing_update', f'__kend < {m}', update)
+
+            return lapack_helpers.add_if(sdfg, state, 'trailing', f'__kend < {n}', trailing)
+
+        lapack_helpers.add_for(sdfg, init, 'blocks', '__k0', 0, kmax, block_size, block)
+        return sdfg
 
 
 @dace.library.expansion
@@ -128,7 +254,12 @@ class ExpandGetrfCuSolverDn(ExpandTransformation):
 class Getrf(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
-    implementations = {"OpenBLAS": ExpandGetrfOpenBLAS, "MKL": ExpandGetrfMKL, "cuSolverDn": ExpandGetrfCuSolverDn}
+    implementations = {
+        "pure": ExpandGetrfPure,
+        "OpenBLAS": ExpandGetrfOpenBLAS,
+        "MKL": ExpandGetrfMKL,
+        "cuSolverDn": ExpandGetrfCuSolverDn
+    }
     default_implementation = None
 
     # Object fields
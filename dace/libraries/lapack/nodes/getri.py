@@ -10,19 +10,53 @@ from dace import data as dt, dtypes, memlet as mm, SDFG, SDFGState, symbolic
 from dace.frontend.common import op_repository as oprepo
 from dace.libraries.blas import environments as blas_environments
 from dace.libraries.blas import blas_helpers
+from dace.libraries.lapack import lapack_helpers
 
 
 @dace.library.expansion
 class ExpandGetriPure(ExpandTransformation):
     """
-    Naive backend-agnostic expansion of LAPACK GETRI.
+    Backend-agnostic expansion of LAPACK GETRI. Computes the inverse from the
+    LU factorization by solving for the columns of the identity matrix with the
+    blocked triangular solves of the pure GETRS expansion.
     """
 
     environments = []
 
     @staticmethod
-    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
-        raise (NotImplementedError)
+    def expansion(node, parent_state, parent_sdfg, n=None, block_size=lapack_helpers.DEFAULT_BLOCK_SIZE, **kwargs):
+        (desc_x, stride_x, rows_x, cols_x), desc_ipiv, desc_result = node.validate(parent_sdfg, parent_state)
+        if desc_x.dtype.veclen > 1:
+            raise (NotImplementedError)
+        dtype = desc_x.dtype
+        _, shape, strides = lapack_helpers.matrix_operand(parent_state, parent_sdfg, node, '_xin')
+        _, _, out_strides = lapack_helpers.matrix_operand(parent_state, parent_sdfg, node, '_xout')
+        n = shape[0]
+
+        sdfg = dace.SDFG(node.label + '_sdfg')
+        sdfg.add_array('_xin', shape, dtype, strides=strides)
+        sdfg.add_array('_xout', shape, dtype, strides=out_strides)
+        sdfg.add_array('_ipiv', [n], dace.int32)
+        sdfg.add_array('_res', [1], dace.int32)
+        sdfg.add_array('_lu', shape, dtype, transient=True)
+
+        # The output may alias the factorization, so copy it before writing the identity
+        state = sdfg.add_state('init')
+        lapack_helpers.add_result(state)
+        state.add_nedge(state.add_read('_xin'), state.add_write('_lu'),
+                        dace.Memlet.from_array('_xin', sdfg.arrays['_xin']))
+        state = lapack_helpers.add_state_after(sdfg, state, 'identity')
+        state.add_mapped_tasklet('identity',
+                                 dict(__i=f'0:{symstr(n)}', __j=f'0:{symstr(n)}'), {},
+                                 f'_out = (__i == __j) ? {dtype.ctype}(1) : {dtype.ctype}(0);',
+                                 dict(_out=mm.Memlet('_xout[__i, __j]')),
+                                 language=dtypes.Language.CPP,
+                                 external_edges=True)
+        state = lapack_helpers.add_state_after(sdfg, state, 'solve')
+        solve = lapack_helpers.make_lu_solve_sdfg(node.label + '_solve', dtype, n, n, sdfg.arrays['_lu'].strides,
+                                                  out_strides, block_size)
+        lapack_helpers.add_lu_solve(state, solve, '_lu', '_ipiv', '_xout', '_xout')
+        return sdfg
 
 
 @dace.library.expansion
@@ -86,6 +120,7 @@ class Getri(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
+        "pure": ExpandGetriPure,
         "OpenBLAS": ExpandGetriOpenBLAS,
         "MKL": ExpandGetriMKL,
     }
@@ -10,19 +10,47 @@ from dace import data as dt, dtypes, memlet as mm, SDFG, SDFGState, symbolic
 from dace.frontend.common import op_repository as oprepo
 from dace.libraries.blas import environments as blas_environments
 from dace.libraries.blas import blas_helpers
+from dace.libraries.lapack import lapack_helpers
 
 
 @dace.library.expansion
 class ExpandGetrsPure(ExpandTransformation):
     """
-    Naive backend-agnostic expansion of LAPACK GETRS.
+    Backend-agnostic expansion of LAPACK GETRS. Applies the row interchanges
+    to the right-hand sides in parallel, then solves with the unit lower and
+    upper triangular factors by blocks, using maps within the diagonal blocks
+    and a ``Gemm`` library node for the remaining rows.
     """
 
     environments = []
 
     @staticmethod
-    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
-        raise (NotImplementedError)
+    def expansion(node, parent_state, parent_sdfg, n=None, block_size=lapack_helpers.DEFAULT_BLOCK_SIZE, **kwargs):
+        (desc_a, stride_a, rows_a, cols_a), (desc_rhs, stride_rhs, rows_rhs,
+                                             cols_rhs), desc_ipiv, desc_res = node.validate(parent_sdfg, parent_state)
+        if desc_a.dtype.veclen > 1:
+            raise (NotImplementedError)
+        dtype = desc_a.dtype
+        _, ashape, astrides = lapack_helpers.matrix_operand(parent_state, parent_sdfg, node, '_a')
+        _, bshape, bstrides = lapack_helpers.matrix_operand(parent_state, parent_sdfg, node, '_rhs_in')
+
+        sdfg = dace.SDFG(node.label + '_sdfg')
+        sdfg.add_array('_a', ashape, dtype, strides=astrides)
+        sdfg.add_array('_rhs_in', bshape, dtype, strides=bstrides)
+        sdfg.add_array('_rhs_out', bshape, dtype, strides=bstrides)
+        sdfg.add_array('_ipiv', [ashape[0]], dace.int32)
+        sdfg.add_array('_res', [1], dace.int32)
+
+        state = sdfg.add_state('init')
+        lapack_helpers.add_result(state)
+        if not lapack_helpers.in_place(parent_state, node, '_rhs_in', '_rhs_out'):
+            state.add_nedge(state.add_read('_rhs_in'), state.add_write('_rhs_out'),
+                            dace.Memlet.from_array('_rhs_in', sdfg.arrays['_rhs_in']))
+        state = lapack_helpers.add_state_after(sdfg, state, 'solve')
+        solve = lapack_helpers.make_lu_solve_sdfg(node.label + '_solve', dtype, ashape[0], bshape[1], astrides,
+                                                  bstrides, block_size)
+        lapack_helpers.add_lu_solve(state, solve, '_a', '_ipiv', '_rhs_out', '_rhs_out')
+        return sdfg
 
 
 @dace.library.expansion
@@ -129,7 +157,12 @@ class ExpandGetrsCuSolverDn(ExpandTransformation):
 class Getrs(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
-    implementations = {"OpenBLAS": ExpandGetrsOpenBLAS, "MKL": ExpandGetrsMKL, "cuSolverDn": ExpandGetrsCuSolverDn}
+    implementations = {
+        "pure": ExpandGetrsPure,
+        "OpenBLAS": ExpandGetrsOpenBLAS,
+        "MKL": ExpandGetrsMKL,
+        "cuSolverDn": ExpandGetrsCuSolverDn
+    }
     default_implementation = None
 
     # Object fields
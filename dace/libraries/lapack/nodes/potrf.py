@@ -8,19 +8,136 @@ from dace.transformation.transformation import ExpandTransformation
 from .. import environments
 from dace.libraries.blas import environments as blas_environments
 from dace.libraries.blas import blas_helpers
+from dace.libraries.lapack import lapack_helpers
+from dace.symbolic import symstr
 
 
 @dace.library.expansion
 class ExpandPotrfPure(ExpandTransformation):
     """
-    Naive backend-agnostic expansion of LAPACK POTRF.
+    Backend-agnostic expansion of LAPACK POTRF for real matrices. Computes a
+    blocked Cholesky factorization: each diagonal block is updated with a
+    ``Gemm`` library node and factorized column by column with maps, then the
+    block column below it is updated with ``Gemm`` and a triangular solve.
+    The upper factorization is computed on the transposed view of the matrix.
     """
 
     environments = []
 
     @staticmethod
-    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
-        raise (NotImplementedError)
+    def expansion(node, parent_state, parent_sdfg, n=None, block_size=lapack_helpers.DEFAULT_BLOCK_SIZE, **kwargs):
+        (desc_x, stride_x, rows_x, cols_x), desc_result = node.validate(parent_sdfg, parent_state)
+        dtype = desc_x.dtype
+        if dtype.veclen > 1 or dtype in (dace.complex64, dace.complex128):
+            raise (NotImplementedError)
+        _, shape, strides = lapack_helpers.matrix_operand(parent_state, parent_sdfg, node, '_xin')
+        if not node._lower:
+            # Factorize the lower triangle of the transposed view
+            strides = list(reversed(strides))
+        n = symstr(shape[0])
+
+        sdfg = dace.SDFG(node.label + '_sdfg')
+        sdfg.add_array('_xin', shape, dtype, strides=strides)
+        sdfg.add_array('_xout', shape, dtype, strides=strides)
+        sdfg.add_array('_res', [1], dace.int32)
+        sdfg.add_array('_tmp', [block_size, block_size], dtype, transient=True)
+
+        init = sdfg.add_state('init')
+        lapack_helpers.add_result(init)
+        if not lapack_helpers.in_place(parent_state, node, '_xin', '_xout'):
+            init.add_nedge(init.add_read('_xin'), init.add_write('_xout'), dace.Memlet(f'_xin[0:{n}, 0:{n}]'))
+
+        def diagonal_column(first):
+            state = lapack_helpers.add_state_after(sdfg, first, 'diagonal')
+            tasklet = state.add_tasklet('diagonal', {'_x', '_rin'}, {'_y', '_rout'},
+                                        """
+if (_x > 0) {
+    _y = sqrt(_x);
+    _rout = _rin;
+} else {
+    _y = _x;
+    _rout = (_rin == 0) ? __c + 1 : _rin;
+}""",
+                                        language=dace.dtypes.Language.CPP)
+            state.add_edge(state.add_read('_xout'), None, tasklet, '_x', dace.Memlet('_xout[__c, __c]'))
+            state.add_edge(state.add_read('_res'), None, tasklet, '_rin', dace.Memlet('_res[0]'))
+            state.add_edge(tasklet, '_y', state.add_write('_xout'), None, dace.Memlet('_xout[__c, __c]'))
+            state.add_edge(tasklet, '_rout', state.add_write('_res'), None, dace.Memlet('_res[0]'))
+
+            state = lapack_helpers.add_state_after(sdfg, state, 'scale')
+            lapack_helpers.add_update_map(state, 'scale', {'__i': '__c + 1:__jend'}, '_y = _x / _d',
+                                          {'_d': '_xout[__c, __c]'}, '_xout[__i, __c]')
+            state = lapack_helpers.add_state_after(sdfg, state, 'diagonal_update')
+            lapack_helpers.add_update_map(state,
+                                          'diagonal_update', {
+                                              '__i': '__c + 1:__jend',
+                                              '__q': '__c + 1:__jend'
+                                          },
+                                          '_y = (__q <= __i) ? _x - _a * _b : _x;', {
+                                              '_a': '_xout[__i, __c]',
+                                              '_b': '_xout[__q, __c]'
+                                          },
+                                          '_xout[__i, __q]',
+                                          language=dace.dtypes.Language.CPP)
+            return state
+
+        def offdiagonal_column(first):
+            state = lapack_helpers.add_state_after(sdfg, first, 'trsm_scale')
+            lapack_helpers.add_update_map(state, 'trsm_scale', {'__i': f'__jend:{n}'}, '_y = _x / _d',
+                                          {'_d': '_xout[__c, __c]'}, '_xout[__i, __c]')
+            state = lapack_helpers.add_state_after(sdfg, state, 'trsm_update')
+            lapack_helpers.add_update_map(state, 'trsm_update', {
+                '__i': f'__jend:{n}',
+                '__q': '__c + 1:__jend'
+            }, '_y = _x - _a * _b', {
+                '_a': '_xout[__i, __c]',
+                '_b': '_xout[__q, __c]'
+            }, '_xout[__i, __q]')
+            return state
+
+        def block(first):
+            state = lapack_helpers.add_state_after(sdfg,
+                                                   first,
+                                                   'block',
+                                                   assignments={'__jend': f'min(__j0 + {block_size}, {n})'})
+
+            # Update the lower triangle of the diagonal block with the previous block columns
+            def diagonal_update(ufirst):
+                lapack_helpers.add_gemm_update(ufirst, ('_tmp', '0:__jend - __j0, 0:__jend - __j0'),
+                                               ('_xout', '__j0:__jend, 0:__j0'), ('_xout', '__j0:__jend, 0:__j0'),
+                                               alpha=1,
+                                               beta=0,
+                                               transB=True)
+                st = lapack_helpers.add_state_after(sdfg, ufirst, 'diagonal_subtract')
+                lapack_helpers.add_update_map(st,
+                                              'diagonal_subtract', {
+                                                  '__i': '__j0:__jend',
+                                                  '__q': '__j0:__jend'
+                                              },
+                                              '_y = (__q <= __i) ? _x - _t : _x;',
+                                              {'_t': '_tmp[__i - __j0, __q - __j0]'},
+                                              '_xout[__i, __q]',
+                                              language=dace.dtypes.Language.CPP)
+                return st
+
+            state = lapack_helpers.add_if(sdfg, state, 'diagonal_update', '__j0 > 0', diagonal_update)
+            state = lapack_helpers.add_for(sdfg, state, 'diagonal', '__c', '__j0', '__jend', 1, diagonal_column)
+
+            # Update and solve the block column below the diagonal block
+            def panel(pfirst):
+                def panel_update(ufirst):
+                    lapack_helpers.add_gemm_update(ufirst, ('_xout', f'__jend:{n}, __j0:__jend'),
+                                                   ('_xout', f'__jend:{n}, 0:__j0'), ('_xout', '__j0:__jend, 0:__j0'),
+                                                   transB=True)
+                    return ufirst
+
+                st = lapack_helpers.add_if(sdfg, pfirst, 'panel_update', '__j0 > 0', panel_update)
+                return lapack_helpers.add_for(sdfg, st, 'trsm', '__c', '__j0', '__jend', 1, offdiagonal_column)
+
+            return lapack_helpers.add_if(sdfg, state, 'panel', f'__jend < {n}', panel)
+
+        lapack_helpers.add_for(sdfg, init, 'blocks', '__j0', 0, n, block_size, block)
+        return sdfg
 
 
 @dace.library.expansion
@@ -107,7 +224,12 @@ class ExpandPotrfCuSolverDn(ExpandTransformation):
 class Potrf(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
-    implementations = {"OpenBLAS": ExpandPotrfOpenBLAS, "MKL": ExpandPotrfMKL, "cuSolverDn": ExpandPotrfCuSolverDn}
+    implementations = {
+        "pure": ExpandPotrfPure,
+        "OpenBLAS": ExpandPotrfOpenBLAS,
+        "MKL": ExpandPotrfMKL,
+        "cuSolverDn": ExpandPotrfCuSolverDn
+    }
     default_implementation = None
 
     # Object fields
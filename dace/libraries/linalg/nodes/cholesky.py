@@ -71,14 +71,15 @@ def _make_sdfg(node, parent_state, parent_sdfg, implementation):
 @dace.library.expansion
 class ExpandCholeskyPure(ExpandTransformation):
     """
-    Naive backend-agnostic expansion of LAPACK POTRF.
+    Backend-agnostic expansion of linalg.cholesky, using the blocked pure
+    expansion of LAPACK POTRF.
     """
 
     environments = []
 
     @staticmethod
-    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
-        raise NotImplementedError
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        return _make_sdfg(node, parent_state, parent_sdfg, "pure")
 
 
 @dace.library.expansion
@@ -120,6 +121,7 @@ class Cholesky(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
+        "pure": ExpandCholeskyPure,
         "OpenBLAS": ExpandCholeskyOpenBLAS,
         "MKL": ExpandCholeskyMKL,
         "cuSolverDn": ExpandCholeskyCuSolverDn
@@ -135,19 +135,19 @@ def _make_sdfg_getrs(node, parent_state, parent_sdfg, implementation):
 
 @dace.library.expansion
 class ExpandInvPure(ExpandTransformation):
+    """
+    Backend-agnostic expansion of linalg.inv, using the blocked pure
+    expansions of LAPACK GETRF and GETRI (or GETRS).
+    """
 
     environments = []
 
     @staticmethod
-    def make_sdfg(node, parent_state, parent_sdfg):
-        raise NotImplementedError("Missing pure implementation of linalg.inv.")
-
-    @staticmethod
-    def expansion(node, state, sdfg):
-        node.validate(sdfg, state)
-        if node.dtype is None:
-            raise ValueError("Data type must be set to expand " + str(node) + ".")
-        return ExpandInvPure.make_sdfg(node, state, sdfg)
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        if node.use_getri:
+            return _make_sdfg(node, parent_state, parent_sdfg, "pure")
+        else:
+            return _make_sdfg_getrs(node, parent_state, parent_sdfg, "pure")
 
 
 @dace.library.expansion
@@ -190,7 +190,12 @@ class ExpandInvCuSolverDn(ExpandTransformation):
 class Inv(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
-    implementations = {"OpenBLAS": ExpandInvOpenBLAS, "MKL": ExpandInvMKL, "cuSolverDn": ExpandInvCuSolverDn}
+    implementations = {
+        "pure": ExpandInvPure,
+        "OpenBLAS": ExpandInvOpenBLAS,
+        "MKL": ExpandInvMKL,
+        "cuSolverDn": ExpandInvCuSolverDn
+    }
     default_implementation = None
 
     overwrite = dace.properties.Property(dtype=bool, default=False)
@@ -84,19 +84,16 @@ def _make_sdfg_getrs(node, parent_state, parent_sdfg, implementation):
 
 @dace.library.expansion
 class ExpandSolvePure(ExpandTransformation):
+    """
+    Backend-agnostic expansion of linalg.solve, using the blocked pure
+    expansions of LAPACK GETRF and GETRS.
+    """
 
     environments = []
 
     @staticmethod
-    def make_sdfg(node, parent_state, parent_sdfg):
-        raise NotImplementedError("Missing pure implementation of linalg.solve.")
-
-    @staticmethod
-    def expansion(node, state, sdfg):
-        node.validate(sdfg, state)
-        if node.dtype is None:
-            raise ValueError("Data type must be set to expand " + str(node) + ".")
-        return ExpandSolvePure.make_sdfg(node, state, sdfg)
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        return _make_sdfg_getrs(node, parent_state, parent_sdfg, "pure")
 
 
 @dace.library.expansion
@@ -133,7 +130,12 @@ class ExpandSolveCuSolverDn(ExpandTransformation):
 class Solve(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
-    implementations = {"OpenBLAS": ExpandSolveOpenBLAS, "MKL": ExpandSolveMKL, "cuSolverDn": ExpandSolveCuSolverDn}
+    implementations = {
+        "pure": ExpandSolvePure,
+        "OpenBLAS": ExpandSolveOpenBLAS,
+        "MKL": ExpandSolveMKL,
+        "cuSolverDn": ExpandSolveCuSolverDn
+    }
     default_implementation = None
 
     overwrite = dace.properties.Property(dtype=bool, default=False)
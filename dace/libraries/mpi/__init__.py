@@ -4,4 +4,9 @@ from .nodes import *
 from .environments import *
 from .utils import *
 
+# The collectives and blocking point-to-point nodes can also be expanded to
+# single-node shared-memory communication, e.g., with
+# ``dace.library.change_default(dace.libraries.mpi, "SharedMemory")``
+default_implementation = "MPI"
+
 register_library(__name__, "mpi")
@@ -1,2 +1,3 @@
 # Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
 from .mpi import *
+from .shared_memory import *
@@ -14,8 +14,12 @@ class MPI:
     cmake_compile_flags = ["-I${MPI_CXX_HEADER_DIR}"]
     cmake_link_flags = ["${MPI_LINKER_FLAGS}"]
 
-    headers = ["mpi.h"]
+    headers = ["mpi.h", "../include/dace_mpi.h"]
     state_fields = []
     init_code = "int t; MPI_Initialized(&t);  if (!t) MPI_Init(NULL, NULL);"
     finalize_code = "// MPI_Finalize();"  # actually if we finalize in the dace program we break pytest :)
     dependencies = []
+
+    # Communication calls must be made in the same order on all ranks, so
+    # they are never generated in concurrent OpenMP sections or tasks
+    ordered_calls = True
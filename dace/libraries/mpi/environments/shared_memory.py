@@ -0,0 +1,36 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import sys
+import dace.library
+
+
+@dace.library.environment
+class SharedMemory:
+    """
+    An environment for single-node communication over shared memory, which
+    implements the MPI library nodes without an MPI installation. Programs
+    are started with one process per rank by the launcher in
+    ``dace.libraries.mpi.shm``.
+    """
+
+    cmake_minimum_version = None
+    cmake_packages = []
+    cmake_variables = {}
+    cmake_includes = []
+    cmake_compile_flags = []
+    cmake_link_flags = []
+    cmake_files = []
+
+    headers = ["../include/dace_shm.h"]
+    state_fields = []
+    init_code = "dace::shm::world();"
+    finalize_code = ""
+    dependencies = []
+
+    # All ranks share one barrier and one slot each, so collectives must not
+    # run concurrently (see ``_has_ordered_calls`` in the frame generator)
+    ordered_calls = True
+
+    @staticmethod
+    def cmake_libraries():
+        # shm_open is part of librt on older Linux C libraries
+        return ["rt"] if sys.platform.startswith('linux') else []
@@ -0,0 +1,144 @@
+// Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+#pragma once
+
+#include <mpi.h>
+
+namespace dace {
+namespace mpi {
+
+/**
+ * Exchanges the halo regions of a block-distributed array with the
+ * neighboring processes of a Cartesian process grid. Halos are sent and
+ * received in place using subarray datatypes, without packing.
+ *
+ * Dimensions are exchanged one after the other. The exchange of dimension d
+ * includes the halos of dimensions 0..d-1 that were already received, so
+ * that corner (and edge) halos are filled as well.
+ *
+ * The process grid and the datatypes are created once and reused across
+ * calls, as long as the local array shape and element type do not change.
+ */
+template <int DIMS>
+class HaloExchange {
+ public:
+    /**
+     * Creates the Cartesian process grid.
+     * @param grid Number of processes in each dimension. Zero entries are
+     *             filled in by MPI_Dims_create.
+     * @param periodic Nonzero for dimensions that wrap around.
+     */
+    HaloExchange(const int *grid, const int *periodic) {
+        int commsize;
+        MPI_Comm_size(MPI_COMM_WORLD, &commsize);
+        int periods[DIMS];
+        for (int d = 0; d < DIMS; ++d) {
+            dims_[d] = grid[d];
+            periods[d] = periodic[d];
+        }
+        MPI_Dims_create(commsize, DIMS, dims_);
+        MPI_Cart_create(MPI_COMM_WORLD, DIMS, dims_, periods, 0, &comm_);
+        for (int d = 0; d < DIMS; ++d) {
+            MPI_Cart_shift(comm_, d, 1, &neighbors_[d][0], &neighbors_[d][1]);
+        }
+    }
+
+    ~HaloExchange() {
+        int finalized;
+        MPI_Finalized(&finalized);
+        if (finalized) return;
+        free_types();
+        if (comm_ != MPI_COMM_NULL) MPI_Comm_free(&comm_);
+    }
+
+    HaloExchange(const HaloExchange &) = delete;
+    HaloExchange &operator=(const HaloExchange &) = delete;
+
+    /**
+     * Exchanges the halos of a local array block.
+     * @param buffer Pointer to the first element of the local block.
+     * @param type MPI datatype of the elements.
+     * @param sizes Allocated size of each dimension (including halos).
+     * @param halo Halo width of each dimension.
+     */
+    void exchange(void *buffer, MPI_Datatype type, const int *sizes, const int *halo) {
+        prepare(type, sizes, halo);
+        MPI_Request requests[4];
+        for (int d = 0; d < DIMS; ++d) {
+            if (halo[d] == 0) continue;
+            // Receive into the low and high halos, send the low and high
+            // boundaries of the interior
+            MPI_Irecv(buffer, 1, types_[d][0][1], neighbors_[d][0], 2 * d + 1, comm_, &requests[0]);
+            MPI_Irecv(buffer, 1, types_[d][1][1], neighbors_[d][1], 2 * d, comm_, &requests[1]);
+            MPI_Isend(buffer, 1, types_[d][0][0], neighbors_[d][0], 2 * d, comm_, &requests[2]);
+            MPI_Isend(buffer, 1, types_[d][1][0], neighbors_[d][1], 2 * d + 1, comm_, &requests[3]);
+            MPI_Waitall(4, requests, MPI_STATUSES_IGNORE);
+        }
+    }
+
+    /// Returns the communicator of the Cartesian process grid.
+    MPI_Comm comm() const { return comm_; }
+
+ private:
+    void prepare(MPI_Datatype type, const int *sizes, const int *halo) {
+        bool same = built_ && type == type_;
+        for (int d = 0; d < DIMS && same; ++d) {
+            same = sizes[d] == sizes_[d] && halo[d] == halo_[d];
+        }
+        if (same) return;
+
+        free_types();
+        type_ = type;
+        for (int d = 0; d < DIMS; ++d) {
+            sizes_[d] = sizes[d];
+            halo_[d] = halo[d];
+        }
+        for (int d = 0; d < DIMS; ++d) {
+            if (halo[d] == 0) continue;
+            int subsizes[DIMS], starts[DIMS];
+            for (int e = 0; e < DIMS; ++e) {
+                // Dimensions that were already exchanged include their halos
+                subsizes[e] = (e < d) ? sizes[e] : sizes[e] - 2 * halo[e];
+                starts[e] = (e < d) ? 0 : halo[e];
+            }
+            subsizes[d] = halo[d];
+            // [side][send/receive]: low boundary, low halo, high boundary,
+            // high halo
+            const int offsets[2][2] = {{halo[d], 0}, {sizes[d] - 2 * halo[d], sizes[d] - halo[d]}};
+            for (int side = 0; side < 2; ++side) {
+                for (int dir = 0; dir < 2; ++dir) {
+                    starts[d] = offsets[side][dir];
+                    MPI_Type_create_subarray(DIMS, sizes, subsizes, starts, MPI_ORDER_C, type,
+                                             &types_[d][side][dir]);
+                    MPI_Type_commit(&types_[d][side][dir]);
+                }
+            }
+        }
+        built_ = true;
+    }
+
+    void free_types() {
+        if (!built_) return;
+        for (int d = 0; d < DIMS; ++d) {
+            if (halo_[d] == 0) continue;
+            for (int side = 0; side < 2; ++side) {
+                for (int dir = 0; dir < 2; ++dir) {
+                    MPI_Type_free(&types_[d][side][dir]);
+                }
+            }
+        }
+        built_ = false;
+    }
+
+    MPI_Comm comm_ = MPI_COMM_NULL;
+    int dims_[DIMS];
+    int neighbors_[DIMS][2];
+
+    bool built_ = false;
+    MPI_Datatype type_ = MPI_DATATYPE_NULL;
+    int sizes_[DIMS];
+    int halo_[DIMS];
+    MPI_Datatype types_[DIMS][2][2];
+};
+
+}  // namespace mpi
+}  // namespace dace
@@ -0,0 +1,457 @@
+// Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+#pragma once
+
+// Shared-memory communication between processes on a single node, used by the
+// "SharedMemory" implementation of the MPI library nodes. One process runs
+// per rank, started by the launcher in dace/libraries/mpi/shm.py, which sets
+// the following environment variables:
+//   DACE_SHM_NAME   Name of the shared-memory segment
+//   DACE_SHM_RANK   Rank of this process
+//   DACE_SHM_SIZE   Number of processes
+//   DACE_SHM_CHUNK  (optional) Size of the staging buffers in bytes
+//   DACE_SHM_CMA    (optional) Set to 0 to disable single-copy transfers
+// Without these variables, the program runs as a single rank.
+//
+// Data are transferred with a single copy, directly between the address
+// spaces of the processes (Linux cross-memory attach), when the operating
+// system permits it. Otherwise, and for small point-to-point messages, data
+// are copied through staging buffers in the shared-memory segment.
+
+#include <algorithm>
+#include <atomic>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include <fcntl.h>
+#include <sched.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#ifdef __linux__
+#include <sys/uio.h>
+#endif
+
+namespace dace {
+namespace shm {
+
+// Reduction operators
+struct Sum {
+    template <typename T>
+    static T apply(T a, T b) { return a + b; }
+};
+struct Prod {
+    template <typename T>
+    static T apply(T a, T b) { return a * b; }
+};
+struct Max {
+    template <typename T>
+    static T apply(T a, T b) { return a < b ? b : a; }
+};
+struct Min {
+    template <typename T>
+    static T apply(T a, T b) { return b < a ? b : a; }
+};
+
+namespace detail {
+
+constexpr size_t kCacheLine = 64;
+
+inline size_t align(size_t n) { return (n + kCacheLine - 1) / kCacheLine * kCacheLine; }
+
+[[noreturn]] inline void fail(const char *message) {
+    fprintf(stderr, "DaCe shared-memory communication error: %s\n", message);
+    abort();
+}
+
+template <typename Predicate>
+inline void wait_until(Predicate &&done) {
+    for (int spins = 0; !done(); ++spins) {
+        if (spins > 1000) sched_yield();
+    }
+}
+
+inline long env_or(const char *name, long fallback) {
+    const char *value = getenv(name);
+    return value ? atol(value) : fallback;
+}
+
+struct alignas(kCacheLine) Header {
+    std::atomic<int> initialized;
+    alignas(kCacheLine) std::atomic<uint32_t> barrier_count;
+    alignas(kCacheLine) std::atomic<uint32_t> barrier_generation;
+    alignas(kCacheLine) std::atomic<int> cma_failures;
+};
+
+// Buffer exposed by a rank in a collective operation
+struct alignas(kCacheLine) Slot {
+    pid_t pid;
+    uint64_t address;
+    uint64_t bytes;
+};
+
+// One-directional message channel between a pair of ranks. Each message is
+// either stored in the staging buffer that follows the channel (eager), or
+// read directly from the address space of the sender (rendezvous).
+struct alignas(kCacheLine) Channel {
+    std::atomic<uint64_t> posted;
+    alignas(kCacheLine) std::atomic<uint64_t> consumed;
+    alignas(kCacheLine) uint64_t bytes;
+    uint64_t address;
+    int tag;
+    int last;
+};
+
+}  // namespace detail
+
+class Communicator {
+ public:
+    Communicator() {
+        const char *name = getenv("DACE_SHM_NAME");
+        rank_ = (int)detail::env_or("DACE_SHM_RANK", 0);
+        size_ = (int)detail::env_or("DACE_SHM_SIZE", 1);
+        chunk_ = detail::align((size_t)detail::env_or("DACE_SHM_CHUNK", 1 << 18));
+        if (size_ < 1 || rank_ < 0 || rank_ >= size_) detail::fail("invalid rank or number of ranks");
+
+        // Segment layout: header, one slot per rank, one staging buffer per
+        // rank, and one channel (with its staging buffer) per pair of ranks
+        slots_offset_ = detail::align(sizeof(detail::Header));
+        staging_offset_ = slots_offset_ + size_ * sizeof(detail::Slot);
+        channels_offset_ = staging_offset_ + size_ * chunk_;
+        channel_stride_ = sizeof(detail::Channel) + chunk_;
+        bytes_ = channels_offset_ + (size_t)size_ * size_ * channel_stride_;
+
+        if (name == nullptr || size_ == 1) {
+            // Single rank: use private memory
+            private_.resize(bytes_ + detail::kCacheLine);
+            base_ = (char *)detail::align((size_t)private_.data());
+        } else {
+            attach(name);
+        }
+
+        slot(rank_).pid = getpid();
+        if (size_ > 1) {
+            barrier();
+            if (rank_ == 0) shm_unlink(name);
+            probe_cma();
+        }
+    }
+
+    ~Communicator() {
+        if (private_.empty() && base_ != nullptr) munmap(base_, bytes_);
+    }
+
+    Communicator(const Communicator &) = delete;
+    Communicator &operator=(const Communicator &) = delete;
+
+    int rank() const { return rank_; }
+    int size() const { return size_; }
+
+    void barrier() {
+        detail::Header &h = header();
+        uint32_t generation = h.barrier_generation.load(std::memory_order_acquire);
+        if (h.barrier_count.fetch_add(1, std::memory_order_acq_rel) == (uint32_t)size_ - 1) {
+            h.barrier_count.store(0, std::memory_order_relaxed);
+            h.barrier_generation.fetch_add(1, std::memory_order_acq_rel);
+        } else {
+            detail::wait_until([&] { return h.barrier_generation.load(std::memory_order_acquire) != generation; });
+        }
+    }
+
+    ///////////////////////////////////////////////////////////////////////
+    // Collectives
+
+    void bcast(void *buffer, size_t bytes, int root) {
+        check_rank(root);
+        expose(rank_ == root ? buffer : nullptr, rank_ == root ? bytes : 0, bytes, [&](Reader &read) {
+            if (rank_ != root) read(root, 0, buffer, bytes);
+        });
+    }
+
+    void scatter(const void *in, void *out, size_t bytes, int root) {
+        check_rank(root);
+        size_t total = bytes * size_;
+        expose(rank_ == root ? in : nullptr, rank_ == root ? total : 0, total,
+               [&](Reader &read) { read(root, rank_ * bytes, out, bytes); });
+    }
+
+    void gather(const void *in, void *out, size_t bytes, int root) {
+        check_rank(root);
+        expose(in, bytes, bytes, [&](Reader &read) {
+            if (rank_ != root) return;
+            for (int peer = 0; peer < size_; ++peer) read(peer, 0, (char *)out + peer * bytes, bytes);
+        });
+    }
+
+    void allgather(const void *in, void *out, size_t bytes) {
+        expose(in, bytes, bytes, [&](Reader &read) {
+            for (int peer = 0; peer < size_; ++peer) read(peer, 0, (char *)out + peer * bytes, bytes);
+        });
+    }
+
+    template <typename Op, typename T>
+    void reduce(const T *in, T *out, size_t count, int root) {
+        check_rank(root);
+        std::vector<T> partial;
+        if (rank_ == root) partial.resize(std::min(count, chunk_ / sizeof(T) + 1));
+        expose(in, count * sizeof(T), count * sizeof(T), [&](Reader &read) {
+            if (rank_ == root) combine<Op>(read, 0, count, out, partial);
+        });
+    }
+
+    template <typename Op, typename T>
+    void allreduce(const T *in, T *out, size_t count) {
+        // Reduce-scatter: each rank reduces one block of the result...
+        size_t begin = block_begin(count, rank_), end = block_begin(count, rank_ + 1);
+        std::vector<T> partial(std::min(end - begin, chunk_ / sizeof(T) + 1));
+        expose(in, count * sizeof(T), count * sizeof(T),
+               [&](Reader &read) { combine<Op>(read, begin, end, out, partial); });
+        // ...then all ranks gather the blocks
+        expose(out, count * sizeof(T), count * sizeof(T), [&](Reader &read) {
+            for (int peer = 0; peer < size_; ++peer) {
+                if (peer == rank_) continue;
+                size_t b = block_begin(count, peer), e = block_begin(count, peer + 1);
+                read(peer, b * sizeof(T), out + b, (e - b) * sizeof(T));
+            }
+        });
+    }
+
+    ///////////////////////////////////////////////////////////////////////
+    // Point-to-point
+
+    void send(const void *buffer, size_t bytes, int dest, int tag) {
+        check_rank(dest);
+        detail::Channel &c = channel(rank_, dest);
+        char *staging = (char *)&c + sizeof(detail::Channel);
+        auto wait_free = [&] {
+            detail::wait_until([&] {
+                return c.consumed.load(std::memory_order_acquire) == c.posted.load(std::memory_order_relaxed);
+            });
+        };
+        if (bytes > chunk_ && use_cma_) {
+            // Rendezvous: the receiver reads from the send buffer
+            wait_free();
+            c.bytes = bytes;
+            c.address = (uint64_t)buffer;
+            c.tag = tag;
+            c.last = 1;
+            c.posted.fetch_add(1, std::memory_order_release);
+            wait_free();
+            return;
+        }
+        // Eager: copy through the staging buffer of the channel
+        size_t offset = 0;
+        do {
+            size_t n = std::min(chunk_, bytes - offset);
+            wait_free();
+            memcpy(staging, (const char *)buffer + offset, n);
+            c.bytes = n;
+            c.address = 0;
+            c.tag = tag;
+            offset += n;
+            c.last = offset == bytes;
+            c.posted.fetch_add(1, std::memory_order_release);
+        } while (offset < bytes);
+    }
+
+    void recv(void *buffer, size_t bytes, int src, int tag) {
+        check_rank(src);
+        detail::Channel &c = channel(src, rank_);
+        const char *staging = (const char *)&c + sizeof(detail::Channel);
+        size_t offset = 0;
+        for (bool last = false; !last;) {
+            detail::wait_until([&] {
+                return c.posted.load(std::memory_order_acquire) != c.consumed.load(std::memory_order_relaxed);
+            });
+            if (c.tag != tag) detail::fail("message tags do not match (messages are received in order)");
+            if (offset + c.bytes > bytes) detail::fail("message is larger than the receive buffer");
+            if (c.address != 0) {
+                if (!cma_read(slot(src).pid, c.address, (char *)buffer + offset, c.bytes))
+                    detail::fail("cross-memory read failed");
+            } else {
+                memcpy((char *)buffer + offset, staging, c.bytes);
+            }
+            offset += c.bytes;
+            last = c.last;
+            c.consumed.fetch_add(1, std::memory_order_release);
+        }
+    }
+
+ private:
+    /// Reads parts of the buffers exposed by other ranks (see expose).
+    class Reader {
+     public:
+        Reader(Communicator &comm, size_t window_begin, size_t window_end)
+            : comm_(comm), window_begin_(window_begin), window_end_(window_end) {}
+
+        /**
+         * Copies the part of [offset, offset + bytes) of the buffer exposed
+         * by a peer that is available in the current window.
+         * @return The copied range, relative to offset.
+         */
+        std::pair<size_t, size_t> operator()(int peer, size_t offset, void *dst, size_t bytes) {
+            detail::Slot &s = comm_.slot(peer);
+            size_t begin = std::max(offset, window_begin_);
+            size_t end = std::min({offset + bytes, window_end_, (size_t)s.bytes});
+            if (begin >= end) return {0, 0};
+            char *target = (char *)dst + (begin - offset);
+            if (peer == comm_.rank_) {
+                memmove(target, (const char *)comm_.exposed_ + begin, end - begin);
+            } else if (comm_.use_cma_) {
+                if (!comm_.cma_read(s.pid, s.address + begin, target, end - begin))
+                    detail::fail("cross-memory read failed");
+            } else {
+                memcpy(target, comm_.staging(peer) + (begin - window_begin_), end - begin);
+            }
+            return {begin - offset, end - offset};
+        }
+
+     private:
+        Communicator &comm_;
+        size_t window_begin_, window_end_;
+    };
+
+    /**
+     * Collectively exposes a buffer to the other ranks and calls
+     * ``reads(Reader &)`` once or more to read from the exposed buffers.
+     * @param max_bytes The largest number of bytes exposed by any rank.
+     */
+    template <typename F>
+    void expose(const void *data, size_t bytes, size_t max_bytes, F &&reads) {
+        detail::Slot &s = slot(rank_);
+        s.address = (uint64_t)data;
+        s.bytes = bytes;
+        exposed_ = data;
+        if (use_cma_ || size_ == 1) {
+            barrier();
+            Reader reader(*this, 0, max_bytes);
+            reads(reader);
+            barrier();
+            return;
+        }
+        // Stage the exposed buffers chunk by chunk
+        for (size_t window = 0; window < max_bytes; window += chunk_) {
+            if (window < bytes) memcpy(staging(rank_), (const char *)data + window, std::min(chunk_, bytes - window));
+            barrier();
+            Reader reader(*this, window, std::min(window + chunk_, max_bytes));
+            reads(reader);
+            barrier();
+        }
+    }
+
+    /// Reduces elements [begin, end) of the buffers exposed by all ranks.
+    /// The local contribution is read first, so that ``in`` and ``out`` may
+    /// be the same buffer.
+    template <typename Op, typename T>
+    void combine(Reader &read, size_t begin, size_t end, T *out, std::vector<T> &partial) {
+        for (size_t b = begin; b < end; b += partial.size()) {
+            size_t e = std::min(end, b + partial.size());
+            read(rank_, b * sizeof(T), out + b, (e - b) * sizeof(T));
+            for (int peer = 0; peer < size_; ++peer) {
+                if (peer == rank_) continue;
+                auto r = read(peer, b * sizeof(T), partial.data(), (e - b) * sizeof(T));
+                for (size_t i = r.first / sizeof(T); i < r.second / sizeof(T); ++i) {
+                    out[b + i] = Op::apply(out[b + i], partial[i]);
+                }
+            }
+        }
+    }
+
+    void check_rank(int r) const {
+        if (r < 0 || r >= size_) detail::fail("rank out of range");
+    }
+
+    size_t block_begin(size_t count, int r) const { return count * r / size_; }
+
+    void attach(const char *name) {
+        int fd = -1;
+        if (rank_ == 0) {
+            fd = shm_open(name, O_CREAT | O_EXCL | O_RDWR, 0600);
+            if (fd < 0 || ftruncate(fd, bytes_) != 0) detail::fail("cannot create shared-memory segment");
+        } else {
+            // Wait for rank 0 to create the segment
+            for (int tries = 0; fd < 0; ++tries) {
+                fd = shm_open(name, O_RDWR, 0600);
+                if (fd < 0) {
+                    if (tries > 600000) detail::fail("cannot open shared-memory segment");
+                    usleep(100);
+                }
+            }
+            struct stat st;
+            do {
+                if (fstat(fd, &st) != 0) detail::fail("cannot open shared-memory segment");
+            } while ((size_t)st.st_size < bytes_ && (usleep(100), true));
+        }
+        void *mem = mmap(nullptr, bytes_, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd);
+        if (mem == MAP_FAILED) detail::fail("cannot map shared-memory segment");
+        base_ = (char *)mem;
+        if (rank_ == 0) {
+            header().initialized.store(1, std::memory_order_release);
+        } else {
+            detail::wait_until([&] { return header().initialized.load(std::memory_order_acquire) != 0; });
+        }
+    }
+
+    void probe_cma() {
+#ifdef __linux__
+        static const uint64_t probe = 0xDACE;
+        slot(rank_).address = (uint64_t)&probe;
+        barrier();
+        uint64_t value = 0;
+        int peer = (rank_ + 1) % size_;
+        if (detail::env_or("DACE_SHM_CMA", 1) == 0 ||
+            !cma_read(slot(peer).pid, slot(peer).address, &value, sizeof(value)) || value != probe) {
+            header().cma_failures.fetch_add(1);
+        }
+        barrier();
+        use_cma_ = header().cma_failures.load() == 0;
+#endif
+    }
+
+    bool cma_read(pid_t pid, uint64_t address, void *dst, size_t bytes) {
+#ifdef __linux__
+        while (bytes > 0) {
+            struct iovec local = {dst, bytes};
+            struct iovec remote = {(void *)address, bytes};
+            ssize_t n = process_vm_readv(pid, &local, 1, &remote, 1, 0);
+            if (n <= 0) return false;
+            dst = (char *)dst + n;
+            address += n;
+            bytes -= n;
+        }
+        return true;
+#else
+        return false;
+#endif
+    }
+
+    detail::Header &header() { return *(detail::Header *)base_; }
+    detail::Slot &slot(int r) { return ((detail::Slot *)(base_ + slots_offset_))[r]; }
+    char *staging(int r) { return base_ + staging_offset_ + r * chunk_; }
+    detail::Channel &channel(int src, int dst) {
+        return *(detail::Channel *)(base_ + channels_offset_ + ((size_t)src * size_ + dst) * channel_stride_);
+    }
+
+    int rank_, size_;
+    size_t chunk_;
+    size_t slots_offset_, staging_offset_, channels_offset_, channel_stride_, bytes_;
+    char *base_ = nullptr;
+    std::vector<char> private_;
+    bool use_cma_ = false;
+    const void *exposed_ = nullptr;
+};
+
+/// Returns the communicator of all ranks, attaching to the shared-memory
+/// segment on the first call.
+inline Communicator &world() {
+    static Communicator comm;
+    return comm;
+}
+
+}  // namespace shm
+}  // namespace dace
@@ -10,3 +10,7 @@ from .gather import Gather
 from .reduce import Reduce
 from .allreduce import Allreduce
 from .allgather import Allgather
+from .ibcast import Ibcast
+from .iallreduce import Iallreduce
+from .iallgather import Iallgather
+from .halo_exchange import HaloExchange
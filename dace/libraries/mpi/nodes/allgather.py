@@ -35,14 +35,37 @@ class ExpandAllgatherMPI(ExpandTransformation):
         return tasklet
 
 
+@dace.library.expansion
+class ExpandAllgatherSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (inbuffer, in_count_str), (outbuffer, out_count_str) = node.validate(parent_sdfg, parent_state)
+        if inbuffer.dtype.veclen > 1:
+            raise NotImplementedError
+        code = f"""
+            dace::shm::world().allgather(_inbuffer, _outbuffer,
+                                         ({in_count_str}) * sizeof({inbuffer.dtype.base_type.ctype}));
+            """
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
 @dace.library.node
 class Allgather(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
         "MPI": ExpandAllgatherMPI,
+        "SharedMemory": ExpandAllgatherSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
 
     def __init__(self, name, *args, **kwargs):
         super().__init__(name, *args, inputs={"_inbuffer"}, outputs={"_outbuffer"}, **kwargs)
@@ -20,7 +20,7 @@ class ExpandAllreduceMPI(ExpandTransformation):
 
         code = f"""
             MPI_Allreduce(_inbuffer, _outbuffer, {count_str}, {mpi_dtype_str},
-                          {node._op}, MPI_COMM_WORLD);
+                          {node.op}, MPI_COMM_WORLD);
             """
         tasklet = dace.sdfg.nodes.Tasklet(node.name,
                                           node.in_connectors,
@@ -30,18 +30,41 @@ class ExpandAllreduceMPI(ExpandTransformation):
         return tasklet
 
 
+@dace.library.expansion
+class ExpandAllreduceSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (inbuffer, count_str), outbuffer = node.validate(parent_sdfg, parent_state)
+        if inbuffer.dtype.veclen > 1:
+            raise NotImplementedError
+        shm_op = dace.libraries.mpi.utils.SHM_OP(node.op)
+        code = f"dace::shm::world().allreduce<{shm_op}>(_inbuffer, _outbuffer, {count_str});"
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
 @dace.library.node
 class Allreduce(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
         "MPI": ExpandAllreduceMPI,
+        "SharedMemory": ExpandAllreduceSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
+
+    op = dace.properties.Property(dtype=str, default='MPI_SUM', desc='MPI reduction operation (e.g., MPI_SUM)')
 
-    def __init__(self, name, *args, **kwargs):
+    def __init__(self, name, *args, op='MPI_SUM', **kwargs):
         super().__init__(name, *args, inputs={"_inbuffer"}, outputs={"_outbuffer"}, **kwargs)
-        self._op = kwargs.get('op', "MPI_SUM")
+        self.op = op
 
     def validate(self, sdfg, state):
         """
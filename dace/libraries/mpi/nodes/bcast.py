@@ -51,14 +51,37 @@ class ExpandBcastMPI(ExpandTransformation):
         return tasklet
 
 
+@dace.library.expansion
+class ExpandBcastSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (buffer, count_str), root = node.validate(parent_sdfg, parent_state)
+        if buffer.dtype.veclen > 1:
+            raise NotImplementedError
+        ref = "&" if isinstance(buffer, dace.data.Scalar) else ""
+        code = f"""
+            dace::shm::world().bcast({ref}_inbuffer, ({count_str}) * sizeof({buffer.dtype.base_type.ctype}), _root);
+            _outbuffer = _inbuffer;"""
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
 @dace.library.node
 class Bcast(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
         "MPI": ExpandBcastMPI,
+        "SharedMemory": ExpandBcastSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
 
     def __init__(self, name, *args, **kwargs):
         super().__init__(name, *args, inputs={"_inbuffer", "_root"}, outputs={"_outbuffer"}, **kwargs)
@@ -0,0 +1,116 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace.library
+import dace.properties
+import dace.sdfg.nodes
+from dace.symbolic import symstr
+from dace.transformation.transformation import ExpandTransformation
+from .. import environments
+
+
+@dace.library.expansion
+class ExpandHaloExchangeMPI(ExpandTransformation):
+
+    environments = [environments.mpi.MPI]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        buffer, sizes = node.validate(parent_sdfg, parent_state)
+        mpi_dtype_str = dace.libraries.mpi.utils.MPI_DDT(buffer.dtype.base_type)
+        ndims = len(sizes)
+        grid = node.grid or [0] * ndims
+        periodic = node.periodic or [False] * ndims
+
+        # The process grid and the subarray datatypes are created on the first
+        # call and cached in a static object
+        code = f"""
+            const int _grid[{ndims}] = {{{', '.join(str(g) for g in grid)}}};
+            const int _periodic[{ndims}] = {{{', '.join(str(int(p)) for p in periodic)}}};
+            static dace::mpi::HaloExchange<{ndims}> _halo(_grid, _periodic);
+            const int _sizes[{ndims}] = {{{', '.join(f'(int)({s})' for s in sizes)}}};
+            const int _widths[{ndims}] = {{{', '.join(str(h) for h in node.halo)}}};
+            _halo.exchange(_inbuffer, {mpi_dtype_str}, _sizes, _widths);
+            _outbuffer = _inbuffer;"""
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
+@dace.library.node
+class HaloExchange(dace.sdfg.nodes.LibraryNode):
+    """
+    Exchanges the halo regions of a block-distributed array with the
+    neighboring processes of a Cartesian process grid. Each process holds one
+    block of the array, surrounded by ``halo[d]`` elements on each side of
+    dimension ``d``. After the exchange, the halos contain the boundary
+    elements of the neighboring blocks (including corners).
+
+    Halos are sent and received directly from the array using MPI subarray
+    datatypes, without packing them into intermediate buffers.
+    """
+
+    # Global properties
+    implementations = {
+        "MPI": ExpandHaloExchangeMPI,
+    }
+    default_implementation = "MPI"
+
+    # Object fields
+    halo = dace.properties.ListProperty(element_type=int, default=[], desc="Halo width in each dimension")
+    grid = dace.properties.ListProperty(element_type=int,
+                                        default=[],
+                                        desc="Number of processes in each dimension of the process grid. "
+                                        "Zero entries (or an empty list) let MPI choose")
+    periodic = dace.properties.ListProperty(element_type=bool,
+                                            default=[],
+                                            desc="Whether each dimension of the process grid wraps around "
+                                            "(empty list for non-periodic)")
+
+    def __init__(self, name, halo=None, grid=None, periodic=None, *args, **kwargs):
+        super().__init__(name, *args, inputs={"_inbuffer"}, outputs={"_outbuffer"}, **kwargs)
+        self.halo = list(halo or [])
+        self.grid = list(grid or [])
+        self.periodic = list(periodic or [])
+
+    def validate(self, sdfg, state):
+        """
+        :return: A two-tuple of the buffer data descriptor in the parent SDFG
+                 and the allocated size of each of its dimensions.
+        """
+
+        inbuffer, outbuffer = None, None
+        for e in state.out_edges(self):
+            if e.src_conn == "_outbuffer":
+                outbuffer = sdfg.arrays[e.data.data]
+                out_subset = e.data.subset
+        for e in state.in_edges(self):
+            if e.dst_conn == "_inbuffer":
+                inbuffer = sdfg.arrays[e.data.data]
+                in_subset = e.data.subset
+
+        if inbuffer != outbuffer:
+            raise ValueError("HaloExchange input and output buffer must be the same!")
+        if inbuffer.dtype.veclen > 1:
+            raise NotImplementedError("HaloExchange does not support vector types")
+        ndims = len(inbuffer.shape)
+        if len(self.halo) != ndims:
+            raise ValueError("HaloExchange needs one halo width per dimension of the buffer")
+        if any(h < 0 for h in self.halo):
+            raise ValueError("HaloExchange halo widths must be non-negative")
+        if self.grid and len(self.grid) != ndims:
+            raise ValueError("HaloExchange process grid must have one entry per dimension of the buffer")
+        if self.periodic and len(self.periodic) != ndims:
+            raise ValueError("HaloExchange periodicity must have one entry per dimension of the buffer")
+        for subset in (in_subset, out_subset):
+            if any(b != 0 for b in subset.min_element()) or subset.size_exact() != list(inbuffer.shape):
+                raise ValueError("HaloExchange must access the whole buffer")
+        if inbuffer.strides[-1] != 1:
+            raise ValueError("HaloExchange requires a buffer that is contiguous in the last dimension")
+
+        # Allocated sizes (including padding) of a row-major buffer
+        sizes = [symstr(inbuffer.shape[0])]
+        sizes += [symstr(inbuffer.strides[d - 1] / inbuffer.strides[d]) for d in range(1, ndims)]
+
+        return inbuffer, sizes
@@ -0,0 +1,80 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace.library
+import dace.properties
+import dace.sdfg.nodes
+from dace.transformation.transformation import ExpandTransformation
+from .. import environments
+from dace import dtypes
+
+
+@dace.library.expansion
+class ExpandIallreduceMPI(ExpandTransformation):
+
+    environments = [environments.mpi.MPI]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (inbuffer, count_str), outbuffer, req = node.validate(parent_sdfg, parent_state)
+        mpi_dtype_str = dace.libraries.mpi.utils.MPI_DDT(inbuffer.dtype.base_type)
+        if inbuffer.dtype.veclen > 1:
+            raise (NotImplementedError)
+
+        code = f"""
+            MPI_Iallreduce(_inbuffer, _outbuffer, {count_str}, {mpi_dtype_str},
+                           {node.op}, MPI_COMM_WORLD, _request);
+            """
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        conn = tasklet.out_connectors
+        conn = {c: (dtypes.pointer(dtypes.opaque("MPI_Request")) if c == '_request' else t) for c, t in conn.items()}
+        tasklet.out_connectors = conn
+        return tasklet
+
+
+@dace.library.node
+class Iallreduce(dace.sdfg.nodes.LibraryNode):
+    """
+    Non-blocking all-reduce. The output buffer may only be accessed after
+    the request returned in `_request` has been completed with a `Wait` node,
+    and the input buffer must not be modified before then.
+    """
+
+    # Global properties
+    implementations = {
+        "MPI": ExpandIallreduceMPI,
+    }
+    default_implementation = "MPI"
+
+    # Object fields
+    op = dace.properties.Property(dtype=str, default="MPI_SUM", desc="MPI reduction operation")
+
+    def __init__(self, name, op="MPI_SUM", *args, **kwargs):
+        super().__init__(name, *args, inputs={"_inbuffer"}, outputs={"_outbuffer", "_request"}, **kwargs)
+        self.op = op
+
+    def validate(self, sdfg, state):
+        """
+        :return: A three-tuple (inbuffer, count), outbuffer, request of the
+                 data descriptors in the parent SDFG.
+        """
+
+        inbuffer, outbuffer, req = None, None, None
+        for e in state.out_edges(self):
+            if e.src_conn == "_outbuffer":
+                outbuffer = sdfg.arrays[e.data.data]
+            if e.src_conn == "_request":
+                req = sdfg.arrays[e.data.data]
+        for e in state.in_edges(self):
+            if e.dst_conn == "_inbuffer":
+                inbuffer = sdfg.arrays[e.data.data]
+
+        count_str = "XXX"
+        for _, src_conn, _, _, data in state.out_edges(self):
+            if src_conn == '_outbuffer':
+                dims = [str(e) for e in data.subset.size_exact()]
+                count_str = "*".join(dims)
+
+        return (inbuffer, count_str), outbuffer, req
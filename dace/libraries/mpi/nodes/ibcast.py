@@ -0,0 +1,86 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace.library
+import dace.properties
+import dace.sdfg.nodes
+from dace.symbolic import symstr
+from dace.transformation.transformation import ExpandTransformation
+from .. import environments
+from dace import dtypes
+
+
+@dace.library.expansion
+class ExpandIbcastMPI(ExpandTransformation):
+
+    environments = [environments.mpi.MPI]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (buffer, count_str), root, req = node.validate(parent_sdfg, parent_state)
+        mpi_dtype_str = dace.libraries.mpi.utils.MPI_DDT(buffer.dtype.base_type)
+        if buffer.dtype.veclen > 1:
+            raise (NotImplementedError)
+
+        ref = ""
+        if isinstance(buffer, dace.data.Scalar):
+            ref = "&"
+
+        code = f"""
+            MPI_Ibcast({ref}_inbuffer, {count_str}, {mpi_dtype_str}, _root, MPI_COMM_WORLD, _request);
+            _outbuffer = _inbuffer;"""
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        conn = tasklet.out_connectors
+        conn = {c: (dtypes.pointer(dtypes.opaque("MPI_Request")) if c == '_request' else t) for c, t in conn.items()}
+        tasklet.out_connectors = conn
+        return tasklet
+
+
+@dace.library.node
+class Ibcast(dace.sdfg.nodes.LibraryNode):
+    """
+    Non-blocking broadcast. The buffer may only be accessed after the request
+    returned in `_request` has been completed with a `Wait` node.
+    """
+
+    # Global properties
+    implementations = {
+        "MPI": ExpandIbcastMPI,
+    }
+    default_implementation = "MPI"
+
+    def __init__(self, name, *args, **kwargs):
+        super().__init__(name, *args, inputs={"_inbuffer", "_root"}, outputs={"_outbuffer", "_request"}, **kwargs)
+
+    def validate(self, sdfg, state):
+        """
+        :return: A three-tuple (buffer, count), root, request of the data
+                 descriptors in the parent SDFG.
+        """
+
+        inbuffer, outbuffer, root, req = None, None, None, None
+        for e in state.out_edges(self):
+            if e.src_conn == "_outbuffer":
+                outbuffer = sdfg.arrays[e.data.data]
+            if e.src_conn == "_request":
+                req = sdfg.arrays[e.data.data]
+        for e in state.in_edges(self):
+            if e.dst_conn == "_inbuffer":
+                inbuffer = sdfg.arrays[e.data.data]
+            if e.dst_conn == "_root":
+                root = sdfg.arrays[e.data.data]
+
+        if inbuffer != outbuffer:
+            raise (ValueError("Ibcast input and output buffer must be the same!"))
+        if root.dtype.base_type != dace.dtypes.int32:
+            raise (ValueError("Ibcast root must be an integer!"))
+
+        count_str = "XXX"
+        for _, src_conn, _, _, data in state.out_edges(self):
+            if src_conn == '_outbuffer':
+                dims = [symstr(e) for e in data.subset.size_exact()]
+                count_str = "*".join(dims)
+
+        return (inbuffer, count_str), root, req
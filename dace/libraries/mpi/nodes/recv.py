@@ -43,14 +43,36 @@ class ExpandRecvMPI(ExpandTransformation):
         return tasklet
 
 
+@dace.library.expansion
+class ExpandRecvSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (buffer, count_str, buffer_offset, ddt), src, tag = node.validate(parent_sdfg, parent_state)
+        if buffer.dtype.veclen > 1:
+            raise NotImplementedError
+        if ddt is not None:
+            raise NotImplementedError("The shared-memory implementation only receives contiguous data")
+        code = f"dace::shm::world().recv(_buffer, ({count_str}) * sizeof({buffer.dtype.base_type.ctype}), _src, _tag);"
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
 @dace.library.node
 class Recv(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
         "MPI": ExpandRecvMPI,
+        "SharedMemory": ExpandRecvSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
 
     def __init__(self, name, *args, **kwargs):
         super().__init__(name, *args, inputs={"_src", "_tag"}, outputs={"_buffer"}, **kwargs)
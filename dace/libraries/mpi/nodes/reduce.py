@@ -20,7 +20,27 @@ class ExpandReduceMPI(ExpandTransformation):
         if root.dtype.base_type != dace.dtypes.int32:
             raise ValueError("Reduce root must be an integer!")
 
-        code = f"MPI_Reduce(_inbuffer, _outbuffer, {count_str}, {mpi_dtype_str}, {node._op}, _root, MPI_COMM_WORLD);"
+        code = f"MPI_Reduce(_inbuffer, _outbuffer, {count_str}, {mpi_dtype_str}, {node.op}, _root, MPI_COMM_WORLD);"
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
+@dace.library.expansion
+class ExpandReduceSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (inbuffer, count_str), outbuffer, root = node.validate(parent_sdfg, parent_state)
+        if inbuffer.dtype.veclen > 1:
+            raise NotImplementedError
+        shm_op = dace.libraries.mpi.utils.SHM_OP(node.op)
+        code = f"dace::shm::world().reduce<{shm_op}>(_inbuffer, _outbuffer, {count_str}, _root);"
         tasklet = dace.sdfg.nodes.Tasklet(node.name,
                                           node.in_connectors,
                                           node.out_connectors,
@@ -35,12 +55,15 @@ class Reduce(dace.sdfg.nodes.LibraryNode):
     # Global properties
     implementations = {
         "MPI": ExpandReduceMPI,
+        "SharedMemory": ExpandReduceSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
+
+    op = dace.properties.Property(dtype=str, default='MPI_SUM', desc='MPI reduction operation (e.g., MPI_SUM)')
 
-    def __init__(self, name, *args, **kwargs):
+    def __init__(self, name, *args, op='MPI_SUM', **kwargs):
         super().__init__(name, *args, inputs={"_inbuffer", "_root"}, outputs={"_outbuffer"}, **kwargs)
-        self._op = kwargs.get('op', "MPI_SUM")
+        self.op = op
 
     def validate(self, sdfg, state):
         """
@@ -38,14 +38,37 @@ class ExpandScatterMPI(ExpandTransformation):
         return tasklet
 
 
+@dace.library.expansion
+class ExpandScatterSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (inbuffer, in_count_str), (outbuffer, out_count_str), root = node.validate(parent_sdfg, parent_state)
+        if inbuffer.dtype.veclen > 1:
+            raise NotImplementedError
+        code = f"""
+            dace::shm::world().scatter(_inbuffer, _outbuffer,
+                                       ({out_count_str}) * sizeof({outbuffer.dtype.base_type.ctype}), _root);
+            """
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
 @dace.library.node
 class Scatter(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
         "MPI": ExpandScatterMPI,
+        "SharedMemory": ExpandScatterSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
 
     def __init__(self, name, *args, **kwargs):
         super().__init__(name, *args, inputs={"_inbuffer", "_root"}, outputs={"_outbuffer"}, **kwargs)
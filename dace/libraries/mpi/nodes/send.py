@@ -46,14 +46,36 @@ class ExpandSendMPI(ExpandTransformation):
         return tasklet
 
 
+@dace.library.expansion
+class ExpandSendSharedMemory(ExpandTransformation):
+
+    environments = [environments.shared_memory.SharedMemory]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, n=None, **kwargs):
+        (buffer, count_str, buffer_offset, ddt), dest, tag = node.validate(parent_sdfg, parent_state)
+        if buffer.dtype.veclen > 1:
+            raise NotImplementedError
+        if ddt is not None:
+            raise NotImplementedError("The shared-memory implementation only sends contiguous data")
+        code = f"dace::shm::world().send(_buffer, ({count_str}) * sizeof({buffer.dtype.base_type.ctype}), _dest, _tag);"
+        tasklet = dace.sdfg.nodes.Tasklet(node.name,
+                                          node.in_connectors,
+                                          node.out_connectors,
+                                          code,
+                                          language=dace.dtypes.Language.CPP)
+        return tasklet
+
+
 @dace.library.node
 class Send(dace.sdfg.nodes.LibraryNode):
 
     # Global properties
     implementations = {
         "MPI": ExpandSendMPI,
+        "SharedMemory": ExpandSendSharedMemory,
     }
-    default_implementation = "MPI"
+    default_implementation = None
 
     # Object fields
     n = dace.properties.SymbolicProperty(allow_none=True, default=None)
@@ -0,0 +1,98 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+"""
+Launcher for programs that use the shared-memory ("SharedMemory")
+implementation of the MPI library nodes. It starts one process per rank on
+the local node, without requiring an MPI installation.
+
+Usage::
+
+    python -m dace.libraries.mpi.shm -n 4 python program.py [arguments]
+
+Within the processes, ``rank()`` and ``size()`` return the rank of the
+process and the number of ranks.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+
+def rank() -> int:
+    """ Returns the rank of the calling process (0 outside of the launcher). """
+    return int(os.environ.get('DACE_SHM_RANK', 0))
+
+
+def size() -> int:
+    """ Returns the number of ranks (1 outside of the launcher). """
+    return int(os.environ.get('DACE_SHM_SIZE', 1))
+
+
+def launch(nprocs: int,
+           command: List[str],
+           chunk_size: Optional[int] = None,
+           single_copy: bool = True,
+           env: Optional[Dict[str, str]] = None) -> int:
+    """
+    Runs a command with one process per rank, and waits for all processes
+    to finish. If a process fails, the remaining processes are terminated.
+    :param nprocs: Number of ranks.
+    :param command: The command to run, as a list of arguments.
+    :param chunk_size: Size of the staging buffers in bytes (optional).
+    :param single_copy: If False, disables the transfers directly between the
+                        address spaces of the processes, and copies all data
+                        through the shared-memory segment.
+    :param env: Environment of the processes (defaults to the current one).
+    :return: The exit code of the first process that failed, or 0.
+    """
+    if nprocs < 1:
+        raise ValueError('The number of ranks must be positive')
+    name = f'/dace_shm_{os.getpid()}_{uuid.uuid4().hex[:8]}'
+    procs = []
+    for r in range(nprocs):
+        proc_env = dict(os.environ if env is None else env)
+        proc_env.update(DACE_SHM_NAME=name, DACE_SHM_RANK=str(r), DACE_SHM_SIZE=str(nprocs))
+        if chunk_size is not None:
+            proc_env['DACE_SHM_CHUNK'] = str(chunk_size)
+        if not single_copy:
+            proc_env['DACE_SHM_CMA'] = '0'
+        procs.append(subprocess.Popen(command, env=proc_env))
+
+    returncode = 0
+    try:
+        running = list(procs)
+        while running:
+            for proc in list(running):
+                code = proc.poll()
+                if code is None:
+                    continue
+                running.remove(proc)
+                if code != 0 and returncode == 0:
+                    returncode = code
+                    for other in running:
+                        other.terminate()
+            time.sleep(0.01)
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+        # The segment is removed by rank 0 once all ranks are attached, unless
+        # a process failed before that
+        path = os.path.join('/dev/shm', name[1:])
+        if os.path.exists(path):
+            os.remove(path)
+    return returncode
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Runs a DaCe program on multiple ranks over shared memory.')
+    parser.add_argument('-n', '--nprocs', type=int, required=True, help='Number of ranks')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Size of the staging buffers in bytes')
+    parser.add_argument('--no-single-copy', action='store_true', help='Copy all data through the shared-memory segment')
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run')
+    args = parser.parse_args()
+    if not args.command:
+        parser.error('No command given')
+    sys.exit(launch(args.nprocs, args.command, args.chunk_size, not args.no_single_copy))
@@ -70,3 +70,16 @@ def create_vector_ddt(memlet, data):
     ddt["count"] = "(" + str(memlet.subset.num_elements_exact()) + ")" + "/" + str(ddt['blocklen'])
     ddt["stride"] = str(data.strides[0])
     return ddt
+
+
+def SHM_OP(op):
+    """ Returns the shared-memory reduction operator for an MPI operation. """
+    shm_ops = {
+        "MPI_SUM": "dace::shm::Sum",
+        "MPI_PROD": "dace::shm::Prod",
+        "MPI_MAX": "dace::shm::Max",
+        "MPI_MIN": "dace::shm::Min"
+    }
+    if op not in shm_ops:
+        raise ValueError("Reduction " + str(op) + " not supported by the shared-memory implementation.")
+    return shm_ops[op]
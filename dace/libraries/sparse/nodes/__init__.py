@@ -0,0 +1,3 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+from .spmv import SpMV
+from .spmm import SpMM
@@ -0,0 +1,124 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import warnings
+
+from dace import dtypes, properties
+import dace.library
+import dace.sdfg.nodes
+from dace.codegen.targets.cpp import sym2cpp
+from dace.transformation.transformation import ExpandTransformation
+from dace.libraries.blas import environments as blas_environments
+from dace.libraries.sparse import sparse_helpers
+
+
+@dace.library.expansion
+class ExpandSpMMPure(ExpandTransformation):
+    """ Expands SpMM to maps over the rows (CSR) or the nonzeros (COO), and
+        the columns of the dense matrices. """
+
+    environments = []
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        ops = node.validate(parent_sdfg, parent_state)
+        return sparse_helpers.pure_expansion(node, ops)
+
+
+@dace.library.expansion
+class ExpandSpMMOpenMP(ExpandTransformation):
+    """ Expands SpMM to an OpenMP parallel region, in which every thread
+        processes about the same number of nonzeros. """
+
+    environments = []
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        ops = node.validate(parent_sdfg, parent_state)
+        if ops.fmt == 'COO' and ops.dtype in (dtypes.complex64, dtypes.complex128):
+            warnings.warn('Atomic accumulation of complex values is not supported, falling back to pure expansion.')
+            return ExpandSpMMPure.expansion(node, parent_state, parent_sdfg, **kwargs)
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       sparse_helpers.openmp_code(node, ops),
+                                       language=dtypes.Language.CPP,
+                                       code_global='#include <algorithm>\n#include <vector>\n#include <omp.h>')
+
+
+@dace.library.expansion
+class ExpandSpMMMKL(ExpandTransformation):
+
+    environments = [blas_environments.intel_mkl.IntelMKL]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        ops = node.validate(parent_sdfg, parent_state)
+        if sparse_helpers.mkl_type(ops.dtype) is None or ops.index_desc.dtype != dtypes.int32:
+            warnings.warn('MKL sparse BLAS requires single or double precision values and 32-bit indices, '
+                          'falling back to OpenMP expansion.')
+            return ExpandSpMMOpenMP.expansion(node, parent_state, parent_sdfg, **kwargs)
+        if ops.b_strides[1] == 1 and ops.c_strides[1] == 1:
+            layout, ldb, ldc = 'SPARSE_LAYOUT_ROW_MAJOR', ops.b_strides[0], ops.c_strides[0]
+        elif ops.b_strides[0] == 1 and ops.c_strides[0] == 1:
+            layout, ldb, ldc = 'SPARSE_LAYOUT_COLUMN_MAJOR', ops.b_strides[1], ops.c_strides[1]
+        else:
+            warnings.warn('MKL sparse BLAS requires dense matrices with the same contiguous dimension, '
+                          'falling back to OpenMP expansion.')
+            return ExpandSpMMOpenMP.expansion(node, parent_state, parent_sdfg, **kwargs)
+
+        code = sparse_helpers.mkl_copy_code(ops) + sparse_helpers.mkl_create_code(ops)
+        code += ('mkl_sparse_{t}_mm(SPARSE_OPERATION_NON_TRANSPOSE, {alpha}, __A, __descr, {layout}, _b, {columns}, '
+                 '{ldb}, {beta}, _c, {ldc});\n'
+                 'mkl_sparse_destroy(__A);').format(t=sparse_helpers.mkl_type(ops.dtype),
+                                                    alpha=sym2cpp(node.alpha),
+                                                    beta=sym2cpp(node.beta),
+                                                    layout=layout,
+                                                    columns=sym2cpp(ops.columns),
+                                                    ldb=sym2cpp(ldb),
+                                                    ldc=sym2cpp(ldc))
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       code,
+                                       language=dtypes.Language.CPP)
+
+
+@dace.library.node
+class SpMM(dace.sdfg.nodes.LibraryNode):
+    """
+    Sparse matrix-matrix product ``C = alpha * A @ B + beta * C``, where ``A``
+    is a sparse matrix in CSR or COO format. The member arrays of ``A`` (see
+    ``dace.data.CSR`` and ``dace.data.COO``) are connected to
+    ``_a_<member>`` (e.g., ``_a_indptr``, ``_a_indices`` and ``_a_data``), for
+    example with ``dace.libraries.sparse.sparse_helpers.add_sparse_input``.
+    The dense matrices are connected to ``_b`` and ``_c``; if ``beta`` is
+    nonzero, the initial values of ``c`` are read from ``_cin``.
+    """
+
+    # Global properties
+    implementations = {
+        "pure": ExpandSpMMPure,
+        "OpenMP": ExpandSpMMOpenMP,
+        "MKL": ExpandSpMMMKL,
+    }
+    default_implementation = "pure"
+
+    # Object fields
+    format = properties.Property(dtype=str, default="CSR", desc="Format of the sparse matrix (CSR or COO)")
+    alpha = properties.SymbolicProperty(allow_none=False, default=1)
+    beta = properties.SymbolicProperty(allow_none=False, default=0)
+
+    def __init__(self, name, format="CSR", alpha=1, beta=0, location=None):
+        inputs = set(sparse_helpers.sparse_connectors(format)) | {"_b"}
+        if beta != 0:
+            inputs.add("_cin")
+        super().__init__(name, location=location, inputs=inputs, outputs={"_c"})
+        self.format = format
+        self.alpha = alpha
+        self.beta = beta
+
+    def validate(self, sdfg, state):
+        """ :return: The operands of the product (``sparse_helpers.Operands``). """
+        ops = sparse_helpers.Operands(self, state, sdfg, "_b", "_c", "_cin")
+        if ops.is_vector:
+            raise ValueError("SpMM only supports matrix operands, use SpMV for vectors")
+        return ops
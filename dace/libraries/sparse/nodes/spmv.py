@@ -0,0 +1,113 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import warnings
+
+from dace import dtypes, properties
+import dace.library
+import dace.sdfg.nodes
+from dace.codegen.targets.cpp import sym2cpp
+from dace.transformation.transformation import ExpandTransformation
+from dace.libraries.blas import environments as blas_environments
+from dace.libraries.sparse import sparse_helpers
+
+
+@dace.library.expansion
+class ExpandSpMVPure(ExpandTransformation):
+    """ Expands SpMV to maps over the rows (CSR) or the nonzeros (COO). """
+
+    environments = []
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        ops = node.validate(parent_sdfg, parent_state)
+        return sparse_helpers.pure_expansion(node, ops)
+
+
+@dace.library.expansion
+class ExpandSpMVOpenMP(ExpandTransformation):
+    """ Expands SpMV to an OpenMP parallel region, in which every thread
+        processes about the same number of nonzeros. """
+
+    environments = []
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        ops = node.validate(parent_sdfg, parent_state)
+        if ops.fmt == 'COO' and ops.dtype in (dtypes.complex64, dtypes.complex128):
+            warnings.warn('Atomic accumulation of complex values is not supported, falling back to pure expansion.')
+            return ExpandSpMVPure.expansion(node, parent_state, parent_sdfg, **kwargs)
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       sparse_helpers.openmp_code(node, ops),
+                                       language=dtypes.Language.CPP,
+                                       code_global='#include <algorithm>\n#include <vector>\n#include <omp.h>')
+
+
+@dace.library.expansion
+class ExpandSpMVMKL(ExpandTransformation):
+
+    environments = [blas_environments.intel_mkl.IntelMKL]
+
+    @staticmethod
+    def expansion(node, parent_state, parent_sdfg, **kwargs):
+        ops = node.validate(parent_sdfg, parent_state)
+        if sparse_helpers.mkl_type(ops.dtype) is None or ops.index_desc.dtype != dtypes.int32:
+            warnings.warn('MKL sparse BLAS requires single or double precision values and 32-bit indices, '
+                          'falling back to OpenMP expansion.')
+            return ExpandSpMVOpenMP.expansion(node, parent_state, parent_sdfg, **kwargs)
+        if ops.b_strides[0] != 1 or ops.c_strides[0] != 1:
+            warnings.warn('MKL sparse BLAS requires contiguous vectors, falling back to OpenMP expansion.')
+            return ExpandSpMVOpenMP.expansion(node, parent_state, parent_sdfg, **kwargs)
+
+        code = sparse_helpers.mkl_copy_code(ops) + sparse_helpers.mkl_create_code(ops)
+        code += ('mkl_sparse_{t}_mv(SPARSE_OPERATION_NON_TRANSPOSE, {alpha}, __A, __descr, _x, {beta}, _y);\n'
+                 'mkl_sparse_destroy(__A);').format(t=sparse_helpers.mkl_type(ops.dtype),
+                                                    alpha=sym2cpp(node.alpha),
+                                                    beta=sym2cpp(node.beta))
+        return dace.sdfg.nodes.Tasklet(node.name,
+                                       node.in_connectors,
+                                       node.out_connectors,
+                                       code,
+                                       language=dtypes.Language.CPP)
+
+
+@dace.library.node
+class SpMV(dace.sdfg.nodes.LibraryNode):
+    """
+    Sparse matrix-vector product ``y = alpha * A @ x + beta * y``, where ``A``
+    is a sparse matrix in CSR or COO format. The member arrays of ``A`` (see
+    ``dace.data.CSR`` and ``dace.data.COO``) are connected to
+    ``_a_<member>`` (e.g., ``_a_indptr``, ``_a_indices`` and ``_a_data``), for
+    example with ``dace.libraries.sparse.sparse_helpers.add_sparse_input``.
+    The dense vectors are connected to ``_x`` and ``_y``; if ``beta`` is
+    nonzero, the initial values of ``y`` are read from ``_yin``.
+    """
+
+    # Global properties
+    implementations = {
+        "pure": ExpandSpMVPure,
+        "OpenMP": ExpandSpMVOpenMP,
+        "MKL": ExpandSpMVMKL,
+    }
+    default_implementation = "pure"
+
+    # Object fields
+    format = properties.Property(dtype=str, default="CSR", desc="Format of the sparse matrix (CSR or COO)")
+    alpha = properties.SymbolicProperty(allow_none=False, default=1)
+    beta = properties.SymbolicProperty(allow_none=False, default=0)
+
+    def __init__(self, name, format="CSR", alpha=1, beta=0, location=None):
+        inputs = set(sparse_helpers.sparse_connectors(format)) | {"_x"}
+        if beta != 0:
+            inputs.add("_yin")
+        super().__init__(name, location=location, inputs=inputs, outputs={"_y"})
+        self.format = format
+        self.alpha = alpha
+        self.beta = beta
+
+    def validate(self, sdfg, state):
+        """ :return: The operands of the product (``sparse_helpers.Operands``). """
+        ops = sparse_helpers.Operands(self, state, sdfg, "_x", "_y", "_yin")
+        if not ops.is_vector:
+            raise ValueError("SpMV only supports vector operands, use SpMM for matrices")
+        return ops
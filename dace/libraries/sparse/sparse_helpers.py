@@ -0,0 +1,337 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Helpers shared by the sparse matrix library nodes. A sparse matrix
+    multiplication ``C = alpha * A @ B + beta * C`` is handled uniformly for
+    vectors (SpMV) and matrices (SpMM), by viewing vectors as matrices with a
+    single column. """
+import copy
+from typing import Dict, List, Tuple
+
+import dace
+from dace import data as dt, dtypes, symbolic, Memlet, SDFG, SDFGState
+from dace.codegen.targets.cpp import sym2cpp
+from dace.symbolic import symstr
+
+#: Supported sparse matrix formats, by name
+FORMATS = {'CSR': dt.CSR, 'COO': dt.COO}
+
+
+def check_format(fmt: str):
+    if fmt not in FORMATS:
+        raise ValueError('Unsupported sparse matrix format "%s" (supported: %s)' % (fmt, ', '.join(FORMATS)))
+
+
+def sparse_connectors(fmt: str, prefix: str = '_a') -> List[str]:
+    """ Returns the connectors of the member arrays of a sparse matrix operand
+        (e.g., ``_a_indptr``, ``_a_indices`` and ``_a_data`` for CSR). """
+    check_format(fmt)
+    return [prefix + '_' + member for member in FORMATS[fmt].member_names]
+
+
+def add_sparse_input(state: SDFGState, name: str, node: dace.nodes.Node, prefix: str = '_a'):
+    """ Connects the member arrays of the sparse matrix ``name`` (see
+        ``SDFG.add_sparse``) to the ``<prefix>_<member>`` connectors of a
+        node. """
+    sdfg = state.parent
+    desc = sdfg.sparse_arrays[name]
+    for member in desc.member_names:
+        array = name + '_' + member
+        state.add_edge(state.add_read(array), None, node, prefix + '_' + member,
+                       Memlet.from_array(array, sdfg.arrays[array]))
+
+
+def _mismatch(a, b) -> bool:
+    """ Returns True if two sizes are provably different. """
+    diff = symbolic.pystr_to_symbolic(a - b)
+    return diff.is_number and diff != 0
+
+
+class Operands:
+    """ The (squeezed) operands of a sparse matrix multiplication node. """
+    def __init__(self, node: dace.nodes.LibraryNode, state: SDFGState, sdfg: SDFG, dense_in: str, dense_out: str,
+                 dense_out_in: str):
+        self.fmt = node.format
+        self.dense_in = dense_in
+        self.dense_out = dense_out
+        #: Input connector of the initial output values (used if beta is nonzero)
+        self.dense_out_in = dense_out_in if node.beta != 0 else None
+
+        edges = {e.dst_conn: e for e in state.in_edges(node)}
+        edges.update({e.src_conn: e for e in state.out_edges(node)})
+        for conn in sparse_connectors(self.fmt) + [dense_in, dense_out
+                                                   ] + ([self.dense_out_in] if self.dense_out_in else []):
+            if conn not in edges:
+                raise ValueError('Connector "%s" of %s is not connected' % (conn, node.label))
+
+        #: Descriptor and size of each member array of the sparse matrix, by connector
+        self.members: Dict[str, Tuple[dt.Data, List]] = {}
+        for conn in sparse_connectors(self.fmt):
+            desc, size, _ = self._operand(sdfg, edges[conn])
+            if len(size) != 1:
+                raise ValueError('Sparse matrix member "%s" must be one-dimensional' % conn)
+            self.members[conn] = (desc, size)
+
+        self.b_desc, b_size, self.b_strides = self._operand(sdfg, edges[dense_in])
+        self.c_desc, c_size, self.c_strides = self._operand(sdfg, edges[dense_out])
+        self.b_shape, self.c_shape = b_size, c_size
+        if self.dense_out_in:
+            self.cin_desc, cin_size, self.cin_strides = self._operand(sdfg, edges[self.dense_out_in])
+            if len(cin_size) != len(c_size) or any(_mismatch(a, b) for a, b in zip(cin_size, c_size)):
+                raise ValueError('Sizes of %s and %s do not match' % (self.dense_out_in, dense_out))
+        if len(b_size) != len(c_size) or len(b_size) not in (1, 2):
+            raise ValueError('Dense operands must both be vectors or both be matrices')
+        self.is_vector = len(b_size) == 1
+
+        self.rows = c_size[0]
+        self.cols = b_size[0]
+        self.columns = 1 if self.is_vector else c_size[1]
+        if not self.is_vector and _mismatch(b_size[1], c_size[1]):
+            raise ValueError('Columns of %s (%s) do not match columns of %s (%s)' %
+                             (dense_in, b_size[1], dense_out, c_size[1]))
+
+        self.data_desc, (self.nnz, ) = self.members['_a_data']
+        self.index_desc = self.members[sparse_connectors(self.fmt)[0]][0]
+        if self.fmt == 'CSR' and _mismatch(self.members['_a_indptr'][1][0], self.rows + 1):
+            raise ValueError('Row offsets of a CSR matrix must have one more element than its rows')
+        if self.fmt == 'COO' and _mismatch(self.members['_a_row'][1][0], self.members['_a_col'][1][0]):
+            raise ValueError('Row and column indices of a COO matrix must have the same size')
+        self.dtype = self.c_desc.dtype
+
+    @staticmethod
+    def _operand(sdfg: SDFG, edge):
+        desc = sdfg.arrays[edge.data.data]
+        subset = copy.deepcopy(edge.data.subset)
+        dims = subset.squeeze()
+        return desc, subset.size(), [desc.strides[d] for d in dims]
+
+    def b(self, row: str, column: str) -> str:
+        """ Returns the C++ element offset into the dense input. """
+        offset = '(%s) * %s' % (row, sym2cpp(self.b_strides[0]))
+        if not self.is_vector:
+            offset += ' + (%s) * %s' % (column, sym2cpp(self.b_strides[1]))
+        return offset
+
+    def c(self, row: str, column: str) -> str:
+        """ Returns the C++ element offset into the dense output. """
+        offset = '(%s) * %s' % (row, sym2cpp(self.c_strides[0]))
+        if not self.is_vector:
+            offset += ' + (%s) * %s' % (column, sym2cpp(self.c_strides[1]))
+        return offset
+
+    def cin(self, row: str, column: str) -> str:
+        """ Returns the C++ element offset into the initial output values. """
+        offset = '(%s) * %s' % (row, sym2cpp(self.cin_strides[0]))
+        if not self.is_vector:
+            offset += ' + (%s) * %s' % (column, sym2cpp(self.cin_strides[1]))
+        return offset
+
+
+def pure_expansion(node: dace.nodes.LibraryNode, ops: Operands) -> SDFG:
+    """ Builds a portable SDFG for a sparse matrix multiplication. Rows of a
+        CSR matrix are computed in parallel, where each row traverses its
+        nonzeros. Elements of a COO matrix are processed in parallel, with
+        write-conflict resolution on the output. """
+    sdfg = SDFG(node.label + '_sdfg')
+    for conn, (desc, size) in ops.members.items():
+        sdfg.add_array(conn, size, desc.dtype, storage=desc.storage)
+    bname, cname = ops.dense_in, ops.dense_out
+    sdfg.add_array(bname, ops.b_shape, ops.b_desc.dtype, strides=ops.b_strides, storage=ops.b_desc.storage)
+    sdfg.add_array(cname, ops.c_shape, ops.c_desc.dtype, strides=ops.c_strides, storage=ops.c_desc.storage)
+    if ops.dense_out_in:
+        sdfg.add_array(ops.dense_out_in,
+                       ops.c_shape,
+                       ops.cin_desc.dtype,
+                       strides=ops.cin_strides,
+                       storage=ops.cin_desc.storage)
+
+    # Output initialization
+    cidx = '__i' if ops.is_vector else '__i, __n'
+    crange = {'__i': '0:%s' % symstr(ops.rows)}
+    if not ops.is_vector:
+        crange['__n'] = '0:%s' % symstr(ops.columns)
+    init_state = sdfg.add_state(node.label + '_init')
+    if node.beta != 0:
+        init_state.add_mapped_tasklet('init',
+                                      crange, {'__in': Memlet('%s[%s]' % (ops.dense_out_in, cidx))},
+                                      '__out = %s * __in' % symstr(node.beta),
+                                      {'__out': Memlet('%s[%s]' % (cname, cidx))},
+                                      external_edges=True)
+    else:
+        init_state.add_mapped_tasklet('init',
+                                      crange, {},
+                                      '__out = 0', {'__out': Memlet('%s[%s]' % (cname, cidx))},
+                                      external_edges=True)
+
+    state = sdfg.add_state_after(init_state, node.label + '_multiply')
+    bsub = '0:%s' % symstr(ops.cols) if ops.is_vector else '0:%s, __n' % symstr(ops.cols)
+    wcr = 'lambda a, b: a + b'
+    scopes = []
+    if ops.fmt == 'CSR':
+        # Rows in parallel, with a dynamic range over the nonzeros of each row
+        rows_entry, rows_exit = state.add_map('rows', {'__i': '0:%s' % symstr(ops.rows)})
+        nz_entry, nz_exit = state.add_map('nonzeros', {'__j': '__begin:__end'}, schedule=dtypes.ScheduleType.Sequential)
+        nz_entry.add_in_connector('__begin')
+        nz_entry.add_in_connector('__end')
+        indptr = state.add_read('_a_indptr')
+        rows_entry.add_in_connector('IN__a_indptr')
+        rows_entry.add_out_connector('OUT__a_indptr')
+        state.add_edge(indptr, None, rows_entry, 'IN__a_indptr', Memlet.from_array('_a_indptr',
+                                                                                   sdfg.arrays['_a_indptr']))
+        state.add_edge(rows_entry, 'OUT__a_indptr', nz_entry, '__begin', Memlet('_a_indptr[__i]'))
+        state.add_edge(rows_entry, 'OUT__a_indptr', nz_entry, '__end', Memlet('_a_indptr[__i + 1]'))
+        scopes.append((rows_entry, rows_exit))
+        scopes.append((nz_entry, nz_exit))
+        inputs = {'__a': Memlet('_a_data[__j]'), '__col': Memlet('_a_indices[__j]')}
+        code = '__out = %s * __a * __b[__col]' % symstr(node.alpha)
+        output = ('__out', Memlet('%s[%s]' % (cname, cidx), wcr=wcr))
+    else:
+        # Nonzeros in parallel
+        nz_entry, nz_exit = state.add_map('nonzeros', {'__k': '0:%s' % symstr(ops.nnz)})
+        scopes.append((nz_entry, nz_exit))
+        inputs = {'__a': Memlet('_a_data[__k]'), '__row': Memlet('_a_row[__k]'), '__col': Memlet('_a_col[__k]')}
+        code = '__c[__row] = %s * __a * __b[__col]' % symstr(node.alpha)
+        csub = '0:%s' % symstr(ops.rows) if ops.is_vector else '0:%s, __n' % symstr(ops.rows)
+        output = ('__c', Memlet('%s[%s]' % (cname, csub), wcr=wcr, dynamic=True))
+    if not ops.is_vector:
+        scopes.append(
+            state.add_map('columns', {'__n': '0:%s' % symstr(ops.columns)}, schedule=dtypes.ScheduleType.Sequential))
+    inputs['__b'] = Memlet('%s[%s]' % (bname, bsub))
+
+    tasklet = state.add_tasklet('multiply', set(inputs.keys()), {output[0]}, code)
+    entries = [entry for entry, _ in scopes]
+    exits = [exit for _, exit in reversed(scopes)]
+    for conn, memlet in inputs.items():
+        state.add_memlet_path(state.add_read(memlet.data), *entries, tasklet, dst_conn=conn, memlet=memlet)
+    state.add_memlet_path(tasklet, *exits, state.add_write(cname), src_conn=output[0], memlet=output[1])
+    return sdfg
+
+
+def openmp_code(node: dace.nodes.LibraryNode, ops: Operands) -> str:
+    """ Generates OpenMP code for a sparse matrix multiplication. The rows of a
+        CSR matrix are split into contiguous partitions with about the same
+        number of nonzeros. The elements of a COO matrix are split evenly;
+        each thread accumulates consecutive elements of the same row locally
+        and adds them to the output atomically. """
+    ctype = ops.dtype.ctype
+    alpha = sym2cpp(node.alpha)
+    b, c = ops.dense_in, ops.dense_out
+    init = '{c}[{off}] = {val};'.format(
+        c=c,
+        off=ops.c('__i', '__n'),
+        val=('%s * %s[%s]' %
+             (sym2cpp(node.beta), ops.dense_out_in, ops.cin('__i', '__n'))) if node.beta != 0 else '%s(0)' % ctype)
+    fmt = dict(ctype=ctype,
+               alpha=alpha,
+               b=b,
+               c=c,
+               rows=sym2cpp(ops.rows),
+               columns=sym2cpp(ops.columns),
+               nnz=sym2cpp(ops.nnz),
+               init=init,
+               boff=ops.b('__col', '__n'),
+               coff=ops.c('__i', '__n'),
+               crowoff=ops.c('__row', '__n'))
+
+    if ops.fmt == 'CSR':
+        code = '''
+const long long __rows = {rows};
+const long long __nnz = (long long)(_a_indptr[__rows] - _a_indptr[0]);
+#pragma omp parallel
+{{
+    const int __nt = omp_get_num_threads();
+    const int __t = omp_get_thread_num();
+    auto __first_row = [&](int __p) -> long long {{
+        if (__p == 0) return 0;
+        if (__p == __nt) return __rows;
+        const long long __target = _a_indptr[0] + __nnz * __p / __nt;
+        return std::lower_bound(_a_indptr, _a_indptr + __rows, __target) - _a_indptr;
+    }};
+    const long long __end = __first_row(__t + 1);
+    for (long long __i = __first_row(__t); __i < __end; ++__i) {{
+        for (long long __n = 0; __n < {columns}; ++__n)
+            {init}
+        for (long long __j = _a_indptr[__i]; __j < _a_indptr[__i + 1]; ++__j) {{
+            const {ctype} __a = {alpha} * _a_data[__j];
+            const long long __col = _a_indices[__j];
+            for (long long __n = 0; __n < {columns}; ++__n)
+                {c}[{coff}] += __a * {b}[{boff}];
+        }}
+    }}
+}}'''
+    else:
+        code = '''
+const long long __nnz = {nnz};
+#pragma omp parallel for
+for (long long __i = 0; __i < {rows}; ++__i) {{
+    for (long long __n = 0; __n < {columns}; ++__n)
+        {init}
+}}
+#pragma omp parallel
+{{
+    const int __nt = omp_get_num_threads();
+    const int __t = omp_get_thread_num();
+    const long long __end = __nnz * (__t + 1) / __nt;
+    std::vector<{ctype}> __acc({columns});
+    long long __row = -1;
+    auto __flush = [&]() {{
+        if (__row < 0) return;
+        for (long long __n = 0; __n < {columns}; ++__n) {{
+            #pragma omp atomic
+            {c}[{crowoff}] += __acc[__n];
+            __acc[__n] = {ctype}(0);
+        }}
+    }};
+    for (long long __k = __nnz * __t / __nt; __k < __end; ++__k) {{
+        if (_a_row[__k] != __row) {{
+            __flush();
+            __row = _a_row[__k];
+        }}
+        const {ctype} __a = {alpha} * _a_data[__k];
+        const long long __col = _a_col[__k];
+        for (long long __n = 0; __n < {columns}; ++__n)
+            __acc[__n] += __a * {b}[{boff}];
+    }}
+    __flush();
+}}'''
+    return code.format(**fmt)
+
+
+def mkl_type(dtype: dtypes.typeclass) -> str:
+    """ Returns the MKL sparse BLAS function letter of a data type, or None
+        if the type is unsupported. """
+    return {dtypes.float32: 's', dtypes.float64: 'd'}.get(dtype)
+
+
+def mkl_create_code(ops: Operands) -> str:
+    """ Generates code that creates an MKL sparse matrix handle ``__A``. """
+    t = mkl_type(ops.dtype)
+    ctype = ops.dtype.ctype
+    if ops.fmt == 'CSR':
+        create = ('mkl_sparse_{t}_create_csr(&__A, SPARSE_INDEX_BASE_ZERO, {rows}, {cols}, (MKL_INT *)_a_indptr, '
+                  '(MKL_INT *)_a_indptr + 1, (MKL_INT *)_a_indices, ({ctype} *)_a_data);')
+    else:
+        create = ('mkl_sparse_{t}_create_coo(&__A, SPARSE_INDEX_BASE_ZERO, {rows}, {cols}, {nnz}, '
+                  '(MKL_INT *)_a_row, (MKL_INT *)_a_col, ({ctype} *)_a_data);')
+    return '''
+sparse_matrix_t __A;
+{create}
+struct matrix_descr __descr;
+__descr.type = SPARSE_MATRIX_TYPE_GENERAL;
+'''.format(create=create.format(t=t, ctype=ctype, rows=sym2cpp(ops.rows), cols=sym2cpp(ops.cols), nnz=sym2cpp(ops.nnz)))
+
+
+def mkl_copy_code(ops: Operands) -> str:
+    """ Generates code that copies the initial output values to the output,
+        as MKL sparse BLAS updates the output in place. """
+    if not ops.dense_out_in:
+        return ''
+    return '''
+if ((const void *){c} != (const void *){cin}) {{
+    for (long long __i = 0; __i < {rows}; ++__i)
+        for (long long __n = 0; __n < {columns}; ++__n)
+            {c}[{coff}] = {cin}[{cinoff}];
+}}'''.format(c=ops.dense_out,
+             cin=ops.dense_out_in,
+             rows=sym2cpp(ops.rows),
+             columns=sym2cpp(ops.columns),
+             coff=ops.c('__i', '__n'),
+             cinoff=ops.cin('__i', '__n'))
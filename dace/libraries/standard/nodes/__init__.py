@@ -2,3 +2,4 @@
 from .code import CodeLibraryNode
 from .gearbox import Gearbox
 from .reduce import Reduce
+from .scan import Scan
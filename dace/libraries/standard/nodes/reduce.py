@@ -283,8 +283,8 @@ class ExpandReduceOpenMP(pm.ExpandTransformation):
         # Get reduction type for OpenMP
         redtype = detect_reduction_type(node.wcr, openmp=True)
         if redtype not in ExpandReduceOpenMP._REDUCTION_TYPE_TO_OPENMP:
-            warnings.warn('Reduction type not supported for "%s"' % node.wcr)
-            return ExpandReducePure.expansion(node, state, sdfg)
+            # Custom reduction: use thread-private partial results
+            return ExpandReduceOpenMPTree.expansion(node, state, sdfg)
         omptype, expr = ExpandReduceOpenMP._REDUCTION_TYPE_TO_OPENMP[redtype]
 
         # Standardize axes
@@ -362,6 +362,79 @@ class ExpandReduceOpenMP(pm.ExpandTransformation):
         return tnode
 
 
+@dace.library.expansion
+class ExpandReduceOpenMPTree(pm.ExpandTransformation):
+    """
+        OpenMP-based implementation of the reduce node for arbitrary
+        (associative) reduction functions. Partial results are computed in
+        thread-private storage and combined with a parallel binary tree (see
+        ``dace::ParallelReduce`` in ``reduction.h``).
+    """
+    environments = []
+
+    @staticmethod
+    def expansion(node: 'Reduce', state: SDFGState, sdfg: SDFG):
+        node.validate(sdfg, state)
+        inedge: graph.MultiConnectorEdge = state.in_edges(node)[0]
+        outedge: graph.MultiConnectorEdge = state.out_edges(node)[0]
+        input_dims = len(inedge.data.subset)
+        input_data = sdfg.arrays[inedge.data.data]
+        output_data = sdfg.arrays[outedge.data.data]
+
+        from dace.codegen.targets.cpp import sym2cpp, unparse_cr
+
+        # Standardize axes
+        axes = sorted(node.axes) if node.axes else [i for i in range(input_dims)]
+        insize = inedge.data.subset.size()
+        outsize = outedge.data.subset.size()
+
+        # Match the non-reduced input dimensions with the output dimensions,
+        # ignoring unit dimensions (e.g., kept reduced dimensions)
+        kept = [i for i in range(input_dims) if i not in axes and insize[i] != 1]
+        outdims = [i for i in range(len(outsize)) if outsize[i] != 1]
+        if len(kept) != len(outdims):
+            warnings.warn('Cannot match output dimensions of reduction "%s"' % node.label)
+            return ExpandReducePure.expansion(node, state, sdfg)
+
+        odims = []
+        for i, o in zip(kept, outdims):
+            odims.extend([insize[i], input_data.strides[i], output_data.strides[o]])
+        rdims = []
+        for i in axes:
+            rdims.extend([insize[i], input_data.strides[i]])
+
+        ctype = output_data.dtype.ctype
+        if node.identity is not None:
+            identity = 'true, (%s)(%s)' % (ctype, sym2cpp(node.identity))
+        else:
+            identity = 'false, {}'
+
+        code = '''
+const int64_t __odims[] = {{ {odims} }};
+const int64_t __rdims[] = {{ {rdims} }};
+dace::ParallelReduce<{on}, {rn}>(_in, _out, {wcr}, __odims, __rdims, {identity});
+'''.format(odims=', '.join(sym2cpp(d) for d in odims) or '0',
+           rdims=', '.join(sym2cpp(d) for d in rdims) or '0',
+           on=len(kept),
+           rn=len(axes),
+           wcr=unparse_cr(sdfg, node.wcr, output_data.dtype),
+           identity=identity)
+
+        # Make tasklet
+        tnode = dace.nodes.Tasklet('reduce', {'_in': dace.pointer(input_data.dtype)},
+                                   {'_out': dace.pointer(output_data.dtype)},
+                                   code,
+                                   language=dace.Language.CPP)
+
+        # Rename outer connectors and add to node
+        inedge._dst_conn = '_in'
+        outedge._src_conn = '_out'
+        node.add_in_connector('_in')
+        node.add_out_connector('_out')
+
+        return tnode
+
+
 @dace.library.expansion
 class ExpandReduceCUDADevice(pm.ExpandTransformation):
     """
@@ -1045,6 +1118,7 @@ class Reduce(dace.sdfg.nodes.LibraryNode):
         'pure': ExpandReducePure,
         'pure-seq': ExpandReducePureSequentialDim,
         'OpenMP': ExpandReduceOpenMP,
+        'OpenMP (tree)': ExpandReduceOpenMPTree,
         'CUDA (device)': ExpandReduceCUDADevice,
         'CUDA (block)': ExpandReduceCUDABlock,
         'CUDA (block allreduce)': ExpandReduceCUDABlockAll,
@@ -0,0 +1,322 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" File defining the scan (prefix-sum) library node. """
+
+import ast
+import dace
+import dace.serialize
+import dace.library
+from dace import dtypes
+from dace.frontend.operations import detect_reduction_type
+from dace.frontend.python import astutils
+from dace.properties import Property, LambdaProperty
+from dace.sdfg import SDFG, SDFGState, graph
+from dace.symbolic import symstr
+from dace.transformation import transformation as pm
+
+
+def _scan_edges(node: 'Scan', state: SDFGState, sdfg: SDFG):
+    """ Returns the input/output edges and data descriptors of a scan node. """
+    inedge: graph.MultiConnectorEdge = state.in_edges(node)[0]
+    outedge: graph.MultiConnectorEdge = state.out_edges(node)[0]
+    return inedge, outedge, sdfg.arrays[inedge.data.data], sdfg.arrays[outedge.data.data]
+
+
+def _wcr_to_python(wcr: str, left: str, right: str) -> str:
+    """ Converts a binary lambda to a Python expression over two given names.
+
+        :param wcr: The lambda (as a string), e.g., ``lambda a, b: a + b``.
+        :param left: Name to substitute for the first lambda argument.
+        :param right: Name to substitute for the second lambda argument.
+        :return: A Python expression string.
+    """
+    lmbda = ast.parse(wcr).body[0].value
+    args = [a.arg for a in lmbda.args.args]
+    if len(args) != 2:
+        raise ValueError('Scan function must be a binary lambda, got "%s"' % wcr)
+    body = astutils.ASTFindReplace({args[0]: left, args[1]: right}).visit(lmbda.body)
+    return astutils.unparse(body)
+
+
+@dace.library.expansion
+class ExpandScanPure(pm.ExpandTransformation):
+    """
+        Pure SDFG Scan expansion, which replaces a scan node with a sequential
+        loop over the scanned axis, containing a parallel map over all other
+        dimensions.
+    """
+    environments = []
+
+    @staticmethod
+    def expansion(node: 'Scan', state: SDFGState, sdfg: SDFG):
+        node.validate(sdfg, state)
+        inedge, outedge, input_data, output_data = _scan_edges(node, state, sdfg)
+        shape = inedge.data.subset.size()
+        axis = node.axis
+
+        nsdfg = SDFG('scan')
+        nsdfg.add_array('_in', shape, input_data.dtype, strides=input_data.strides, storage=input_data.storage)
+        nsdfg.add_array('_out', shape, output_data.dtype, strides=output_data.strides, storage=output_data.storage)
+
+        other_dims = {'_o%d' % i: '0:%s' % symstr(s) for i, s in enumerate(shape) if i != axis}
+
+        def index(axis_index: str) -> str:
+            return ','.join(axis_index if i == axis else '_o%d' % i for i in range(len(shape)))
+
+        def add_scan_step(st: SDFGState, name: str, code: str, inputs: dict, out_index: str):
+            outputs = {'__out': dace.Memlet('_out[%s]' % index(out_index))}
+            if other_dims:
+                st.add_mapped_tasklet(name, other_dims, inputs, code, outputs, external_edges=True)
+            else:
+                t = st.add_tasklet(name, set(inputs.keys()), {'__out'}, code)
+                for conn, memlet in inputs.items():
+                    st.add_edge(st.add_read(memlet.data), None, t, conn, memlet)
+                st.add_edge(t, '__out', st.add_write('_out'), None, outputs['__out'])
+
+        # First element of the output
+        init_state = nsdfg.add_state('scan_init')
+        if node.exclusive:
+            add_scan_step(init_state, 'scan_init', '__out = %s' % node.identity, {}, '0')
+        else:
+            add_scan_step(init_state, 'scan_init', '__out = __inp', {'__inp': dace.Memlet('_in[%s]' % index('0'))}, '0')
+
+        # Remaining elements, one loop iteration per element along the axis
+        body_state = nsdfg.add_state('scan_body')
+        in_index = '__s - 1' if node.exclusive else '__s'
+        add_scan_step(body_state, 'scan_step', '__out = %s' % _wcr_to_python(node.wcr, '__prev', '__inp'), {
+            '__prev': dace.Memlet('_out[%s]' % index('__s - 1')),
+            '__inp': dace.Memlet('_in[%s]' % index(in_index))
+        }, '__s')
+        nsdfg.add_loop(init_state, body_state, None, '__s', '1', '__s < %s' % symstr(shape[axis]), '__s + 1')
+
+        # Rename outer connectors
+        inedge._dst_conn = '_in'
+        outedge._src_conn = '_out'
+
+        return nsdfg
+
+
+@dace.library.expansion
+class ExpandScanOpenMP(pm.ExpandTransformation):
+    """
+        Multi-threaded CPU implementation of the scan node. If there are at
+        least as many independent scans (i.e., elements in the non-scanned
+        dimensions) as threads, each thread scans a subset of them
+        sequentially. Otherwise, the threads cooperate on every scan using a
+        work-efficient reduce-then-scan scheme: each thread reduces a
+        contiguous chunk, the chunk totals are combined into per-thread
+        offsets, and each thread then scans its chunk starting from its
+        offset. The scheme performs O(N) applications of the scan function
+        and preserves operand order, so any associative function is supported.
+    """
+    environments = []
+
+    @staticmethod
+    def expansion(node: 'Scan', state: SDFGState, sdfg: SDFG):
+        from dace.codegen.targets.cpp import sym2cpp, unparse_cr
+
+        node.validate(sdfg, state)
+        inedge, outedge, input_data, output_data = _scan_edges(node, state, sdfg)
+        shape = inedge.data.subset.size()
+        axis = node.axis
+        ctype = output_data.dtype.ctype
+        outer = [i for i in range(len(shape)) if i != axis]
+
+        def offset(desc: dace.data.Data, idx: str) -> str:
+            terms = ['_o%d * %s' % (i, sym2cpp(desc.strides[i])) for i in outer]
+            terms.append('(%s) * %s' % (idx, sym2cpp(desc.strides[axis])))
+            return ' + '.join(terms)
+
+        def inp(idx):
+            return '_in[%s]' % offset(input_data, idx)
+
+        def out(idx):
+            return '_out[%s]' % offset(output_data, idx)
+
+        identity = sym2cpp(node.identity) if node.identity is not None else None
+
+        # Sequential scan of a single line
+        if node.exclusive:
+            sequential = '''
+{ctype} __acc = {identity};
+for (long long __i = 0; __i < __n; ++__i) {{
+    {ctype} __v = {inp};
+    {out} = __acc;
+    __acc = __op(__acc, __v);
+}}'''
+        else:
+            sequential = '''
+if (__n > 0) {{
+    {ctype} __acc = {inp0};
+    {out0} = __acc;
+    for (long long __i = 1; __i < __n; ++__i) {{
+        __acc = __op(__acc, {inp});
+        {out} = __acc;
+    }}
+}}'''
+        sequential = sequential.format(ctype=ctype,
+                                       identity=identity,
+                                       inp=inp('__i'),
+                                       out=out('__i'),
+                                       inp0=inp('0'),
+                                       out0=out('0'))
+
+        # Cooperative (reduce-then-scan) scan of a single line
+        if node.exclusive:
+            chunk_scan = '''
+    {ctype} __acc = __has_offset ? __offset : {identity};
+    for (long long __i = __lo; __i < __hi; ++__i) {{
+        {ctype} __v = {inp};
+        {out} = __acc;
+        __acc = __op(__acc, __v);
+    }}'''
+        else:
+            chunk_scan = '''
+    {ctype} __acc = __has_offset ? __op(__offset, {inplo}) : {inplo};
+    {outlo} = __acc;
+    for (long long __i = __lo + 1; __i < __hi; ++__i) {{
+        __acc = __op(__acc, {inp});
+        {out} = __acc;
+    }}'''
+        cooperative = '''
+#pragma omp parallel
+{{
+    const int __t = omp_get_thread_num();
+    const int __nt = omp_get_num_threads();
+    const long long __chunk = (__n + __nt - 1) / __nt;
+    const long long __lo = (__t * __chunk < __n) ? __t * __chunk : __n;
+    const long long __hi = (__lo + __chunk < __n) ? __lo + __chunk : __n;
+
+    // Reduce own chunk
+    if (__lo < __hi) {{
+        {ctype} __acc = {inplo};
+        for (long long __i = __lo + 1; __i < __hi; ++__i)
+            __acc = __op(__acc, {inp});
+        __partial[__t] = __acc;
+    }}
+    #pragma omp barrier
+
+    // Combine totals of preceding (non-empty) chunks into an offset
+    bool __has_offset = false;
+    {ctype} __offset{init};
+    for (int __s = 0; __s < __t && __s * __chunk < __n; ++__s) {{
+        __offset = __has_offset ? __op(__offset, __partial[__s]) : __partial[__s];
+        __has_offset = true;
+    }}
+
+    // Scan own chunk, starting from the offset
+    if (__lo < __hi) {{''' + chunk_scan + '''
+    }}
+}}'''
+        cooperative = cooperative.format(ctype=ctype,
+                                         identity=identity,
+                                         init=(' = %s' % identity) if identity is not None else '',
+                                         inp=inp('__i'),
+                                         out=out('__i'),
+                                         inplo=inp('__lo'),
+                                         outlo=out('__lo'))
+
+        code = 'auto __op = %s;\n' % unparse_cr(sdfg, node.wcr, output_data.dtype)
+        code += 'const long long __n = %s;\n' % sym2cpp(shape[axis])
+
+        if outer:
+            num_lines = ' * '.join('(%s)' % sym2cpp(shape[i]) for i in outer)
+            outer_loops = ''.join('for (long long _o{i} = 0; _o{i} < {sz}; ++_o{i})\n'.format(i=i, sz=sym2cpp(shape[i]))
+                                  for i in outer)
+            code += 'if ((long long)({lines}) >= (long long)omp_get_max_threads()) {{\n'.format(lines=num_lines)
+            code += '#pragma omp parallel for collapse({cdim})\n'.format(cdim=len(outer))
+            code += outer_loops + '{\n' + sequential + '\n}\n'
+            code += '} else {\n'
+            code += '{ctype} *__partial = new {ctype}[omp_get_max_threads()];\n'.format(ctype=ctype)
+            code += outer_loops + '{\n' + cooperative + '\n}\n'
+            code += 'delete[] __partial;\n'
+            code += '}\n'
+        else:
+            code += '{ctype} *__partial = new {ctype}[omp_get_max_threads()];\n'.format(ctype=ctype)
+            code += cooperative + '\n'
+            code += 'delete[] __partial;\n'
+
+        tnode = dace.nodes.Tasklet('scan', {'_in': dace.pointer(input_data.dtype)},
+                                   {'_out': dace.pointer(output_data.dtype)},
+                                   code,
+                                   language=dace.Language.CPP,
+                                   code_global='#include <omp.h>')
+
+        # Rename outer connectors
+        inedge._dst_conn = '_in'
+        outedge._src_conn = '_out'
+
+        return tnode
+
+
+@dace.library.node
+class Scan(dace.sdfg.nodes.LibraryNode):
+    """ An SDFG node that computes the prefix scan of an N-dimensional array
+        along one axis, using an associative binary function. An inclusive
+        scan writes ``out[i] = in[0] op ... op in[i]``, whereas an exclusive
+        scan writes ``out[0] = identity`` and
+        ``out[i] = identity op in[0] op ... op in[i-1]``. """
+
+    # Global properties
+    implementations = {
+        'pure': ExpandScanPure,
+        'OpenMP': ExpandScanOpenMP,
+    }
+
+    default_implementation = 'pure'
+
+    # Properties
+    axis = Property(dtype=int, default=0, desc='Axis along which to scan')
+    wcr = LambdaProperty(default='lambda a, b: a + b')
+    identity = Property(allow_none=True, desc='Identity value of the scan function (required for exclusive scans)')
+    exclusive = Property(dtype=bool, default=False, desc='If True, computes an exclusive scan')
+
+    def __init__(self,
+                 wcr='lambda a, b: a + b',
+                 axis=0,
+                 identity=None,
+                 exclusive=False,
+                 schedule=dtypes.ScheduleType.Default,
+                 debuginfo=None,
+                 **kwargs):
+        super().__init__(name='Scan', inputs={'_in'}, outputs={'_out'}, **kwargs)
+        self.wcr = wcr
+        self.axis = axis
+        self.identity = identity
+        self.exclusive = exclusive
+        self.debuginfo = debuginfo
+        self.schedule = schedule
+
+    @staticmethod
+    def from_json(json_obj, context=None):
+        ret = Scan()
+        dace.serialize.set_properties_from_json(ret, json_obj, context=context)
+        return ret
+
+    def __str__(self):
+        redtype = detect_reduction_type(self.wcr)
+        if redtype == dtypes.ReductionType.Custom:
+            wcrstr = astutils.unparse(ast.parse(self.wcr).body[0].value.body)
+        else:
+            wcrstr = str(redtype)
+            wcrstr = wcrstr[wcrstr.find('.') + 1:]  # Skip "ReductionType."
+
+        return '{kind} scan ({op}), Axis: {axis}'.format(kind='Exclusive' if self.exclusive else 'Inclusive',
+                                                         op=wcrstr,
+                                                         axis=self.axis)
+
+    def __label__(self, sdfg, state):
+        return str(self).replace(' Axis', '\nAxis')
+
+    def validate(self, sdfg, state):
+        if len(state.in_edges(self)) != 1:
+            raise ValueError('Scan node must have one input')
+        if len(state.out_edges(self)) != 1:
+            raise ValueError('Scan node must have one output')
+        insize = state.in_edges(self)[0].data.subset.size()
+        outsize = state.out_edges(self)[0].data.subset.size()
+        if len(insize) != len(outsize) or any((a != b) == True for a, b in zip(insize, outsize)):
+            raise ValueError('Scan input and output shapes must match')
+        if self.axis < 0 or self.axis >= len(insize):
+            raise ValueError('Scan axis %d out of bounds for %d-dimensional input' % (self.axis, len(insize)))
+        if self.exclusive and self.identity is None:
+            raise ValueError('Exclusive scan requires an identity value')
@@ -210,7 +210,7 @@ def generate_boundary_conditions(node, shape, field_accesses, field_to_desc, ite
                     bc = {"btype": "shrink"}
                 btype = bc["btype"]
                 if btype == "copy":
-                    center_memlet = accesses[center]
+                    center_memlet = accesses[tuple(0 for _ in indices)]
                     boundary_val = "_{}".format(center_memlet)
                 elif btype == "constant":
                     boundary_val = bc["value"]
@@ -231,6 +231,51 @@ def generate_boundary_conditions(node, shape, field_accesses, field_to_desc, ite
     return boundary_code, oob_cond
 
 
+def stencil_halo(shape, field_accesses, iterator_mapping, inputs) -> List[Tuple[int, int]]:
+    """
+    Computes the number of points at the lower and upper end of each dimension
+    of the iteration space for which at least one input access is out of
+    bounds, from the access offsets of all inputs.
+    """
+    halo = [[0, 0] for _ in range(len(shape))]
+    for field_name in inputs:
+        dims = [i for i, v in enumerate(iterator_mapping[field_name]) if v]
+        for indices in field_accesses[field_name].keys():
+            for dim, offset in zip(dims, indices):
+                halo[dim][0] = max(halo[dim][0], -offset)
+                halo[dim][1] = max(halo[dim][1], offset)
+    return [tuple(h) for h in halo]
+
+
+def split_regions(shape, halo) -> Dict[str, List[Tuple]]:
+    """
+    Splits the iteration space into an interior region, in which all accesses
+    are in bounds, and disjoint boundary slabs that cover the rest of the
+    iteration space. Each region is given as a list of (begin, end) tuples,
+    where end is exclusive. Dimensions are clamped, such that iteration spaces
+    smaller than the halo are still covered exactly once.
+    """
+    lower_end = [dace.symbolic.pystr_to_symbolic(f"Min({lo}, {s})") for s, (lo, _) in zip(shape, halo)]
+    upper_begin = [
+        dace.symbolic.pystr_to_symbolic(f"Max({le}, {s} - {hi})") for s, le, (_, hi) in zip(shape, lower_end, halo)
+    ]
+    interior = [(b, e) for b, e in zip(lower_end, upper_begin)]
+    regions = collections.OrderedDict()
+    regions["interior"] = interior
+    for dim, (lo, hi) in enumerate(halo):
+        inner = interior[:dim]
+        outer = [(0, s) for s in shape[dim + 1:]]
+        if lo > 0:
+            regions[f"lower{dim}"] = inner + [(0, lower_end[dim])] + outer
+        if hi > 0:
+            regions[f"upper{dim}"] = inner + [(upper_begin[dim], shape[dim])] + outer
+    # Remove regions that are known to be empty
+    for name, region in list(regions.items()):
+        if any(not dace.symbolic.issymbolic(e - b) and (e - b) <= 0 for b, e in region):
+            del regions[name]
+    return regions
+
+
 def validate_vector_lengths(vector_lengths, iterator_mapping):
     """
     Assert that vector lengths are valid and consistent.
@@ -31,7 +31,7 @@ class ExpandStencilCPU(dace.library.ExpandTransformation):
         # Replace relative indices with memlet names
         code, field_accesses = parse_accesses(code, outputs)
         iterator_mapping = make_iterator_mapping(node, field_accesses, shape)
-        validate_vector_lengths(vector_lengths, iterator_mapping)
+        vector_length = validate_vector_lengths(vector_lengths, iterator_mapping)
 
         #######################################################################
         # Boundary condition generation
@@ -44,14 +44,20 @@ class ExpandStencilCPU(dace.library.ExpandTransformation):
         # Write all output memlets
         #######################################################################
 
+        center = tuple(0 for _ in range(len(shape)))
         write_code = ""
         if len(oob_cond) > 1:
             write_code += "if not (" + " or ".join(sorted(oob_cond)) + "):\n"
-        write_code += "\n".join("{}_{} = {}".format("\t" if len(oob_cond) > 0 else "", field_accesses[output][tuple(
-            0 for _ in range(len(shape)))], field_accesses[output][tuple(0 for _ in range(len(shape)))], output)
-                                for output in outputs)
+        write_code += "\n".join("{}_{} = {}".format("\t" if len(oob_cond) > 0 else "", field_accesses[output][center],
+                                                    field_accesses[output][center]) for output in outputs)
+        boundary_tasklet_code = boundary_code + "\n" + code + "\n" + write_code
 
-        code = boundary_code + "\n" + code + "\n" + write_code
+        # In the interior of the domain, all accesses are in bounds
+        interior_code = "".join(f"{memlet_name} = _{memlet_name}\n" for k in inputs if sum(iterator_mapping[k], 0) > 0
+                                for memlet_name in field_accesses[k].values())
+        interior_code += code + "\n"
+        interior_code += "\n".join("_{} = {}".format(field_accesses[output][center], field_accesses[output][center])
+                                   for output in outputs)
 
         input_connectors = sum(
             [
@@ -63,14 +69,14 @@ class ExpandStencilCPU(dace.library.ExpandTransformation):
         output_connectors = sum([[f"_{c}" for c in field_accesses[k].values()] for k in outputs], [])
 
         #######################################################################
-        # Create tasklet
+        # Split iteration space into interior and boundary regions
         #######################################################################
 
-        tasklet = state.add_tasklet(node.label + "_compute",
-                                    input_connectors,
-                                    output_connectors,
-                                    code,
-                                    language=dace.dtypes.Language.Python)
+        halo = stencil_halo(shape, field_accesses, iterator_mapping, inputs)
+        if node.split_boundaries and vector_length == 1 and any(lo != 0 or hi != 0 for lo, hi in halo):
+            regions = split_regions(shape, halo)
+        else:
+            regions = {"boundary": [(0, s) for s in shape]}
 
         #######################################################################
         # Build dataflow state
@@ -78,44 +84,75 @@ class ExpandStencilCPU(dace.library.ExpandTransformation):
 
         parameters = [f"_i{i}" for i in range(len(shape))]
 
-        entry, exit = state.add_map(
-            node.name + "_map", collections.OrderedDict(
-                (parameters[i], "0:" + str(shape[i])) for i in range(len(shape))))
-
+        read_nodes = {}
         for field in inputs:
-
             dtype = field_to_desc[field].dtype
-
-            read_node = state.add_read(field)
             input_dims = iterator_mapping[field]
+            if not any(input_dims):
+                continue
             input_shape = tuple(s for s, v in zip(shape, input_dims) if v)
-            data = sdfg.add_array(field, input_shape, dtype)
-            field_parameters = tuple(p for p, v in zip(parameters, input_dims) if v)
-            for indices, connector in field_accesses[field].items():
-                access_str = ", ".join(f"{p} + ({i})" for p, i in zip(field_parameters, indices))
-                memlet = dace.Memlet(f"{field}[{access_str}]", dynamic=True)
-                memlet.allow_oob = True
-                state.add_memlet_path(read_node, entry, tasklet, dst_conn=f"_{connector}", memlet=memlet)
-
-        index_tuple = ", ".join(parameters)
+            sdfg.add_array(field, input_shape, dtype)
+            read_nodes[field] = state.add_read(field)
+        write_nodes = {}
         for field in outputs:
-
             dtype = field_to_desc[field].dtype
+            sdfg.add_array(field, shape, dtype)
+            write_nodes[field] = state.add_write(field)
 
-            data = sdfg.add_array(field, shape, dtype)
-            write_node = state.add_write(field)
-            for indices, connector in field_accesses[field].items():
-                state.add_memlet_path(tasklet,
-                                      exit,
-                                      write_node,
-                                      src_conn=f"_{connector}",
-                                      memlet=dace.Memlet(f"{field}[{index_tuple}]", dynamic=len(oob_cond) > 0))
+        index_tuple = ", ".join(parameters)
+        interior_entry = None
+        for region_name, region in regions.items():
+            interior = region_name == "interior"
+            label = node.label if len(regions) == 1 else f"{node.label}_{region_name}"
+
+            tasklet = state.add_tasklet(label + "_compute",
+                                        input_connectors,
+                                        output_connectors,
+                                        interior_code if interior else boundary_tasklet_code,
+                                        language=dace.dtypes.Language.Python)
+
+            entry, exit = state.add_map(
+                label + "_map", collections.OrderedDict((p, (b, e - 1, 1)) for p, (b, e) in zip(parameters, region)))
+            if interior:
+                interior_entry = entry
+
+            for field, read_node in read_nodes.items():
+                field_parameters = tuple(p for p, v in zip(parameters, iterator_mapping[field]) if v)
+                for indices, connector in field_accesses[field].items():
+                    access_str = ", ".join(f"{p} + ({i})" for p, i in zip(field_parameters, indices))
+                    memlet = dace.Memlet(f"{field}[{access_str}]", dynamic=not interior)
+                    memlet.allow_oob = not interior
+                    state.add_memlet_path(read_node, entry, tasklet, dst_conn=f"_{connector}", memlet=memlet)
+
+            for field, write_node in write_nodes.items():
+                for indices, connector in field_accesses[field].items():
+                    state.add_memlet_path(tasklet,
+                                          exit,
+                                          write_node,
+                                          src_conn=f"_{connector}",
+                                          memlet=dace.Memlet(f"{field}[{index_tuple}]",
+                                                             dynamic=not interior and len(oob_cond) > 0))
+
+            # Maps without inputs (e.g., only scalar inputs)
+            if state.in_degree(entry) == 0:
+                state.add_nedge(entry, tasklet, dace.Memlet())
 
         # Add scalars as symbols
         for field_name, mapping in iterator_mapping.items():
             if not any(mapping):
                 sdfg.add_symbol(field_name, parent_sdfg.symbols[field_name])
 
+        # Tile the interior of the domain
+        if node.tile_sizes and interior_entry is not None:
+            from dace.transformation.dataflow import MapTiling
+            MapTiling.apply_to(sdfg,
+                               options={
+                                   "tile_sizes": tuple(node.tile_sizes),
+                                   "prefix": "_tile"
+                               },
+                               map_entry=interior_entry,
+                               save=False)
+
         #######################################################################
 
         return sdfg
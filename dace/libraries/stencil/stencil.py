@@ -44,6 +44,12 @@ class Stencil(dace.library.LibraryNode):
     }
 
     This will use iterators _i0 and _i2 for accessing b.
+
+    On CPUs, the iteration space is split into an interior region, where no
+    access can be out of bounds, and thin boundary regions derived from the
+    access offsets. Only the boundary regions evaluate the boundary
+    conditions, such that the interior can be vectorized. The interior can
+    optionally be tiled with `tile_sizes`.
     """
 
     implementations = {
@@ -69,14 +75,26 @@ class Stencil(dace.library.LibraryNode):
         desc=("Boundary condition specifications for each accessed field, on "
               "the form: {'b': {'btype': 'constant', 'value': 3}}."),
         default=collections.OrderedDict())
+    split_boundaries = dace.properties.Property(dtype=bool,
+                                                default=True,
+                                                desc=("Split the iteration space into an interior region without "
+                                                      "bounds checks and thin boundary regions (CPU only)."))
+    tile_sizes = dace.properties.ListProperty(element_type=int,
+                                              default=[],
+                                              desc=("Tile sizes for each dimension of the interior region, e.g., "
+                                                    "[1, 32, 256] (CPU only). If empty, the interior is not tiled."))
 
     def __init__(self,
                  label: str,
                  code: str = "",
                  iterator_mapping: Dict[str, Tuple[int]] = {},
                  boundary_conditions: Dict[str, Dict] = {},
+                 split_boundaries: bool = True,
+                 tile_sizes: List[int] = None,
                  **kwargs):
         super().__init__(label, **kwargs)
         self.code = type(self).code.from_string(code, dace.dtypes.Language.Python)
         self.iterator_mapping = iterator_mapping
         self.boundary_conditions = boundary_conditions
+        self.split_boundaries = split_boundaries
+        self.tile_sizes = tile_sizes or []
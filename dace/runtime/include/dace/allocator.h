@@ -0,0 +1,395 @@
+// Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+#ifndef __DACE_ALLOCATOR_H
+#define __DACE_ALLOCATOR_H
+
+#include <algorithm>
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <cstdlib>
+#include <mutex>
+#include <new>
+#include <type_traits>
+#include <vector>
+
+#if defined(_WIN32)
+#include <malloc.h>
+#elif defined(__linux__)
+#include <sys/mman.h>
+#endif
+
+// Maximal number of bytes kept in caches before blocks are returned to the
+// system
+#ifndef DACE_ALLOCATOR_MAX_CACHED_BYTES
+#define DACE_ALLOCATOR_MAX_CACHED_BYTES (size_t(1) << 30)
+#endif
+
+// Number of blocks per size class that each thread caches without locking
+#ifndef DACE_ALLOCATOR_THREAD_CACHE_BLOCKS
+#define DACE_ALLOCATOR_THREAD_CACHE_BLOCKS 4
+#endif
+
+// Blocks larger than this are only cached in the shared pool
+#ifndef DACE_ALLOCATOR_THREAD_CACHE_MAX_BYTES
+#define DACE_ALLOCATOR_THREAD_CACHE_MAX_BYTES (size_t(1) << 20)
+#endif
+
+namespace dace {
+namespace allocator {
+
+    // Every block starts with a header, which keeps user pointers 64-byte
+    // aligned
+    constexpr size_t HEADER_BYTES = 64;
+    // Blocks at least this large are backed by transparent huge pages
+    // if requested
+    constexpr size_t HUGE_PAGE_BYTES = size_t(1) << 21;
+
+    // Size classes: 64 bytes, then four classes per power of two
+    // (e.g., 80, 96, 112, 128, 160, ...), wasting at most 25% of a block
+    constexpr int MIN_CLASS_LOG = 6;
+    constexpr int NUM_CLASSES = 1 + 4 * (64 - MIN_CLASS_LOG);
+
+    inline int size_class(size_t bytes) {
+        if (bytes <= (size_t(1) << MIN_CLASS_LOG))
+            return 0;
+#if defined(__GNUC__) || defined(__clang__)
+        const int log = 63 - __builtin_clzll((unsigned long long)(bytes - 1));
+#else
+        int log = 0;
+        for (size_t b = bytes - 1; b > 1; b >>= 1)
+            ++log;
+#endif
+        const size_t quarter = size_t(1) << (log - 2);
+        const int sub = int((bytes - 1 - (size_t(1) << log)) / quarter);
+        return 1 + 4 * (log - MIN_CLASS_LOG) + sub;
+    }
+
+    inline size_t class_bytes(int cls) {
+        if (cls == 0)
+            return size_t(1) << MIN_CLASS_LOG;
+        const int log = MIN_CLASS_LOG + (cls - 1) / 4;
+        const int sub = (cls - 1) % 4;
+        return (size_t(1) << log) + (sub + 1) * (size_t(1) << (log - 2));
+    }
+
+    struct BlockHeader {
+        int size_class;
+        bool hugepages;
+        size_t count;
+    };
+    static_assert(sizeof(BlockHeader) <= HEADER_BYTES, "Block header too large");
+
+    /**
+     * Allocator statistics. Counters accumulate over the lifetime of the
+     * process; byte counts refer to whole blocks, including headers and
+     * rounding to size classes.
+     */
+    struct Statistics {
+        size_t allocations;         // Calls to allocate
+        size_t deallocations;       // Calls to deallocate
+        size_t cache_hits;          // Allocations served from a cache
+        size_t cache_misses;        // Allocations requested from the system
+        size_t releases;            // Blocks returned to the system
+        size_t bytes_in_use;        // Bytes currently allocated
+        size_t bytes_cached;        // Bytes currently held in caches
+        size_t peak_bytes_reserved; // Maximum of bytes obtained from the system
+    };
+
+    /**
+     * Counters of a single thread. Only the owning thread modifies them, so
+     * they are updated without atomic read-modify-write operations, and
+     * read by other threads when collecting statistics.
+     */
+    struct ThreadCounters {
+        std::atomic<size_t> allocations{0}, deallocations{0}, cache_hits{0};
+        std::atomic<size_t> bytes_allocated{0}, bytes_freed{0};
+
+        static void add(std::atomic<size_t> &counter, size_t value) {
+            counter.store(counter.load(std::memory_order_relaxed) + value, std::memory_order_relaxed);
+        }
+    };
+
+    /**
+     * Process-wide pool of free blocks, one list per size class and backing
+     * type (regular or huge pages).
+     */
+    class Pool {
+     protected:
+        struct Bin {
+            std::mutex mutex;
+            std::vector<void *> blocks;
+        };
+        Bin m_bins[2][NUM_CLASSES];
+
+        std::mutex m_threads_mutex;
+        std::vector<const ThreadCounters *> m_threads;
+        size_t m_retired[5] = {0, 0, 0, 0, 0};  // Counters of exited threads
+
+        std::atomic<size_t> m_cache_hits{0}, m_cache_misses{0}, m_releases{0}, m_cached{0};
+        std::atomic<size_t> m_reserved{0}, m_peak_reserved{0};
+
+        static void *system_alloc(size_t bytes, bool hugepages) {
+            void *ptr = nullptr;
+            const size_t alignment = hugepages ? HUGE_PAGE_BYTES : HEADER_BYTES;
+#ifdef _WIN32
+            ptr = _aligned_malloc(bytes, alignment);
+#else
+            if (posix_memalign(&ptr, alignment, bytes) != 0)
+                ptr = nullptr;
+#endif
+            if (ptr == nullptr)
+                throw std::bad_alloc();
+#if defined(__linux__) && defined(MADV_HUGEPAGE)
+            // A hint only, ignored if transparent huge pages are disabled
+            if (hugepages)
+                madvise(ptr, bytes, MADV_HUGEPAGE);
+#endif
+            return ptr;
+        }
+
+        static void system_free(void *ptr) {
+#ifdef _WIN32
+            _aligned_free(ptr);
+#else
+            free(ptr);
+#endif
+        }
+
+        void free_block(void *block, int cls) {
+            system_free(block);
+            m_reserved.fetch_sub(class_bytes(cls), std::memory_order_relaxed);
+            m_releases.fetch_add(1, std::memory_order_relaxed);
+        }
+
+     public:
+        static Pool &get() {
+            // Never destroyed, since thread caches return blocks on thread exit
+            static Pool *pool = new Pool();
+            return *pool;
+        }
+
+        void *acquire(int cls, bool hugepages) {
+            Bin &bin = m_bins[hugepages][cls];
+            {
+                std::lock_guard<std::mutex> guard(bin.mutex);
+                if (!bin.blocks.empty()) {
+                    void *block = bin.blocks.back();
+                    bin.blocks.pop_back();
+                    m_cached.fetch_sub(class_bytes(cls), std::memory_order_relaxed);
+                    m_cache_hits.fetch_add(1, std::memory_order_relaxed);
+                    return block;
+                }
+            }
+            m_cache_misses.fetch_add(1, std::memory_order_relaxed);
+            void *block = system_alloc(class_bytes(cls), hugepages);
+            const size_t reserved = m_reserved.fetch_add(class_bytes(cls), std::memory_order_relaxed) + class_bytes(cls);
+            size_t peak = m_peak_reserved.load(std::memory_order_relaxed);
+            while (reserved > peak && !m_peak_reserved.compare_exchange_weak(peak, reserved, std::memory_order_relaxed)) {
+            }
+            return block;
+        }
+
+        void release(void *block, int cls, bool hugepages) {
+            const size_t bytes = class_bytes(cls);
+            if (m_cached.fetch_add(bytes, std::memory_order_relaxed) + bytes <= DACE_ALLOCATOR_MAX_CACHED_BYTES) {
+                Bin &bin = m_bins[hugepages][cls];
+                std::lock_guard<std::mutex> guard(bin.mutex);
+                bin.blocks.push_back(block);
+                return;
+            }
+            m_cached.fetch_sub(bytes, std::memory_order_relaxed);
+            free_block(block, cls);
+        }
+
+        // Returns all cached blocks of the pool to the system
+        void trim() {
+            for (auto &bins : m_bins) {
+                for (int cls = 0; cls < NUM_CLASSES; ++cls) {
+                    std::lock_guard<std::mutex> guard(bins[cls].mutex);
+                    for (void *block : bins[cls].blocks) {
+                        m_cached.fetch_sub(class_bytes(cls), std::memory_order_relaxed);
+                        free_block(block, cls);
+                    }
+                    bins[cls].blocks.clear();
+                    bins[cls].blocks.shrink_to_fit();
+                }
+            }
+        }
+
+        void register_thread(const ThreadCounters *counters) {
+            std::lock_guard<std::mutex> guard(m_threads_mutex);
+            m_threads.push_back(counters);
+        }
+
+        void unregister_thread(const ThreadCounters *counters) {
+            std::lock_guard<std::mutex> guard(m_threads_mutex);
+            m_retired[0] += counters->allocations.load();
+            m_retired[1] += counters->deallocations.load();
+            m_retired[2] += counters->cache_hits.load();
+            m_retired[3] += counters->bytes_allocated.load();
+            m_retired[4] += counters->bytes_freed.load();
+            for (auto it = m_threads.begin(); it != m_threads.end(); ++it) {
+                if (*it == counters) {
+                    m_threads.erase(it);
+                    break;
+                }
+            }
+        }
+
+        Statistics statistics() {
+            size_t totals[5];
+            {
+                std::lock_guard<std::mutex> guard(m_threads_mutex);
+                std::copy(m_retired, m_retired + 5, totals);
+                for (const ThreadCounters *counters : m_threads) {
+                    totals[0] += counters->allocations.load(std::memory_order_relaxed);
+                    totals[1] += counters->deallocations.load(std::memory_order_relaxed);
+                    totals[2] += counters->cache_hits.load(std::memory_order_relaxed);
+                    totals[3] += counters->bytes_allocated.load(std::memory_order_relaxed);
+                    totals[4] += counters->bytes_freed.load(std::memory_order_relaxed);
+                }
+            }
+            // Blocks may be freed by a different thread than the one that
+            // allocated them, so only the sums are meaningful
+            const size_t in_use = totals[3] - totals[4];
+            const size_t reserved = m_reserved.load();
+            return Statistics{totals[0],
+                              totals[1],
+                              totals[2] + m_cache_hits.load(),
+                              m_cache_misses.load(),
+                              m_releases.load(),
+                              in_use,
+                              reserved > in_use ? reserved - in_use : 0,
+                              m_peak_reserved.load()};
+        }
+    };
+
+    /**
+     * Per-thread cache of small blocks, which serves repeated allocations in
+     * the same thread (e.g., in loops or parallel maps) without locking.
+     */
+    class ThreadCache {
+     protected:
+        struct Bin {
+            void *blocks[DACE_ALLOCATOR_THREAD_CACHE_BLOCKS];
+            int count = 0;
+        };
+        Bin m_bins[2][NUM_CLASSES];
+
+     public:
+        ThreadCounters counters;
+
+        static ThreadCache &get() {
+            static thread_local ThreadCache cache;
+            return cache;
+        }
+
+        ThreadCache() { Pool::get().register_thread(&counters); }
+
+        ~ThreadCache() {
+            flush();
+            Pool::get().unregister_thread(&counters);
+        }
+
+        void *acquire(int cls, bool hugepages) {
+            ThreadCounters::add(counters.allocations, 1);
+            ThreadCounters::add(counters.bytes_allocated, class_bytes(cls));
+            Bin &bin = m_bins[hugepages][cls];
+            if (bin.count > 0) {
+                ThreadCounters::add(counters.cache_hits, 1);
+                return bin.blocks[--bin.count];
+            }
+            return Pool::get().acquire(cls, hugepages);
+        }
+
+        void release(void *block, int cls, bool hugepages) {
+            ThreadCounters::add(counters.deallocations, 1);
+            ThreadCounters::add(counters.bytes_freed, class_bytes(cls));
+            Bin &bin = m_bins[hugepages][cls];
+            if (class_bytes(cls) <= DACE_ALLOCATOR_THREAD_CACHE_MAX_BYTES && bin.count < DACE_ALLOCATOR_THREAD_CACHE_BLOCKS) {
+                bin.blocks[bin.count++] = block;
+                return;
+            }
+            Pool::get().release(block, cls, hugepages);
+        }
+
+        // Moves all blocks of this thread to the shared pool
+        void flush() {
+            Pool &pool = Pool::get();
+            for (int huge = 0; huge < 2; ++huge) {
+                for (int cls = 0; cls < NUM_CLASSES; ++cls) {
+                    Bin &bin = m_bins[huge][cls];
+                    while (bin.count > 0)
+                        pool.release(bin.blocks[--bin.count], cls, huge != 0);
+                }
+            }
+        }
+    };
+
+    /**
+     * Allocates a 64-byte aligned array from the caching allocator. Unlike
+     * `new`, arrays of trivial types are not initialized.
+     * @tparam T:         Element type.
+     * @tparam HugePages: If true, large blocks are backed by huge pages.
+     * @param count:      Number of elements.
+     */
+    template <typename T, bool HugePages = false>
+    T *allocate(size_t count) {
+        const size_t bytes = HEADER_BYTES + (count > 0 ? count : 1) * sizeof(T);
+        const int cls = size_class(bytes);
+        const bool hugepages = HugePages && class_bytes(cls) >= HUGE_PAGE_BYTES;
+
+        char *block = static_cast<char *>(ThreadCache::get().acquire(cls, hugepages));
+        new (block) BlockHeader{cls, hugepages, count};
+        T *ptr = reinterpret_cast<T *>(block + HEADER_BYTES);
+        if (!std::is_trivially_default_constructible<T>::value) {
+            for (size_t i = 0; i < count; ++i)
+                new (ptr + i) T();
+        }
+        return ptr;
+    }
+
+    /**
+     * Returns an array obtained from `allocate` to the caching allocator.
+     */
+    template <typename T>
+    void deallocate(T *ptr) {
+        if (ptr == nullptr)
+            return;
+        char *block = reinterpret_cast<char *>(ptr) - HEADER_BYTES;
+        const BlockHeader header = *reinterpret_cast<BlockHeader *>(block);
+        if (!std::is_trivially_destructible<T>::value) {
+            for (size_t i = 0; i < header.count; ++i)
+                ptr[i].~T();
+        }
+        ThreadCache::get().release(block, header.size_class, header.hugepages);
+    }
+
+    /**
+     * Returns a snapshot of the allocator statistics.
+     */
+    inline Statistics statistics() { return Pool::get().statistics(); }
+
+    /**
+     * Returns cached blocks of the calling thread and of the shared pool to
+     * the system.
+     */
+    inline void trim() {
+        ThreadCache::get().flush();
+        Pool::get().trim();
+    }
+
+    /**
+     * Returns cached blocks of all OpenMP threads and of the shared pool to
+     * the system (called when a program is finalized).
+     */
+    inline void release() {
+#pragma omp parallel
+        ThreadCache::get().flush();
+        trim();
+    }
+
+}  // namespace allocator
+}  // namespace dace
+
+#endif  // __DACE_ALLOCATOR_H
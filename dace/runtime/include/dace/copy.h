@@ -2,6 +2,10 @@
 #ifndef __DACE_COPY_H
 #define __DACE_COPY_H
 
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+
 #include "types.h"
 #include "reduction.h"
 #include "vector.h"
@@ -398,6 +402,190 @@ namespace dace
         };
     };
 
+#if !defined(__CUDACC__) && !defined(__HIPCC__)
+    // Parallel copies of large N-dimensional subsets on CPUs. Dimensions are
+    // first normalized (unit dimensions removed, contiguous dimensions merged).
+    // Copies whose innermost dimension is the same in both arrays are split
+    // across threads in rows (or row chunks, copied with memcpy). Copies that
+    // change the layout (e.g., transposes) are split into tiles, which are
+    // recursively subdivided until they fit in the L1 cache.
+    namespace copy
+    {
+        constexpr int64_t kRowChunkBytes = 1 << 16;
+        constexpr int64_t kTileBytes = 1 << 14;
+        constexpr int64_t kBlockBytes = 1 << 10;
+
+        template <int DIMS>
+        struct Shape
+        {
+            int dims;
+            int64_t size[DIMS > 0 ? DIMS : 1];
+            int64_t src[DIMS > 0 ? DIMS : 1];
+            int64_t dst[DIMS > 0 ? DIMS : 1];
+
+            // Returns the source and destination offsets of the given
+            // (flattened) index over the first `ndims` dimensions, skipping
+            // up to two dimensions.
+            inline void offsets(int64_t index, int ndims, int skip1, int skip2,
+                                int64_t& src_offset, int64_t& dst_offset) const
+            {
+                src_offset = dst_offset = 0;
+                for (int i = ndims - 1; i >= 0; --i) {
+                    if (i == skip1 || i == skip2)
+                        continue;
+                    const int64_t idx = index % size[i];
+                    index /= size[i];
+                    src_offset += idx * src[i];
+                    dst_offset += idx * dst[i];
+                }
+            }
+        };
+
+        template <int DIMS>
+        inline Shape<DIMS> normalize(const int64_t *args)
+        {
+            Shape<DIMS> shape;
+            shape.dims = 0;
+            for (int i = 0; i < DIMS; ++i) {
+                const int64_t size = args[3 * i], src = args[3 * i + 1], dst = args[3 * i + 2];
+                if (size == 1)
+                    continue;
+                // Merge with the previous (outer) dimension if contiguous
+                const int last = shape.dims - 1;
+                if (last >= 0 && shape.src[last] == size * src && shape.dst[last] == size * dst) {
+                    shape.size[last] *= size;
+                    shape.src[last] = src;
+                    shape.dst[last] = dst;
+                    continue;
+                }
+                shape.size[shape.dims] = size;
+                shape.src[shape.dims] = src;
+                shape.dst[shape.dims] = dst;
+                ++shape.dims;
+            }
+            return shape;
+        }
+
+        // Cache-oblivious copy of a 2D block, where element (i, j) is read
+        // from src[i * sa + j * sb] and written to dst[i * da + j * db]
+        template <typename T>
+        inline void block2d(const T *__restrict__ src, T *__restrict__ dst, int64_t na, int64_t nb,
+                            int64_t sa, int64_t sb, int64_t da, int64_t db)
+        {
+            constexpr int64_t block = kBlockBytes / sizeof(T) > 4 ? kBlockBytes / sizeof(T) : 4;
+            if (na * nb <= block) {
+                for (int64_t i = 0; i < na; ++i)
+                    for (int64_t j = 0; j < nb; ++j)
+                        dst[i * da + j * db] = src[i * sa + j * sb];
+                return;
+            }
+            if (na >= nb) {
+                const int64_t half = na / 2;
+                block2d(src, dst, half, nb, sa, sb, da, db);
+                block2d(src + half * sa, dst + half * da, na - half, nb, sa, sb, da, db);
+            } else {
+                const int64_t half = nb / 2;
+                block2d(src, dst, na, half, sa, sb, da, db);
+                block2d(src + half * sb, dst + half * db, na, nb - half, sa, sb, da, db);
+            }
+        }
+
+        inline int smallest_stride(const int64_t *strides, int dims)
+        {
+            int result = dims - 1;
+            for (int i = 0; i < dims; ++i)
+                if (std::abs(strides[i]) < std::abs(strides[result]))
+                    result = i;
+            return result;
+        }
+    }  // namespace copy
+
+    template <typename T, int DIMS>
+    struct ParallelCopyND
+    {
+        // Arguments are given per dimension as (size, source stride,
+        // destination stride), as in CopyNDDynamic::Dynamic
+        template <typename... Args>
+        static void Copy(const T *src, T *dst, const Args&... args)
+        {
+            static_assert(sizeof...(args) == DIMS * 3, "Dimensionality mismatch in parallel copy");
+            const int64_t argarr[] = { int64_t(args)... };
+            const copy::Shape<DIMS> shape = copy::normalize<DIMS>(argarr);
+            const int dims = shape.dims;
+            for (int i = 0; i < dims; ++i)
+                if (shape.size[i] <= 0)
+                    return;
+            if (dims == 0) {
+                *dst = *src;
+                return;
+            }
+
+            const int sa = copy::smallest_stride(shape.src, dims);
+            const int da = copy::smallest_stride(shape.dst, dims);
+
+            if (sa == da) {
+                // Rows along the same dimension: split rows into chunks
+                const int inner = sa;
+                const int64_t rowlen = shape.size[inner];
+                const int64_t ss = shape.src[inner], ds = shape.dst[inner];
+                const int64_t chunk = copy::kRowChunkBytes / int64_t(sizeof(T)) > 0
+                                          ? copy::kRowChunkBytes / int64_t(sizeof(T)) : 1;
+                const int64_t nchunks = (rowlen + chunk - 1) / chunk;
+                int64_t rows = 1;
+                for (int i = 0; i < dims; ++i)
+                    if (i != inner)
+                        rows *= shape.size[i];
+
+                #pragma omp parallel for schedule(static)
+                for (int64_t item = 0; item < rows * nchunks; ++item) {
+                    int64_t soff, doff;
+                    shape.offsets(item / nchunks, dims, inner, -1, soff, doff);
+                    const int64_t begin = (item % nchunks) * chunk;
+                    const int64_t len = (rowlen - begin < chunk) ? rowlen - begin : chunk;
+                    const T *s = src + soff + begin * ss;
+                    T *d = dst + doff + begin * ds;
+                    if (ss == 1 && ds == 1) {
+                        std::memcpy(d, s, len * sizeof(T));
+                    } else {
+                        for (int64_t j = 0; j < len; ++j)
+                            d[j * ds] = s[j * ss];
+                    }
+                }
+                return;
+            }
+
+            // Layout-changing copy: tile the plane of the two innermost
+            // dimensions of the source and destination
+            const int64_t tile = [] {
+                int64_t t = 4;
+                while (2 * t * 2 * t * int64_t(sizeof(T)) <= copy::kTileBytes)
+                    t *= 2;
+                return t;
+            }();
+            const int64_t na = shape.size[sa], nb = shape.size[da];
+            const int64_t tiles_a = (na + tile - 1) / tile, tiles_b = (nb + tile - 1) / tile;
+            int64_t batch = 1;
+            for (int i = 0; i < dims; ++i)
+                if (i != sa && i != da)
+                    batch *= shape.size[i];
+
+            #pragma omp parallel for schedule(static)
+            for (int64_t item = 0; item < batch * tiles_a * tiles_b; ++item) {
+                const int64_t tb = item % tiles_b;
+                const int64_t ta = (item / tiles_b) % tiles_a;
+                int64_t soff, doff;
+                shape.offsets(item / (tiles_a * tiles_b), dims, sa, da, soff, doff);
+                const int64_t ia = ta * tile, ib = tb * tile;
+                // The destination-contiguous dimension is innermost
+                copy::block2d(src + soff + ia * shape.src[sa] + ib * shape.src[da],
+                              dst + doff + ia * shape.dst[sa] + ib * shape.dst[da],
+                              (na - ia < tile) ? na - ia : tile, (nb - ib < tile) ? nb - ib : tile,
+                              shape.src[sa], shape.src[da], shape.dst[sa], shape.dst[da]);
+            }
+        }
+    };
+#endif  // !defined(__CUDACC__) && !defined(__HIPCC__)
+
 }  // namespace dace
 
 #endif  // __DACE_COPY_H
@@ -15,12 +15,15 @@
 #include "vector.h"
 #include "intset.h"
 #include "math.h"
+#include "simd.h"
 #include "complex.h"
 #include "pyinterop.h"
 #include "reduction.h"
 #include "copy.h"
 #include "stream.h"
 #include "os.h"
+#include "numa.h"
+#include "allocator.h"
 #include "perf/reporting.h"
 
 #if defined(__CUDACC__) || defined(__HIPCC__)
@@ -0,0 +1,51 @@
+// Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+#ifndef __DACE_NUMA_H
+#define __DACE_NUMA_H
+
+#include <cstddef>
+#include <new>
+
+#if defined(__linux__)
+#include <sys/mman.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+namespace dace {
+namespace numa {
+
+    // Allocates zero-initialized memory whose pages are interleaved across
+    // all NUMA nodes the process may use. Falls back to a regular allocation
+    // if memory policies are not available.
+    template <typename T>
+    T *interleaved_alloc(size_t elements) {
+#if defined(__linux__) && defined(SYS_mbind)
+        const size_t bytes = (elements > 0 ? elements : 1) * sizeof(T);
+        void *ptr = mmap(nullptr, bytes, PROT_READ | PROT_WRITE, MAP_PRIVATE | MAP_ANONYMOUS, -1, 0);
+        if (ptr == MAP_FAILED)
+            throw std::bad_alloc();
+
+        // MPOL_INTERLEAVE over every node (the kernel ignores nodes that are
+        // not available). Placement is a hint, so failures are ignored.
+        const unsigned long nodemask = ~0UL;
+        const int mpol_interleave = 3;
+        syscall(SYS_mbind, ptr, bytes, mpol_interleave, &nodemask, 8 * sizeof(nodemask), 0);
+        return static_cast<T *>(ptr);
+#else
+        return new T[elements]();
+#endif
+    }
+
+    template <typename T>
+    void interleaved_free(T *ptr, size_t elements) {
+#if defined(__linux__) && defined(SYS_mbind)
+        munmap(ptr, (elements > 0 ? elements : 1) * sizeof(T));
+#else
+        delete[] ptr;
+#endif
+    }
+
+}  // namespace numa
+}  // namespace dace
+
+#endif  // __DACE_NUMA_H
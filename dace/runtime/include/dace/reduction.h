@@ -4,9 +4,14 @@
 
 #include <cstdint>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
 #include "types.h"
 #include "vector.h"
 #include "math.h"  // for ::min, ::max
+#include "simd.h"
 
 #ifdef __CUDACC__
     #include "../../../external/cub/cub/device/device_segmented_reduce.cuh"
@@ -521,6 +526,38 @@ namespace dace {
         }
     };
 
+    // Reduces all elements of a vector to a scalar
+    template <ReductionType REDTYPE, typename T, int N>
+    struct _vreduce
+    {
+        static DACE_HDFI T reduce(const dace::vec<T, N>& value)
+        {
+            T scal = value[0];
+            __DACE_UNROLL
+            for (int i = 1; i < N; ++i)
+              scal = _wcr_fixed<REDTYPE, T>()(scal, value[i]);
+            return scal;
+        }
+    };
+
+#if !defined(__CUDACC__) && !defined(__HIPCC__)
+    // On CPUs, common reductions use log2(N) vector operations
+    #define __DACE_SIMD_VREDUCE(REDTYPE, OP)                                    \
+    template <typename T, int N>                                                \
+    struct _vreduce<REDTYPE, T, N>                                              \
+    {                                                                           \
+        static inline T reduce(const dace::vec<T, N>& value)                    \
+        {                                                                       \
+            return simd::horizontal<T, N, OP>::reduce(value, OP());             \
+        }                                                                       \
+    };
+    __DACE_SIMD_VREDUCE(ReductionType::Sum, simd::plus)
+    __DACE_SIMD_VREDUCE(ReductionType::Product, simd::multiplies)
+    __DACE_SIMD_VREDUCE(ReductionType::Min, simd::minimum)
+    __DACE_SIMD_VREDUCE(ReductionType::Max, simd::maximum)
+    #undef __DACE_SIMD_VREDUCE
+#endif
+
     // When atomics are supported, use _wcr_fixed normally
     template <ReductionType REDTYPE, typename T>
     struct wcr_fixed<REDTYPE, T, EnableIfScalar<T> >
@@ -547,12 +584,7 @@ namespace dace {
         static DACE_HDFI T vreduce(T *ptr, const dace::vec<T, N>& value)
         {
             T old = *ptr;
-
-            T scal = value[0];
-            __DACE_UNROLL
-            for (int i = 1; i < N; ++i)
-              scal = _wcr_fixed<REDTYPE, T>()(scal, value[i]);
-
+            T scal = _vreduce<REDTYPE, T, N>::reduce(value);
             *ptr = _wcr_fixed<REDTYPE, T>()(old, scal);
             return old;
         }
@@ -560,16 +592,206 @@ namespace dace {
         template <int N>
         static DACE_HDFI T vreduce_atomic(T *ptr, const dace::vec<T, N>& value)
         {
-            T scal = value[0];
-            __DACE_UNROLL
-            for (int i = 1; i < N; ++i)
-              scal = _wcr_fixed<REDTYPE, T>()(scal, value[i]);
-            
+            T scal = _vreduce<REDTYPE, T, N>::reduce(value);
             return _wcr_fixed<REDTYPE, T>::reduce_atomic(ptr, scal);
         }
     };
 
 
+#if !defined(__CUDACC__) && !defined(__HIPCC__)
+    // Parallel reductions with arbitrary (associative) reduction functions on
+    // CPUs. The output and reduction dimensions are normalized (unit
+    // dimensions removed, contiguous dimensions merged). If there are enough
+    // outputs to occupy all threads, the outputs are split across threads and
+    // reduced without synchronization. Otherwise, the reduced dimensions are
+    // split into contiguous chunks, each thread reduces its chunk into a
+    // private partial result, and the partial results are combined with a
+    // parallel binary tree. Since partial results are only combined with their
+    // neighbors, in order, the reduction function does not need to be
+    // commutative.
+    namespace reduce
+    {
+        inline int max_threads()
+        {
+#ifdef _OPENMP
+            return omp_get_max_threads();
+#else
+            return 1;
+#endif
+        }
+
+        // An iteration space with two sets of strides (input and output).
+        template <int DIMS>
+        struct Space
+        {
+            int dims;
+            int64_t total;
+            int64_t size[DIMS > 0 ? DIMS : 1];
+            int64_t in[DIMS > 0 ? DIMS : 1];
+            int64_t out[DIMS > 0 ? DIMS : 1];
+
+            // Creates a space from (size, input stride[, output stride])
+            // tuples of `nargs` elements each
+            Space(const int64_t *args, int nargs) : dims(0), total(1)
+            {
+                for (int i = 0; i < DIMS; ++i) {
+                    const int64_t sz = args[nargs * i], istride = args[nargs * i + 1];
+                    const int64_t ostride = (nargs > 2) ? args[nargs * i + 2] : 0;
+                    total *= sz;
+                    if (sz == 1)
+                        continue;
+                    // Merge with the previous (outer) dimension if contiguous
+                    const int last = dims - 1;
+                    if (last >= 0 && in[last] == sz * istride && out[last] == sz * ostride) {
+                        size[last] *= sz;
+                        in[last] = istride;
+                        out[last] = ostride;
+                        continue;
+                    }
+                    size[dims] = sz;
+                    in[dims] = istride;
+                    out[dims] = ostride;
+                    ++dims;
+                }
+            }
+
+            inline void offsets(int64_t index, int64_t& in_offset, int64_t& out_offset) const
+            {
+                in_offset = out_offset = 0;
+                for (int i = dims - 1; i >= 0; --i) {
+                    const int64_t idx = index % size[i];
+                    index /= size[i];
+                    in_offset += idx * in[i];
+                    out_offset += idx * out[i];
+                }
+            }
+
+            // Calls `f(in_offset, out_offset)` for each (flattened) index in
+            // [begin, end), in order
+            template <typename F>
+            inline void iterate(int64_t begin, int64_t end, F f) const
+            {
+                if (begin >= end)
+                    return;
+                if (dims == 0) {
+                    f(int64_t(0), int64_t(0));
+                    return;
+                }
+                const int last = dims - 1;
+                int64_t idx[DIMS > 0 ? DIMS : 1];
+                int64_t ioff = 0, ooff = 0, index = begin;
+                for (int i = last; i >= 0; --i) {
+                    idx[i] = index % size[i];
+                    index /= size[i];
+                    ioff += idx[i] * in[i];
+                    ooff += idx[i] * out[i];
+                }
+                int64_t remaining = end - begin;
+                while (remaining > 0) {
+                    const int64_t n = (size[last] - idx[last] < remaining) ? (size[last] - idx[last]) : remaining;
+                    for (int64_t j = 0; j < n; ++j)
+                        f(ioff + j * in[last], ooff + j * out[last]);
+                    remaining -= n;
+                    ioff += n * in[last];
+                    ooff += n * out[last];
+                    idx[last] += n;
+                    for (int i = last; i > 0 && idx[i] == size[i]; --i) {
+                        ioff += in[i - 1] - idx[i] * in[i];
+                        ooff += out[i - 1] - idx[i] * out[i];
+                        idx[i] = 0;
+                        ++idx[i - 1];
+                    }
+                }
+            }
+        };
+    }  // namespace reduce
+
+    // Reduces `in` into `out` with the reduction function `wcr`. `odims`
+    // contains (size, input stride, output stride) tuples of the output
+    // dimensions, and `rdims` contains (size, input stride) tuples of the
+    // reduced dimensions. If `has_identity` is false, the result is
+    // accumulated into the existing contents of `out`.
+    template <int ODIMS, int RDIMS, typename TIN, typename TOUT, typename WCR>
+    inline void ParallelReduce(const TIN *in, TOUT *out, WCR wcr, const int64_t *odims, const int64_t *rdims,
+                               bool has_identity, const TOUT& identity)
+    {
+        const reduce::Space<ODIMS> ospace(odims, 3);
+        const reduce::Space<RDIMS> rspace(rdims, 2);
+        const int64_t O = ospace.total, R = rspace.total;
+        if (O <= 0)
+            return;
+        if (R <= 0) {
+            if (has_identity)
+                ospace.iterate(0, O, [&](int64_t, int64_t o) { out[o] = identity; });
+            return;
+        }
+        const int64_t threads = reduce::max_threads();
+
+        if (O >= threads || R == 1) {
+            // Enough outputs: split outputs across threads
+            const int64_t nt = (threads < O) ? threads : O;
+            // Traverse the outputs in the inner loop if they are closer in
+            // memory than the reduced elements
+            const bool outputs_inner = (ospace.dims > 0 && rspace.dims > 0 &&
+                                        ospace.in[ospace.dims - 1] < rspace.in[rspace.dims - 1]);
+            #pragma omp parallel for schedule(static)
+            for (int64_t t = 0; t < nt; ++t) {
+                const int64_t obegin = O * t / nt, oend = O * (t + 1) / nt;
+                if (outputs_inner) {
+                    if (has_identity)
+                        ospace.iterate(obegin, oend, [&](int64_t, int64_t o) { out[o] = identity; });
+                    rspace.iterate(0, R, [&](int64_t r, int64_t) {
+                        const TIN *base = in + r;
+                        ospace.iterate(obegin, oend, [&](int64_t i, int64_t o) { out[o] = wcr(out[o], base[i]); });
+                    });
+                } else {
+                    ospace.iterate(obegin, oend, [&](int64_t i, int64_t o) {
+                        const TIN *base = in + i;
+                        TOUT acc = has_identity ? identity : out[o];
+                        rspace.iterate(0, R, [&](int64_t r, int64_t) { acc = wcr(acc, base[r]); });
+                        out[o] = acc;
+                    });
+                }
+            }
+            return;
+        }
+
+        // Few outputs: privatize partial results per thread
+        const int64_t nt = (threads < R) ? threads : R;
+        TOUT *partials = new TOUT[nt * O];
+        #pragma omp parallel for schedule(static)
+        for (int64_t t = 0; t < nt; ++t) {
+            const int64_t rbegin = R * t / nt, rend = R * (t + 1) / nt;
+            int64_t first, unused;
+            rspace.offsets(rbegin, first, unused);
+            TOUT *partial = partials + t * O;
+            ospace.iterate(0, O, [&](int64_t i, int64_t) {
+                const TIN *base = in + i;
+                TOUT acc = has_identity ? wcr(identity, base[first]) : TOUT(base[first]);
+                rspace.iterate(rbegin + 1, rend, [&](int64_t r, int64_t) { acc = wcr(acc, base[r]); });
+                *partial++ = acc;
+            });
+        }
+
+        // Combine partial results with a binary tree
+        for (int64_t stride = 1; stride < nt; stride *= 2) {
+            const int64_t pairs = (nt - stride + 2 * stride - 1) / (2 * stride);
+            #pragma omp parallel for schedule(static) if (pairs * O > 1)
+            for (int64_t k = 0; k < pairs * O; ++k) {
+                const int64_t t = (k / O) * 2 * stride, o = k % O;
+                partials[t * O + o] = wcr(partials[t * O + o], partials[(t + stride) * O + o]);
+            }
+        }
+
+        int64_t index = 0;
+        ospace.iterate(0, O, [&](int64_t, int64_t o) {
+            out[o] = has_identity ? partials[index] : wcr(out[o], partials[index]);
+            ++index;
+        });
+        delete[] partials;
+    }
+#endif
+
 #ifdef __CUDACC__
     struct StridedIteratorHelper {
 	explicit StridedIteratorHelper(size_t stride)
@@ -0,0 +1,394 @@
+// Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+#ifndef __DACE_SIMD_H
+#define __DACE_SIMD_H
+
+// Explicit SIMD operations on dace::vec types for CPUs: unaligned and masked
+// loads/stores, horizontal reductions, and element-wise math functions.
+// With GCC/Clang, dace::vec types are compiler vector extensions, so
+// arithmetic already maps to SIMD instructions. Masked accesses use AVX or
+// AVX-512 intrinsics where available, and math functions are written as
+// `omp simd` loops so that vectorized math libraries (e.g., libmvec) are used.
+
+#include <cstring>
+
+#include "types.h"
+#include "vector.h"
+#include "math.h"
+
+#ifndef DACE_XILINX
+
+#if defined(__GNUC__) && (defined(__x86_64__) || defined(__i386__)) && !defined(__CUDACC__) && !defined(__HIPCC__)
+    #include <immintrin.h>
+    #define DACE_SIMD_X86
+#endif
+
+namespace dace
+{
+    namespace simd
+    {
+        // Lane-wise access that works for all vector type implementations
+        template <typename T, unsigned int N>
+        struct lanes
+        {
+            T s[N];
+
+            lanes() = default;
+            DACE_HDFI explicit lanes(const vec<T, N>& v) { std::memcpy(s, &v, sizeof(s)); }
+
+            DACE_HDFI vec<T, N> get() const
+            {
+                vec<T, N> result;
+                std::memcpy(&result, s, sizeof(s));
+                return result;
+            }
+        };
+
+        // Unaligned load and store of a full vector
+        template <typename T, unsigned int N>
+        DACE_HDFI vec<T, N> load(const T *ptr)
+        {
+            vec<T, N> result;
+            std::memcpy(&result, ptr, sizeof(result));
+            return result;
+        }
+
+        template <typename T, unsigned int N>
+        DACE_HDFI void store(T *ptr, const vec<T, N>& value)
+        {
+            std::memcpy(ptr, &value, sizeof(value));
+        }
+
+        // Masked loads and stores access only the first `count` lanes (e.g.,
+        // the remainder of a vectorized loop). Masked-off lanes of loaded
+        // vectors are zero.
+        template <typename T, unsigned int N>
+        struct masked
+        {
+            static DACE_HDFI vec<T, N> load(const T *ptr, int count)
+            {
+                lanes<T, N> result;
+                for (unsigned int i = 0; i < N; ++i)
+                    result.s[i] = (int(i) < count) ? ptr[i] : T(0);
+                return result.get();
+            }
+
+            static DACE_HDFI void store(T *ptr, const vec<T, N>& value, int count)
+            {
+                lanes<T, N> v(value);
+                for (int i = 0; i < count && i < int(N); ++i)
+                    ptr[i] = v.s[i];
+            }
+        };
+
+#ifdef DACE_SIMD_X86
+        template <typename T>
+        static inline T _lane_mask(int count)
+        {
+            // Bit mask with the lowest `count` bits set
+            return (count >= int(8 * sizeof(T))) ? T(~T(0)) : T((T(1) << count) - 1);
+        }
+
+#if defined(__AVX512F__)
+        #define __DACE_MASKED_AVX512(T, N, VT, IT, SUFFIX)                          \
+        template <>                                                                 \
+        struct masked<T, N>                                                         \
+        {                                                                           \
+            static inline vec<T, N> load(const T *ptr, int count)                   \
+            {                                                                       \
+                VT r = _mm512_maskz_loadu_##SUFFIX(_lane_mask<IT>(count), ptr);     \
+                vec<T, N> result;                                                   \
+                std::memcpy(&result, &r, sizeof(result));                           \
+                return result;                                                      \
+            }                                                                       \
+            static inline void store(T *ptr, const vec<T, N>& value, int count)     \
+            {                                                                       \
+                VT v;                                                               \
+                std::memcpy(&v, &value, sizeof(v));                                 \
+                _mm512_mask_storeu_##SUFFIX(ptr, _lane_mask<IT>(count), v);         \
+            }                                                                       \
+        };
+        __DACE_MASKED_AVX512(float, 16, __m512, __mmask16, ps)
+        __DACE_MASKED_AVX512(double, 8, __m512d, __mmask8, pd)
+        __DACE_MASKED_AVX512(dace::int32, 16, __m512i, __mmask16, epi32)
+        __DACE_MASKED_AVX512(dace::uint32, 16, __m512i, __mmask16, epi32)
+        __DACE_MASKED_AVX512(dace::int64, 8, __m512i, __mmask8, epi64)
+        __DACE_MASKED_AVX512(dace::uint64, 8, __m512i, __mmask8, epi64)
+        #undef __DACE_MASKED_AVX512
+#endif  // __AVX512F__
+
+#if defined(__AVX512F__) && defined(__AVX512VL__)
+        #define __DACE_MASKED_AVX512VL(T, N, VT, SUFFIX, WIDTH)                     \
+        template <>                                                                 \
+        struct masked<T, N>                                                         \
+        {                                                                           \
+            static inline vec<T, N> load(const T *ptr, int count)                   \
+            {                                                                       \
+                VT r = _mm##WIDTH##_maskz_loadu_##SUFFIX(                           \
+                    _lane_mask<__mmask8>(count), ptr);                              \
+                vec<T, N> result;                                                   \
+                std::memcpy(&result, &r, sizeof(result));                           \
+                return result;                                                      \
+            }                                                                       \
+            static inline void store(T *ptr, const vec<T, N>& value, int count)     \
+            {                                                                       \
+                VT v;                                                               \
+                std::memcpy(&v, &value, sizeof(v));                                 \
+                _mm##WIDTH##_mask_storeu_##SUFFIX(ptr, _lane_mask<__mmask8>(count), \
+                                                  v);                               \
+            }                                                                       \
+        };
+        __DACE_MASKED_AVX512VL(float, 8, __m256, ps, 256)
+        __DACE_MASKED_AVX512VL(double, 4, __m256d, pd, 256)
+        __DACE_MASKED_AVX512VL(float, 4, __m128, ps, )
+        __DACE_MASKED_AVX512VL(double, 2, __m128d, pd, )
+        __DACE_MASKED_AVX512VL(dace::int32, 8, __m256i, epi32, 256)
+        __DACE_MASKED_AVX512VL(dace::int64, 4, __m256i, epi64, 256)
+        #undef __DACE_MASKED_AVX512VL
+#elif defined(__AVX2__)
+        // AVX2 masked moves use the sign bit of each lane of an integer vector
+        // as the mask
+        static inline __m256i _avx_mask32(int count)
+        {
+            const __m256i lanes = _mm256_setr_epi32(0, 1, 2, 3, 4, 5, 6, 7);
+            return _mm256_cmpgt_epi32(_mm256_set1_epi32(count), lanes);
+        }
+        static inline __m256i _avx_mask64(int count)
+        {
+            const __m256i lanes = _mm256_setr_epi64x(0, 1, 2, 3);
+            return _mm256_cmpgt_epi64(_mm256_set1_epi64x(count), lanes);
+        }
+
+        #define __DACE_MASKED_AVX(T, N, VT, LOAD, STORE, MASK, PTRCAST)             \
+        template <>                                                                 \
+        struct masked<T, N>                                                         \
+        {                                                                           \
+            static inline vec<T, N> load(const T *ptr, int count)                   \
+            {                                                                       \
+                VT r = LOAD((const PTRCAST *)ptr, MASK(count));                     \
+                vec<T, N> result;                                                   \
+                std::memcpy(&result, &r, sizeof(result));                           \
+                return result;                                                      \
+            }                                                                       \
+            static inline void store(T *ptr, const vec<T, N>& value, int count)     \
+            {                                                                       \
+                VT v;                                                               \
+                std::memcpy(&v, &value, sizeof(v));                                 \
+                STORE((PTRCAST *)ptr, MASK(count), v);                              \
+            }                                                                       \
+        };
+        __DACE_MASKED_AVX(float, 8, __m256, _mm256_maskload_ps, _mm256_maskstore_ps, _avx_mask32, float)
+        __DACE_MASKED_AVX(double, 4, __m256d, _mm256_maskload_pd, _mm256_maskstore_pd, _avx_mask64, double)
+        __DACE_MASKED_AVX(dace::int32, 8, __m256i, _mm256_maskload_epi32, _mm256_maskstore_epi32, _avx_mask32, int)
+        __DACE_MASKED_AVX(dace::uint32, 8, __m256i, _mm256_maskload_epi32, _mm256_maskstore_epi32,
+                          _avx_mask32, int)
+        __DACE_MASKED_AVX(dace::int64, 4, __m256i, _mm256_maskload_epi64, _mm256_maskstore_epi64, _avx_mask64,
+                          long long)
+        __DACE_MASKED_AVX(dace::uint64, 4, __m256i, _mm256_maskload_epi64, _mm256_maskstore_epi64,
+                          _avx_mask64, long long)
+        #undef __DACE_MASKED_AVX
+#endif  // __AVX512VL__ / __AVX2__
+#endif  // DACE_SIMD_X86
+
+        template <typename T, unsigned int N>
+        DACE_HDFI vec<T, N> load_masked(const T *ptr, int count)
+        {
+            return masked<T, N>::load(ptr, count);
+        }
+
+        template <typename T, unsigned int N>
+        DACE_HDFI void store_masked(T *ptr, const vec<T, N>& value, int count)
+        {
+            masked<T, N>::store(ptr, value, count);
+        }
+
+    }  // namespace simd
+}  // namespace dace
+
+#if !defined(__CUDACC__) && !defined(__HIPCC__)
+
+namespace dace
+{
+    namespace simd
+    {
+        // Horizontal reductions: the vector is repeatedly split in half and
+        // the halves are combined with a vector operation, which requires
+        // log2(N) vector operations instead of N - 1 scalar ones.
+        struct plus { template <typename V> inline V operator()(const V& a, const V& b) const { return a + b; } };
+        struct multiplies { template <typename V> inline V operator()(const V& a, const V& b) const { return a * b; } };
+        struct minimum { template <typename V> inline V operator()(const V& a, const V& b) const { return (a < b) ? a : b; } };
+        struct maximum { template <typename V> inline V operator()(const V& a, const V& b) const { return (a > b) ? a : b; } };
+
+        template <typename T, unsigned int N, typename Op>
+        struct horizontal
+        {
+            static inline T reduce(const vec<T, N>& value, Op op)
+            {
+#if defined(__GNUC__)
+                vec<T, N / 2> lo, hi;
+                std::memcpy(&lo, &value, sizeof(lo));
+                std::memcpy(&hi, reinterpret_cast<const char *>(&value) + sizeof(lo), sizeof(hi));
+                return horizontal<T, N / 2, Op>::reduce(op(lo, hi), op);
+#else
+                lanes<T, N> v(value);
+                T result = v.s[0];
+                for (unsigned int i = 1; i < N; ++i)
+                    result = op(result, v.s[i]);
+                return result;
+#endif
+            }
+        };
+
+        template <typename T, typename Op>
+        struct horizontal<T, 1, Op>
+        {
+            static inline T reduce(const T& value, Op) { return value; }
+        };
+
+        template <typename T, unsigned int N>
+        inline T reduce_sum(const vec<T, N>& value) { return horizontal<T, N, plus>::reduce(value, plus()); }
+        template <typename T, unsigned int N>
+        inline T reduce_product(const vec<T, N>& value) { return horizontal<T, N, multiplies>::reduce(value, multiplies()); }
+        template <typename T, unsigned int N>
+        inline T reduce_min(const vec<T, N>& value) { return horizontal<T, N, minimum>::reduce(value, minimum()); }
+        template <typename T, unsigned int N>
+        inline T reduce_max(const vec<T, N>& value) { return horizontal<T, N, maximum>::reduce(value, maximum()); }
+
+        // Applies a scalar function to every lane of a vector
+        template <typename T, unsigned int N, typename F>
+        inline vec<T, N> map(const vec<T, N>& a, F func)
+        {
+            lanes<T, N> x(a), result;
+            #pragma omp simd
+            for (unsigned int i = 0; i < N; ++i)
+                result.s[i] = func(x.s[i]);
+            return result.get();
+        }
+
+        template <typename T, unsigned int N, typename F>
+        inline vec<T, N> map(const vec<T, N>& a, const vec<T, N>& b, F func)
+        {
+            lanes<T, N> x(a), y(b), result;
+            #pragma omp simd
+            for (unsigned int i = 0; i < N; ++i)
+                result.s[i] = func(x.s[i], y.s[i]);
+            return result.get();
+        }
+
+        // Square roots map to a single instruction
+        template <typename T, unsigned int N>
+        inline vec<T, N> sqrt(const vec<T, N>& a)
+        {
+            return map<T, N>(a, [](T x) { return (T)std::sqrt(x); });
+        }
+
+#ifdef DACE_SIMD_X86
+        #define __DACE_SIMD_SQRT(T, N, VT, INTRINSIC)                               \
+        template <>                                                                 \
+        inline vec<T, N> sqrt<T, N>(const vec<T, N>& a)                             \
+        {                                                                           \
+            VT v;                                                                   \
+            std::memcpy(&v, &a, sizeof(v));                                         \
+            v = INTRINSIC(v);                                                       \
+            vec<T, N> result;                                                       \
+            std::memcpy(&result, &v, sizeof(result));                               \
+            return result;                                                          \
+        }
+#if defined(__SSE2__)
+        __DACE_SIMD_SQRT(float, 4, __m128, _mm_sqrt_ps)
+        __DACE_SIMD_SQRT(double, 2, __m128d, _mm_sqrt_pd)
+#endif
+#if defined(__AVX__)
+        __DACE_SIMD_SQRT(float, 8, __m256, _mm256_sqrt_ps)
+        __DACE_SIMD_SQRT(double, 4, __m256d, _mm256_sqrt_pd)
+#endif
+#if defined(__AVX512F__)
+        __DACE_SIMD_SQRT(float, 16, __m512, _mm512_sqrt_ps)
+        __DACE_SIMD_SQRT(double, 8, __m512d, _mm512_sqrt_pd)
+#endif
+        #undef __DACE_SIMD_SQRT
+#endif  // DACE_SIMD_X86
+    }  // namespace simd
+}  // namespace dace
+
+// Element-wise math functions on floating-point vectors. These are
+// non-template overloads, so that they take precedence over the generic
+// scalar templates in dace::math and the global namespace.
+#define __DACE_SIMD_UNARY(FUNC, T, N)                                               \
+    static inline dace::vec<T, N> FUNC(const dace::vec<T, N>& a)                    \
+    {                                                                               \
+        return dace::simd::map<T, N>(a, [](T x) { return (T)std::FUNC(x); });       \
+    }
+#define __DACE_SIMD_BINARY(FUNC, T, N)                                              \
+    static inline dace::vec<T, N> FUNC(const dace::vec<T, N>& a,                    \
+                                       const dace::vec<T, N>& b)                    \
+    {                                                                               \
+        return dace::simd::map<T, N>(a, b, [](T x, T y) { return (T)std::FUNC(x, y); }); \
+    }                                                                               \
+    static inline dace::vec<T, N> FUNC(const dace::vec<T, N>& a, const T& b)        \
+    {                                                                               \
+        return dace::simd::map<T, N>(a, [b](T x) { return (T)std::FUNC(x, b); });   \
+    }                                                                               \
+    static inline dace::vec<T, N> FUNC(const dace::vec<T, N>& a, const int& b)      \
+    {                                                                               \
+        return FUNC(a, T(b));                                                       \
+    }
+#define __DACE_SIMD_SQRT(T, N)                                                      \
+    static inline dace::vec<T, N> sqrt(const dace::vec<T, N>& a)                    \
+    {                                                                               \
+        return dace::simd::sqrt<T, N>(a);                                           \
+    }
+
+#define __DACE_SIMD_ALLSIZES(MACRO, ...)                                            \
+    MACRO(__VA_ARGS__, float, 2) MACRO(__VA_ARGS__, float, 4)                       \
+    MACRO(__VA_ARGS__, float, 8) MACRO(__VA_ARGS__, float, 16)                      \
+    MACRO(__VA_ARGS__, float, 32) MACRO(__VA_ARGS__, double, 2)                     \
+    MACRO(__VA_ARGS__, double, 4) MACRO(__VA_ARGS__, double, 8)                     \
+    MACRO(__VA_ARGS__, double, 16) MACRO(__VA_ARGS__, double, 32)
+#define __DACE_SIMD_ALLSIZES_NOARGS(MACRO)                                          \
+    MACRO(float, 2) MACRO(float, 4) MACRO(float, 8) MACRO(float, 16)                \
+    MACRO(float, 32) MACRO(double, 2) MACRO(double, 4) MACRO(double, 8)             \
+    MACRO(double, 16) MACRO(double, 32)
+
+#define __DACE_SIMD_MATH_FUNCTIONS                                                  \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, exp)                                    \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, log)                                    \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, sin)                                    \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, cos)                                    \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, tan)                                    \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, sinh)                                   \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, cosh)                                   \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, tanh)                                   \
+    __DACE_SIMD_ALLSIZES(__DACE_SIMD_BINARY, pow)                                   \
+    __DACE_SIMD_ALLSIZES_NOARGS(__DACE_SIMD_SQRT)
+
+// Global namespace (unqualified calls in tasklets)
+__DACE_SIMD_MATH_FUNCTIONS
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, log2)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, log10)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, asin)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, acos)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, atan)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, floor)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, ceil)
+__DACE_SIMD_ALLSIZES(__DACE_SIMD_UNARY, abs)
+
+namespace dace
+{
+    namespace math
+    {
+        __DACE_SIMD_MATH_FUNCTIONS
+    }
+}
+
+#undef __DACE_SIMD_MATH_FUNCTIONS
+#undef __DACE_SIMD_ALLSIZES_NOARGS
+#undef __DACE_SIMD_ALLSIZES
+#undef __DACE_SIMD_SQRT
+#undef __DACE_SIMD_BINARY
+#undef __DACE_SIMD_UNARY
+
+#endif  // !defined(__CUDACC__) && !defined(__HIPCC__)
+
+#endif  // DACE_XILINX
+
+#endif  // __DACE_SIMD_H
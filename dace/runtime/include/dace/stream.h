@@ -7,6 +7,8 @@
 // Consume
 #include <thread>
 #include <atomic>
+#include <stdexcept>
+#include <utility>
 #include <vector>
 
 #include "vector.h"
@@ -69,6 +71,14 @@ namespace dace {
     template <typename T, bool ALIGNED = false>
     class Stream;
 
+    // Lock-free streams for known producer/consumer multiplicities
+    template <typename T>
+    class SPSCStream;
+    template <typename T>
+    class MPSCStream;
+    template <typename Derived, typename T>
+    class RingBufferStream;
+
     // Performance can be increased by removing qsize, but this is necessary for
     // consume to work for now.
     template <typename T, bool ALIGNED>
@@ -76,6 +86,7 @@ namespace dace {
     protected:
         BlockingConcurrentQueue<T> m_queue;
     public:
+        typedef T value_type;
         std::atomic<unsigned int> m_elements;
 
         Stream(size_t capacity = 6 * ConcurrentQueueDefaultTraits::BLOCK_SIZE) :
@@ -154,6 +165,14 @@ namespace dace {
             return result;
         }
 
+        // Used by consume scopes: elements that were pushed and not processed
+        inline bool has_pending() const {
+            return m_elements > 0;
+        }
+        inline void processed(size_t count) {
+            m_elements -= count;
+        }
+
     };
 
     // Stream implementation with a direct array connection
@@ -168,6 +187,7 @@ namespace dace {
         friend class ArrayStreamViewThreadlocal<T, !ALIGNED>;
         friend class Stream<T, ALIGNED>;
         friend class Stream<T, !ALIGNED>;
+        template <typename, typename> friend class RingBufferStream;
 
     public:
         static constexpr bool aligned = ALIGNED;
@@ -252,6 +272,7 @@ namespace dace {
         friend class ArrayStreamView<T, !ALIGNED>;
         friend class Stream<T, ALIGNED>;
         friend class Stream<T, !ALIGNED>;
+        template <typename, typename> friend class RingBufferStream;
 
     public:
         static constexpr bool aligned = ALIGNED;
@@ -333,23 +354,344 @@ namespace dace {
         }
     };
 
+#ifndef DACE_CACHE_LINE_SIZE
+#define DACE_CACHE_LINE_SIZE 64
+#endif
+
+#ifndef DACE_STREAM_MAX_PRODUCERS
+#define DACE_STREAM_MAX_PRODUCERS 256
+#endif
+
+    // Single-producer, single-consumer queue of bounded ring buffers. If the
+    // current ring buffer is full, the producer continues in a new one of
+    // twice the capacity, which the consumer switches to after emptying (and
+    // freeing) the previous one. The indices written by the producer and
+    // the consumer reside on separate cache lines, and each side caches the
+    // last index it observed from the other side.
+    template <typename T>
+    class SPSCRingBuffer {
+    protected:
+        struct Ring {
+            std::atomic<size_t> head;  // Written by the consumer
+            char pad0[DACE_CACHE_LINE_SIZE - sizeof(std::atomic<size_t>)];
+            std::atomic<size_t> tail;  // Written by the producer
+            char pad1[DACE_CACHE_LINE_SIZE - sizeof(std::atomic<size_t>)];
+            std::atomic<Ring *> next;
+            const size_t mask;
+            T * const data;
+
+            explicit Ring(size_t capacity) : head(0), tail(0), next(nullptr),
+                mask(capacity - 1), data(new T[capacity]) {}
+            ~Ring() { delete[] data; }
+        };
+
+        // Consumer state
+        Ring *m_front;
+        size_t m_tail_cache;
+        char pad0[DACE_CACHE_LINE_SIZE - sizeof(Ring *) - sizeof(size_t)];
+        // Producer state
+        Ring *m_back;
+        size_t m_head_cache;
+        char pad1[DACE_CACHE_LINE_SIZE - sizeof(Ring *) - sizeof(size_t)];
+
+        static size_t round_capacity(size_t capacity) {
+            size_t result = 2;
+            while (result < capacity) result *= 2;
+            return result;
+        }
+
+    public:
+        explicit SPSCRingBuffer(size_t capacity) : m_tail_cache(0), m_head_cache(0) {
+            m_front = m_back = new Ring(round_capacity(capacity));
+        }
+        SPSCRingBuffer(const SPSCRingBuffer&) = delete;
+        SPSCRingBuffer& operator=(const SPSCRingBuffer&) = delete;
+
+        ~SPSCRingBuffer() {
+            while (m_front != nullptr) {
+                Ring *next = m_front->next.load(std::memory_order_relaxed);
+                delete m_front;
+                m_front = next;
+            }
+        }
+
+        // Producer side
+        template <typename U>
+        inline void enqueue(U&& val) {
+            Ring *r = m_back;
+            const size_t tail = r->tail.load(std::memory_order_relaxed);
+            if (tail - m_head_cache > r->mask) {
+                m_head_cache = r->head.load(std::memory_order_acquire);
+                if (tail - m_head_cache > r->mask) {
+                    // Full: continue in a larger ring buffer
+                    Ring *next = new Ring(2 * (r->mask + 1));
+                    next->data[0] = std::forward<U>(val);
+                    next->tail.store(1, std::memory_order_relaxed);
+                    r->next.store(next, std::memory_order_release);
+                    m_back = next;
+                    m_head_cache = 0;
+                    return;
+                }
+            }
+            r->data[tail & r->mask] = std::forward<U>(val);
+            r->tail.store(tail + 1, std::memory_order_release);
+        }
+
+        // Consumer side
+        inline bool try_dequeue(T& item) {
+            Ring *r = m_front;
+            const size_t head = r->head.load(std::memory_order_relaxed);
+            if (head == m_tail_cache) {
+                m_tail_cache = r->tail.load(std::memory_order_acquire);
+                if (head == m_tail_cache) {
+                    Ring *next = r->next.load(std::memory_order_acquire);
+                    if (next == nullptr)
+                        return false;
+                    // The tail is final once the producer moved on
+                    m_tail_cache = r->tail.load(std::memory_order_acquire);
+                    if (head == m_tail_cache) {
+                        m_front = next;
+                        m_tail_cache = 0;
+                        delete r;
+                        return try_dequeue(item);
+                    }
+                }
+            }
+            item = std::move(r->data[head & r->mask]);
+            r->head.store(head + 1, std::memory_order_release);
+            return true;
+        }
+
+        inline bool empty() const {
+            for (Ring *r = m_front; r != nullptr; r = r->next.load(std::memory_order_acquire)) {
+                if (r->head.load(std::memory_order_relaxed) != r->tail.load(std::memory_order_acquire))
+                    return false;
+            }
+            return true;
+        }
+    };
+
+    // Common stream interface of lock-free streams. Elements are not counted
+    // separately: since there is only one consumer, the stream has pending
+    // elements in a consume scope as long as it is not empty.
+    template <typename Derived, typename T>
+    class RingBufferStream {
+    protected:
+        inline Derived& self() { return *static_cast<Derived *>(this); }
+        inline const Derived& self() const { return *static_cast<const Derived *>(this); }
+
+    public:
+        typedef T value_type;
+
+        inline void pop(T& item, bool noupdate = false) {
+            while (!self().try_dequeue(item))
+                std::this_thread::yield();
+        }
+        inline T pop(bool noupdate = false) {
+            T item;
+            pop(item, noupdate);
+            return item;
+        }
+        inline size_t pop(T *valarr, int max_size, bool noupdate = false) {
+            size_t result;
+            while ((result = pop_try(valarr, max_size, noupdate)) == 0)
+                std::this_thread::yield();
+            return result;
+        }
+        inline bool pop_try(T& output, bool noupdate = false) {
+            return self().try_dequeue(output);
+        }
+        inline size_t pop_try(T *valarr, int max_size, bool noupdate = false) {
+            size_t result = 0;
+            while (result < (size_t)max_size && self().try_dequeue(valarr[result]))
+                ++result;
+            return result;
+        }
+
+        inline void push(T const& val) {
+            self().enqueue(val);
+        }
+        inline void push(T&& val) {
+            self().enqueue(std::move(val));
+        }
+        inline void push(const T *valarr, int size) {
+            for (int i = 0; i < size; ++i)
+                self().enqueue(valarr[i]);
+        }
+
+        template <bool A>
+        void push(const ArrayStreamView<T, A>& s) {
+            push(s.m_array, s.m_elements);
+        }
+
+        template <bool A>
+        void push(const ArrayStreamViewThreadlocal<T, A>& s) {
+            push(s.m_array, s.m_elements);
+        }
+
+        // Streams grow when their ring buffers are full, so pushing always
+        // succeeds
+        inline bool push_try(T const& val) {
+            push(val);
+            return true;
+        }
+        inline bool push_try(T&& val) {
+            push(std::move(val));
+            return true;
+        }
+        inline bool push_try(const T *valarr, int size) {
+            push(valarr, size);
+            return true;
+        }
+
+        inline bool has_pending() const {
+            return !self().empty();
+        }
+        inline void processed(size_t count) {}
+    };
+
+    // Stream with at most one concurrent producer and one concurrent consumer
+    template <typename T>
+    class SPSCStream : public RingBufferStream<SPSCStream<T>, T> {
+    protected:
+        SPSCRingBuffer<T> m_queue;
+
+    public:
+        explicit SPSCStream(size_t capacity = 1024) : m_queue(capacity) {}
+
+        template <typename U>
+        inline void enqueue(U&& val) {
+            m_queue.enqueue(std::forward<U>(val));
+        }
+        inline bool try_dequeue(T& item) {
+            return m_queue.try_dequeue(item);
+        }
+        inline bool empty() const {
+            return m_queue.empty();
+        }
+    };
+
+    // Stream with multiple concurrent producers and at most one concurrent
+    // consumer. Every producer thread pushes to its own single-producer queue
+    // (registered on its first push), which keeps pushes free of contention,
+    // and the consumer drains the queues in turn.
+    template <typename T>
+    class MPSCStream : public RingBufferStream<MPSCStream<T>, T> {
+    protected:
+        struct Producer {
+            const std::thread::id owner;
+            SPSCRingBuffer<T> queue;
+
+            Producer(std::thread::id owner, size_t capacity) : owner(owner), queue(capacity) {}
+        };
+
+        const size_t m_capacity;
+        const size_t m_id;
+        std::atomic<size_t> m_num_producers;
+        std::atomic<Producer *> m_producers[DACE_STREAM_MAX_PRODUCERS];
+        size_t m_current;  // Queue the consumer currently reads from
+
+        static size_t new_id() {
+            static std::atomic<size_t> counter(0);
+            return ++counter;
+        }
+
+        inline size_t num_producers() const {
+            size_t result = m_num_producers.load(std::memory_order_acquire);
+            return result < DACE_STREAM_MAX_PRODUCERS ? result : DACE_STREAM_MAX_PRODUCERS;
+        }
+
+        SPSCRingBuffer<T>& producer_queue() {
+            // Streams are identified by a unique ID rather than their address,
+            // which may be reused by another stream
+            static thread_local size_t cached_id = 0;
+            static thread_local SPSCRingBuffer<T> *cached_queue = nullptr;
+            if (cached_id == m_id)
+                return *cached_queue;
+
+            const std::thread::id thread_id = std::this_thread::get_id();
+            Producer *producer = nullptr;
+            const size_t num = num_producers();
+            for (size_t i = 0; i < num; ++i) {
+                Producer *p = m_producers[i].load(std::memory_order_acquire);
+                if (p != nullptr && p->owner == thread_id) {
+                    producer = p;
+                    break;
+                }
+            }
+            if (producer == nullptr) {
+                const size_t index = m_num_producers.fetch_add(1);
+                if (index >= DACE_STREAM_MAX_PRODUCERS)
+                    throw std::runtime_error("Too many producer threads for stream (increase DACE_STREAM_MAX_PRODUCERS)");
+                producer = new Producer(thread_id, m_capacity);
+                m_producers[index].store(producer, std::memory_order_release);
+            }
+            cached_id = m_id;
+            cached_queue = &producer->queue;
+            return producer->queue;
+        }
+
+    public:
+        explicit MPSCStream(size_t capacity = 1024) : m_capacity(capacity), m_id(new_id()), m_num_producers(0),
+                                                       m_current(0) {
+            for (auto& p : m_producers)
+                p.store(nullptr, std::memory_order_relaxed);
+        }
+        MPSCStream(const MPSCStream&) = delete;
+        MPSCStream& operator=(const MPSCStream&) = delete;
+
+        ~MPSCStream() {
+            const size_t num = num_producers();
+            for (size_t i = 0; i < num; ++i)
+                delete m_producers[i].load(std::memory_order_relaxed);
+        }
+
+        template <typename U>
+        inline void enqueue(U&& val) {
+            producer_queue().enqueue(std::forward<U>(val));
+        }
+
+        inline bool try_dequeue(T& item) {
+            const size_t num = num_producers();
+            for (size_t i = 0; i < num; ++i) {
+                const size_t index = (m_current + i) % num;
+                Producer *p = m_producers[index].load(std::memory_order_acquire);
+                if (p != nullptr && p->queue.try_dequeue(item)) {
+                    m_current = index;
+                    return true;
+                }
+            }
+            return false;
+        }
+
+        inline bool empty() const {
+            const size_t num = num_producers();
+            for (size_t i = 0; i < num; ++i) {
+                Producer *p = m_producers[i].load(std::memory_order_acquire);
+                if (p != nullptr && !p->queue.empty())
+                    return false;
+            }
+            return true;
+        }
+    };
+
     template <int CHUNKSIZE = 1>
     struct Consume;
 
     template <int CHUNKSIZE>
     struct Consume {
-        template <template <typename, bool> typename StreamT, typename T, bool ALIGNED,
-                  typename Functor>
-        static void consume(StreamT<T, ALIGNED>& stream, unsigned num_threads,
+        template <typename StreamT, typename Functor>
+        static void consume(StreamT& stream, unsigned num_threads,
                             Functor&& contents) {
+            typedef typename StreamT::value_type T;
             std::vector<std::thread> threads;
             auto thread_contents = [&](int pe) {
                 T consumed_elements[CHUNKSIZE];
-                while (stream.m_elements > 0) {
+                while (stream.has_pending()) {
                     size_t elems = stream.pop_try(consumed_elements, CHUNKSIZE, true);
                     if (elems > 0) {
                         contents(pe, consumed_elements, elems);
-                        stream.m_elements -= elems;
+                        stream.processed(elems);
                     }
                 }
             };
@@ -359,10 +701,10 @@ namespace dace {
             for (auto& t : threads) t.join();
         }
 
-        template <template <typename, bool> typename StreamT, typename T, bool ALIGNED,
-                  typename CondFunctor, typename Functor>
-        static void consume_cond(StreamT<T, ALIGNED>& stream, unsigned num_threads,
+        template <typename StreamT, typename CondFunctor, typename Functor>
+        static void consume_cond(StreamT& stream, unsigned num_threads,
                                  CondFunctor&& quiescence, Functor&& contents) {
+            typedef typename StreamT::value_type T;
             std::vector<std::thread> threads;
             auto thread_contents = [&](int pe) {
                 T consumed_elements[CHUNKSIZE];
@@ -370,7 +712,7 @@ namespace dace {
                     size_t elems = stream.pop_try(consumed_elements, CHUNKSIZE, true);
                     if (elems > 0) {
                         contents(pe, consumed_elements, elems);
-                        stream.m_elements -= elems;
+                        stream.processed(elems);
                     }
                 }
             };
@@ -384,17 +726,17 @@ namespace dace {
     // Specialization for consumption of 1 element
     template<>
     struct Consume<1> {
-        template <template <typename, bool> typename StreamT, typename T, bool ALIGNED,
-                  typename Functor>
-        static void consume(StreamT<T, ALIGNED>& stream, unsigned num_threads,
+        template <typename StreamT, typename Functor>
+        static void consume(StreamT& stream, unsigned num_threads,
                             Functor&& contents) {
+            typedef typename StreamT::value_type T;
             std::vector<std::thread> threads;
             auto thread_contents = [&](int pe) {
                 T consumed_element;
-                while (stream.m_elements > 0) {
+                while (stream.has_pending()) {
                     if (stream.pop_try(consumed_element, true)) {
                         contents(pe, consumed_element);
-                        stream.m_elements--;
+                        stream.processed(1);
                     }
                 }
             };
@@ -404,17 +746,17 @@ namespace dace {
             for (auto& t : threads) t.join();
         }
 
-        template <template <typename, bool> typename StreamT, typename T, bool ALIGNED,
-                  typename CondFunctor, typename Functor>
-        static void consume_cond(StreamT<T, ALIGNED>& stream, unsigned num_threads,
+        template <typename StreamT, typename CondFunctor, typename Functor>
+        static void consume_cond(StreamT& stream, unsigned num_threads,
                                  CondFunctor&& quiescence, Functor&& contents) {
+            typedef typename StreamT::value_type T;
             std::vector<std::thread> threads;
             auto thread_contents = [&](int pe) {
                 T consumed_element;
                 while (!quiescence()) {
                     if (stream.pop_try(consumed_element, true)) {
                         contents(pe, consumed_element);
-                        stream.m_elements--;
+                        stream.processed(1);
                     }
                 }
             };
@@ -4,6 +4,7 @@
 
 #include <cstdint>
 #include <complex>
+#include <cstring>
 
 #ifdef _MSC_VER
     //#define DACE_ALIGN(N) __declspec( align(N) )
@@ -61,6 +62,13 @@
     #define __DACE_UNROLL
 #endif
 
+// Software prefetching (rw: 0 for reads, 1 for writes; locality: 0-3)
+#if defined(__GNUC__) || defined(__clang__)
+    #define DACE_PREFETCH(addr, rw, locality) __builtin_prefetch((addr), (rw), (locality))
+#else
+    #define DACE_PREFETCH(addr, rw, locality)
+#endif
+
 
 
 namespace dace
@@ -87,13 +95,58 @@ namespace dace
     typedef std::complex<float> complex64;
     typedef std::complex<double> complex128;
     struct half {
-        // source: https://stackoverflow.com/a/26779139/15853075
+        // IEEE 754 binary16 storage, converted from and to float with
+        // round-to-nearest-even (including subnormals, infinities and NaN)
+        half() = default;
         half(float f) {
-            uint32_t x = *((uint32_t*)&f);
-            h = ((x>>16)&0x8000)|((((x&0x7f800000)-0x38000000)>>13)&0x7c00)|((x>>13)&0x03ff);
+            uint32_t x;
+            std::memcpy(&x, &f, sizeof(x));
+            uint32_t sign = (x >> 16) & 0x8000, mant = x & 0x7fffff;
+            int exp = int((x >> 23) & 0xff) - 127 + 15;
+            if (exp == 0xff - 127 + 15) {
+                h = uint16_t(sign | 0x7c00 | (mant ? 0x200 : 0));
+            } else if (exp >= 31) {
+                h = uint16_t(sign | 0x7c00);
+            } else if (exp <= 0) {
+                if (exp < -10) {
+                    h = uint16_t(sign);
+                    return;
+                }
+                mant |= 0x800000;
+                int shift = 14 - exp;
+                uint32_t r = mant >> shift, rem = mant & ((1u << shift) - 1), mid = 1u << (shift - 1);
+                if (rem > mid || (rem == mid && (r & 1)))
+                    ++r;
+                h = uint16_t(sign | r);
+            } else {
+                uint32_t r = sign | (uint32_t(exp) << 10) | (mant >> 13), rem = mant & 0x1fff;
+                if (rem > 0x1000 || (rem == 0x1000 && (r & 1)))
+                    ++r;  // May carry into the exponent, which rounds correctly
+                h = uint16_t(r);
+            }
         }
-        operator float() {
-            float f = ((h&0x8000)<<16) | (((h&0x7c00)+0x1C000)<<13) | ((h&0x03FF)<<13);
+        operator float() const {
+            uint32_t sign = uint32_t(h & 0x8000) << 16, mant = h & 0x3ff, x;
+            int exp = (h >> 10) & 0x1f;
+            if (exp == 0x1f) {
+                x = sign | 0x7f800000 | (mant << 13);
+            } else if (exp == 0) {
+                if (mant == 0) {
+                    x = sign;
+                } else {
+                    // Normalize subnormal values
+                    exp = 1;
+                    while (!(mant & 0x400)) {
+                        mant <<= 1;
+                        --exp;
+                    }
+                    x = sign | (uint32_t(exp + 112) << 23) | ((mant & 0x3ff) << 13);
+                }
+            } else {
+                x = sign | (uint32_t(exp + 112) << 23) | (mant << 13);
+            }
+            float f;
+            std::memcpy(&f, &x, sizeof(f));
             return f;
         }
         uint16_t h;
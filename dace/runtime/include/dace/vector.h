@@ -322,7 +322,7 @@ namespace dace
     template <typename T1, typename T2, unsigned int N>
     vec<T1, N> xtoy(vec<T2, N> x) {
         vec<T1, N> y;
-        for (int i = 0; i < 4; ++i)
+        for (unsigned int i = 0; i < N; ++i)
             y[i] = x[i];
         return y;
     }
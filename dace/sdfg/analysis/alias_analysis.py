@@ -0,0 +1,281 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Alias analysis on data containers, used to determine where code generators
+    can emit ``__restrict__`` qualifiers and vectorization pragmas. """
+
+import re
+from typing import Optional, Set, Tuple
+
+import sympy
+
+from dace import data, dtypes, subsets, symbolic
+from dace.memlet import Memlet
+from dace.sdfg import nodes, utils as sdutil
+from dace.sdfg.sdfg import SDFG
+from dace.sdfg.state import SDFGState
+
+
+def _subset_on(memlet: Memlet, dataname: str) -> Optional[subsets.Subset]:
+    """ Returns the subset of a memlet that refers to the given data. """
+    if memlet.data == dataname:
+        return memlet.subset
+    return memlet.other_subset
+
+
+def _may_intersect(a: Optional[subsets.Subset], b: Optional[subsets.Subset]) -> bool:
+    if a is None or b is None:
+        return True
+    try:
+        return subsets.intersects(a, b) is not False
+    except TypeError:
+        return True
+
+
+def resolve_view(sdfg: SDFG, state: SDFGState, node: nodes.AccessNode,
+                 subset: Optional[subsets.Subset]) -> Tuple[nodes.AccessNode, Optional[subsets.Subset]]:
+    """
+    Follows a chain of views to the viewed data container.
+
+    :param sdfg: The SDFG containing the access node.
+    :param state: The state containing the access node.
+    :param node: The access node to resolve.
+    :param subset: The accessed subset of the access node, or None if unknown.
+    :return: A 2-tuple of the access node of the viewed (non-view) data and
+             the accessed subset on it. If a view cannot be resolved, the
+             view node itself is returned. Subsets accessed through views are
+             over-approximated by the entire viewed region.
+    """
+    while isinstance(sdfg.arrays[node.data], data.View):
+        edge = sdutil.get_view_edge(state, node)
+        viewed = sdutil.get_view_node(state, node)
+        if edge is None or not isinstance(viewed, nodes.AccessNode):
+            return node, None
+        node, subset = viewed, _subset_on(edge.data, viewed.data)
+    return node, subset
+
+
+def _outer_access(sdfg: SDFG, name: str) -> Optional[Tuple[SDFG, SDFGState, nodes.AccessNode, subsets.Subset]]:
+    """ Returns the outer access node and subset that a nested SDFG argument
+        is connected to, or None if it cannot be determined. """
+    nsdfg_node = sdfg.parent_nsdfg_node
+    state: SDFGState = sdfg.parent
+    parent: SDFG = sdfg.parent_sdfg
+    for e in state.in_edges(nsdfg_node):
+        if e.dst_conn == name and not e.data.is_empty():
+            outer = state.memlet_path(e)[0]
+            if isinstance(outer.src, nodes.AccessNode):
+                return parent, state, outer.src, _subset_on(outer.data, outer.src.data)
+            return None
+    for e in state.out_edges(nsdfg_node):
+        if e.src_conn == name and not e.data.is_empty():
+            outer = state.memlet_path(e)[-1]
+            if isinstance(outer.dst, nodes.AccessNode):
+                return parent, state, outer.dst, _subset_on(outer.data, outer.dst.data)
+            return None
+    return None
+
+
+def may_alias(sdfg: SDFG,
+              state: SDFGState,
+              node_a: nodes.AccessNode,
+              node_b: nodes.AccessNode,
+              subset_a: Optional[subsets.Subset] = None,
+              subset_b: Optional[subsets.Subset] = None) -> bool:
+    """
+    Conservatively determines whether two accesses may refer to overlapping
+    memory. Views are followed to the data they view, and arguments of nested
+    SDFGs are followed to the containers they are connected to in the parent
+    SDFG. Top-level arguments are assumed not to overlap unless marked with
+    ``may_alias``.
+
+    :param sdfg: The SDFG containing the access nodes.
+    :param state: The state containing the access nodes.
+    :param node_a: The first access node.
+    :param node_b: The second access node.
+    :param subset_a: The accessed subset of the first node (None for all).
+    :param subset_b: The accessed subset of the second node (None for all).
+    :return: False if the accesses provably do not overlap, True otherwise.
+    """
+    node_a, subset_a = resolve_view(sdfg, state, node_a, subset_a)
+    node_b, subset_b = resolve_view(sdfg, state, node_b, subset_b)
+    if node_a.data == node_b.data:
+        return _may_intersect(subset_a, subset_b)
+
+    desc_a, desc_b = sdfg.arrays[node_a.data], sdfg.arrays[node_b.data]
+    if isinstance(desc_a, data.View) or isinstance(desc_b, data.View):
+        # Unresolved views
+        return True
+    if desc_a.transient or desc_b.transient:
+        # Transients are separate allocations
+        return False
+    if getattr(desc_a, 'may_alias', False) or getattr(desc_b, 'may_alias', False):
+        return True
+    if sdfg.parent_nsdfg_node is None:
+        return False
+
+    # Nested SDFG arguments: check the containers they are connected to
+    outer_a = _outer_access(sdfg, node_a.data)
+    outer_b = _outer_access(sdfg, node_b.data)
+    if outer_a is None or outer_b is None:
+        return True
+    parent, pstate, onode_a, osubset_a = outer_a
+    _, _, onode_b, osubset_b = outer_b
+    return may_alias(parent, pstate, onode_a, onode_b, osubset_a, osubset_b)
+
+
+def restrict_arguments(sdfg: SDFG, state: SDFGState, node: nodes.NestedSDFG) -> Set[str]:
+    """
+    Returns the connectors of a nested SDFG node whose arguments can be
+    qualified with ``__restrict__``, i.e., whose memory does not overlap with
+    any other argument of the call.
+
+    :param sdfg: The SDFG containing the nested SDFG node.
+    :param state: The state containing the nested SDFG node.
+    :param node: The nested SDFG node.
+    :return: A set of connector names.
+    """
+    accesses = {}
+    unknown = set()
+    for e in state.in_edges(node):
+        if e.data.is_empty():
+            continue
+        outer = state.memlet_path(e)[0]
+        if isinstance(outer.src, nodes.AccessNode):
+            accesses[e.dst_conn] = (outer.src, _subset_on(outer.data, outer.src.data))
+        else:
+            unknown.add(e.dst_conn)
+    for e in state.out_edges(node):
+        if e.data.is_empty():
+            continue
+        outer = state.memlet_path(e)[-1]
+        if isinstance(outer.dst, nodes.AccessNode):
+            accesses[e.src_conn] = (outer.dst, _subset_on(outer.data, outer.dst.data))
+        else:
+            unknown.add(e.src_conn)
+    if unknown:
+        return set()
+
+    result = set()
+    for conn, (anode, asubset) in accesses.items():
+        inner_desc = node.sdfg.arrays.get(conn, None)
+        if not isinstance(inner_desc, data.Array) or inner_desc.may_alias:
+            continue
+        if not isinstance(sdfg.arrays[anode.data], data.Array):
+            continue
+        if all(not may_alias(sdfg, state, anode, onode, asubset, osubset)
+               for oconn, (onode, osubset) in accesses.items() if oconn != conn):
+            result.add(conn)
+    return result
+
+
+def _injective_in(subset: subsets.Subset, param: str, step) -> bool:
+    """ Returns True if the subset accessed by different values of the
+        parameter is provably disjoint. """
+    if not isinstance(subset, subsets.Range):
+        subset = subsets.Range.from_indices(subset)
+    for begin, end, _ in subset.ndrange():
+        begin, end = sympy.sympify(begin), sympy.sympify(end)
+        psym = next((s for s in begin.free_symbols if str(s) == param), None)
+        if psym is None:
+            continue
+        coeff = sympy.diff(begin, psym)
+        if not coeff.is_number or coeff == 0:
+            continue
+        if any(str(s) == param for s in (begin - coeff * psym).free_symbols):
+            continue
+        length = sympy.simplify(end - begin)
+        if not length.is_number:
+            continue
+        distance = abs(coeff)
+        if not symbolic.issymbolic(step) and step > 0:
+            distance *= step
+        if length < distance:
+            return True
+    return False
+
+
+def _is_private(sdfg: SDFG, state: SDFGState, map_entry: nodes.MapEntry, dataname: str) -> bool:
+    """ Returns True if a data container is only used within the given map
+        scope, and is thus allocated separately in every iteration. """
+    desc = sdfg.arrays[dataname]
+    if not desc.transient or isinstance(desc, (data.View, data.Stream)):
+        return False
+    if desc.lifetime != dtypes.AllocationLifetime.Scope:
+        return False
+    scope_nodes = set(state.scope_subgraph(map_entry).nodes())
+    for other_state in sdfg.nodes():
+        for node in other_state.data_nodes():
+            if node.data == dataname and (other_state is not state or node not in scope_nodes):
+                return False
+    return True
+
+
+def is_vectorizable_map(sdfg: SDFG, state: SDFGState, map_entry: nodes.MapEntry) -> bool:
+    """
+    Determines whether the innermost loop of a map can be safely marked for
+    SIMD execution (e.g., with ``#pragma omp simd``). This is the case if the
+    map body only contains tasklets and iteration-private data, every output
+    element is written by at most one iteration of the innermost dimension,
+    and no input may overlap with an output, unless the same element is read
+    and written within an iteration.
+
+    :param sdfg: The SDFG containing the map.
+    :param state: The state containing the map.
+    :param map_entry: The map entry node.
+    :return: True if the innermost map dimension is free of loop-carried
+             dependencies.
+    """
+    if any(not c.startswith('IN_') for c in map_entry.in_connectors):
+        return False
+    param = map_entry.map.params[-1]
+    step = map_entry.map.range[-1][2]
+    map_exit = state.exit_node(map_entry)
+
+    callbacks = [k for k, v in sdfg.symbols.items() if isinstance(v, dtypes.callback)]
+    cbpattern = re.compile(r'\b(%s)\b' % '|'.join(re.escape(c) for c in callbacks)) if callbacks else None
+    for node in state.scope_children()[map_entry]:
+        if node is map_exit:
+            continue
+        if isinstance(node, nodes.Tasklet):
+            code = node.code.as_string
+            if '#pragma' in code or (cbpattern is not None and cbpattern.search(code)):
+                return False
+        elif isinstance(node, nodes.AccessNode):
+            if not _is_private(sdfg, state, map_entry, node.data):
+                return False
+        else:
+            return False
+
+    reads = []
+    for e in state.out_edges(map_entry):
+        if e.data.is_empty():
+            continue
+        outer = state.memlet_path(e)[0]
+        if not isinstance(outer.src, nodes.AccessNode):
+            return False
+        reads.append((outer.src, e.data))
+    writes = []
+    for e in state.in_edges(map_exit):
+        if e.data.is_empty():
+            continue
+        outer = state.memlet_path(e)[-1]
+        if not isinstance(outer.dst, nodes.AccessNode):
+            return False
+        if e.data.wcr is not None or e.data.dynamic:
+            return False
+        subset = _subset_on(e.data, outer.dst.data)
+        if subset is None or not _injective_in(subset, param, step):
+            return False
+        writes.append((outer.dst, subset))
+
+    # Accesses to potentially overlapping memory must refer to the same
+    # element within one iteration
+    for i, (wnode, wsubset) in enumerate(writes):
+        for onode, osubset in writes[i + 1:]:
+            if may_alias(sdfg, state, wnode, onode):
+                if wnode.data != onode.data or wsubset != osubset:
+                    return False
+        for rnode, rmemlet in reads:
+            if may_alias(sdfg, state, wnode, rnode):
+                if rnode.data != wnode.data or rmemlet.dynamic or _subset_on(rmemlet, rnode.data) != wsubset:
+                    return False
+    return True
@@ -0,0 +1,74 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Analyses that determine how many threads concurrently access a stream, used
+    by code generators to select specialized stream implementations. """
+
+from typing import List, Optional, Tuple
+
+from dace import data, dtypes, symbolic
+from dace.sdfg import nodes
+from dace.sdfg.scope import in_parallel_scope, nested_in_parallel_scope
+from dace.sdfg.sdfg import SDFG
+from dace.sdfg.state import SDFGState
+
+
+def _concurrent(sdfg: SDFG, state: SDFGState, sites: List[nodes.Node]) -> bool:
+    """ Returns True if nodes in the same state may run concurrently, i.e., if
+        they are in different components generated as OpenMP sections. """
+    if len(sites) < 2 or not sdfg.openmp_sections:
+        return False
+    from dace.sdfg import concurrent_subgraphs  # Avoid import loop
+    components = concurrent_subgraphs(state)
+    if len(components) < 2:
+        return False
+    used = {i for i, component in enumerate(components) for n in sites if n in component.nodes()}
+    return len(used) > 1
+
+
+def stream_concurrency(sdfg: SDFG, dataname: str) -> Optional[Tuple[bool, bool]]:
+    """
+    Determines whether a transient stream may be pushed to by multiple
+    threads at the same time, and whether it may be popped from by multiple
+    threads at the same time. Accesses in different states never overlap, and
+    a stream can thus have one producer thread at a time even if it is written
+    in several places.
+
+    :param sdfg: The SDFG that contains the stream.
+    :param dataname: The name of the stream.
+    :return: A 2-tuple of (multiple producers, multiple consumers), or None
+             if the accesses to the stream cannot be analyzed (e.g., if the
+             stream is an argument or passed to a nested SDFG).
+    """
+    desc = sdfg.arrays[dataname]
+    if not isinstance(desc, data.Stream) or not desc.transient:
+        return None
+    if (desc.lifetime in (dtypes.AllocationLifetime.Persistent, dtypes.AllocationLifetime.Global)
+            and nested_in_parallel_scope(sdfg)):
+        # Shared among concurrent invocations of the nested SDFG
+        return None
+
+    multi_producer = multi_consumer = False
+    for state in sdfg.nodes():
+        producers, consumers = [], []
+        for node in state.data_nodes():
+            if node.data != dataname:
+                continue
+            for e in state.in_edges(node):
+                if e.data.is_empty():
+                    continue
+                src = state.memlet_path(e)[0].src
+                if not isinstance(src, (nodes.Tasklet, nodes.AccessNode)):
+                    return None
+                multi_producer |= in_parallel_scope(state, src)
+                producers.append(src)
+            for e in state.out_edges(node):
+                if e.data.is_empty():
+                    continue
+                dst = state.memlet_path(e)[-1].dst
+                if not isinstance(dst, (nodes.Tasklet, nodes.AccessNode)):
+                    return None
+                multi_consumer |= in_parallel_scope(state, dst)
+                consumers.append(dst)
+        multi_producer |= _concurrent(sdfg, state, producers)
+        multi_consumer |= _concurrent(sdfg, state, consumers)
+
+    return multi_producer, multi_consumer
@@ -0,0 +1,170 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+"""
+Multi-versioning of SDFGs on symbol values.
+
+A multi-versioned SDFG contains specialized copies ("versions") of an SDFG for
+given values, ranges, or divisibility of its symbols, as well as a generic
+version. All versions are compiled into the same library, and the version to
+run is selected at runtime from the symbol values passed to the SDFG.
+"""
+
+import copy
+from typing import Dict, List, Sequence, Tuple, Union
+
+from dace import data, dtypes, symbolic
+from dace.properties import CodeBlock
+from dace.sdfg import nodes
+from dace.sdfg.sdfg import SDFG, InterstateEdge
+
+
+class MultipleOf:
+    """ Specifies that a symbol is a multiple of a constant factor, e.g.,
+        the vector length. In the specialized version, the symbol is replaced
+        by ``factor * <new symbol>``. """
+    def __init__(self, factor: int):
+        if factor <= 0:
+            raise ValueError('Factor must be positive')
+        self.factor = factor
+
+    def __repr__(self):
+        return f'MultipleOf({self.factor})'
+
+
+#: A specification of a symbol value in a version: a constant value, an
+#: inclusive range of values, or divisibility by a constant factor.
+SymbolSpec = Union[int, Tuple[int, int], MultipleOf]
+
+
+def version_condition(spec: Dict[str, SymbolSpec]) -> str:
+    """
+    Returns the condition (as a Python expression) under which a version is
+    selected.
+
+    :param spec: A mapping from symbol names to value specifications.
+    :return: A string of the condition.
+    """
+    conditions = []
+    for name, value in sorted(spec.items()):
+        if isinstance(value, MultipleOf):
+            conditions.append(f'({name} % {value.factor} == 0)')
+        elif isinstance(value, (tuple, list)):
+            low, high = value
+            conditions.append(f'({name} >= {low}) and ({name} <= {high})')
+        else:
+            conditions.append(f'({name} == {value})')
+    return ' and '.join(conditions) or 'True'
+
+
+def _specialize_version(sdfg: SDFG, spec: Dict[str, SymbolSpec]) -> Dict[str, symbolic.SymbolicType]:
+    """
+    Specializes a copy of an SDFG for the given symbol specification, in place.
+
+    :return: Symbols that were introduced for the version, mapped to their
+             values in terms of the original symbols.
+    """
+    new_symbols = {}
+    for name, value in spec.items():
+        if name not in sdfg.symbols:
+            raise KeyError(f'Symbol "{name}" not found in SDFG "{sdfg.name}"')
+        if isinstance(value, MultipleOf):
+            newname = f'__dace_{name}_div{value.factor}'
+            stype = sdfg.symbols[name]
+            sdfg.replace(name, f'({value.factor} * {newname})')
+            sdfg.remove_symbol(name)
+            sdfg.add_symbol(newname, stype)
+            new_symbols[newname] = symbolic.pystr_to_symbolic(f'{name} // {value.factor}')
+        elif isinstance(value, (tuple, list)):
+            # Ranges only select the version, which can then be optimized
+            # separately (e.g., for small sizes)
+            continue
+        else:
+            sdfg.specialize({name: value})
+    return new_symbols
+
+
+def multiversion(sdfg: SDFG, versions: Sequence[Dict[str, SymbolSpec]], name: str = None) -> SDFG:
+    """
+    Creates a multi-versioned SDFG from a given SDFG.
+
+    Each version is a nested SDFG that is specialized for the given symbol
+    values. Versions are tested in order, and the first version whose
+    condition holds is executed. If no condition holds, a generic (unmodified)
+    version is executed. The versions can be retrieved with
+    :func:`get_versions` and optimized separately before compilation.
+
+    :param sdfg: The SDFG to multi-version. It is not modified.
+    :param versions: A list of mappings from symbol names to a constant value,
+                     an inclusive range ``(low, high)``, or a
+                     :class:`MultipleOf` specification.
+    :param name: The name of the resulting SDFG (defaults to the name of the
+                 given SDFG).
+    :return: A new SDFG that dispatches to the versions.
+    """
+    # The versions are copies of the SDFG with the same original name, so the
+    # name is set explicitly to avoid renaming the resulting SDFG
+    result = SDFG(f'{sdfg.name}_multiversion')
+    result.name = name or sdfg.name
+    result.arg_names = list(sdfg.arg_names)
+    result.constants_prop = copy.deepcopy(sdfg.constants_prop)
+    for symname, stype in sdfg.symbols.items():
+        result.add_symbol(symname, stype)
+    for aname, desc in sdfg.arrays.items():
+        if not desc.transient:
+            result.add_datadesc(aname, copy.deepcopy(desc))
+    result.global_code = copy.deepcopy(sdfg.global_code)
+    result.init_code = copy.deepcopy(sdfg.init_code)
+    result.exit_code = copy.deepcopy(sdfg.exit_code)
+
+    dispatch = result.add_state('multiversion_dispatch', is_start_state=True)
+    end = result.add_state('multiversion_end')
+
+    specs: List[Dict[str, SymbolSpec]] = list(versions) + [{}]
+    conditions = [version_condition(spec) for spec in versions]
+    for i, spec in enumerate(specs):
+        is_generic = (i == len(versions))
+        version = copy.deepcopy(sdfg)
+        version.name = f'{sdfg.name}_generic' if is_generic else f'{sdfg.name}_version_{i}'
+        # Global, initialization and finalization code is kept in the outer SDFG
+        version.global_code = {'frame': CodeBlock('', dtypes.Language.CPP)}
+        version.init_code = {'frame': CodeBlock('', dtypes.Language.CPP)}
+        version.exit_code = {'frame': CodeBlock('', dtypes.Language.CPP)}
+        new_symbols = _specialize_version(version, spec)
+
+        # Select the first matching version
+        previous = ' or '.join(f'({c})' for c in conditions[:i])
+        if is_generic:
+            condition = f'not ({previous})' if previous else '1'
+        else:
+            condition = f'({conditions[i]}) and not ({previous})' if previous else conditions[i]
+
+        state = result.add_state(f'multiversion_{version.name}')
+        result.add_edge(dispatch, state, InterstateEdge(condition))
+        result.add_edge(state, end, InterstateEdge())
+
+        read_set, write_set = version.read_and_write_sets()
+        inputs = {n for n in read_set if not version.arrays[n].transient}
+        outputs = {n for n in write_set if not version.arrays[n].transient}
+        # Arrays that are neither read nor written are still passed
+        unused = {n for n, d in version.arrays.items() if not d.transient} - inputs - outputs
+        inputs |= {n for n in unused if not isinstance(version.arrays[n], data.Scalar)}
+
+        symbol_mapping = {s: s for s in version.free_symbols if s not in new_symbols}
+        symbol_mapping.update(new_symbols)
+        nsdfg = state.add_nested_sdfg(version, result, inputs, outputs, symbol_mapping)
+        for aname in inputs:
+            state.add_edge(state.add_read(aname), None, nsdfg, aname, result.make_array_memlet(aname))
+        for aname in outputs:
+            state.add_edge(nsdfg, aname, state.add_write(aname), None, result.make_array_memlet(aname))
+
+    return result
+
+
+def get_versions(sdfg: SDFG) -> List[SDFG]:
+    """
+    Returns the versions of a multi-versioned SDFG (see :func:`multiversion`),
+    in the order in which they are tested. The last version is the generic one.
+    """
+    result = []
+    for edge in sdfg.out_edges(sdfg.start_state):
+        result.extend(n.sdfg for n in edge.dst.nodes() if isinstance(n, nodes.NestedSDFG))
+    return result
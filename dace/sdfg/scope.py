@@ -243,6 +243,40 @@ def is_devicelevel_fpga(sdfg: 'dace.sdfg.SDFG', state: 'dace.sdfg.SDFGState', no
             or (state and is_fpga_kernel(sdfg, state)))
 
 
+# Schedules that execute their iterations on one thread
+_SEQUENTIAL_SCHEDULES = (dtypes.ScheduleType.Sequential, dtypes.ScheduleType.Unrolled)
+
+
+def _is_parallel(entry: nd.EntryNode) -> bool:
+    if isinstance(entry, nd.ConsumeEntry):
+        return symbolic.issymbolic(entry.consume.num_pes) or entry.consume.num_pes != 1
+    if isinstance(entry, nd.MapEntry):
+        return entry.map.schedule not in _SEQUENTIAL_SCHEDULES
+    return True
+
+
+def in_parallel_scope(state: 'dace.sdfg.SDFGState', node: NodeType) -> bool:
+    """ Returns True if a node is (transitively) contained in a scope whose
+        iterations may run on multiple threads. """
+    scope_dict = state.scope_dict()
+    scope = scope_dict[node]
+    while scope is not None:
+        if _is_parallel(scope):
+            return True
+        scope = scope_dict[scope]
+    return False
+
+
+def nested_in_parallel_scope(sdfg: 'dace.sdfg.SDFG') -> bool:
+    """ Returns True if an SDFG is (transitively) nested in a parallel scope,
+        i.e., if it may be invoked by multiple threads at the same time. """
+    while sdfg.parent_nsdfg_node is not None:
+        if in_parallel_scope(sdfg.parent, sdfg.parent_nsdfg_node):
+            return True
+        sdfg = sdfg.parent_sdfg
+    return False
+
+
 def devicelevel_block_size(sdfg: 'dace.sdfg.SDFG', state: 'dace.sdfg.SDFGState',
                            node: NodeType) -> Tuple[symbolic.SymExpr]:
     """ Returns the current thread-block size if the given node is enclosed in
@@ -243,6 +243,10 @@ class SDFG(OrderedDiGraph[SDFGState, InterstateEdge]):
                        to_json=_arrays_to_json,
                        from_json=_arrays_from_json)
     symbols = DictProperty(str, dtypes.typeclass, desc="Global symbols for this SDFG")
+    sparse_arrays = Property(dtype=dict,
+                             desc="Sparse matrices of this SDFG, whose members are stored as arrays",
+                             to_json=_arrays_to_json,
+                             from_json=_arrays_from_json)
 
     instrument = EnumProperty(dtype=dtypes.InstrumentationType,
                               desc="Measure execution statistics with given method",
@@ -295,6 +299,7 @@ class SDFG(OrderedDiGraph[SDFGState, InterstateEdge]):
         self._sdfg_list = [self]
         self._start_state: Optional[int] = None
         self._arrays = {}  # type: Dict[str, dt.Array]
+        self.sparse_arrays = {}  # type: Dict[str, dt.Sparse]
         self.global_code = {'frame': CodeBlock("", dtypes.Language.CPP)}
         self.init_code = {'frame': CodeBlock("", dtypes.Language.CPP)}
         self.exit_code = {'frame': CodeBlock("", dtypes.Language.CPP)}
@@ -1602,6 +1607,40 @@ class SDFG(OrderedDiGraph[SDFGState, InterstateEdge]):
 
         return name
 
+    def add_sparse(self, name: str, desc: dt.Sparse, find_new_name: bool = False) -> Tuple[str, dt.Sparse]:
+        """ Adds a sparse matrix to the SDFG. The matrix is stored as one array
+            per member of the descriptor (e.g., ``A_indptr``, ``A_indices``
+            and ``A_data`` for a CSR matrix ``A``), and the descriptor is kept
+            in ``sparse_arrays``, so that ``scipy.sparse`` matrices can be
+            passed to the compiled SDFG.
+            :param name: Name of the sparse matrix.
+            :param desc: Sparse matrix descriptor (e.g., ``dace.data.CSR``).
+            :param find_new_name: If True and a member array with this name
+                                  exists, finds a new name to add.
+            :return: A 2-tuple of (name, descriptor).
+        """
+        if not isinstance(desc, dt.Sparse):
+            raise TypeError("Expected a sparse matrix descriptor, got %s" % type(desc).__name__)
+
+        def exists(n):
+            return n in self.sparse_arrays or any((n + '_' + m) in self._arrays for m in desc.member_names)
+
+        if exists(name):
+            if not find_new_name:
+                raise NameError('Sparse matrix with name "%s" or one of its members already exists in SDFG' % name)
+            index = 0
+            while exists(name + ('_%d' % index)):
+                index += 1
+            name = name + ('_%d' % index)
+
+        for member, member_desc in desc.members.items():
+            self.add_datadesc(name + '_' + member, member_desc)
+        self.sparse_arrays[name] = desc
+        for sym in desc.free_symbols:
+            if sym.name not in self.symbols:
+                self.add_symbol(sym.name, sym.dtype)
+        return name, desc
+
     def add_loop(
         self,
         before_state,
@@ -1714,6 +1753,20 @@ class SDFG(OrderedDiGraph[SDFGState, InterstateEdge]):
         for k, v in syms.items():
             self.add_constant(str(k), v)
 
+    def multiversion(self, versions: List[Dict[str, Any]], name: str = None) -> 'SDFG':
+        """ Creates a new SDFG that contains specialized versions of this SDFG
+            for the given symbol values, ranges, or factors, and a generic
+            version. The version is selected at runtime from the symbol values.
+            :param versions: A list of mappings from symbol names to a value,
+                             an inclusive range ``(low, high)``, or a
+                             ``dace.sdfg.multiversioning.MultipleOf`` object.
+            :param name: Name of the resulting SDFG (defaults to this name).
+            :return: The multi-versioned SDFG.
+            :see: dace.sdfg.multiversioning.multiversion
+        """
+        from dace.sdfg.multiversioning import multiversion  # Avoid import loop
+        return multiversion(self, versions, name)
+
     def optimize(self, optimizer=None) -> 'SDFG':
         """
         Optimize an SDFG using the CLI or external hooks.
@@ -1828,6 +1881,21 @@ class SDFG(OrderedDiGraph[SDFGState, InterstateEdge]):
         # Get the function handle
         return compiler.get_program_handle(shared_library, sdfg)
 
+    def expand_sparse_arguments(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """ Replaces sparse matrix arguments (e.g., ``scipy.sparse`` matrices)
+            with the arrays of their members, and adds the sizes that can be
+            inferred from them. Arguments that are given explicitly take
+            precedence over inferred sizes.
+            :param kwargs: Keyword arguments to the SDFG.
+            :return: A new dictionary of keyword arguments.
+        """
+        result = {k: v for k, v in kwargs.items() if k not in self.sparse_arrays}
+        for name, desc in self.sparse_arrays.items():
+            if name in kwargs:
+                for aname, arg in desc.arguments(name, kwargs[name]).items():
+                    result.setdefault(aname, arg)
+        return result
+
     def argument_typecheck(self, args, kwargs, types_only=False):
         """ Checks if arguments and keyword arguments match the SDFG
             types. Raises RuntimeError otherwise.
@@ -1843,6 +1911,13 @@ class SDFG(OrderedDiGraph[SDFGState, InterstateEdge]):
                                                  if not k.startswith('__return')])
         kwargs = {k: v for k, v in kwargs.items() if not k.startswith('__return')}
 
+        # Sparse matrices are passed as their member arrays
+        if any(name in kwargs for name in self.sparse_arrays):
+            kwargs = {
+                k: v
+                for k, v in self.expand_sparse_arguments(kwargs).items() if k in kwargs or k in expected_args
+            }
+
         num_args_passed = len(args) + len(kwargs)
         num_args_expected = len(expected_args)
         if num_args_passed < num_args_expected:
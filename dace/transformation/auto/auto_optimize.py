@@ -22,6 +22,7 @@ from dace.transformation import helpers as xfh
 
 # Environments
 from dace.libraries.blas.environments import intel_mkl as mkl, openblas
+from dace.libraries.fft.environments import fftw
 
 # Enumerator
 from dace.transformation.estimator.enumeration import GreedyEnumerator
@@ -330,6 +331,10 @@ def find_fast_library(device: dtypes.DeviceType) -> List[str]:
         if openblas.OpenBLAS.is_installed():
             result.append('OpenBLAS')
 
+        # FFT calls
+        if fftw.FFTW.is_installed():
+            result.append('FFTW')
+
         return result + ['OpenMP', 'pure']
 
     return ['pure']
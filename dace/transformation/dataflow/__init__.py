@@ -20,6 +20,7 @@ from .tiling import MapTiling
 from .tiling_with_overlap import MapTilingWithOverlap
 from .buffer_tiling import BufferTiling
 from .vectorization import Vectorization
+from .prefetch import SoftwarePrefetch
 
 # Data-related
 from .stream_transient import StreamTransient, AccumulateTransient
@@ -38,6 +39,7 @@ from .prune_connectors import PruneConnectors, PruneSymbols
 from .wcr_conversion import AugAssignToWCR
 from .tasklet_fusion import SimpleTaskletFusion
 from .trivial_tasklet_elimination import TrivialTaskletElimination
+from .callback_batching import CallbackBatching
 
 # Device-related
 from .copy_to_device import CopyToDevice
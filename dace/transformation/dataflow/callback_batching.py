@@ -0,0 +1,220 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Contains classes that implement the callback batching transformation. """
+
+import ast
+import re
+from typing import List, Optional, Tuple
+
+from dace import data, dtypes, subsets, symbolic
+from dace.memlet import Memlet
+from dace.sdfg import SDFG, SDFGState, nodes
+from dace.sdfg import utils as sdutil
+from dace.transformation import transformation
+from dace.properties import make_properties
+
+
+def _callback_call(tasklet: nodes.Tasklet) -> Optional[Tuple[str, str, List[str]]]:
+    """ Returns the output connector, callback name and argument connectors
+        of a tasklet of the form ``out = f(a, b, ...)``, or None if the
+        tasklet does not match. """
+    if tasklet.language != dtypes.Language.Python:
+        return None
+    code = tasklet.code.code
+    if not isinstance(code, list) or len(code) != 1:
+        return None
+    stmt = code[0]
+    if not isinstance(stmt, ast.Assign) or len(stmt.targets) != 1:
+        return None
+    target = stmt.targets[0]
+    call = stmt.value
+    if not isinstance(target, ast.Name) or not isinstance(call, ast.Call):
+        return None
+    if not isinstance(call.func, ast.Name) or call.keywords:
+        return None
+    if not all(isinstance(arg, ast.Name) for arg in call.args):
+        return None
+    return target.id, call.func.id, [arg.id for arg in call.args]
+
+
+@make_properties
+class CallbackBatching(transformation.SingleStateTransformation):
+    """ Implements the callback batching transformation.
+
+        Transforms a map whose body calls a scalar Python callback once per
+        iteration (``out = f(a, b, ...)``) into three steps: a map that
+        gathers the arguments into contiguous buffers, a single call to a
+        batched version of the callback, and a map that scatters the results
+        to the original outputs. This reduces the number of transitions
+        between native code and the Python interpreter from one per iteration
+        to one per map invocation.
+
+        The callback must not be used anywhere else in the SDFG, as its
+        signature is changed to the batched form (see ``dace.callback``).
+    """
+
+    map_entry = transformation.PatternNode(nodes.MapEntry)
+    tasklet = transformation.PatternNode(nodes.Tasklet)
+    map_exit = transformation.PatternNode(nodes.MapExit)
+
+    @classmethod
+    def expressions(cls):
+        return [sdutil.node_path_graph(cls.map_entry, cls.tasklet, cls.map_exit)]
+
+    def can_be_applied(self, graph: SDFGState, expr_index, sdfg: SDFG, permissive=False):
+        map_entry = self.map_entry
+        tasklet = self.tasklet
+
+        if map_entry.map.schedule in dtypes.GPU_SCHEDULES or map_entry.map.schedule == dtypes.ScheduleType.FPGA_Device:
+            return False
+        # Buffers are allocated around the map, so it must be top-level
+        if graph.entry_node(map_entry) is not None:
+            return False
+        if set(graph.scope_children()[map_entry]) != {tasklet, self.map_exit}:
+            return False
+
+        call = _callback_call(tasklet)
+        if call is None:
+            return False
+        out_conn, funcname, args = call
+        if set(args) != set(tasklet.in_connectors.keys()) or set(tasklet.out_connectors.keys()) != {out_conn}:
+            return False
+
+        # The callback must be a scalar, non-batched function
+        cbtype = sdfg.symbols.get(funcname, None)
+        if not isinstance(cbtype, dtypes.callback) or cbtype.batched:
+            return False
+        if not cbtype.is_scalar_function() or cbtype.cfunc_return_type() == dtypes.typeclass(None):
+            return False
+        if len(cbtype.input_types) != len(args):
+            return False
+        if any(
+                isinstance(t, data.Array) or isinstance(t.dtype, (dtypes.string, dtypes.pointer))
+                for t in cbtype.input_types):
+            return False
+
+        # Each argument must be a single element read from outside the map
+        for e in graph.in_edges(tasklet):
+            if e.src is not map_entry or e.data.is_empty():
+                return False
+            if e.data.dynamic or e.data.volume != 1:
+                return False
+        out_edges = graph.out_edges(tasklet)
+        if len(out_edges) != 1 or out_edges[0].dst is not self.map_exit:
+            return False
+        out_edge = out_edges[0]
+        if out_edge.data.wcr is not None or out_edge.data.dynamic or out_edge.data.volume != 1:
+            return False
+        if not isinstance(graph.memlet_path(out_edge)[-1].dst, nodes.AccessNode):
+            return False
+
+        # The callback cannot be used anywhere else, since its type changes
+        pattern = re.compile(r'\b%s\b' % re.escape(funcname))
+        for node, _ in sdfg.sdfg_list[0].all_nodes_recursive():
+            if node is tasklet:
+                continue
+            if isinstance(node, nodes.Tasklet) and pattern.search(node.code.as_string):
+                return False
+            if isinstance(node, nodes.NestedSDFG) and any(
+                    pattern.search(str(v)) for k, v in node.symbol_mapping.items() if k != funcname):
+                return False
+
+        # The callback must be passed through unchanged to this SDFG
+        nsdfg = sdfg
+        while nsdfg.parent_nsdfg_node is not None:
+            if str(nsdfg.parent_nsdfg_node.symbol_mapping.get(funcname, '')) != funcname:
+                return False
+            nsdfg = nsdfg.parent_sdfg
+
+        return True
+
+    def apply(self, graph: SDFGState, sdfg: SDFG):
+        map_entry = self.map_entry
+        tasklet = self.tasklet
+        map_exit = self.map_exit
+        out_conn, funcname, args = _callback_call(tasklet)
+        cbtype: dtypes.callback = sdfg.symbols[funcname]
+
+        # Linearized iteration index and batch size
+        rng = map_entry.map.range
+        batch_size = rng.num_elements()
+        index = 0
+        for param, (begin, _, step), size in zip(map_entry.map.params, rng, rng.size()):
+            pindex = symbolic.pystr_to_symbolic(param) - begin
+            if step != 1:
+                pindex = symbolic.int_floor(pindex, step)
+            index = index * size + pindex
+        element = subsets.Range([(index, index, 1)])
+        whole = subsets.Range([(0, batch_size - 1, 1)])
+
+        input_types = [t.dtype for t in cbtype.input_types]
+        return_type = cbtype.cfunc_return_type()
+
+        # Gather: the tasklet now copies its arguments into the buffers
+        buffers = []
+        gather_code = []
+        for i, (arg, dtype) in enumerate(zip(args, input_types)):
+            name, _ = sdfg.add_array(f'__batch_{funcname}_{arg}', [batch_size],
+                                     dtype,
+                                     transient=True,
+                                     find_new_name=True)
+            buffers.append(name)
+            tasklet.add_out_connector(f'__b{i}')
+            gather_code.append(f'__b{i} = {arg}')
+
+        out_edge = graph.out_edges(tasklet)[0]
+        out_path = graph.memlet_path(out_edge)
+        dst_node: nodes.AccessNode = out_path[-1].dst
+        inner_memlet = out_edge.data
+        for e in out_path:
+            graph.remove_edge(e)
+        if out_path[0].dst_conn in map_exit.in_connectors:
+            map_exit.remove_in_connector(out_path[0].dst_conn)
+            map_exit.remove_out_connector(out_path[-1].src_conn)
+        tasklet.remove_out_connector(out_conn)
+        tasklet.code.as_string = '\n'.join(gather_code)
+
+        buffer_nodes = []
+        for i, name in enumerate(buffers):
+            wnode = graph.add_write(name)
+            buffer_nodes.append(wnode)
+            graph.add_memlet_path(tasklet,
+                                  map_exit,
+                                  wnode,
+                                  src_conn=f'__b{i}',
+                                  memlet=Memlet(data=name, subset=element))
+
+        # Batched call
+        outbuf, _ = sdfg.add_array(f'__batch_{funcname}_result', [batch_size],
+                                   return_type,
+                                   transient=True,
+                                   find_new_name=True)
+        call_args = ', '.join([f'__b{i}' for i in range(len(buffers))] + ['__bout'])
+        call = graph.add_tasklet(f'{funcname}_batched',
+                                 {f'__b{i}': dtypes.pointer(t)
+                                  for i, t in enumerate(input_types)}, {'__bout': dtypes.pointer(return_type)},
+                                 f'{funcname}({symbolic.symstr(batch_size)}, {call_args});',
+                                 language=dtypes.Language.CPP)
+        for i, (name, wnode) in enumerate(zip(buffers, buffer_nodes)):
+            graph.add_edge(wnode, None, call, f'__b{i}', Memlet(data=name, subset=whole))
+        outnode = graph.add_access(outbuf)
+        graph.add_edge(call, '__bout', outnode, None, Memlet(data=outbuf, subset=whole))
+
+        # Scatter results to the original destination
+        graph.add_mapped_tasklet(f'{funcname}_scatter',
+                                 {p: str(subsets.Range([r]))
+                                  for p, r in zip(map_entry.map.params, rng.ranges)},
+                                 {'__inp': Memlet(data=outbuf, subset=element)},
+                                 '__out = __inp', {'__out': inner_memlet},
+                                 schedule=map_entry.map.schedule,
+                                 external_edges=True,
+                                 input_nodes={outbuf: outnode},
+                                 output_nodes={dst_node.data: dst_node})
+
+        # Change the callback signature to the batched version
+        batched_type = dtypes.callback(data.Array(return_type, [batch_size]),
+                                       dtypes.int64,
+                                       *(data.Array(t, [batch_size]) for t in input_types),
+                                       batched=True)
+        for nsdfg in sdfg.sdfg_list[0].all_sdfgs_recursive():
+            if funcname in nsdfg.symbols:
+                nsdfg.symbols[funcname] = batched_type
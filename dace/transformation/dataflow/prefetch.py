@@ -0,0 +1,280 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Contains classes that implement the software prefetching transformation. """
+import ast
+import copy
+from typing import Dict, List, Optional, Tuple
+
+import sympy
+
+from dace import data, dtypes, symbolic
+from dace.frontend.python import astutils
+from dace.memlet import Memlet
+from dace.properties import Property, make_properties
+from dace.sdfg import nodes, scope, SDFG, SDFGState
+from dace.sdfg import utils as sdutil
+from dace.transformation import transformation
+
+
+@make_properties
+class SoftwarePrefetch(transformation.SingleStateTransformation):
+    """ Inserts software prefetch instructions into a CPU map.
+
+        The transformation detects two kinds of accesses in the tasklets and
+        nested SDFGs directly inside the map, which hardware prefetchers
+        handle poorly:
+
+          * Indirect accesses, e.g., ``x[col[j]]``, where the index is read
+            from an integer array by the innermost map parameter.
+          * Direct accesses whose stride between consecutive iterations of the
+            innermost map parameter is large (e.g., column accesses).
+
+        For every such access, a tasklet is added to the map that prefetches
+        the address accessed ``distance`` iterations ahead, if that iteration
+        is within the map range.
+    """
+
+    map_entry = transformation.PatternNode(nodes.MapEntry)
+
+    distance = Property(dtype=int, default=16, desc='Prefetch distance, in iterations of the innermost map dimension')
+    locality = Property(dtype=int,
+                        default=3,
+                        desc='Temporal locality hint of the prefetched data, from 0 (no temporal locality, '
+                        'evict after use) to 3 (keep in all cache levels)')
+    indirect = Property(dtype=bool, default=True, desc='Prefetch indirect accesses')
+    strided = Property(dtype=bool, default=True, desc='Prefetch direct accesses with large strides')
+    stride_threshold = Property(dtype=int,
+                                default=64,
+                                desc='Minimal stride (in bytes) between consecutive iterations for a direct '
+                                'access to be prefetched. Accesses with smaller strides are left to the hardware '
+                                'prefetcher. Symbolic strides are always prefetched.')
+
+    @classmethod
+    def expressions(cls):
+        return [sdutil.node_path_graph(cls.map_entry)]
+
+    def can_be_applied(self, graph: SDFGState, expr_index, sdfg: SDFG, permissive=False):
+        map_entry = self.map_entry
+        if self.distance <= 0 or self.locality not in (0, 1, 2, 3):
+            return False
+        if map_entry.map.schedule not in (dtypes.ScheduleType.Default, dtypes.ScheduleType.Sequential,
+                                          dtypes.ScheduleType.CPU_Multicore):
+            return False
+        if (scope.is_devicelevel_gpu(sdfg, graph, map_entry) or scope.is_devicelevel_fpga(sdfg, graph, map_entry)):
+            return False
+        # Do not prefetch twice
+        if any(
+                isinstance(e.dst, nodes.Tasklet) and 'DACE_PREFETCH' in e.dst.code.as_string
+                for e in graph.out_edges(map_entry)):
+            return False
+        return len(self._find_accesses(graph, sdfg)) > 0
+
+    def apply(self, graph: SDFGState, sdfg: SDFG):
+        # Avoiding import loop
+        from dace.codegen.targets.cpp import sym2cpp
+
+        map_entry = self.map_entry
+        map_exit = graph.exit_node(map_entry)
+        param = symbolic.pystr_to_symbolic(map_entry.map.params[-1])
+        step = map_entry.map.range[-1][2]
+        ahead = {param: param + self.distance * step}
+
+        # Gather accesses and the pointers they use
+        connectors: Dict[Tuple[str, str], str] = {}
+        inputs: Dict[str, Tuple[str, Memlet]] = {}
+
+        def pointer(src_conn: str, memlet: Memlet) -> str:
+            key = (memlet.data, str(memlet.subset))
+            if key not in connectors:
+                conn = f'__pf_{memlet.data}'
+                while conn in inputs:
+                    conn += '_'
+                connectors[key] = conn
+                inputs[conn] = (src_conn, memlet)
+            return connectors[key]
+
+        # The addresses accessed ahead are only prefetched if they are within
+        # the pointed-to data, which can extend beyond the map range (e.g.,
+        # to the next row of a sparse matrix)
+        lines = []
+        for src_conn, ptr_memlet, offset, indices, bounds in self._find_accesses(graph, sdfg):
+            expr = sym2cpp(offset.subs(ahead))
+            conditions = [f'{sym2cpp(i.subs(ahead))} <= {sym2cpp(e)}' for i, e in bounds]
+            for i, (idx_conn, idx_memlet, idx_offset, idx_bounds) in enumerate(indices):
+                idx_ptr = pointer(idx_conn, idx_memlet)
+                expr = expr.replace(f'__pf_i{i}', f'{idx_ptr}[{sym2cpp(idx_offset.subs(ahead))}]')
+                conditions.extend(f'{sym2cpp(i.subs(ahead))} <= {sym2cpp(e)}' for i, e in idx_bounds)
+            line = f'DACE_PREFETCH(&{pointer(src_conn, ptr_memlet)}[{expr}], 0, {self.locality});'
+            if conditions:
+                line = f'if ({" && ".join(conditions)}) {line}'
+            if line not in lines:
+                lines.append(line)
+
+        tasklet = graph.add_tasklet('prefetch',
+                                    set(inputs.keys()),
+                                    set(),
+                                    '\n'.join(lines),
+                                    language=dtypes.Language.CPP)
+        for conn, (src_conn, memlet) in inputs.items():
+            tasklet.in_connectors[conn] = dtypes.pointer(sdfg.arrays[memlet.data].dtype)
+            graph.add_edge(map_entry, src_conn, tasklet, conn, memlet)
+        graph.add_nedge(tasklet, map_exit, Memlet())
+
+    def _find_accesses(self, graph: SDFGState, sdfg: SDFG) -> List[tuple]:
+        """
+        Finds the accesses to prefetch in the map.
+
+        :return: A list of tuples (map entry connector, pointer memlet, offset
+                 from pointer, indirection indices, bounds). Each indirection
+                 index is a tuple (map entry connector, pointer memlet,
+                 offset, bounds). Bounds are pairs of index expressions that
+                 depend on the map parameter and their inclusive upper bound.
+        """
+        map_entry = self.map_entry
+        param = symbolic.pystr_to_symbolic(map_entry.map.params[-1])
+        step = map_entry.map.range[-1][2]
+        result = []
+
+        for node in set(e.dst for e in graph.out_edges(map_entry)):
+            if not isinstance(node, (nodes.Tasklet, nodes.NestedSDFG)):
+                continue
+            edges = [e for e in graph.in_edges(node) if e.src is map_entry and e.data.data is not None]
+
+            # Direct accesses with large strides
+            if self.strided:
+                for e in edges:
+                    desc = sdfg.arrays[e.data.data]
+                    if not self._is_point(e, desc) or str(param) not in e.data.subset.free_symbols:
+                        continue
+                    outer = self._outer_memlet(graph, e)
+                    if outer is None:
+                        continue
+                    index = e.data.subset.min_element()
+                    stride = sympy.simplify(
+                        _linear_offset(desc, [sympy.sympify(i).subs({param: param + step})
+                                              for i in index]) - _linear_offset(desc, index))
+                    if stride == 0:
+                        continue
+                    if stride.is_number and abs(int(stride)) * desc.dtype.bytes < self.stride_threshold:
+                        continue
+                    offset = _linear_offset(desc, index, outer.subset.min_element())
+                    result.append((e.src_conn, outer, offset, [], _bounds(index, outer, param)))
+
+            # Indirect accesses
+            if self.indirect:
+                # Indices read by the innermost map parameter
+                index_edges = {}
+                for e in edges:
+                    desc = sdfg.arrays[e.data.data]
+                    if (not self._is_point(e, desc) or str(param) not in e.data.subset.free_symbols
+                            or desc.dtype not in dtypes.INTEGER_TYPES):
+                        continue
+                    outer = self._outer_memlet(graph, e)
+                    if outer is None:
+                        continue
+                    index = e.data.subset.min_element()
+                    index_edges[e.dst_conn] = (e.src_conn, outer, _linear_offset(desc, index,
+                                                                                 outer.subset.min_element()),
+                                               _bounds(index, outer, param))
+                if not index_edges:
+                    continue
+                # Arrays accessed by these indices
+                arrays = {
+                    e.dst_conn: e
+                    for e in edges if e.data.wcr is None and isinstance(sdfg.arrays[e.data.data], data.Array)
+                    and e.data.subset.num_elements() != 1
+                }
+                if isinstance(node, nodes.Tasklet):
+                    accesses = self._tasklet_indirections(graph, node, arrays, index_edges)
+                else:
+                    accesses = self._nested_sdfg_indirections(node, arrays, index_edges)
+                for conn, index, indices in accesses:
+                    e = arrays[conn]
+                    desc = sdfg.arrays[e.data.data]
+                    if isinstance(node, nodes.NestedSDFG):
+                        desc = node.sdfg.arrays[conn]
+                    memlet = Memlet(data=e.data.data, subset=copy.deepcopy(e.data.subset))
+                    result.append((e.src_conn, memlet, _linear_offset(desc, index), indices, []))
+
+        return result
+
+    @staticmethod
+    def _is_point(edge, desc: data.Data) -> bool:
+        return (isinstance(desc, data.Array) and edge.data.wcr is None and edge.data.subset.num_elements() == 1)
+
+    @staticmethod
+    def _outer_memlet(graph: SDFGState, edge) -> Optional[Memlet]:
+        """ Returns a pointer memlet to the data passed into the map through the
+            connector of the given edge, or None if it covers one element. """
+        outer = next(iter(graph.in_edges_by_connector(edge.src, 'IN_' + edge.src_conn[4:])), None)
+        if outer is None or outer.data.data != edge.data.data or outer.data.subset.num_elements() == 1:
+            return None
+        return Memlet(data=outer.data.data, subset=copy.deepcopy(outer.data.subset))
+
+    @staticmethod
+    def _tasklet_indirections(graph: SDFGState, tasklet: nodes.Tasklet, arrays, index_edges):
+        """ Finds subscripts of array connectors with index connectors in a
+            Python tasklet (e.g., ``__ind_x[index_col]``). """
+        if tasklet.language != dtypes.Language.Python:
+            return []
+        symbols = set(graph.symbols_defined_at(tasklet).keys())
+        result = []
+        for stmt in tasklet.code.code:
+            for node in ast.walk(stmt):
+                if not (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name)
+                        and node.value.id in arrays):
+                    continue
+                names = {n.id for n in ast.walk(node.slice) if isinstance(n, ast.Name)}
+                used = [n for n in names if n in index_edges]
+                if not used or not names <= (set(used) | symbols):
+                    continue
+                replacements = {name: f'__pf_i{i}' for i, name in enumerate(used)}
+                index_ast = astutils.ASTFindReplace(replacements).visit(copy.deepcopy(node.slice))
+                elts = index_ast.elts if isinstance(index_ast, ast.Tuple) else [index_ast]
+                if any(isinstance(elt, ast.Slice) for elt in elts):
+                    continue
+                index = [symbolic.pystr_to_symbolic(astutils.unparse(elt)) for elt in elts]
+                if len(index) != len(arrays[node.value.id].data.subset):
+                    continue
+                result.append((node.value.id, index, [index_edges[name] for name in used]))
+        return result
+
+    @staticmethod
+    def _nested_sdfg_indirections(nsdfg: nodes.NestedSDFG, arrays, index_edges):
+        """ Finds memlets in a nested SDFG that use a symbol that is assigned
+            from an index connector (e.g., ``__tmp[__sym_index]``). """
+        result = []
+        # Only consider memlets that use symbols mapped to the same names
+        outer_symbols = {k for k, v in nsdfg.symbol_mapping.items() if str(v) == k}
+        for iedge in nsdfg.sdfg.edges():
+            for sym, value in iedge.data.assignments.items():
+                if value.strip() not in index_edges:
+                    continue
+                for state in nsdfg.sdfg.nodes():
+                    for e in state.edges():
+                        if e.data.data not in arrays or e.data.subset is None:
+                            continue
+                        if e.data.subset.num_elements() != 1 or sym not in map(str, e.data.subset.free_symbols):
+                            continue
+                        if not set(map(str, e.data.subset.free_symbols)) <= (outer_symbols | {sym}):
+                            continue
+                        index = [
+                            sympy.sympify(i).subs({symbolic.symbol(sym): symbolic.symbol('__pf_i0')})
+                            for i in e.data.subset.min_element()
+                        ]
+                        result.append((e.data.data, index, [index_edges[value.strip()]]))
+        return result
+
+
+def _linear_offset(desc: data.Array, index, begin=None) -> symbolic.SymbolicType:
+    """ Returns the offset (in elements) of an index in an array, relative to
+        another index. """
+    if begin is None:
+        begin = [0] * len(index)
+    return sympy.sympify(sum((i - b) * s for i, b, s in zip(index, begin, desc.strides)))
+
+
+def _bounds(index, memlet: Memlet, param: symbolic.symbol) -> List[tuple]:
+    """ Returns the dimensions of an index that depend on the map parameter,
+        along with the inclusive upper bound of the memlet in that dimension. """
+    return [(sympy.sympify(i), rng[1]) for i, rng in zip(index, memlet.subset)
+            if param in sympy.sympify(i).free_symbols]
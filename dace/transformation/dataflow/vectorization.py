@@ -34,6 +34,10 @@ class Vectorization(transformation.SingleStateTransformation):
                          default=None,
                          allow_none=True,
                          desc='Force creation or skipping a postamble map without vectors')
+    masked_postamble = Property(dtype=bool,
+                                default=False,
+                                desc='Vectorize the postamble map using masked loads and stores, instead of '
+                                'computing the remainder with scalars. Only applies to strided maps.')
 
     map_entry = transformation.PatternNode(nodes.MapEntry)
 
@@ -144,16 +148,81 @@ class Vectorization(transformation.SingleStateTransformation):
             tasklet = new_scope.nodes()[old_scope.nodes().index(tasklet)]
             new_range[0] = new_begin
 
-        # Create postamble non-vectorized map
+        # Create postamble map, which is either non-vectorized or consists of
+        # one partial vector (accessed with masked loads and stores)
+        postamble_tasklet = None
         if create_postamble:
-            new_scope: ScopeSubgraphView = replicate_scope(sdfg, graph, graph.scope_subgraph(map_entry, True, True))
+            old_scope = graph.scope_subgraph(map_entry, True, True)
+            new_scope: ScopeSubgraphView = replicate_scope(sdfg, graph, old_scope)
             dim_to_ex = dim_to + 1
-            new_scope.entry.map.range[-1] = (dim_to_ex - (dim_to_ex % vector_size), dim_to, dim_skip)
+            remainder_start = dim_to_ex - (dim_to_ex % vector_size)
+            if self._can_mask_postamble(graph, tasklet, dim_to_ex % vector_size):
+                new_scope.entry.map.range[-1] = (remainder_start, dim_to, vector_size)
+                postamble_tasklet = new_scope.nodes()[old_scope.nodes().index(tasklet)]
+            else:
+                new_scope.entry.map.range[-1] = (remainder_start, dim_to, dim_skip)
 
         # Change the step of the inner-most dimension.
         map_entry.map.range[-1] = tuple(new_range)
 
-        # Vectorize connectors adjacent to the tasklet.
+        self._vectorize_connectors(graph, sdfg, tasklet, param)
+        if postamble_tasklet is not None:
+            self._vectorize_connectors(graph, sdfg, postamble_tasklet, param, dim_to)
+
+        # Vector length propagation using data descriptors, recursive traversal
+        # outwards
+        if self.propagate_parent:
+            for edge in graph.all_edges(tasklet):
+                cursdfg = sdfg
+                curedge = edge
+                while cursdfg is not None:
+                    arrname = curedge.data.data
+                    dtype = cursdfg.arrays[arrname].dtype
+
+                    # Change type and shape to vector
+                    if not isinstance(dtype, dtypes.vector):
+                        cursdfg.arrays[arrname].dtype = dtypes.vector(dtype, vector_size)
+                        new_shape = list(cursdfg.arrays[arrname].shape)
+                        contigidx = cursdfg.arrays[arrname].strides.index(1)
+                        new_shape[contigidx] /= vector_size
+                        try:
+                            new_shape[contigidx] = int(new_shape[contigidx])
+                        except TypeError:
+                            pass
+                        cursdfg.arrays[arrname].shape = new_shape
+
+                    propagation.propagate_memlets_sdfg(cursdfg)
+
+                    # Find matching edge in parent
+                    nsdfg = cursdfg.parent_nsdfg_node
+                    if nsdfg is None:
+                        break
+                    tstate = cursdfg.parent
+                    curedge = ([e for e in tstate.in_edges(nsdfg) if e.dst_conn == arrname] +
+                               [e for e in tstate.out_edges(nsdfg) if e.src_conn == arrname])[0]
+                    cursdfg = cursdfg.parent_sdfg
+
+    def _can_mask_postamble(self, graph: SDFGState, tasklet: nodes.Tasklet, remainder) -> bool:
+        """ Returns True if the postamble can be computed with one partial vector. """
+        if not self.masked_postamble or not self.strided_map or self.propagate_parent:
+            return False
+        # A single remaining element cannot be distinguished from a scalar
+        # access that is broadcast to a vector
+        if remainder == 1:
+            return False
+        # Vector-to-scalar reductions over partial vectors are not supported
+        return all(e.data.wcr is None for e in graph.all_edges(tasklet))
+
+    def _vectorize_connectors(self, graph: SDFGState, sdfg: SDFG, tasklet: nodes.Tasklet, param, masked_end=None):
+        """
+        Vectorizes the connectors adjacent to a tasklet, and modifies their
+        memlets to match the vector length.
+
+        :param masked_end: If not None, the memlets access a partial vector
+                           from the map parameter up to (and including)
+                           this index.
+        """
+        vector_size = self.vector_len
         for edge in graph.all_edges(tasklet):
             connectors = (tasklet.in_connectors if edge.dst == tasklet else tasklet.out_connectors)
             conn = edge.dst_conn if edge.dst == tasklet else edge.src_conn
@@ -195,7 +264,10 @@ class Vectorization(transformation.SingleStateTransformation):
             connectors[conn] = dtypes.vector(oldtype, vector_size)
 
             # Modify memlet subset to match vector length
-            if self.strided_map:
+            if masked_end is not None:
+                rb = newlist[contigidx][0]
+                newlist[contigidx] = (rb, rb + masked_end - param, 1)
+            elif self.strided_map:
                 rb = newlist[contigidx][0]
                 if self.propagate_parent:
                     newlist[contigidx] = (rb / self.vector_len, rb / self.vector_len, 1)
@@ -208,37 +280,4 @@ class Vectorization(transformation.SingleStateTransformation):
                 else:
                     newlist[contigidx] = (self.vector_len * rb, self.vector_len * rb + self.vector_len - 1, 1)
             edge.data.subset = subsets.Range(newlist)
-            edge.data.volume = vector_size
-
-        # Vector length propagation using data descriptors, recursive traversal
-        # outwards
-        if self.propagate_parent:
-            for edge in graph.all_edges(tasklet):
-                cursdfg = sdfg
-                curedge = edge
-                while cursdfg is not None:
-                    arrname = curedge.data.data
-                    dtype = cursdfg.arrays[arrname].dtype
-
-                    # Change type and shape to vector
-                    if not isinstance(dtype, dtypes.vector):
-                        cursdfg.arrays[arrname].dtype = dtypes.vector(dtype, vector_size)
-                        new_shape = list(cursdfg.arrays[arrname].shape)
-                        contigidx = cursdfg.arrays[arrname].strides.index(1)
-                        new_shape[contigidx] /= vector_size
-                        try:
-                            new_shape[contigidx] = int(new_shape[contigidx])
-                        except TypeError:
-                            pass
-                        cursdfg.arrays[arrname].shape = new_shape
-
-                    propagation.propagate_memlets_sdfg(cursdfg)
-
-                    # Find matching edge in parent
-                    nsdfg = cursdfg.parent_nsdfg_node
-                    if nsdfg is None:
-                        break
-                    tstate = cursdfg.parent
-                    curedge = ([e for e in tstate.in_edges(nsdfg) if e.dst_conn == arrname] +
-                               [e for e in tstate.out_edges(nsdfg) if e.src_conn == arrname])[0]
-                    cursdfg = cursdfg.parent_sdfg
+            edge.data.volume = vector_size if masked_end is None else masked_end - param + 1
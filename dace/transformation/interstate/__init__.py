@@ -11,4 +11,8 @@ from .sdfg_nesting import NestSDFG, InlineSDFG, InlineTransients, RefineNestedAc
 from .loop_unroll import LoopUnroll
 from .loop_peeling import LoopPeeling
 from .loop_to_map import LoopToMap
+from .loop_blocking import LoopTiling, LoopInterchange, LoopSkewing, TemporalBlocking
 from .multistate_inline import InlineMultistateSDFG
+from .communication_overlap import CommunicationOverlap
+from .mixed_precision import MixedPrecision
+from .data_layout import ArrayLayout, StructToSoA
@@ -0,0 +1,416 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Overlapping of non-blocking communication with computation. """
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from dace import sdfg as sd
+from dace.sdfg import nodes, utils as sdutil
+from dace.transformation import transformation
+
+# Connectors of non-blocking operations that are consumed when the operation
+# starts (and are therefore not in flight until the matching wait)
+_START_ARGUMENTS = {'_request', '_root', '_dest', '_src', '_tag'}
+
+
+def _start_types():
+    from dace.libraries.mpi import nodes as mpi
+    return (mpi.Isend, mpi.Irecv, mpi.Ibcast, mpi.Iallreduce, mpi.Iallgather)
+
+
+def _wait_types():
+    from dace.libraries.mpi import nodes as mpi
+    return (mpi.Wait, mpi.Waitall)
+
+
+def _accesses(state: sd.SDFGState, nodeset=None) -> Tuple[Set[str], Set[str]]:
+    """ Returns the sets of data read and written by (a subset of) a state. """
+    reads, writes = set(), set()
+    for node in (nodeset if nodeset is not None else state.nodes()):
+        if isinstance(node, nodes.AccessNode):
+            if state.out_degree(node) > 0:
+                reads.add(node.data)
+            if state.in_degree(node) > 0:
+                writes.add(node.data)
+    return reads, writes
+
+
+def _conflicts(state: sd.SDFGState, nodeset: Optional[Set[nodes.Node]], reads: Set[str], writes: Set[str]) -> bool:
+    """ Returns True if (a subset of) a state cannot be reordered with an
+        operation that reads and writes the given data. """
+    state_reads, state_writes = _accesses(state, nodeset)
+    return bool((state_writes & (reads | writes)) or (state_reads & writes))
+
+
+def _closure(state: sd.SDFGState, sources, forward: bool) -> Set[nodes.Node]:
+    """ Returns the given nodes and all their descendants (or ancestors). """
+    result = set(sources)
+    queue = list(sources)
+    while queue:
+        node = queue.pop()
+        neighbors = [e.dst for e in state.out_edges(node)] if forward else [e.src for e in state.in_edges(node)]
+        for neighbor in neighbors:
+            if neighbor not in result:
+                result.add(neighbor)
+                queue.append(neighbor)
+    return result
+
+
+def _move_nodes(state: sd.SDFGState, nodeset: Set[nodes.Node], target: sd.SDFGState):
+    """ Moves a set of nodes from one state to another. Edges from nodes
+        outside the set are reconnected to copies of the source access nodes
+        in the target state. """
+    edges = [e for n in nodeset for e in state.in_edges(n)]
+    for n in nodeset:
+        target.add_node(n)
+    copies = {}
+    for e in edges:
+        src = e.src
+        if src not in nodeset:
+            if src not in copies:
+                copies[src] = target.add_access(src.data)
+            src = copies[src]
+        target.add_edge(src, e.src_conn, e.dst, e.dst_conn, e.data)
+    for n in nodeset:
+        state.remove_node(n)
+
+
+class _Operation(object):
+    """ A non-blocking operation and the data it keeps in flight. """
+    def __init__(self, state: sd.SDFGState, start: nodes.LibraryNode):
+        self.start = start
+        self.inputs = set(e.src for e in state.in_edges(start))
+        self.outputs = set(e.dst for e in state.out_edges(start))
+        self.requests = set(e.data.data for e in state.out_edges(start) if e.src_conn == '_request')
+        # Data that must not be modified (reads) or accessed (writes) until
+        # the operation completes
+        self.inflight_reads = set(e.data.data for e in state.in_edges(start) if e.dst_conn not in _START_ARGUMENTS)
+        self.inflight_writes = set(
+            e.data.data for e in state.out_edges(start) if e.src_conn not in _START_ARGUMENTS) | self.requests
+
+    def nodes(self) -> Set[nodes.Node]:
+        return {self.start} | self.inputs | self.outputs
+
+    def is_isolated(self, state: sd.SDFGState) -> bool:
+        """ Returns True if the state only contains this operation and its
+            input and output access nodes. """
+        if set(state.nodes()) != self.nodes():
+            return False
+        return (all(state.in_degree(n) == 0 and state.out_degree(n) == 1 for n in self.inputs)
+                and all(state.in_degree(n) == 1 and state.out_degree(n) == 0 for n in self.outputs))
+
+
+class CommunicationOverlap(transformation.MultiStateTransformation):
+    """
+    Overlaps non-blocking MPI operations (``Iallreduce``, ``Ibcast``,
+    ``Iallgather``, ``Isend``, and ``Irecv``) with computation, by starting
+    them as early as possible and completing them (``Wait``) as late as
+    possible.
+
+    If the matched state contains other computation, it is first split into
+    states that run in the following order: the computation the operation
+    depends on, the start of the operation, the independent computation, the
+    wait (if in the same state), and the computation that uses the
+    communicated data. Then, the start is hoisted into a new state across
+    preceding states, and the wait is sunk into a new state across following
+    states, as long as these states do not access the data in flight.
+
+    States are only moved across linear sequences of states (one predecessor
+    and one unconditional successor), so an operation is never moved into or
+    out of a loop or branch. Since the computation between the start and the
+    wait of an operation is placed in separate states, this transformation
+    should be applied after state fusion (e.g., after simplification).
+    """
+
+    state = transformation.PatternNode(sd.SDFGState)
+
+    @classmethod
+    def expressions(cls):
+        return [sdutil.node_path_graph(cls.state)]
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        return self._plan(sdfg, self.state) is not None
+
+    def _plan(self, sdfg: sd.SDFG, state: sd.SDFGState):
+        """
+        Finds a non-blocking operation in the given state to overlap.
+        :return: A 2-tuple of the operation and either a list of node sets to
+                 split the state into (in order), or a dictionary describing
+                 the movement of the start and the wait. None if there is no
+                 operation that can be overlapped further.
+        """
+        for start in state.nodes():
+            if not isinstance(start, _start_types()) or state.entry_node(start) is not None:
+                continue
+            op = _Operation(state, start)
+            if not op.requests or any(not isinstance(n, nodes.AccessNode) for n in op.inputs | op.outputs):
+                continue
+            wait_state, wait_nodes = self._find_waits(sdfg, state, op.requests)
+            if wait_state is None:
+                continue
+
+            if wait_state is state or not op.is_isolated(state):
+                partitions = self._partition(state, op, wait_nodes if wait_state is state else None)
+                if partitions is not None:
+                    return op, partitions
+                continue
+
+            movement = self._movement(sdfg, state, op, wait_state, wait_nodes)
+            if movement is not None:
+                return op, movement
+
+        return None
+
+    @staticmethod
+    def _find_waits(sdfg: sd.SDFG, state: sd.SDFGState,
+                    requests: Set[str]) -> Tuple[Optional[sd.SDFGState], Set[nodes.Node]]:
+        """ Finds the wait nodes that complete the given requests in the
+            given state or along the linear sequence of states after it.
+            :return: The state and the wait nodes with their statuses (and
+                     request access nodes, if in another state), or
+                     (None, {}) if not found.
+        """
+        wait_types = _wait_types()
+        current = state
+        visited = set()
+        while current not in visited:
+            visited.add(current)
+            waits = [
+                n for n in current.nodes()
+                if isinstance(n, wait_types) and any(e.data.data in requests for e in current.in_edges(n))
+            ]
+            if waits:
+                wait_nodes = set(waits)
+                for w in waits:
+                    wait_nodes |= set(e.dst for e in current.out_edges(w))
+                    if current is not state:
+                        wait_nodes |= set(e.src for e in current.in_edges(w))
+                if current is not state:
+                    # The waits must be separable from the rest of the state
+                    if any(e.src not in wait_nodes or e.dst not in wait_nodes for n in wait_nodes
+                           for e in current.all_edges(n)):
+                        return None, set()
+                return current, wait_nodes
+            out_edges = sdfg.out_edges(current)
+            if len(out_edges) != 1 or sdfg.in_degree(out_edges[0].dst) != 1:
+                break
+            current = out_edges[0].dst
+        return None, set()
+
+    @staticmethod
+    def _partition(state: sd.SDFGState, op: _Operation,
+                   wait_nodes: Optional[Set[nodes.Node]]) -> Optional[List[Set[nodes.Node]]]:
+        """
+        Partitions a state into the computation the operation depends on,
+        the start of the operation, the independent computation, the wait
+        (if given), and the computation that depends on the communicated
+        data.
+        :return: A list of node sets, or None if the state cannot be split.
+        """
+        start_nodes = {op.start} | op.outputs | {n for n in op.inputs if state.in_degree(n) == 0}
+        if any(state.in_degree(n) != 1 for n in op.outputs):
+            return None
+        wait_nodes = set(wait_nodes or set())
+        if wait_nodes:
+            # Include separate request access nodes of the waits
+            wait_nodes |= set(e.src for n in list(wait_nodes) if isinstance(n, _wait_types())
+                              for e in state.in_edges(n)) - start_nodes
+
+        before = _closure(state, [op.start], forward=False) - start_nodes
+        if before & wait_nodes:
+            return None
+
+        # Computation that uses (or modifies) data in flight
+        seeds = set()
+        for n in op.outputs | wait_nodes:
+            seeds |= set(e.dst for e in state.out_edges(n))
+        for n in state.nodes():
+            if n in before or n in start_nodes or n in wait_nodes or not isinstance(n, nodes.AccessNode):
+                continue
+            if n.data in op.inflight_writes or (n.data in op.inflight_reads and state.in_degree(n) > 0):
+                seeds.add(n)
+                for e in state.in_edges(n):
+                    if isinstance(e.src, nodes.ExitNode):
+                        seeds |= set(state.scope_subgraph(state.entry_node(e.src)).nodes())
+                    else:
+                        seeds.add(e.src)
+        seeds -= wait_nodes
+        after = _closure(state, seeds, forward=True)
+        if after & (before | start_nodes | wait_nodes):
+            return None
+        if after and not wait_nodes:
+            # Data in flight is used before the wait
+            return None
+        independent = set(state.nodes()) - before - start_nodes - wait_nodes - after
+
+        partitions = [before, start_nodes, independent, wait_nodes, after]
+        partition_of: Dict[nodes.Node, int] = {n: i for i, p in enumerate(partitions) for n in p}
+
+        # Place source and sink access nodes with their first reader and last
+        # writer, respectively
+        for i in (0, 2, 4):
+            for n in list(partitions[i]):
+                if not isinstance(n, nodes.AccessNode) or state.degree(n) == 0:
+                    continue
+                if state.in_degree(n) == 0:
+                    target = min(partition_of[e.dst] for e in state.out_edges(n))
+                elif state.out_degree(n) == 0:
+                    target = max(partition_of[e.src] for e in state.in_edges(n))
+                else:
+                    continue
+                partitions[i].remove(n)
+                partitions[target].add(n)
+                partition_of[n] = target
+
+        # Scopes cannot be split
+        for n in state.nodes():
+            if isinstance(n, nodes.EntryNode):
+                if any(partition_of[m] != partition_of[n] for m in state.scope_subgraph(n).nodes()):
+                    return None
+
+        # Edges between partitions must go forward and through data
+        for e in state.edges():
+            src, dst = partition_of[e.src], partition_of[e.dst]
+            if src != dst and (src > dst
+                               or not (isinstance(e.src, nodes.AccessNode) or isinstance(e.dst, nodes.AccessNode))):
+                return None
+
+        return partitions
+
+    @staticmethod
+    def _split(sdfg: sd.SDFG, state: sd.SDFGState, partitions: List[Set[nodes.Node]], keep: int) -> List[sd.SDFGState]:
+        """ Splits a state into a sequence of states, one per non-empty node
+            set. The node set with index ``keep`` remains in the given state.
+            :return: The list of states (None for empty node sets).
+        """
+        states: List[Optional[sd.SDFGState]] = [None] * len(partitions)
+        states[keep] = state
+        last = state
+        for i in range(keep - 1, -1, -1):
+            if partitions[i]:
+                states[i] = sdfg.add_state_before(last, f'{state.label}_{i}', is_start_state=(sdfg.start_state is last))
+                last = states[i]
+        last = state
+        for i in range(keep + 1, len(partitions)):
+            if partitions[i]:
+                states[i] = sdfg.add_state_after(last, f'{state.label}_{i}')
+                last = states[i]
+
+        partition_of = {n: i for i, p in enumerate(partitions) for n in p}
+        connected = {n for n in state.nodes() if state.degree(n) > 0}
+        edges = list(state.edges())
+        for i, nodeset in enumerate(partitions):
+            if i == keep:
+                continue
+            for n in nodeset:
+                state.remove_node(n)
+                states[i].add_node(n)
+
+        # Reconnect edges, copying access nodes across states
+        copies = {}
+
+        def copy_of(node: nodes.AccessNode, i: int) -> nodes.AccessNode:
+            if (node, i) not in copies:
+                copies[node, i] = states[i].add_access(node.data)
+            return copies[node, i]
+
+        for e in edges:
+            src, dst = partition_of[e.src], partition_of[e.dst]
+            if src == dst:
+                if src != keep:
+                    states[src].add_edge(e.src, e.src_conn, e.dst, e.dst_conn, e.data)
+            elif isinstance(e.src, nodes.AccessNode):
+                states[dst].add_edge(copy_of(e.src, dst), e.src_conn, e.dst, e.dst_conn, e.data)
+            else:
+                states[src].add_edge(e.src, e.src_conn, copy_of(e.dst, src), e.dst_conn, e.data)
+
+        # Remove access nodes that are no longer connected
+        for i, nodeset in enumerate(partitions):
+            for n in nodeset:
+                if n in connected and states[i].degree(n) == 0:
+                    states[i].remove_node(n)
+
+        return states
+
+    def _movement(self, sdfg: sd.SDFG, state: sd.SDFGState, op: _Operation, wait_state: sd.SDFGState,
+                  wait_nodes: Set[nodes.Node]) -> Optional[Dict[str, sd.SDFGState]]:
+        """ Computes how far the start of an isolated operation can be hoisted
+            and how far its wait can be sunk.
+            :return: A dictionary with the state to insert the start before
+                     (``hoist_before``), and the state to insert the wait
+                     before (``sink_before``) or after (``sink_after``), or
+                     None if neither can be moved.
+        """
+        start_reads, start_writes = _accesses(state, op.nodes())
+        start_symbols = set().union(*(e.data.free_symbols for e in state.all_edges(op.start)))
+        result = {}
+
+        # Hoist start
+        hoist_before = state
+        while True:
+            in_edges = sdfg.in_edges(hoist_before)
+            if len(in_edges) != 1:
+                break
+            edge = in_edges[0]
+            pred = edge.src
+            if (sdfg.out_degree(pred) != 1 or not edge.data.is_unconditional()
+                    or (edge.data.assignments.keys() & start_symbols) or (edge.data.free_symbols & start_writes)
+                    or _conflicts(pred, None, start_reads, start_writes)):
+                break
+            hoist_before = pred
+        if hoist_before is not state:
+            result['hoist_before'] = hoist_before
+
+        # Sink wait
+        inflight_reads = op.inflight_reads
+        inflight_writes = op.inflight_writes | _accesses(wait_state, wait_nodes)[1]
+        rest = set(wait_state.nodes()) - wait_nodes
+        if rest and _conflicts(wait_state, rest, inflight_reads, inflight_writes):
+            # The wait must complete before the rest of the state
+            result['sink_before'] = wait_state
+        else:
+            sink_after = wait_state
+            while True:
+                out_edges = sdfg.out_edges(sink_after)
+                if len(out_edges) != 1 or out_edges[0].data.free_symbols & inflight_writes:
+                    break
+                succ = out_edges[0].dst
+                if sdfg.in_degree(succ) != 1 or _conflicts(succ, None, inflight_reads, inflight_writes):
+                    break
+                sink_after = succ
+            if (sink_after is not wait_state or rest) and not any(e.data.free_symbols & inflight_writes
+                                                                  for e in sdfg.out_edges(sink_after)):
+                result['sink_after'] = sink_after
+
+        return result or None
+
+    def apply(self, _, sdfg: sd.SDFG):
+        state: sd.SDFGState = self.state
+        op, plan = self._plan(sdfg, state)
+
+        if isinstance(plan, list):
+            # Split the state around the operation, then move it further
+            states = self._split(sdfg, state, plan, keep=1)
+            op = _Operation(state, op.start)
+            wait_state = states[3]
+            if wait_state is None:
+                wait_state, wait_nodes = self._find_waits(sdfg, state, op.requests)
+            else:
+                wait_nodes = set(wait_state.nodes())
+            plan = self._movement(sdfg, state, op, wait_state, wait_nodes)
+            if plan is None:
+                return
+        else:
+            wait_state, wait_nodes = self._find_waits(sdfg, state, op.requests)
+
+        if 'sink_before' in plan:
+            target = sdfg.add_state_before(plan['sink_before'], wait_state.label + '_wait')
+            _move_nodes(wait_state, wait_nodes, target)
+        elif 'sink_after' in plan:
+            target = sdfg.add_state_after(plan['sink_after'], wait_state.label + '_wait')
+            _move_nodes(wait_state, wait_nodes, target)
+
+        if 'hoist_before' in plan:
+            target = sdfg.add_state_before(plan['hoist_before'],
+                                           state.label + '_start',
+                                           is_start_state=(sdfg.start_state is plan['hoist_before']))
+            _move_nodes(state, op.nodes(), target)
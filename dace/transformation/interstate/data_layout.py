@@ -0,0 +1,501 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Transformations that change the memory layout of arrays: permuting and
+    padding their dimensions, and converting arrays of structs to structs of
+    arrays. """
+
+import ast
+import copy
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+from dace import data, dtypes, symbolic
+from dace import sdfg as sd
+from dace.frontend.python import astutils
+from dace.memlet import Memlet
+from dace.properties import CodeBlock, ListProperty, Property, make_properties
+from dace.sdfg import nodes
+from dace.transformation import transformation
+
+#: Leading dimensions that are a multiple of this number of bytes map
+#: consecutive rows to few cache sets, and are padded by a cache line.
+CONFLICT_BYTES = 1024
+CACHE_LINE_BYTES = 64
+
+
+def _argument_states(sdfg: sd.SDFG) -> Tuple[sd.SDFGState, sd.SDFGState]:
+    """ Adds a state that runs before and a state that runs after the rest of
+        an SDFG, to copy arguments in and out. """
+    start = sdfg.start_state
+    sinks = sdfg.sink_nodes()
+    copy_in = sdfg.add_state('copy_in', is_start_state=True)
+    sdfg.add_edge(copy_in, start, sd.InterstateEdge())
+    copy_out = sdfg.add_state('copy_out')
+    for sink in sinks:
+        sdfg.add_edge(sink, copy_out, sd.InterstateEdge())
+    return copy_in, copy_out
+
+
+def _replace_accesses(sdfg: sd.SDFG, name: str, new_name: str):
+    """ Replaces every access to a data container in the states and
+        inter-state edges of an SDFG, but not its descriptor. """
+    for state in sdfg.nodes():
+        state.replace(name, new_name)
+    for edge in sdfg.edges():
+        edge.data.replace(name, new_name)
+
+
+def _accessed(sdfg: sd.SDFG, name: str) -> Tuple[bool, bool]:
+    """ Returns whether a data container is read and whether it is written. """
+    read, written = False, False
+    for state in sdfg.nodes():
+        for node in state.data_nodes():
+            if node.data == name:
+                read |= state.out_degree(node) > 0
+                written |= state.in_degree(node) > 0
+    return read, written
+
+
+def _dimension_order(desc: data.Array) -> List[int]:
+    """ Returns the dimensions of an array from the largest to the smallest
+        stride. Symbolic strides are compared by setting all symbols to a
+        large size. """
+    def key(dim: int):
+        stride = symbolic.pystr_to_symbolic(desc.strides[dim])
+        return -int(stride.subs({s: 1024 for s in stride.free_symbols}))
+
+    return sorted(range(len(desc.shape)), key=key)
+
+
+def layout_strides(shape, permutation: List[int], padding: int = 0):
+    """
+    Computes the strides and total size of an array with the given dimension
+    order in memory.
+    :param shape: The shape of the array.
+    :param permutation: Dimensions from the outermost to the innermost
+                        (contiguous) one.
+    :param padding: Number of elements to pad the innermost dimension with,
+                    i.e., the leading dimension is its size plus the padding.
+    :return: A 2-tuple of the strides and the total size.
+    """
+    strides = [0] * len(shape)
+    size = 1
+    for i, dim in enumerate(reversed(permutation)):
+        strides[dim] = size
+        size *= shape[dim] + (padding if i == 0 else 0)
+    return strides, size
+
+
+def _code_accesses(state: sd.SDFGState, node: nodes.AccessNode):
+    """ Yields the innermost edge and the node on the other end of every
+        memlet path that starts or ends at an access node. """
+    for e in state.in_edges(node):
+        edge = state.memlet_path(e)[0]
+        yield edge, edge.src
+    for e in state.out_edges(node):
+        for leaf in state.memlet_tree(e).leaves():
+            yield leaf, leaf.dst
+
+
+def innermost_accesses(sdfg: sd.SDFG, name: str) -> List[int]:
+    """
+    Counts, for every dimension of an array, how many accesses in maps index
+    it with the innermost map parameter, i.e., the dimension along which
+    consecutive iterations access the array.
+    :param sdfg: The SDFG containing the array.
+    :param name: The name of the array.
+    :return: A list with the number of accesses per dimension.
+    """
+    counts = [0] * len(sdfg.arrays[name].shape)
+    for state in sdfg.nodes():
+        scope = state.scope_dict()
+        for node in state.data_nodes():
+            if node.data != name:
+                continue
+            for edge, other in _code_accesses(state, node):
+                entry = scope[other]
+                if not isinstance(entry, nodes.MapEntry) or edge.data.data != name:
+                    continue
+                param = symbolic.symbol(entry.map.params[-1])
+                dims = [
+                    i for i, (begin, _, _) in enumerate(edge.data.subset.ndrange())
+                    if param in symbolic.pystr_to_symbolic(begin).free_symbols
+                ]
+                if len(dims) == 1:
+                    counts[dims[0]] += 1
+    return counts
+
+
+def _padding(desc: data.Array, order: List[int]) -> int:
+    """ Returns the number of elements to pad the leading dimension of an
+        array with, if it would cause cache-set conflicts. """
+    if len(order) < 2:
+        return 0
+    try:
+        row_bytes = int(desc.shape[order[-1]]) * desc.dtype.bytes
+    except TypeError:  # Symbolic size
+        return 0
+    if row_bytes % CONFLICT_BYTES == 0:
+        return max(1, CACHE_LINE_BYTES // desc.dtype.bytes)
+    return 0
+
+
+def preferred_layout(sdfg: sd.SDFG, name: str) -> Tuple[List[int], int]:
+    """
+    Selects the layout of an array from its accesses. The dimension that is
+    most often indexed by the innermost map parameter becomes contiguous in
+    memory, so that consecutive iterations access consecutive elements.
+    The other dimensions keep their order. If the resulting leading dimension
+    is a multiple of ``CONFLICT_BYTES``, it is padded by a cache line, to
+    avoid cache-set conflicts between consecutive rows.
+    :param sdfg: The SDFG containing the array.
+    :param name: The name of the array.
+    :return: A 2-tuple of the dimension order (from outermost to innermost)
+             and the padding of the innermost dimension, in elements.
+    """
+    desc = sdfg.arrays[name]
+    order = _dimension_order(desc)
+    counts = innermost_accesses(sdfg, name)
+    best = max(range(len(counts)), key=lambda d: counts[d])
+    if counts[best] > counts[order[-1]]:
+        order.remove(best)
+        order.append(best)
+
+    return order, _padding(desc, order)
+
+
+def _set_strides(sdfg: sd.SDFG, name: str, strides, total_size):
+    """ Sets the strides of an array and of the arrays it is passed to in
+        nested SDFGs. """
+    desc = sdfg.arrays[name]
+    desc.strides = strides
+    desc.total_size = total_size
+    for state in sdfg.nodes():
+        for node in state.data_nodes():
+            if node.data != name:
+                continue
+            for edge, other in _code_accesses(state, node):
+                if isinstance(other, nodes.NestedSDFG):
+                    conn = edge.src_conn if other is edge.src else edge.dst_conn
+                    _set_strides(other.sdfg, conn, strides, total_size)
+
+
+def _layout_compatible(sdfg: sd.SDFG, name: str) -> bool:
+    """ Returns True if the layout of an array can be changed, i.e., it is
+        not viewed and is only passed to nested SDFGs as a whole. """
+    ndims = len(sdfg.arrays[name].shape)
+    for state in sdfg.nodes():
+        for node in state.data_nodes():
+            if isinstance(sdfg.arrays[node.data], data.View) and any(e.data.data == name
+                                                                     for e in state.all_edges(node)):
+                return False
+            if node.data != name:
+                continue
+            for edge, other in _code_accesses(state, node):
+                if not isinstance(other, nodes.NestedSDFG):
+                    continue
+                conn = edge.src_conn if other is edge.src else edge.dst_conn
+                if len(other.sdfg.arrays[conn].shape) != ndims or not _layout_compatible(other.sdfg, conn):
+                    return False
+    return True
+
+
+@make_properties
+class ArrayLayout(transformation.MultiStateTransformation):
+    """
+    Changes the memory layout of an array by permuting its dimensions in
+    memory and padding its leading dimension. Since memlets index arrays
+    logically, only the strides of the array (and of the arrays it is passed
+    to in nested SDFGs) change.
+
+    Arguments of the SDFG keep the layout of the caller, unless
+    ``copy_arguments`` is set. In that case, accesses to the argument are
+    replaced by accesses to a transient with the new layout, which is copied
+    in at the beginning and out at the end of the SDFG.
+
+    If no permutation or padding is given, the layout is selected by
+    ``preferred_layout``, from the dimensions indexed by the innermost map
+    parameters. Arrays that are viewed, or passed to nested SDFGs as a subset
+    with fewer dimensions, are not changed.
+    """
+
+    array = Property(dtype=str,
+                     default='',
+                     desc='Array to change. If empty, every array whose layout can be improved is changed')
+    permutation = ListProperty(int,
+                               desc='Order of the dimensions in memory, from the outermost to the innermost '
+                               '(contiguous) one. If empty, the order is selected automatically')
+    padding = Property(dtype=int,
+                       default=None,
+                       allow_none=True,
+                       desc='Number of elements to pad the leading dimension with. If None, it is selected '
+                       'automatically')
+    copy_arguments = Property(dtype=bool, default=False, desc='Change the layout of arguments through copies')
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        return len(self._layouts(sdfg)) > 0
+
+    @classmethod
+    def expressions(cls):
+        return [sd.SDFG('_')]
+
+    def _layouts(self, sdfg: sd.SDFG) -> Dict[str, Tuple[List[symbolic.SymbolicType], symbolic.SymbolicType]]:
+        """ Returns the new strides and total size of every array to change. """
+        if self.array:
+            names = [self.array] if self.array in sdfg.arrays else []
+        elif self.permutation:
+            raise ValueError('A permutation can only be given along with an array')
+        else:
+            names = list(sdfg.arrays.keys())
+
+        result = {}
+        for name in names:
+            desc = sdfg.arrays[name]
+            if type(desc) is not data.Array or (not desc.transient and not self.copy_arguments):
+                continue
+            if self.permutation:
+                if sorted(self.permutation) != list(range(len(desc.shape))):
+                    raise ValueError(f'Invalid permutation {self.permutation} for array "{name}"')
+                order = list(self.permutation)
+            else:
+                order, _ = preferred_layout(sdfg, name)
+            padding = _padding(desc, order) if self.padding is None else self.padding
+            strides, total_size = layout_strides(desc.shape, order, padding)
+            if (all(symbolic.simplify(a - b) == 0 for a, b in zip(strides, desc.strides))
+                    and symbolic.simplify(total_size - desc.total_size) == 0):
+                continue
+            if not _layout_compatible(sdfg, name):
+                continue
+            result[name] = (strides, total_size)
+        return result
+
+    def apply(self, _, sdfg: sd.SDFG):
+        copy_states = None
+        for name, (strides, total_size) in self._layouts(sdfg).items():
+            desc = sdfg.arrays[name]
+            if not desc.transient:
+                # Replace the argument by a transient in the new layout
+                read, written = _accessed(sdfg, name)
+                new_desc = copy.deepcopy(desc)
+                new_desc.transient = True
+                new_name = sdfg.add_datadesc(f'{name}_layout', new_desc, find_new_name=True)
+                _replace_accesses(sdfg, name, new_name)
+                copy_states = copy_states or _argument_states(sdfg)
+                if read or written:
+                    copy_states[0].add_nedge(copy_states[0].add_read(name), copy_states[0].add_write(new_name),
+                                             Memlet.from_array(name, desc))
+                if written:
+                    copy_states[1].add_nedge(copy_states[1].add_read(new_name), copy_states[1].add_write(name),
+                                             Memlet.from_array(name, desc))
+                name = new_name
+            _set_strides(sdfg, name, strides, total_size)
+
+
+def _field_accesses(tasklet: nodes.Tasklet, conn: str, fields: Dict[str, dtypes.typeclass]) -> Optional[Set[str]]:
+    """ Returns the struct fields a tasklet accesses through a connector, or
+        None if it uses the connector other than by accessing its fields. """
+    if tasklet.language == dtypes.Language.Python:
+        used = set()
+        attributes = 0
+        tree = ast.parse(tasklet.code.as_string)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == conn:
+                if node.attr not in fields:
+                    return None
+                used.add(node.attr)
+                attributes += 1
+        # The connector may not be used other than to access fields
+        names = sum(1 for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id == conn)
+        return used if names == attributes else None
+    if tasklet.language == dtypes.Language.CPP:
+        code = tasklet.code.as_string
+        used = set(re.findall(r'\b%s\s*\.\s*(\w+)' % re.escape(conn), code))
+        if not used <= set(fields.keys()):
+            return None
+        if re.search(r'\b%s\b' % re.escape(conn), re.sub(r'\b%s\s*\.\s*\w+' % re.escape(conn), '', code)):
+            return None
+        return used
+    return None
+
+
+class _FieldReplacer(ast.NodeTransformer):
+    """ Replaces struct field accesses through a connector by the connectors
+        of the individual fields. """
+    def __init__(self, conn: str):
+        self.conn = conn
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if isinstance(node.value, ast.Name) and node.value.id == self.conn:
+            return ast.copy_location(ast.Name(id=f'{self.conn}_{node.attr}', ctx=node.ctx), node)
+        return self.generic_visit(node)
+
+
+def _replace_fields(tasklet: nodes.Tasklet, conn: str):
+    if tasklet.language == dtypes.Language.Python:
+        tree = _FieldReplacer(conn).visit(ast.parse(tasklet.code.as_string))
+        tasklet.code = CodeBlock(astutils.unparse(tree), tasklet.language)
+    else:
+        code = re.sub(r'\b%s\s*\.\s*(\w+)' % re.escape(conn), conn + r'_\1', tasklet.code.as_string)
+        tasklet.code = CodeBlock(code, tasklet.language)
+
+
+@make_properties
+class StructToSoA(transformation.MultiStateTransformation):
+    """
+    Converts an array of structs (AoS) to a struct of arrays (SoA), i.e., one
+    array per struct field. Tasklets access only the fields they use, which
+    avoids loading the other fields of a struct into the cache.
+
+    Tasklets must access single structs through their connectors, and only
+    use their fields (e.g., ``p.x``), which are replaced by one connector per
+    field (``p_x``). Arrays that are copied to other containers, accumulated
+    with write-conflict resolution, or accessed by other nodes (e.g., nested
+    SDFGs) are not converted. Fields of transients that are never accessed
+    are removed. Arguments of the SDFG are only converted if
+    ``copy_arguments`` is set, in which case all their fields are copied in
+    at the beginning and out at the end of the SDFG.
+    """
+
+    array = Property(dtype=str, default='', desc='Array to convert. If empty, every array that can be converted is')
+    copy_arguments = Property(dtype=bool, default=False, desc='Convert arguments through copies')
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        return len(self._conversions(sdfg)) > 0
+
+    @classmethod
+    def expressions(cls):
+        return [sd.SDFG('_')]
+
+    def _fields(self, sdfg: sd.SDFG, name: str) -> Optional[Set[str]]:
+        """ Returns the fields of a struct array accessed in the SDFG, or None
+            if the array cannot be converted. """
+        fields = sdfg.arrays[name].dtype.fields
+        used = set()
+        for state in sdfg.nodes():
+            for node in state.data_nodes():
+                if node.data != name:
+                    continue
+                for path in self._paths(state, node):
+                    if any(e.data.wcr is not None for e in path):
+                        return None
+                    tasklet = path[0].src if path[-1].dst is node else path[-1].dst
+                    edge = path[0] if path[-1].dst is node else path[-1]
+                    if not isinstance(tasklet,
+                                      nodes.Tasklet) or edge.data.dynamic or edge.data.subset.num_elements() != 1:
+                        return None
+                    conn = edge.src_conn if tasklet is edge.src else edge.dst_conn
+                    connectors = tasklet.out_connectors if tasklet is edge.src else tasklet.in_connectors
+                    if isinstance(connectors[conn], dtypes.pointer):
+                        return None
+                    accessed = _field_accesses(tasklet, conn, fields)
+                    if accessed is None or any(
+                            f'{conn}_{f}' in tasklet.in_connectors or f'{conn}_{f}' in tasklet.out_connectors
+                            for f in accessed):
+                        return None
+                    used |= accessed
+        return used
+
+    @staticmethod
+    def _paths(state: sd.SDFGState, node: nodes.AccessNode):
+        paths = [state.memlet_path(e) for e in state.in_edges(node) if not e.data.is_empty()]
+        paths += [
+            state.memlet_path(leaf) for e in state.out_edges(node) if not e.data.is_empty()
+            for leaf in state.memlet_tree(e).leaves()
+        ]
+        return paths
+
+    def _conversions(self, sdfg: sd.SDFG) -> Dict[str, Set[str]]:
+        """ Returns the fields to convert of every array to convert. """
+        names = ([self.array] if self.array in sdfg.arrays else []) if self.array else list(sdfg.arrays.keys())
+        result = {}
+        for name in names:
+            desc = sdfg.arrays[name]
+            if (type(desc) is not data.Array or not isinstance(desc.dtype, dtypes.struct)
+                    or (not desc.transient and not self.copy_arguments)):
+                continue
+            fields = self._fields(sdfg, name)
+            if fields is None:
+                continue
+            result[name] = fields if desc.transient else set(desc.dtype.fields.keys())
+        return result
+
+    def apply(self, _, sdfg: sd.SDFG):
+        copy_states = None
+        for name, fields in self._conversions(sdfg).items():
+            desc = sdfg.arrays[name]
+            read, written = _accessed(sdfg, name)
+            arrays = {}
+            for field in sorted(fields):
+                arrays[field], _ = sdfg.add_array(f'{name}_{field}',
+                                                  desc.shape,
+                                                  desc.dtype.fields[field],
+                                                  storage=desc.storage,
+                                                  transient=True,
+                                                  lifetime=desc.lifetime,
+                                                  find_new_name=True)
+
+            for state in sdfg.nodes():
+                for node in [n for n in state.data_nodes() if n.data == name]:
+                    self._split(state, node, desc.dtype.fields, arrays)
+
+            if desc.transient:
+                del sdfg.arrays[name]
+                continue
+
+            # Copy the fields of the argument in and out
+            copy_states = copy_states or _argument_states(sdfg)
+            params = [f'__i{i}' for i in range(len(desc.shape))]
+            map_range = {p: f'0:{s}' for p, s in zip(params, desc.shape)}
+            index = ', '.join(params)
+            if read or written:
+                for field, array in arrays.items():
+                    copy_states[0].add_mapped_tasklet(f'copy_in_{array}',
+                                                      map_range, {'__in': Memlet(f'{name}[{index}]')},
+                                                      f'__out = __in.{field}', {'__out': Memlet(f'{array}[{index}]')},
+                                                      external_edges=True)
+            if written:
+                copy_states[1].add_mapped_tasklet(f'copy_out_{name}',
+                                                  map_range,
+                                                  {f'__in_{f}': Memlet(f'{a}[{index}]')
+                                                   for f, a in arrays.items()},
+                                                  '\n'.join(f'__out.{f} = __in_{f}' for f in arrays),
+                                                  {'__out': Memlet(f'{name}[{index}]')},
+                                                  external_edges=True)
+
+    @staticmethod
+    def _split(state: sd.SDFGState, node: nodes.AccessNode, types: Dict[str, dtypes.typeclass], arrays: Dict[str, str]):
+        """ Replaces the accesses through an access node by accesses to the
+            arrays of the fields. """
+        field_nodes = {}
+
+        def field_node(field: str) -> nodes.AccessNode:
+            if field not in field_nodes:
+                field_nodes[field] = state.add_access(arrays[field])
+            return field_nodes[field]
+
+        for path in StructToSoA._paths(state, node):
+            write = path[-1].dst is node
+            edge = path[0] if write else path[-1]
+            tasklet = edge.src if write else edge.dst
+            conn = edge.src_conn if write else edge.dst_conn
+            accessed = _field_accesses(tasklet, conn, types)
+            scopes = [e.dst for e in path[:-1]] if write else [e.src for e in path[1:]]
+            for field in sorted(accessed):
+                memlet = Memlet(data=arrays[field], subset=copy.deepcopy(edge.data.subset))
+                if write:
+                    tasklet.add_out_connector(f'{conn}_{field}', types[field])
+                    state.add_memlet_path(tasklet,
+                                          *scopes,
+                                          field_node(field),
+                                          memlet=memlet,
+                                          src_conn=f'{conn}_{field}')
+                else:
+                    tasklet.add_in_connector(f'{conn}_{field}', types[field])
+                    state.add_memlet_path(field_node(field),
+                                          *scopes,
+                                          tasklet,
+                                          memlet=memlet,
+                                          dst_conn=f'{conn}_{field}')
+            _replace_fields(tasklet, conn)
+            state.remove_memlet_path(edge)
+        if node in state.nodes():
+            state.remove_node(node)
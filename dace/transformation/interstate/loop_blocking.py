@@ -0,0 +1,478 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Loop tiling, interchange, skewing, and temporal blocking transformations
+    for state machine for-loops. """
+
+import copy
+import itertools
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import sympy as sp
+
+from dace import sdfg as sd, subsets, symbolic
+from dace.properties import CodeBlock, Property, make_properties
+from dace.sdfg import utils as sdutil
+from dace.transformation import transformation as xf
+from dace.transformation.interstate.loop_detection import (DetectLoop, find_for_loop)
+
+#: A dependence distance vector. Each entry is the distance in one loop, or
+#: None if the distance is unknown (any value).
+DistanceVector = Tuple[Optional[int], ...]
+
+
+def loop_body_states(sdfg: sd.SDFG, guard: sd.SDFGState, begin: sd.SDFGState) -> List[sd.SDFGState]:
+    """ Returns the states in the body of a state machine for-loop. """
+    return list(sdutil.dfs_conditional(sdfg, sources=[begin], condition=lambda _, child: child != guard))
+
+
+class ForLoop(object):
+    """ The edges and range of a state machine for-loop, which can be used to
+        modify the loop. """
+    def __init__(self,
+                 sdfg: sd.SDFG,
+                 guard: sd.SDFGState,
+                 begin: sd.SDFGState,
+                 exit_state: sd.SDFGState,
+                 itervar: Optional[str] = None):
+        found = find_for_loop(sdfg, guard, begin, itervar=itervar)
+        if found is None:
+            raise ValueError(f'Loop at "{guard.label}" is not a for-loop')
+        self.sdfg = sdfg
+        self.guard = guard
+        self.begin = begin
+        self.exit_state = exit_state
+        self.itervar, (self.start, self.end, self.step), (_, last_state) = found
+        self.states = loop_body_states(sdfg, guard, begin)
+
+        itersym = symbolic.symbol(self.itervar)
+        self.cond_edge = sdfg.edges_between(guard, begin)[0]
+        self.exit_edge = sdfg.edges_between(guard, exit_state)[0]
+        self.step_edge = next(e for e in sdfg.in_edges(guard)
+                              if itersym in symbolic.pystr_to_symbolic(e.data.assignments[self.itervar]).free_symbols)
+        self.init_edges = [e for e in sdfg.in_edges(guard) if e is not self.step_edge]
+
+    @staticmethod
+    def find_nested(sdfg: sd.SDFG, outer: 'ForLoop') -> Optional['ForLoop']:
+        """
+        Returns the loop that is perfectly nested in the given loop, i.e., the
+        outer loop body consists only of the inner loop and empty states
+        without assignments other than those of the loop iteration variables.
+        """
+        for guard in outer.states:
+            if sdfg.out_degree(guard) != 2:
+                continue
+            for begin, exit_state in itertools.permutations([e.dst for e in sdfg.out_edges(guard)]):
+                if exit_state not in outer.states:
+                    continue
+                body = loop_body_states(sdfg, guard, begin)
+                if outer.guard in body or not any(e.dst is guard for s in body for e in sdfg.out_edges(s)):
+                    continue
+                try:
+                    inner = ForLoop(sdfg, guard, begin, exit_state)
+                except ValueError:
+                    continue
+
+                # Check that all other states are empty
+                inner_states = set(inner.states) | {guard}
+                other_states = [s for s in outer.states if s not in inner_states]
+                if any(len(s.nodes()) > 0 for s in other_states):
+                    return None
+                for s in other_states:
+                    for e in sdfg.out_edges(s):
+                        if not e.data.is_unconditional():
+                            return None
+                        if set(e.data.assignments.keys()) - {outer.itervar, inner.itervar}:
+                            return None
+                if any(e.src not in inner_states and e not in inner.init_edges for e in sdfg.in_edges(guard)):
+                    return None
+                return inner
+        return None
+
+    def set_range(self,
+                  itervar: str,
+                  start: symbolic.SymbolicType,
+                  end: symbolic.SymbolicType,
+                  step: Optional[symbolic.SymbolicType] = None):
+        """ Sets the iteration variable and (inclusive) range of the loop. """
+        step = self.step if step is None else step
+        for e in self.init_edges:
+            del e.data.assignments[self.itervar]
+            e.data.assignments[itervar] = symbolic.symstr(start)
+        del self.step_edge.data.assignments[self.itervar]
+        self.step_edge.data.assignments[itervar] = symbolic.symstr(symbolic.symbol(itervar) + step)
+        condition = f'{itervar} <= {symbolic.symstr(end)}'
+        self.cond_edge.data.condition = CodeBlock(condition)
+        self.exit_edge.data.condition = CodeBlock(f'not ({condition})')
+        self.itervar, self.start, self.end, self.step = itervar, start, end, step
+
+    def replace_in_body(self, name: str, value: symbolic.SymbolicType):
+        """ Replaces a symbol in the states and interstate edges of the body. """
+        for state in self.states:
+            state.replace(name, symbolic.symstr(value))
+            for e in self.sdfg.out_edges(state):
+                if e is not self.step_edge:
+                    e.data.replace(name, symbolic.symstr(value), replace_keys=False)
+
+    def wrap(self, itervar: str, start: symbolic.SymbolicType, end: symbolic.SymbolicType,
+             step: symbolic.SymbolicType) -> 'ForLoop':
+        """ Adds a new loop around this loop and returns it. """
+        sdfg = self.sdfg
+        if self.itervar in sdfg.symbols and itervar not in sdfg.symbols:
+            sdfg.add_symbol(itervar, sdfg.symbols[self.itervar])
+        guard = sdfg.add_state(f'{self.guard.label}_{itervar}')
+        begin = sdfg.add_state(f'{self.guard.label}_{itervar}_begin')
+        latch = sdfg.add_state(f'{self.guard.label}_{itervar}_latch')
+
+        # Initialize this loop from the new loop body
+        init_value = None
+        for e in self.init_edges:
+            assignments = dict(e.data.assignments)
+            init_value = assignments.pop(self.itervar)
+            assignments[itervar] = symbolic.symstr(start)
+            sdfg.remove_edge(e)
+            sdfg.add_edge(e.src, guard, sd.InterstateEdge(copy.deepcopy(e.data.condition), assignments))
+        sdfg.add_edge(begin, self.guard, sd.InterstateEdge(assignments={self.itervar: init_value}))
+        self.init_edges = sdfg.edges_between(begin, self.guard)
+
+        # Exit to the new loop
+        sdfg.remove_edge(self.exit_edge)
+        sdfg.add_edge(self.guard, latch, sd.InterstateEdge(copy.deepcopy(self.exit_edge.data.condition)))
+        sdfg.add_edge(latch, guard,
+                      sd.InterstateEdge(assignments={itervar: symbolic.symstr(symbolic.symbol(itervar) + step)}))
+        condition = f'{itervar} <= {symbolic.symstr(end)}'
+        sdfg.add_edge(guard, begin, sd.InterstateEdge(condition))
+        sdfg.add_edge(guard, self.exit_state, sd.InterstateEdge(f'not ({condition})', self.exit_edge.data.assignments))
+        self.exit_edge = sdfg.edges_between(self.guard, latch)[0]
+        outer_exit = self.exit_state
+        self.exit_state = latch
+
+        return ForLoop(sdfg, guard, begin, outer_exit, itervar)
+
+
+def _distance(write: subsets.Subset, access: subsets.Subset,
+              itersyms: Sequence[symbolic.symbol]) -> Union[DistanceVector, bool, None]:
+    """
+    Computes the distance between the iterations that write and access the
+    same element, in the given loops.
+
+    :return: The distance vector, False if the subsets never overlap, or None
+             if the distance cannot be determined.
+    """
+    if write.dims() != access.dims():
+        return None
+    dist: Dict[symbolic.symbol, Optional[int]] = {s: None for s in itersyms}
+    for (wb, we, _), (ab, ae, _) in zip(write.ndrange(), access.ndrange()):
+        wb, we, ab, ae = (sp.sympify(x) for x in (wb, we, ab, ae))
+        wvars = [s for s in itersyms if s in (wb.free_symbols | we.free_symbols)]
+        avars = [s for s in itersyms if s in (ab.free_symbols | ae.free_symbols)]
+        if wb != we or ab != ae:
+            # Ranges must not depend on the loops
+            if wvars or avars:
+                return None
+            continue
+        if not wvars and not avars:
+            diff = sp.simplify(wb - ab)
+            if diff.is_number and diff != 0:
+                return False
+            continue
+        if len(wvars) != 1 or wvars != avars:
+            return None
+        var = wvars[0]
+        coef = sp.diff(wb, var)
+        if not coef.is_number or coef == 0 or sp.diff(ab, var) != coef or sp.diff(coef, var) != 0:
+            return None
+        delta = sp.simplify((wb - ab) / coef)
+        if not delta.is_number:
+            return None
+        if not delta.is_integer:
+            return False
+        if dist[var] is not None and dist[var] != int(delta):
+            return False
+        dist[var] = int(delta)
+    return tuple(dist[s] for s in itersyms)
+
+
+def loop_dependences(sdfg: sd.SDFG, states: Sequence[sd.SDFGState],
+                     itervars: Sequence[str]) -> Optional[Set[DistanceVector]]:
+    """
+    Computes the dependence distance vectors of a loop nest from the memlets
+    in its body. Transients that are only accessed in the body are considered
+    local to each iteration.
+
+    :param sdfg: The SDFG that contains the loop nest.
+    :param states: The states of the loop nest body.
+    :param itervars: The iteration variables of the loops, outermost first.
+    :return: A set of distance vectors, in which every dependence is
+             represented by its distance and its negation, or None if the
+             dependences cannot be determined.
+    """
+    itersyms = [symbolic.symbol(v) for v in itervars]
+    states = set(states)
+
+    # Transients only accessed in the loop body
+    outside = set()
+    for state in sdfg.nodes():
+        if state not in states:
+            outside |= set(n.data for n in state.data_nodes())
+    local = set(n for n, desc in sdfg.arrays.items() if desc.transient and n not in outside)
+
+    accesses: Dict[str, List[Tuple[subsets.Subset, bool]]] = defaultdict(list)
+    for state in states:
+        for dn in state.data_nodes():
+            if dn.data in local:
+                continue
+            for e in state.in_edges(dn):
+                subset = e.data.get_dst_subset(e, state)
+                if subset is None:
+                    return None
+                accesses[dn.data].append((subset, True))
+            for e in state.out_edges(dn):
+                subset = e.data.get_src_subset(e, state)
+                if subset is None:
+                    return None
+                accesses[dn.data].append((subset, False))
+
+    # Data read by interstate edges in the loop nest
+    written = set(data for data, accs in accesses.items() if any(w for _, w in accs))
+    for e in sdfg.edges():
+        if (e.src in states or e.dst in states) and (e.data.free_symbols & written):
+            return None
+
+    result = set()
+    for data, accs in accesses.items():
+        for wsubset, _ in (acc for acc in accs if acc[1]):
+            for asubset, _ in accs:
+                dist = _distance(wsubset, asubset, itersyms)
+                if dist is False:
+                    continue
+                if dist is None:
+                    return None
+                if any(d != 0 for d in dist):
+                    result.add(dist)
+                    result.add(tuple(None if d is None else -d for d in dist))
+    return result
+
+
+def _lex_positive(vector: Sequence[int]) -> bool:
+    for d in vector:
+        if d != 0:
+            return d > 0
+    return False
+
+
+def preserves_dependences(vectors: Set[DistanceVector],
+                          transform: Callable[[Tuple[int, ...]], Sequence[int]],
+                          fully_permutable: bool = False) -> bool:
+    """
+    Checks whether an iteration space transformation preserves the order of
+    dependent iterations.
+
+    :param vectors: The dependence distance vectors (see
+                    :func:`loop_dependences`).
+    :param transform: A linear function that transforms a distance vector.
+    :param fully_permutable: If True, also requires that all transformed
+                             distances are non-negative, which allows tiling
+                             and interchanging all loops.
+    :return: True if the transformation is legal.
+    """
+    known = [abs(d) for v in vectors for d in v if d is not None]
+    bound = 4 * (max(known, default=0) + 2)
+    for vector in vectors:
+        values = [range(-bound, bound + 1) if d is None else [d] for d in vector]
+        for instance in itertools.product(*values):
+            if not _lex_positive(instance):
+                continue
+            transformed = tuple(transform(instance))
+            if not _lex_positive(transformed):
+                return False
+            if fully_permutable and any(d < 0 for d in transformed):
+                return False
+    return True
+
+
+def skewing_factor(vectors: Set[DistanceVector], max_factor: int = 16) -> Optional[int]:
+    """ Returns the smallest factor by which an inner loop can be skewed with
+        respect to an outer loop (for 2-dimensional distance vectors), such
+        that the loops are fully permutable, or None if no such factor exists. """
+    for factor in range(max_factor + 1):
+        if preserves_dependences(vectors, lambda d: (d[0], d[1] + factor * d[0]), fully_permutable=True):
+            return factor
+    return None
+
+
+class _NestedLoopTransformation(DetectLoop, xf.MultiStateTransformation):
+    """ Base class for transformations on two perfectly nested loops, where
+        the inner loop range does not depend on the outer loop. """
+    def _loops(self, sdfg: sd.SDFG) -> Tuple[ForLoop, ForLoop]:
+        outer = ForLoop(sdfg, self.loop_guard, self.loop_begin, self.exit_state)
+        inner = ForLoop.find_nested(sdfg, outer)
+        return outer, inner
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        if not super().can_be_applied(graph, expr_index, sdfg, permissive):
+            return False
+        try:
+            outer, inner = self._loops(sdfg)
+        except ValueError:
+            return False
+        if inner is None:
+            return False
+        for rng in ((outer.start, outer.end, outer.step), (inner.start, inner.end, inner.step)):
+            if any(symbolic.contains_sympy_functions(r) for r in rng):
+                return False
+        if (outer.step > 0) != True or (inner.step > 0) != True:
+            return False
+        # Rectangular loop nests only
+        outer_sym = symbolic.symbol(outer.itervar)
+        if any(outer_sym in sp.sympify(r).free_symbols for r in (inner.start, inner.end, inner.step)):
+            return False
+        return True
+
+    def _dependences(self, sdfg: sd.SDFG, outer: ForLoop, inner: ForLoop) -> Optional[Set[DistanceVector]]:
+        return loop_dependences(sdfg, outer.states, [outer.itervar, inner.itervar])
+
+
+@make_properties
+class LoopTiling(DetectLoop, xf.MultiStateTransformation):
+    """
+    Tiles (strip-mines) a state machine for-loop into a loop over tiles and a
+    loop within each tile. Tiling a single loop does not change the order of
+    iterations, and is combined with :class:`LoopInterchange` to improve
+    locality.
+    """
+
+    tile_size = Property(dtype=int, default=32, desc='Number of iterations in each tile')
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        if not super().can_be_applied(graph, expr_index, sdfg, permissive):
+            return False
+        if self.tile_size <= 1:
+            return False
+        try:
+            loop = ForLoop(sdfg, self.loop_guard, self.loop_begin, self.exit_state)
+        except ValueError:
+            return False
+        if any(symbolic.contains_sympy_functions(r) for r in (loop.start, loop.end, loop.step)):
+            return False
+        return (loop.step > 0) == True
+
+    def apply(self, _, sdfg: sd.SDFG):
+        loop = ForLoop(sdfg, self.loop_guard, self.loop_begin, self.exit_state)
+        tile_var = sdfg.find_new_symbol(f'{loop.itervar}_tile')
+        tile_sym = symbolic.symbol(tile_var)
+        start, end, step = loop.start, loop.end, loop.step
+        loop.wrap(tile_var, start, end, self.tile_size * step)
+        loop.set_range(loop.itervar, tile_sym, sp.Min(tile_sym + self.tile_size * step - 1, end))
+
+
+@make_properties
+class LoopInterchange(_NestedLoopTransformation):
+    """
+    Interchanges two perfectly nested state machine for-loops, if the
+    dependences in the loop body (computed from memlets) allow it.
+    """
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        if not super().can_be_applied(graph, expr_index, sdfg, permissive):
+            return False
+        outer, inner = self._loops(sdfg)
+        dependences = self._dependences(sdfg, outer, inner)
+        if dependences is None:
+            return False
+        return preserves_dependences(dependences, lambda d: (d[1], d[0]))
+
+    def apply(self, _, sdfg: sd.SDFG):
+        outer, inner = self._loops(sdfg)
+        orange = (outer.itervar, outer.start, outer.end, outer.step)
+        irange = (inner.itervar, inner.start, inner.end, inner.step)
+        outer.set_range(*irange)
+        inner.set_range(*orange)
+
+
+@make_properties
+class LoopSkewing(_NestedLoopTransformation):
+    """
+    Skews the inner loop of two perfectly nested state machine for-loops with
+    respect to the outer loop, i.e., the inner iteration variable ``j`` is
+    replaced by ``j' = j + factor * i``, where ``i`` is the outer iteration
+    variable. Skewing does not change the order of iterations, but can make
+    subsequent interchange or tiling legal (e.g., for wavefront execution).
+    """
+
+    factor = Property(dtype=int,
+                      default=0,
+                      desc='Skewing factor. If zero, uses the smallest factor that makes the loops fully '
+                      'permutable, based on the dependences in the loop body.')
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        if not super().can_be_applied(graph, expr_index, sdfg, permissive):
+            return False
+        if self.factor < 0:
+            return False
+        if self.factor == 0:
+            outer, inner = self._loops(sdfg)
+            dependences = self._dependences(sdfg, outer, inner)
+            if dependences is None:
+                return False
+            factor = skewing_factor(dependences)
+            return factor is not None and factor > 0
+        return True
+
+    def apply(self, _, sdfg: sd.SDFG):
+        outer, inner = self._loops(sdfg)
+        factor = self.factor or skewing_factor(self._dependences(sdfg, outer, inner))
+        skew(sdfg, outer, inner, factor)
+
+
+@make_properties
+class TemporalBlocking(_NestedLoopTransformation):
+    """
+    Applies temporal (wavefront) blocking to a time loop that perfectly nests
+    a loop over space, e.g., an in-place stencil. The inner loop is skewed
+    with respect to the time loop such that both loops are fully permutable,
+    tiled, and the tile loop is moved outside the time loop. Each tile then
+    performs all time steps on a skewed block of space, which stays in cache.
+    Legality is checked using the dependences in the loop body.
+    """
+
+    tile_size = Property(dtype=int, default=64, desc='Number of (skewed) inner iterations in each tile')
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        if not super().can_be_applied(graph, expr_index, sdfg, permissive):
+            return False
+        if self.tile_size <= 1:
+            return False
+        outer, inner = self._loops(sdfg)
+        if inner.step != 1:
+            return False
+        dependences = self._dependences(sdfg, outer, inner)
+        if dependences is None:
+            return False
+        return skewing_factor(dependences) is not None
+
+    def apply(self, _, sdfg: sd.SDFG):
+        outer, inner = self._loops(sdfg)
+        factor = skewing_factor(self._dependences(sdfg, outer, inner))
+        time = symbolic.symbol(outer.itervar)
+        start, end = inner.start, inner.end
+        if factor > 0:
+            skew(sdfg, outer, inner, factor)
+
+        # Tile the skewed space and move the tile loop outside the time loop
+        tile_var = sdfg.find_new_symbol(f'{inner.itervar}_tile')
+        tile_sym = symbolic.symbol(tile_var)
+        outer.wrap(tile_var, start + factor * outer.start, end + factor * outer.end, self.tile_size)
+        inner.set_range(inner.itervar, sp.Max(tile_sym, start + factor * time),
+                        sp.Min(tile_sym + self.tile_size - 1, end + factor * time))
+
+
+def skew(sdfg: sd.SDFG, outer: ForLoop, inner: ForLoop, factor: int):
+    """ Skews an inner loop with respect to an outer loop by the given factor.
+        The inner loop iterates over a new iteration variable. """
+    newvar = sdfg.find_new_symbol(f'{inner.itervar}_skewed')
+    shift = factor * symbolic.symbol(outer.itervar)
+    oldvar = inner.itervar
+    inner.set_range(newvar, inner.start + shift, inner.end + shift)
+    inner.replace_in_body(oldvar, symbolic.symbol(newvar) - shift)
+    if oldvar in sdfg.symbols:
+        sdfg.add_symbol(newvar, sdfg.symbols[oldvar])
+        sdfg.remove_symbol(oldvar)
@@ -0,0 +1,294 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Automatic mixed precision: lowers transients and the computations that
+    only access them to a narrower floating-point type, and verifies the
+    result against the full-precision program. """
+
+import copy
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from dace import data, dtypes, subsets
+from dace import sdfg as sd
+from dace.memlet import Memlet
+from dace.properties import ListProperty, TypeClassProperty, make_properties
+from dace.sdfg import nodes
+from dace.transformation import transformation
+
+
+def _is_float(dtype: dtypes.typeclass) -> bool:
+    return dtype.type in (np.float16, np.float32, np.float64)
+
+
+def _copy_subsets(sdfg: sd.SDFG, state: sd.SDFGState, edge) -> Optional[Tuple[subsets.Range, subsets.Range]]:
+    """ Returns the source and destination subsets of a copy, or None if they
+        do not have the same sizes (ignoring dimensions of size one). """
+    ssubset = edge.data.get_src_subset(edge, state) or subsets.Range.from_array(sdfg.arrays[edge.src.data])
+    dsubset = edge.data.get_dst_subset(edge, state) or subsets.Range.from_array(sdfg.arrays[edge.dst.data])
+    if [s for s in ssubset.size() if s != 1] != [s for s in dsubset.size() if s != 1]:
+        return None
+    return ssubset, dsubset
+
+
+@make_properties
+class MixedPrecision(transformation.MultiStateTransformation):
+    """
+    Lowers transient arrays of an SDFG to a narrower floating-point type
+    (e.g., ``float64`` to ``float32`` or ``float16``), reducing the memory
+    traffic of bandwidth-bound programs.
+
+    The arguments of the SDFG (i.e., its inputs and outputs), and transients
+    written with write-conflict resolution (accumulators), keep their
+    original type. Tasklets read and write lowered data in the lower
+    precision, so tasklets that only access lowered data compute in the lower
+    precision, while arithmetic with full-precision operands or constants is
+    promoted to the original precision. Copies between lowered and
+    full-precision data are replaced by maps that convert every element.
+
+    The arrays to lower can be given explicitly, e.g., as the result of
+    ``sensitivity_analysis``. Otherwise, every transient that can be lowered
+    is. Transients that are accessed by library nodes or nested SDFGs cannot
+    be lowered, and only the given (top-level) SDFG is transformed. Library
+    nodes should thus be expanded, and nested SDFGs inlined, beforehand.
+    """
+
+    precision = TypeClassProperty(default=dtypes.float32, desc='Floating-point type to lower arrays to')
+    arrays = ListProperty(str,
+                          desc='Names of the transients to lower. If empty, every transient that can be '
+                          'lowered is lowered')
+
+    def can_be_applied(self, graph, expr_index, sdfg, permissive=False):
+        if self.arrays:
+            # Explicitly given arrays that cannot be lowered raise an error
+            return any(a in sdfg.arrays and self._narrower(sdfg.arrays[a]) for a in self.arrays)
+        return len(self.lowerable(sdfg)) > 0
+
+    @classmethod
+    def expressions(cls):
+        return [sd.SDFG('_')]
+
+    def _narrower(self, desc: data.Data) -> bool:
+        return _is_float(desc.dtype) and desc.dtype.bytes > self.precision.bytes
+
+    def _accesses(self, sdfg: sd.SDFG, name: str):
+        """ Yields the state, the memlet path, the accessing node, and the
+            adjacent edge of the accessing node of every access to an array. """
+        for state in sdfg.nodes():
+            for node in state.data_nodes():
+                if node.data != name:
+                    continue
+                for e in state.in_edges(node):
+                    path = state.memlet_path(e)
+                    yield state, path, path[0].src, path[0]
+                for e in state.out_edges(node):
+                    for leaf in state.memlet_tree(e).leaves():
+                        path = state.memlet_path(leaf)
+                        yield state, path, leaf.dst, leaf
+
+    def _check(self, sdfg: sd.SDFG, name: str, lowered: Set[str]) -> Optional[str]:
+        """ Returns the reason why an array cannot be lowered along with the
+            given arrays, or None if it can. """
+        desc = sdfg.arrays[name]
+        if not desc.transient:
+            return 'it is an argument of the SDFG'
+        if not self._narrower(desc):
+            return f'its type ({desc.dtype}) is not a wider floating-point type than {self.precision}'
+        is_view = isinstance(desc, data.View)
+        for state, path, other, edge in self._accesses(sdfg, name):
+            if edge.data.is_empty():
+                continue
+            if any(e.data.wcr is not None for e in path):
+                return 'it is accumulated with write-conflict resolution'
+            if isinstance(other, nodes.AccessNode):
+                odesc = sdfg.arrays[other.data]
+                if other.data in lowered or (not is_view and len(path) == 1 and not isinstance(odesc, data.View)
+                                             and _copy_subsets(sdfg, state, path[0]) is not None):
+                    continue
+                if odesc.dtype != self.precision:
+                    return f'it is copied from or to "{other.data}" without a conversion'
+            elif not isinstance(other, nodes.Tasklet):
+                return f'it is accessed by "{other}"'
+        return None
+
+    def lowerable(self, sdfg: sd.SDFG, strict: bool = False) -> List[str]:
+        """
+        Returns the arrays that will be lowered, i.e., the given arrays (or
+        all transients) without those that cannot be lowered.
+        :param sdfg: The SDFG to lower.
+        :param strict: If True, raises a ValueError if any of the explicitly
+                       given arrays cannot be lowered.
+        """
+        if self.arrays:
+            candidates = [a for a in self.arrays if a in sdfg.arrays]
+            if strict and len(candidates) != len(self.arrays):
+                missing = [a for a in self.arrays if a not in sdfg.arrays]
+                raise ValueError(f'Arrays not found in SDFG "{sdfg.name}": {missing}')
+        else:
+            candidates = [
+                name for name, desc in sdfg.arrays.items()
+                if desc.transient and isinstance(desc, data.Array) and self._narrower(desc)
+            ]
+
+        # Removing an array may prevent others from being lowered, so the set
+        # is reduced until it is stable
+        lowered = set(candidates)
+        changed = True
+        while changed:
+            changed = False
+            for name in sorted(lowered):
+                reason = self._check(sdfg, name, lowered)
+                if reason is None:
+                    continue
+                if strict and self.arrays:
+                    raise ValueError(f'Array "{name}" cannot be lowered to {self.precision}: {reason}')
+                lowered.remove(name)
+                changed = True
+        return [a for a in candidates if a in lowered]
+
+    def _convert(self, sdfg: sd.SDFG, state: sd.SDFGState, edge):
+        """ Replaces a copy between arrays of different types by a map that
+            converts every element. """
+        src, dst = edge.src, edge.dst
+        ssubset, dsubset = _copy_subsets(sdfg, state, edge)
+        ssizes = [s for s in ssubset.size() if s != 1]
+        params = [f'__i{i}' for i in range(len(ssizes))]
+
+        def index(subset: subsets.Range) -> str:
+            it = iter(params)
+            return ', '.join(
+                str(b) if s == 1 else f'{b} + {next(it)} * {st}' for (b, _, st), s in zip(subset, subset.size()))
+
+        state.remove_edge(edge)
+        if not params:
+            tasklet = state.add_tasklet('convert', {'__inp'}, {'__out'}, '__out = __inp')
+            state.add_edge(src, None, tasklet, '__inp', Memlet(f'{src.data}[{index(ssubset)}]'))
+            state.add_edge(tasklet, '__out', dst, None, Memlet(f'{dst.data}[{index(dsubset)}]'))
+            return
+        state.add_mapped_tasklet('convert', {p: f'0:{s}'
+                                             for p, s in zip(params, ssizes)},
+                                 {'__inp': Memlet(f'{src.data}[{index(ssubset)}]')},
+                                 '__out = __inp', {'__out': Memlet(f'{dst.data}[{index(dsubset)}]')},
+                                 external_edges=True,
+                                 input_nodes={src.data: src},
+                                 output_nodes={dst.data: dst})
+
+    def apply(self, _, sdfg: sd.SDFG):
+        lowered = set(self.lowerable(sdfg, strict=True))
+        original = {name: sdfg.arrays[name].dtype for name in lowered}
+
+        for state in sdfg.nodes():
+            # Tasklets access lowered data through connectors of the lower
+            # precision, since connector types are not converted on access
+            for tasklet in state.nodes():
+                if not isinstance(tasklet, nodes.Tasklet):
+                    continue
+                for e in state.in_edges(tasklet):
+                    src = state.memlet_path(e)[0].src
+                    if isinstance(src, nodes.AccessNode) and src.data in lowered:
+                        self._retype(tasklet.in_connectors, e.dst_conn, original[src.data])
+                for e in state.out_edges(tasklet):
+                    dst = state.memlet_path(e)[-1].dst
+                    if isinstance(dst, nodes.AccessNode) and dst.data in lowered:
+                        self._retype(tasklet.out_connectors, e.src_conn, original[dst.data])
+
+            # Convert copies between lowered and full-precision arrays
+            for edge in list(state.edges()):
+                if (isinstance(edge.src, nodes.AccessNode) and isinstance(edge.dst, nodes.AccessNode)
+                        and not edge.data.is_empty() and (edge.src.data in lowered) != (edge.dst.data in lowered)):
+                    other = edge.dst.data if edge.src.data in lowered else edge.src.data
+                    if sdfg.arrays[other].dtype != self.precision:
+                        self._convert(sdfg, state, edge)
+
+        for name in lowered:
+            sdfg.arrays[name].dtype = self.precision
+
+    def _retype(self, connectors: Dict[str, dtypes.typeclass], conn: str, dtype: dtypes.typeclass):
+        """ Changes the type of a tasklet connector from the original type of
+            the data it accesses to the lower precision. Untyped connectors
+            are inferred from the lowered data. """
+        ctype = connectors[conn]
+        if isinstance(ctype, dtypes.pointer) and ctype.base_type == dtype:
+            connectors[conn] = dtypes.pointer(self.precision)
+        elif ctype == dtype:
+            connectors[conn] = self.precision
+
+
+def _outputs(sdfg: sd.SDFG, arguments: Dict[str, Any]) -> List[str]:
+    """ Returns the names of the floating-point arguments an SDFG writes to. """
+    written = set()
+    for state in sdfg.nodes():
+        written |= {n.data for n in state.data_nodes() if state.in_degree(n) > 0}
+    return [
+        name for name in sorted(written)
+        if name in arguments and not sdfg.arrays[name].transient and _is_float(sdfg.arrays[name].dtype)
+    ]
+
+
+def compare_precision(reference: sd.SDFG, lowered: sd.SDFG, arguments: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Runs an SDFG and its lowered-precision version on copies of the same
+    arguments, and returns the relative error of every floating-point output,
+    i.e., the largest absolute difference divided by the largest magnitude of
+    the full-precision result.
+    :param reference: The full-precision SDFG.
+    :param lowered: The SDFG with lowered precision.
+    :param arguments: The arguments to call both SDFGs with.
+    :return: A dictionary mapping output names to relative errors.
+    """
+    ref_args = copy.deepcopy(arguments)
+    low_args = copy.deepcopy(arguments)
+    reference(**ref_args)
+    lowered(**low_args)
+
+    errors = {}
+    for name in _outputs(reference, arguments):
+        expected = np.asarray(ref_args[name], dtype=np.float64)
+        actual = np.asarray(low_args[name], dtype=np.float64)
+        scale = np.max(np.abs(expected), initial=0) or 1
+        errors[name] = float(np.max(np.abs(actual - expected), initial=0) / scale)
+    return errors
+
+
+def sensitivity_analysis(sdfg: sd.SDFG,
+                         arguments: Dict[str, Any],
+                         tolerance: float,
+                         precision: dtypes.typeclass = dtypes.float32,
+                         candidates: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Selects the transients to lower to a narrower type, such that the
+    relative error of every output stays within a tolerance.
+
+    First, each candidate is lowered in isolation to measure the error it
+    causes. Then, candidates are lowered together in order of increasing
+    error, and a candidate is only kept if the combined program stays within
+    the tolerance. This compiles and runs the program once per candidate and
+    up to once more per candidate, so representative (small) arguments
+    should be used.
+    :param sdfg: The SDFG to analyze, which is not modified.
+    :param arguments: The arguments to call the SDFG with.
+    :param tolerance: Largest acceptable relative error of any output.
+    :param precision: Floating-point type to lower to.
+    :param candidates: Transients to consider (by default, all transients
+                       that can be lowered).
+    :return: The names of the arrays to give to ``MixedPrecision``.
+    """
+    if candidates is None:
+        candidates = MixedPrecision(sdfg, sdfg.sdfg_id, -1, {}, 0, options={'precision': precision}).lowerable(sdfg)
+    count = 0
+
+    def error(arrays: List[str]) -> float:
+        nonlocal count
+        count += 1
+        lowered = copy.deepcopy(sdfg)
+        lowered.name = f'{sdfg.name}_lowered_{count}'
+        lowered.apply_transformations(MixedPrecision, options={'precision': precision, 'arrays': arrays})
+        return max(compare_precision(sdfg, lowered, arguments).values(), default=0)
+
+    sensitivity = {name: error([name]) for name in candidates}
+    selected = []
+    for name in sorted(candidates, key=lambda c: sensitivity[c]):
+        if sensitivity[name] > tolerance:
+            break
+        if len(selected) == 0 or error(selected + [name]) <= tolerance:
+            selected.append(name)
+    return selected
@@ -0,0 +1,72 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample measures the overhead of calling Python functions from a
+    compiled SDFG, comparing one callback per map iteration with a single
+    batched callback (see the ``CallbackBatching`` transformation). """
+import argparse
+import dace
+from dace.transformation.dataflow import CallbackBatching
+import math
+import numpy as np
+from timing import median_runtime
+
+N = dace.symbol('N')
+transform = dace.symbol('transform', dace.callback(dace.float64, dace.float64))
+arrfunc = dace.symbol('arrfunc', dace.callback(None, dace.float64[N]))
+
+
+@dace.program
+def elementwise(A: dace.float64[N], B: dace.float64[N]):
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            a << A[i]
+            b >> B[i]
+            b = transform(a)
+
+
+@dace.program
+def repeated_array_calls(A: dace.float64[N], reps: dace.int64):
+    for _ in range(reps):
+        with dace.tasklet:
+            a << A
+            arrfunc(a)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('N', type=int, nargs='?', default=100000)
+    parser.add_argument('--calls', type=int, default=10000)
+    args = parser.parse_args()
+    n = args.N
+
+    A = np.random.rand(n)
+    B = np.zeros_like(A)
+
+    # One callback per element
+    sdfg = elementwise.to_sdfg()
+    csdfg = sdfg.compile()
+    t_scalar = median_runtime(csdfg, A=A, B=B, N=n, transform=math.sin)
+    assert np.allclose(B, np.sin(A))
+
+    # One callback per map, calling the Python function per element
+    sdfg = elementwise.to_sdfg()
+    sdfg.name = 'elementwise_batched'
+    assert sdfg.apply_transformations(CallbackBatching) == 1
+    csdfg = sdfg.compile()
+    B[:] = 0
+    t_batched = median_runtime(csdfg, A=A, B=B, N=n, transform=math.sin)
+    assert np.allclose(B, np.sin(A))
+
+    # One callback per map, calling a NumPy ufunc once
+    B[:] = 0
+    t_ufunc = median_runtime(csdfg, A=A, B=B, N=n, transform=np.sin)
+    assert np.allclose(B, np.sin(A))
+
+    print(f'Element-wise callbacks ({n} elements):')
+    print(f'  Per element:          {t_scalar * 1e3:10.3f} ms ({n / t_scalar:12.0f} calls/s)')
+    print(f'  Batched (Python):     {t_batched * 1e3:10.3f} ms ({n / t_batched:12.0f} calls/s)')
+    print(f'  Batched (NumPy ufunc):{t_ufunc * 1e3:10.3f} ms ({n / t_ufunc:12.0f} calls/s)')
+
+    # Repeated callbacks with array arguments reuse the array wrappers
+    csdfg = repeated_array_calls.to_sdfg().compile()
+    t_arrays = median_runtime(csdfg, A=A[:16].copy(), reps=args.calls, N=16, arrfunc=lambda a: None)
+    print(f'Array callbacks: {t_arrays / args.calls * 1e6:.3f} us per call')
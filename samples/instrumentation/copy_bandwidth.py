@@ -0,0 +1,53 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample measures the bandwidth of array-to-array copies on the CPU,
+    with and without parallel, tiled copies (``compiler.cpu.parallel_copy``).
+    It copies a matrix to an array with the same layout, to a column-major
+    array (transpose), and a sub-block of a matrix to another matrix. """
+import argparse
+import dace
+import numpy as np
+from timing import median_runtime
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+
+
+def copy_sdfg(name: str, src_subset: str, dst_subset: str, dst_strides=None) -> dace.SDFG:
+    """ Creates an SDFG that copies a subset of A into a subset of B. """
+    sdfg = dace.SDFG(name)
+    sdfg.add_array('A', [N, M], dace.float64)
+    sdfg.add_array('B', [N, M], dace.float64, strides=dst_strides)
+    state = sdfg.add_state()
+    state.add_nedge(state.add_read('A'), state.add_write('B'),
+                    dace.Memlet(data='A', subset=src_subset, other_subset=dst_subset))
+    return sdfg
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('N', type=int, nargs='?', default=8192)
+    parser.add_argument('M', type=int, nargs='?', default=8192)
+    parser.add_argument('--reps', type=int, default=10)
+    args = parser.parse_args()
+    n, m = args.N, args.M
+
+    A = np.random.rand(n, m)
+    copies = [
+        ('Copy', copy_sdfg('copy', '0:N, 0:M', '0:N, 0:M'), np.zeros((n, m)), n * m),
+        ('Transpose', copy_sdfg('transpose', '0:N, 0:M', '0:N, 0:M', [1, N]), np.zeros((n, m), order='F'), n * m),
+        ('Sub-block', copy_sdfg('subblock', '1:N-1, 1:M-1', '1:N-1, 1:M-1'), np.zeros((n, m)), (n - 2) * (m - 2)),
+    ]
+
+    print(f'Copy bandwidth ({n} x {m} doubles):')
+    for name, sdfg, B, elements in copies:
+        for parallel in (False, True):
+            with dace.config.set_temporary('compiler', 'cpu', 'parallel_copy', value=parallel):
+                variant = dace.SDFG.from_json(sdfg.to_json())
+                variant.name += '_parallel' if parallel else '_sequential'
+                csdfg = variant.compile()
+            t = median_runtime(csdfg, repetitions=args.reps, A=A, B=B, N=n, M=m)
+            if name != 'Sub-block':
+                assert np.allclose(A, B)
+            # Bytes moved: read source, write destination
+            label = 'parallel' if parallel else 'sequential'
+            print(f'  {name:10s} {label:10s} {t * 1e3:10.3f} ms {2 * 8 * elements / t * 1e-9:8.2f} GB/s')
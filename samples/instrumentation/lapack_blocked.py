@@ -0,0 +1,102 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample benchmarks the portable, blocked ("pure") expansions of the LU
+    and Cholesky factorizations and of the linear solver against NumPy, for
+    different matrix sizes and block sizes. """
+import argparse
+import dace
+import numpy as np
+import time
+from dace.libraries.lapack import Getrf, Getrs, Potrf
+from dace.libraries.linalg import Solve
+
+N = dace.symbol('N')
+
+
+def make_sdfg(op: str, implementation: str, block_size: int) -> dace.SDFG:
+    sdfg = dace.SDFG(f'{op}_{implementation}_{block_size}')
+    state = sdfg.add_state()
+    sdfg.add_array('A', [N, N], dace.float64)
+    sdfg.add_array('B', [N, N], dace.float64)
+    sdfg.add_array('X', [N, N], dace.float64)
+    sdfg.add_array('pivots', [N], dace.int32)
+    sdfg.add_array('result', [1], dace.int32)
+
+    if op == 'solve':
+        node = Solve('solve')
+        state.add_edge(state.add_read('A'), None, node, '_ain', dace.Memlet('A[0:N, 0:N]'))
+        state.add_edge(state.add_read('B'), None, node, '_bin', dace.Memlet('B[0:N, 0:N]'))
+        state.add_edge(node, '_bout', state.add_write('X'), None, dace.Memlet('X[0:N, 0:N]'))
+    else:
+        node = Getrf('getrf') if op == 'getrf' else Potrf('potrf')
+        state.add_edge(state.add_read('A'), None, node, '_xin', dace.Memlet('A[0:N, 0:N]'))
+        state.add_edge(node, '_xout', state.add_write('A'), None, dace.Memlet('A[0:N, 0:N]'))
+        state.add_edge(node, '_res', state.add_write('result'), None, dace.Memlet('result[0]'))
+        if op == 'getrf':
+            state.add_edge(node, '_ipiv', state.add_write('pivots'), None, dace.Memlet('pivots[0:N]'))
+    node.implementation = implementation
+    if op == 'solve':
+        # Expand the LAPACK nodes created by the solver with the given block size
+        node.expand(sdfg, state)
+        for n, parent in list(sdfg.all_nodes_recursive()):
+            if isinstance(n, (Getrf, Getrs)):
+                n.expand(parent.parent, parent, block_size=block_size)
+    else:
+        node.expand(sdfg, state, block_size=block_size)
+    sdfg.expand_library_nodes()
+    return sdfg
+
+
+def reference(op: str, A: np.ndarray, B: np.ndarray):
+    if op == 'getrf':
+        return np.linalg.det(A)
+    elif op == 'potrf':
+        return np.linalg.cholesky(A)
+    return np.linalg.solve(A, B)
+
+
+def flops(op: str, n: int) -> float:
+    if op == 'getrf':
+        return 2 * n**3 / 3
+    elif op == 'potrf':
+        return n**3 / 3
+    return 2 * n**3 / 3 + 2 * n**3
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[256, 512, 1024, 2048])
+    parser.add_argument('--block_sizes', type=int, nargs='+', default=[32, 64, 128])
+    parser.add_argument('--ops', nargs='+', default=['getrf', 'potrf', 'solve'])
+    parser.add_argument('--reps', type=int, default=5)
+    args = parser.parse_args()
+
+    for op in args.ops:
+        print(f'{op}:')
+        for n in args.sizes:
+            M = np.random.rand(n, n)
+            A0 = M @ M.T + n * np.eye(n) if op == 'potrf' else M
+            B0 = np.random.rand(n, n)
+
+            times = []
+            for _ in range(args.reps):
+                start = time.perf_counter()
+                reference(op, A0, B0)
+                times.append(time.perf_counter() - start)
+            print(f'  N = {n:5d}, NumPy:           {flops(op, n) / np.median(times) * 1e-9:8.2f} GFLOP/s')
+
+            for block_size in args.block_sizes:
+                csdfg = make_sdfg(op, 'pure', block_size).compile()
+                times = []
+                for _ in range(args.reps):
+                    A, B, X = A0.copy(), B0.copy(), np.zeros_like(B0)
+                    result = np.zeros([1], dtype=np.int32)
+                    pivots = np.zeros([n], dtype=np.int32)
+                    start = time.perf_counter()
+                    csdfg(A=A, B=B, X=X, pivots=pivots, result=result, N=n)
+                    times.append(time.perf_counter() - start)
+                if op == 'potrf':
+                    assert np.allclose(np.tril(A), np.linalg.cholesky(A0))
+                elif op == 'solve':
+                    assert np.allclose(A0 @ X, B0)
+                print(f'  N = {n:5d}, pure (block {block_size:3d}): '
+                      f'{flops(op, n) / np.median(times) * 1e-9:8.2f} GFLOP/s')
@@ -0,0 +1,82 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample measures the effect of NUMA placement of transient arrays
+    (``compiler.cpu.numa_placement``) on a STREAM-like triad and on the
+    Polybench 2mm and 3mm kernels, whose intermediate results are transients.
+    Differences are only visible on machines with multiple NUMA nodes. """
+import argparse
+import dace
+import importlib.util
+import numpy as np
+import os
+from timing import median_runtime
+
+N = dace.symbol('N')
+
+
+@dace.program
+def triad(A: dace.float64[N], B: dace.float64[N], out: dace.float64[N]):
+    tmp = np.ndarray([N], dtype=np.float64)
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            a << A[i]
+            b << B[i]
+            t >> tmp[i]
+            t = a + 3 * b
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            t << tmp[i]
+            a << A[i]
+            o >> out[i]
+            o = t + 3 * a
+
+
+def load_polybench(name: str):
+    """ Loads a Polybench sample module (e.g., ``3mm``) by file name. """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'polybench', name + '.py')
+    spec = importlib.util.spec_from_file_location('polybench_' + name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def compile_variants(sdfg: dace.SDFG):
+    result = []
+    for placement in ('Unmanaged', 'FirstTouch', 'Interleaved'):
+        with dace.config.set_temporary('compiler', 'cpu', 'numa_placement', value=placement):
+            variant = dace.SDFG.from_json(sdfg.to_json())
+            variant.name += '_' + placement.lower()
+            result.append((placement, variant.compile()))
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('N', type=int, nargs='?', default=1 << 25)
+    parser.add_argument('--size', type=int, default=2, help='Polybench dataset size index (0-4)')
+    args = parser.parse_args()
+    n = args.N
+
+    A, B = np.random.rand(n), np.random.rand(n)
+    out = np.zeros(n)
+    print(f'Triad through a transient ({n} elements):')
+    for placement, csdfg in compile_variants(triad.to_sdfg()):
+        t = median_runtime(csdfg, A=A, B=B, out=out, N=n)
+        assert np.allclose(out, A + 3 * B + 3 * A)
+        # Bytes moved: read A twice, B once, write and read tmp, write out
+        print(f'  {placement:12s} {t * 1e3:10.3f} ms {6 * 8 * n / t * 1e-9:8.2f} GB/s')
+
+    for name, kernel in (('2mm', 'k2mm'), ('3mm', 'k3mm')):
+        module = load_polybench(name)
+        for k, v in module.sizes[args.size].items():
+            k.set(v)
+        sizes = {str(k): v for k, v in module.sizes[args.size].items()}
+        arrays = [dace.ndarray(shape, dtype) for shape, dtype in module.args]
+        module.init_array(*arrays)
+        program = getattr(module, kernel)
+
+        print(f'Polybench {name} (dataset size {args.size}):')
+        sdfg = program.to_sdfg()
+        sdfg.specialize(sizes)
+        for placement, csdfg in compile_variants(sdfg):
+            t = median_runtime(csdfg, repetitions=5, **dict(zip(program.argnames, arrays)))
+            print(f'  {placement:12s} {t * 1e3:10.3f} ms')
@@ -0,0 +1,58 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample compares the runtime of SDFGs with multiple independent
+    branches of dataflow, with and without OpenMP task-based execution
+    (``compiler.cpu.openmp_tasks``). """
+import argparse
+import dace
+import numpy as np
+from timing import median_runtime
+
+N = dace.symbol('N')
+
+
+@dace.program
+def four_branches(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N], D: dace.float64[N], out: dace.float64[N]):
+    a = np.sin(A) * 2
+    b = np.cos(B) + 1
+    c = np.exp(C) - 1
+    d = np.sqrt(D) * 3
+    out[:] = (a + b) * (c + d)
+
+
+@dace.program
+def reductions(A: dace.float64[N], B: dace.float64[N], out: dace.float64[2]):
+    out[0] = np.sum(A * A)
+    out[1] = np.sum(B * 2)
+
+
+def compile_variants(program: dace.program):
+    result = []
+    for tasks in (False, True):
+        with dace.config.set_temporary('compiler', 'cpu', 'openmp_tasks', value=tasks):
+            sdfg = program.to_sdfg()
+            sdfg.name += '_tasks' if tasks else '_sections'
+            result.append(sdfg.compile())
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('N', type=int, nargs='?', default=1000000)
+    args = parser.parse_args()
+    n = args.N
+
+    A, B, C, D = (np.random.rand(n) for _ in range(4))
+    out = np.zeros(n)
+    reference = (np.sin(A) * 2 + np.cos(B) + 1) * (np.exp(C) - 1 + np.sqrt(D) * 3)
+    print(f'Independent branches ({n} elements):')
+    for name, csdfg in zip(('OpenMP sections', 'OpenMP tasks'), compile_variants(four_branches)):
+        t = median_runtime(csdfg, repetitions=20, A=A, B=B, C=C, D=D, out=out, N=n)
+        assert np.allclose(out, reference)
+        print(f'  {name:16s} {t * 1e3:10.3f} ms')
+
+    out = np.zeros(2)
+    print(f'Independent reductions ({n} elements):')
+    for name, csdfg in zip(('OpenMP sections', 'OpenMP tasks'), compile_variants(reductions)):
+        t = median_runtime(csdfg, repetitions=20, A=A, B=B, out=out, N=n)
+        assert np.allclose(out, [np.sum(A * A), np.sum(B * 2)])
+        print(f'  {name:16s} {t * 1e3:10.3f} ms')
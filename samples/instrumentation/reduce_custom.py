@@ -0,0 +1,73 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample benchmarks reductions with custom reduction functions, which
+    OpenMP does not support natively. The pure expansion (a map with a
+    write-conflict resolution) is compared with the "OpenMP (tree)" expansion,
+    which reduces into thread-private partial results and combines them with a
+    parallel tree. """
+import argparse
+import dace
+import numpy as np
+import time
+from dace.libraries.standard import Reduce
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+
+valindex = dace.struct('valindex', value=dace.float64, index=dace.int64)
+
+# Reduction name -> (input shape, output shape, axes, reduction function, data type)
+REDUCTIONS = {
+    'min': ([N * M], [1], None, 'lambda a, b: a if a < b else b', dace.float64),
+    'min (axis 0)': ([N, M], [M], [0], 'lambda a, b: a if a < b else b', dace.float64),
+    'min (axis 1)': ([N, M], [N], [1], 'lambda a, b: a if a < b else b', dace.float64),
+    'argmax': ([N * M], [1], None, 'lambda a, b: a if a.value >= b.value else b', valindex),
+}
+
+
+def make_sdfg(name: str, implementation: str) -> dace.SDFG:
+    inshape, outshape, axes, wcr, dtype = REDUCTIONS[name]
+    sdfg = dace.SDFG(f'reduce_{name}_{implementation}'.replace(' ', '_').replace('(', '').replace(')', ''))
+    state = sdfg.add_state()
+    sdfg.add_array('A', inshape, dtype)
+    sdfg.add_array('B', outshape, dtype)
+    red = state.add_reduce(wcr, axes)
+    red.implementation = implementation
+    state.add_nedge(state.add_read('A'), red, dace.Memlet.from_array('A', sdfg.arrays['A']))
+    state.add_nedge(red, state.add_write('B'), dace.Memlet.from_array('B', sdfg.arrays['B']))
+    return sdfg
+
+
+def make_data(name: str, n: int, m: int):
+    inshape, outshape, axes, _, _ = REDUCTIONS[name]
+    if name == 'argmax':
+        dtype = np.dtype(valindex.as_ctypes())
+        A = np.zeros([n * m], dtype=dtype)
+        A['value'] = np.random.rand(n * m)
+        A['index'] = np.arange(n * m)
+        B = np.zeros([1], dtype=dtype)
+        B['value'] = -1
+        return A, B, lambda B: B[0]['index'] == np.argmax(A['value'])
+    A = np.random.rand(*[int(dace.symbolic.evaluate(s, {N: n, M: m})) for s in inshape])
+    B = np.full([int(dace.symbolic.evaluate(s, {N: n, M: m})) for s in outshape], np.inf)
+    return A, B, lambda B: np.allclose(B, np.min(A, axis=None if axes is None else tuple(axes)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('N', type=int, nargs='?', default=8)
+    parser.add_argument('M', type=int, nargs='?', default=4000000)
+    parser.add_argument('--reps', type=int, default=10)
+    args = parser.parse_args()
+
+    for name in REDUCTIONS:
+        print(f'{name}:')
+        for implementation in ('pure', 'OpenMP (tree)'):
+            csdfg = make_sdfg(name, implementation).compile()
+            times = []
+            for _ in range(args.reps):
+                A, B, check = make_data(name, args.N, args.M)
+                start = time.perf_counter()
+                csdfg(A=A, B=B, N=args.N, M=args.M)
+                times.append(time.perf_counter() - start)
+                assert check(B)
+            print(f'  {implementation:15s}: {np.median(times) * 1e3:10.3f} ms')
@@ -0,0 +1,71 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample measures the effect of software prefetching (the
+    ``SoftwarePrefetch`` transformation) on sparse matrix-vector multiplication
+    with a CSR matrix, for different prefetch distances. The indirect accesses
+    to the dense vector are prefetched. """
+import argparse
+import dace
+import numpy as np
+import time
+from dace.transformation.dataflow import SoftwarePrefetch
+
+H = dace.symbol('H')
+W = dace.symbol('W')
+nnz = dace.symbol('nnz')
+
+
+@dace.program
+def spmv(A_row: dace.uint32[H + 1], A_col: dace.uint32[nnz], A_val: dace.float64[nnz], x: dace.float64[W],
+         b: dace.float64[H]):
+    @dace.mapscope(_[0:H])
+    def compute_row(i):
+        @dace.map(_[A_row[i]:A_row[i + 1]])
+        def compute(j):
+            a << A_val[j]
+            in_x << x[A_col[j]]
+            out >> b(1, lambda x, y: x + y)[i]
+
+            out = a * in_x
+
+
+def random_csr(rows: int, cols: int, nnz_per_row: int):
+    """ Creates a random CSR matrix with a fixed number of nonzeros per row. """
+    A_row = np.arange(0, rows * nnz_per_row + 1, nnz_per_row, dtype=np.uint32)
+    A_col = np.sort(np.random.randint(0, cols, size=(rows, nnz_per_row)), axis=1).astype(np.uint32).flatten()
+    A_val = np.random.rand(rows * nnz_per_row)
+    return A_row, A_col, A_val
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('H', type=int, nargs='?', default=1000000)
+    parser.add_argument('W', type=int, nargs='?', default=10000000)
+    parser.add_argument('--nnz_per_row', type=int, default=16)
+    parser.add_argument('--reps', type=int, default=10)
+    args = parser.parse_args()
+    h, w = args.H, args.W
+
+    A_row, A_col, A_val = random_csr(h, w, args.nnz_per_row)
+    x = np.random.rand(w)
+    ref = np.add.reduceat(A_val * x[A_col], A_row[:-1].astype(np.int64))
+
+    print(f'SpMV ({h} x {w}, {len(A_val)} nonzeros):')
+    for distance in (None, 4, 8, 16, 32, 64):
+        sdfg = spmv.to_sdfg(simplify=True)
+        if distance is None:
+            sdfg.name += '_noprefetch'
+        else:
+            sdfg.name += f'_prefetch{distance}'
+            sdfg.apply_transformations(SoftwarePrefetch, options=dict(distance=distance))
+        csdfg = sdfg.compile()
+
+        times = []
+        for _ in range(args.reps):
+            b = np.zeros(h)
+            start = time.perf_counter()
+            csdfg(A_row=A_row, A_col=A_col, A_val=A_val, x=x, b=b, H=h, W=w, nnz=len(A_val))
+            times.append(time.perf_counter() - start)
+        assert np.allclose(b, ref)
+
+        label = 'none' if distance is None else str(distance)
+        print(f'  Prefetch distance {label:>5s}: {np.median(times) * 1e3:10.3f} ms')
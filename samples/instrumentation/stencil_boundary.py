@@ -0,0 +1,59 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample measures the effect of splitting the iteration space of a CPU
+    stencil into an interior region without bounds checks and thin boundary
+    regions, with and without tiling the interior. """
+import argparse
+import dace
+import numpy as np
+import time
+from dace.libraries.stencil import Stencil
+
+R = dace.symbol('R')
+C = dace.symbol('C')
+
+
+def make_sdfg(split_boundaries: bool, tile_sizes) -> dace.SDFG:
+    name = 'stencil_' + ('split' if split_boundaries else 'nosplit')
+    if tile_sizes:
+        name += '_tiled_' + '_'.join(str(t) for t in tile_sizes)
+    sdfg = dace.SDFG(name)
+    sdfg.add_array('a', [R, C], dace.float64)
+    sdfg.add_array('res', [R, C], dace.float64)
+    state = sdfg.add_state()
+    stencil = Stencil('jacobi',
+                      'res[0, 0] = 0.2 * (a[0, 0] + a[-1, 0] + a[1, 0] + a[0, -1] + a[0, 1])',
+                      boundary_conditions={'a': {
+                          'btype': 'constant',
+                          'value': 0.0
+                      }},
+                      split_boundaries=split_boundaries,
+                      tile_sizes=tile_sizes)
+    state.add_memlet_path(state.add_read('a'), stencil, dst_conn='a', memlet=dace.Memlet('a[0:R, 0:C]'))
+    state.add_memlet_path(stencil, state.add_write('res'), src_conn='res', memlet=dace.Memlet('res[0:R, 0:C]'))
+    return sdfg
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('R', type=int, nargs='?', default=4096)
+    parser.add_argument('C', type=int, nargs='?', default=4096)
+    parser.add_argument('--reps', type=int, default=10)
+    args = parser.parse_args()
+    r, c = args.R, args.C
+
+    a = np.random.rand(r, c)
+    padded = np.pad(a, 1)
+    ref = 0.2 * (padded[1:-1, 1:-1] + padded[:-2, 1:-1] + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:])
+
+    print(f'Jacobi stencil ({r} x {c}):')
+    for split_boundaries, tile_sizes in ((False, []), (True, []), (True, [32, 512]), (True, [8, 2048])):
+        csdfg = make_sdfg(split_boundaries, tile_sizes).compile()
+        times = []
+        for _ in range(args.reps):
+            res = np.zeros_like(a)
+            start = time.perf_counter()
+            csdfg(a=a, res=res, R=r, C=c)
+            times.append(time.perf_counter() - start)
+        assert np.allclose(res, ref)
+        label = ('split' if split_boundaries else 'no split') + (f', tiles {tile_sizes}' if tile_sizes else '')
+        print(f'  {label:30s}: {np.median(times) * 1e3:10.3f} ms')
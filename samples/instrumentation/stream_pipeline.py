@@ -0,0 +1,104 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" This sample measures the throughput of consume-scope pipelines, comparing
+    the general concurrent stream with the lock-free single- and
+    multi-producer streams (``compiler.cpu.lockfree_streams``). """
+import argparse
+import dace
+import numpy as np
+from timing import median_runtime
+
+N = dace.symbol('N')
+
+
+def recursive_pipeline() -> dace.SDFG:
+    """ A single processing element that consumes and pushes to the same
+        stream: counts down every input element to zero. """
+    sdfg = dace.SDFG('stream_pipeline_recursive')
+    sdfg.add_array('A', [N], dace.int32)
+    sdfg.add_array('count', [1], dace.int64)
+    sdfg.add_stream('S', dace.int32, buffer_size=1024, transient=True)
+
+    init = sdfg.add_state()
+    init.add_mapped_tasklet('init',
+                            dict(i='0:N'),
+                            dict(a=dace.Memlet('A[i]')),
+                            's = a',
+                            dict(s=dace.Memlet('S[0]')),
+                            schedule=dace.ScheduleType.Sequential,
+                            external_edges=True)
+
+    state = sdfg.add_state_after(init)
+    entry, exit = state.add_consume('countdown', ('p', '1'))
+    tasklet = state.add_tasklet('step', {'s'}, {'sout', 'cnt'}, 'cnt = 1\nif s > 0:\n    sout = s - 1')
+    state.add_edge(state.add_read('S'), None, entry, 'IN_stream', dace.Memlet('S[0]'))
+    state.add_edge(entry, 'OUT_stream', tasklet, 's', dace.Memlet('S[0]'))
+    state.add_memlet_path(tasklet,
+                          exit,
+                          state.add_write('S'),
+                          src_conn='sout',
+                          memlet=dace.Memlet('S[0]', dynamic=True))
+    state.add_memlet_path(tasklet,
+                          exit,
+                          state.add_write('count'),
+                          src_conn='cnt',
+                          memlet=dace.Memlet('count[0]', wcr='lambda a, b: a + b'))
+    return sdfg
+
+
+def gather_pipeline() -> dace.SDFG:
+    """ A parallel map filters elements into a stream, which a single
+        processing element consumes. """
+    sdfg = dace.SDFG('stream_pipeline_gather')
+    sdfg.add_array('A', [N], dace.int32)
+    sdfg.add_array('count', [1], dace.int64)
+    sdfg.add_stream('S', dace.int32, buffer_size=1024, transient=True)
+
+    produce = sdfg.add_state()
+    produce.add_mapped_tasklet('filter',
+                               dict(i='0:N'),
+                               dict(a=dace.Memlet('A[i]')),
+                               'if a % 2 == 0:\n    s = a',
+                               dict(s=dace.Memlet('S[0]', dynamic=True)),
+                               schedule=dace.ScheduleType.CPU_Multicore,
+                               external_edges=True)
+
+    state = sdfg.add_state_after(produce)
+    entry, exit = state.add_consume('sum', ('p', '1'))
+    tasklet = state.add_tasklet('add', {'s'}, {'out'}, 'out = s')
+    state.add_edge(state.add_read('S'), None, entry, 'IN_stream', dace.Memlet('S[0]'))
+    state.add_edge(entry, 'OUT_stream', tasklet, 's', dace.Memlet('S[0]'))
+    state.add_memlet_path(tasklet,
+                          exit,
+                          state.add_write('count'),
+                          src_conn='out',
+                          memlet=dace.Memlet('count[0]', wcr='lambda a, b: a + b'))
+    return sdfg
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('N', type=int, nargs='?', default=100000)
+    parser.add_argument('--depth', type=int, default=20)
+    args = parser.parse_args()
+    n = args.N
+
+    A = np.full([n], args.depth, dtype=np.int32)
+    B = np.random.randint(0, 1000, size=n).astype(np.int32)
+    for name, generator, inputs, expected in (('Recursive (SPSC)', recursive_pipeline, A, n * (args.depth + 1)),
+                                              ('Gather (MPSC)', gather_pipeline, B, np.sum(B[B % 2 == 0]))):
+        print(f'{name}:')
+        for lockfree in (False, True):
+            with dace.config.set_temporary('compiler', 'cpu', 'lockfree_streams', value=lockfree):
+                sdfg = generator()
+                sdfg.name += '_lockfree' if lockfree else '_general'
+                csdfg = sdfg.compile()
+            count = np.zeros([1], dtype=np.int64)
+
+            def run():
+                count[0] = 0
+                csdfg(A=inputs, count=count, N=n)
+
+            t = median_runtime(run, repetitions=5)
+            assert count[0] == expected
+            label = 'Lock-free stream' if lockfree else 'General stream'
+            print(f'  {label:17s} {t * 1e3:10.3f} ms')
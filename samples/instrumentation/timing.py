@@ -0,0 +1,20 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Timing helper shared by the instrumentation samples. """
+import numpy as np
+import time
+
+
+def median_runtime(func, *args, repetitions: int = 10, **kwargs) -> float:
+    """
+    Calls a function (e.g., a compiled SDFG) repeatedly with the given
+    arguments and returns its median runtime.
+    :param func: The function to call.
+    :param repetitions: Number of calls to measure.
+    :return: The median runtime in seconds.
+    """
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
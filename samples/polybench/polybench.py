@@ -10,6 +10,7 @@ flags.DEFINE_bool('sequential', False, 'Automatically change all maps to sequent
 flags.DEFINE_bool('compile', False, 'Only compile without running')
 flags.DEFINE_bool('save', False, 'Save results to file')
 flags.DEFINE_enum('size', 'large', ['mini', 'small', 'medium', 'large', 'extralarge'], 'Dataset/problem size')
+flags.DEFINE_enum('numa', None, ['Unmanaged', 'FirstTouch', 'Interleaved'], 'NUMA placement of transient arrays')
 _SIZE_TO_IND = {'mini': 0, 'small': 1, 'medium': 2, 'large': 3, 'extralarge': 4}
 
 FLAGS = flags.FLAGS
@@ -56,6 +57,8 @@ def _main(sizes, args, output_args, init_array, func, argv, keywords=None):
                         node.map.schedule = dace.ScheduleType.Sequential
         if FLAGS.specialize:
             sdfg.specialize(psize)
+        if FLAGS.numa is not None:
+            dace.Config.set('compiler', 'cpu', 'numa_placement', value=FLAGS.numa)
         compiled_sdfg = sdfg.compile()
 
     if FLAGS.compile == False:
@@ -9,7 +9,7 @@ M = dace.symbol('M')
 N = dace.symbol('N')
 
 
-@pytest.mark.parametrize(('implementation', ), [('pure', ),
+@pytest.mark.parametrize(('implementation', ), [('pure', ), ('blocked', ),
                                                 pytest.param('MKL', marks=pytest.mark.mkl), ('OpenBLAS', ),
                                                 pytest.param('cuBLAS', marks=pytest.mark.gpu)])
 def test_gemv_strided(implementation):
@@ -33,6 +33,24 @@ def test_gemv_strided(implementation):
     assert np.allclose(daceres, reference)
 
 
+@pytest.mark.parametrize(('implementation', ), [('pure', ), ('blocked', ), pytest.param('MKL', marks=pytest.mark.mkl)])
+def test_batched_matmul(implementation):
+    @dace.program
+    def bmm(A: dace.float64[4, M, N], B: dace.float64[4, N, M]):
+        return A @ B
+
+    A = np.random.rand(4, 20, 30)
+    B = np.random.rand(4, 30, 20)
+    sdfg = bmm.to_sdfg()
+    sdfg.name = f'{sdfg.name}_{implementation}'
+
+    blas.default_implementation = implementation
+    daceres = sdfg(A=A, B=B, M=20, N=30)
+
+    blas.default_implementation = None
+    assert np.allclose(daceres, A @ B)
+
+
 def test_dot_subset():
     @dace.program
     def dot(x: dace.float64[N, N], y: dace.float64[N, N]):
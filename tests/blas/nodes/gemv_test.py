@@ -69,8 +69,8 @@ def run_gemv(target: str,
              tile_size_y: int = 32):
 
     beta = 0  # TODO: GEMV is not currently implemented for beta != 0
-    if target == "pure":
-        sdfg = pure_graph(dace.float32, transposed, "pure", vectorize, alpha, beta)
+    if target in ("pure", "blocked"):
+        sdfg = pure_graph(dace.float32, transposed, target, vectorize, alpha, beta)
     elif target == "tiles_by_column":
         if not transposed and vectorize > 1:
             raise NotImplementedError("Non-transposed vectorized tile-by-column NYI.")
@@ -115,6 +115,11 @@ def test_pure():
     run_gemv("pure", 256, 512, transposed=True)
 
 
+def test_blocked():
+    run_gemv("blocked", 256, 512, transposed=True)
+    run_gemv("blocked", 256, 512, alpha=2)
+
+
 @fpga_test()
 def test_gemv_fpga_tiles_by_column():
     return run_gemv("tiles_by_column", 256, 512, transposed=True, vectorize=4)
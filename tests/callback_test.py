@@ -103,7 +103,65 @@ def test_invalid_callback():
         shouldfail(oo)
 
 
+def test_callback_array_wrapper_reuse():
+    M = dace.symbol('M')
+    cbtype = dace.callback(None, dace.float64[2 * M])
+    seen = []
+    trampoline = cbtype.get_trampoline(seen.append, {'M': 3})
+    cfunc = cbtype.as_ctypes()(trampoline)
+
+    arr = numpy.random.rand(6)
+    for _ in range(3):
+        cfunc(arr.ctypes.data)
+    assert len(seen) == 3 and all(a is seen[0] for a in seen)
+    assert seen[0].shape == (6, ) and numpy.allclose(seen[0], arr)
+
+
+batchme = dace.symbol('batchme', dace.callback(dace.float64, dace.float64, dace.int32))
+
+
+@dace.program
+def callback_in_map(A: dace.float64[N], B: dace.int32[N], C: dace.float64[N, 2]):
+    for i in dace.map[1:N]:
+        with dace.tasklet:
+            a << A[i]
+            b << B[i - 1]
+            c >> C[i, 1]
+            c = batchme(a, b)
+
+
+@pytest.mark.parametrize('vectorized', (False, True))
+def test_callback_batching(vectorized):
+    from dace.transformation.dataflow import CallbackBatching
+
+    calls = []
+
+    def func(a, b):
+        calls.append(a)
+        return a * 2 + b
+
+    sdfg = callback_in_map.to_sdfg()
+    sdfg.name = f'callback_batching_{vectorized}'
+    assert sdfg.apply_transformations(CallbackBatching) == 1
+    assert sdfg.symbols['batchme'].batched
+
+    A = numpy.random.rand(20)
+    B = numpy.random.randint(0, 10, size=20).astype(numpy.int32)
+    C = numpy.zeros((20, 2))
+    # Callbacks are passed to the compiled SDFG, as in a call to a DaCe program
+    csdfg = sdfg.compile()
+    csdfg(A=A, B=B, C=C, N=20, batchme=numpy.vectorize(func) if vectorized else func)
+
+    assert numpy.allclose(C[1:, 1], A[1:] * 2 + B[:-1])
+    assert numpy.allclose(C[:, 0], 0) and C[0, 1] == 0
+    if not vectorized:
+        assert len(calls) == 19
+
+
 if __name__ == "__main__":
     test_callback()
     test_callback_with_arrays()
     test_invalid_callback()
+    test_callback_array_wrapper_reuse()
+    test_callback_batching(False)
+    test_callback_batching(True)
@@ -0,0 +1,158 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests alias analysis and the resulting __restrict__/SIMD code generation. """
+import os
+import shutil
+import subprocess
+
+import dace
+import numpy as np
+import pytest
+from dace.sdfg.analysis import alias_analysis
+
+N = dace.symbol('N')
+
+
+@dace.program
+def transpose_add(A: dace.float64[N, N], B: dace.float64[N, N]):
+    for i, j in dace.map[0:N, 0:N]:
+        with dace.tasklet:
+            a << A[j, i]
+            b >> B[i, j]
+            b = a + 1
+
+
+@dace.program
+def inplace(A: dace.float64[N]):
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            a << A[i]
+            b >> A[i]
+            b = a + 1
+
+
+@dace.program
+def shifted(A: dace.float64[N]):
+    for i in dace.map[1:N]:
+        with dace.tasklet:
+            a << A[i - 1]
+            b >> A[i]
+            b = a + 1
+
+
+@dace.program
+def accumulate(A: dace.float64[N], B: dace.float64[1]):
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            a << A[i]
+            b >> B(1, lambda x, y: x + y)[0]
+            b = a
+
+
+@dace.program
+def stencil_row(A: dace.float64[N], B: dace.float64[N]):
+    for i in range(1, N):
+        B[i] = A[i] + A[i - 1]
+
+
+@dace.program
+def nested_disjoint(A: dace.float64[N, N], B: dace.float64[N, N]):
+    for j in dace.map[0:N]:
+        stencil_row(A[j], B[j])
+
+
+@dace.program
+def nested_overlapping(A: dace.float64[N, N]):
+    for j in dace.map[0:N]:
+        stencil_row(A[j], A[j])
+
+
+def _pragmas(sdfg: dace.SDFG):
+    with dace.config.set_temporary('compiler', 'cpu', 'alias_analysis', value=True):
+        code = sdfg.generate_code()[0].clean_code
+    return [l.strip() for l in code.split('\n') if '#pragma omp' in l]
+
+
+def _vectorizable_maps(sdfg: dace.SDFG):
+    return [
+        alias_analysis.is_vectorizable_map(sdfg, state, node) for node, state in sdfg.all_nodes_recursive()
+        if isinstance(node, dace.nodes.MapEntry)
+    ]
+
+
+def test_simd_pragmas():
+    assert '#pragma omp simd' in _pragmas(transpose_add.to_sdfg())
+    assert '#pragma omp parallel for simd' in _pragmas(inplace.to_sdfg())
+
+    # Alias analysis is disabled by default
+    code = inplace.to_sdfg().generate_code()[0].clean_code
+    assert 'simd' not in code
+
+
+def test_no_simd_with_dependencies():
+    assert _vectorizable_maps(shifted.to_sdfg()) == [False]
+    assert _vectorizable_maps(accumulate.to_sdfg()) == [False]
+
+    sdfg = inplace.to_sdfg()
+    assert _vectorizable_maps(sdfg) == [True]
+    sdfg.arrays['A'].may_alias = True
+    assert _vectorizable_maps(sdfg) == [True]
+
+    sdfg = transpose_add.to_sdfg()
+    sdfg.arrays['A'].may_alias = True
+    assert _vectorizable_maps(sdfg) == [False]
+
+
+def test_restrict_nested_arguments():
+    for prog, expected in ((nested_disjoint, True), (nested_overlapping, False)):
+        sdfg = prog.to_sdfg(simplify=True)
+        restricted = []
+        for node, state in sdfg.all_nodes_recursive():
+            if isinstance(node, dace.nodes.NestedSDFG):
+                connectors = set(node.in_connectors) | set(node.out_connectors)
+                restricted.append(alias_analysis.restrict_arguments(state.parent, state, node) == connectors)
+        assert restricted == [expected]
+
+
+def test_simd_correctness():
+    with dace.config.set_temporary('compiler', 'cpu', 'alias_analysis', value=True):
+        A = np.random.rand(20, 20)
+        B = np.random.rand(20, 20)
+        transpose_add(A, B)
+        assert np.allclose(B, A.T + 1)
+
+        A = np.random.rand(20)
+        expected = A + 1
+        inplace(A)
+        assert np.allclose(A, expected)
+
+        A = np.random.rand(20, 20)
+        B = np.zeros_like(A)
+        nested_disjoint(A, B)
+        assert np.allclose(B[:, 1:], A[:, 1:] + A[:, :-1])
+
+
+@pytest.mark.skipif(shutil.which('g++') is None, reason='Requires GCC for vectorization reports')
+def test_simd_vectorizes():
+    sdfg = transpose_add.to_sdfg()
+    sdfg.name = 'alias_analysis_vectorizes'
+    with dace.config.set_temporary('compiler', 'cpu', 'alias_analysis', value=True):
+        sdfg.compile()
+    source = os.path.join(sdfg.build_folder, 'src', 'cpu', sdfg.name + '.cpp')
+    include = os.path.join(os.path.dirname(dace.__file__), 'runtime', 'include')
+    result = subprocess.run([
+        'g++', '-std=c++14', '-O3', '-march=native', '-fopenmp', '-fopt-info-vec-optimized', '-I' + include, '-c',
+        source, '-o', os.devnull
+    ],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT,
+                            universal_newlines=True)
+    assert result.returncode == 0
+    assert 'loop vectorized' in result.stdout
+
+
+if __name__ == '__main__':
+    test_simd_pragmas()
+    test_no_simd_with_dependencies()
+    test_restrict_nested_arguments()
+    test_simd_correctness()
+    test_simd_vectorizes()
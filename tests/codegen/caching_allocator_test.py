@@ -0,0 +1,83 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the caching allocator for non-persistent transients. """
+import dace
+import numpy as np
+
+N = dace.symbol('N')
+
+
+@dace.program
+def loop_transient(A: dace.float64[N], B: dace.float64[N]):
+    for _ in range(10):
+        tmp = A * 2
+        B[:] = B + tmp
+
+
+def test_generated_code():
+    sdfg = loop_transient.to_sdfg(simplify=True)
+    with dace.config.set_temporary('compiler', 'cpu', 'caching_allocator', value=True):
+        code = sdfg.generate_code()[0].clean_code
+        assert 'tmp = dace::allocator::allocate<double>(N);' in code
+        assert 'dace::allocator::deallocate(tmp);' in code
+        assert code.count('dace::allocator::release();') == 1
+
+        with dace.config.set_temporary('compiler', 'cpu', 'allocator_hugepages', value=True):
+            code = sdfg.generate_code()[0].clean_code
+            assert 'tmp = dace::allocator::allocate<double, true>(N);' in code
+
+    # The caching allocator is disabled by default
+    code = sdfg.generate_code()[0].clean_code
+    assert 'dace::allocator' not in code
+
+
+def test_persistent():
+    sdfg = loop_transient.to_sdfg(simplify=True)
+    sdfg.arrays['tmp'].lifetime = dace.AllocationLifetime.Persistent
+    with dace.config.set_temporary('compiler', 'cpu', 'caching_allocator', value=True):
+        code = sdfg.generate_code()[0].clean_code
+    assert 'tmp = new double DACE_ALIGN(64)[N];' in code
+    assert 'dace::allocator::deallocate(tmp);' not in code
+
+
+def test_statistics():
+    A = np.random.rand(100)
+    B = np.zeros_like(A)
+    sdfg = loop_transient.to_sdfg(simplify=True)
+    sdfg.instrument = dace.InstrumentationType.Allocator_Statistics
+    with dace.config.set_temporary('compiler', 'cpu', 'caching_allocator', value=True):
+        sdfg(A=A, B=B, N=100)
+    assert np.allclose(B, 20 * A)
+
+    report = sdfg.get_latest_report()
+    num_transients = len([d for d in sdfg.arrays.values() if d.transient])
+    assert report.counters['Allocations (0)'] == 10 * num_transients
+    # Every allocation after the first iteration reuses a cached block
+    assert report.counters['Allocator cache hits (0)'] >= 9 * num_transients
+
+
+def test_release():
+    A = np.random.rand(100)
+    B = np.zeros_like(A)
+    sdfg = loop_transient.to_sdfg(simplify=True)
+    sdfg.name = 'loop_transient_release'
+    sdfg.instrument = dace.InstrumentationType.Allocator_Statistics
+    with dace.config.set_temporary('compiler', 'cpu', 'caching_allocator', value=True):
+        csdfg = sdfg.compile()
+
+    csdfg(A=A, B=B, N=100)
+    misses = sdfg.get_latest_report().counters['Allocator cache misses (0)']
+    assert misses > 0
+
+    # Finalizing the program returns cached blocks to the system, so a new
+    # instance of the program allocates them again
+    csdfg.finalize()
+    csdfg.initialize(100)
+    csdfg(A=A, B=B, N=100)
+    assert sdfg.get_latest_report().counters['Allocator cache misses (0)'] == misses
+
+
+if __name__ == '__main__':
+    test_generated_code()
+    test_persistent()
+    test_statistics()
+    test_release()
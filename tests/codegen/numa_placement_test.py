@@ -0,0 +1,116 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests NUMA-aware placement (first-touch and interleaved) of transient CPU
+    arrays. """
+import dace
+import numpy as np
+from dace.codegen import numa
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+
+
+@dace.program
+def twostep(A: dace.float64[N, M], B: dace.float64[N, M]):
+    tmp = np.ndarray([N, M], dtype=np.float64)
+    for i in dace.map[0:N]:
+        for j in dace.map[0:M]:
+            with dace.tasklet:
+                a << A[i, j]
+                t >> tmp[i, j]
+                t = a * 2
+    for i, j in dace.map[0:N, 0:M]:
+        with dace.tasklet:
+            t << tmp[i, j]
+            b >> B[i, j]
+            b = t + 1
+
+
+@dace.program
+def partial(A: dace.float64[N, M], B: dace.float64[N, M]):
+    tmp = np.ndarray([N, M], dtype=np.float64)
+    for i, j in dace.map[1:N - 1, 0:M]:
+        with dace.tasklet:
+            a << A[i, j]
+            t >> tmp[i, j]
+            t = a * 2
+    for i, j in dace.map[0:N, 0:M]:
+        with dace.tasklet:
+            t << tmp[i, j]
+            b >> B[i, j]
+            b = t + 1
+
+
+def test_placement_resolution():
+    sdfg = twostep.to_sdfg(simplify=True)
+    assert numa.array_placement(sdfg, sdfg.arrays['A']) == dace.NUMAPlacement.Unmanaged
+    with dace.config.set_temporary('compiler', 'cpu', 'numa_placement', value='Unmanaged'):
+        assert numa.array_placement(sdfg, sdfg.arrays['tmp']) == dace.NUMAPlacement.Unmanaged
+        sdfg.arrays['tmp'].numa_placement = dace.NUMAPlacement.Interleaved
+        assert numa.array_placement(sdfg, sdfg.arrays['tmp']) == dace.NUMAPlacement.Interleaved
+    with dace.config.set_temporary('compiler', 'cpu', 'numa_placement', value='FirstTouch'):
+        sdfg.arrays['tmp'].numa_placement = dace.NUMAPlacement.Default
+        assert numa.array_placement(sdfg, sdfg.arrays['tmp']) == dace.NUMAPlacement.FirstTouch
+
+
+def test_first_touch_map():
+    sdfg = twostep.to_sdfg(simplify=True)
+    map_entry, subset = numa.first_touch_map(sdfg, 'tmp')
+    assert map_entry.map.params == ['i']
+    assert subset == dace.subsets.Range.from_string('i, 0:M')
+
+
+def test_serialize():
+    sdfg = twostep.to_sdfg(simplify=True)
+    sdfg.arrays['tmp'].numa_placement = dace.NUMAPlacement.FirstTouch
+    sdfg = dace.SDFG.from_json(sdfg.to_json())
+    assert sdfg.arrays['tmp'].numa_placement == dace.NUMAPlacement.FirstTouch
+
+
+def test_generated_code():
+    sdfg = twostep.to_sdfg(simplify=True)
+    sdfg.arrays['tmp'].numa_placement = dace.NUMAPlacement.FirstTouch
+    code = sdfg.generate_code()[0].clean_code
+    assert 'tmp[((M * i) + __dace_ft1)] = double();' in code
+    assert 'memset' not in code
+
+    sdfg.arrays['tmp'].numa_placement = dace.NUMAPlacement.Interleaved
+    code = sdfg.generate_code()[0].clean_code
+    assert 'dace::numa::interleaved_alloc<double>' in code
+    assert 'dace::numa::interleaved_free(tmp' in code
+
+
+def test_run():
+    A = np.random.rand(20, 30)
+    for placement in ('FirstTouch', 'Interleaved'):
+        B = np.zeros_like(A)
+        with dace.config.set_temporary('compiler', 'cpu', 'numa_placement', value=placement):
+            sdfg = twostep.to_sdfg(simplify=True)
+            sdfg.name += '_' + placement.lower()
+            sdfg(A=A, B=B, N=20, M=30)
+        assert np.allclose(B, A * 2 + 1)
+
+
+def test_setzero_partial():
+    # The first map does not access the first and last rows, which must
+    # still be zeroed
+    A = np.random.rand(20, 30)
+    B = np.zeros_like(A)
+    with dace.config.set_temporary('compiler', 'cpu', 'numa_placement', value='FirstTouch'):
+        sdfg = partial.to_sdfg(simplify=True)
+        for node, _ in sdfg.all_nodes_recursive():
+            if isinstance(node, dace.nodes.AccessNode) and node.data == 'tmp':
+                node.setzero = True
+        code = sdfg.generate_code()[0].clean_code
+        assert 'tmp[__dace_ft] = double();' in code
+        sdfg(A=A, B=B, N=20, M=30)
+    assert np.allclose(B[1:-1], A[1:-1] * 2 + 1)
+    assert np.allclose(B[0], 1) and np.allclose(B[-1], 1)
+
+
+if __name__ == '__main__':
+    test_placement_resolution()
+    test_first_touch_map()
+    test_serialize()
+    test_generated_code()
+    test_run()
+    test_setzero_partial()
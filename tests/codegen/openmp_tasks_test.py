@@ -0,0 +1,174 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the lowering of state dataflow to OpenMP tasks. """
+import dace
+import numpy as np
+from dace.codegen import openmp_tasks
+
+N = dace.symbol('N')
+
+
+@dace.program
+def branches(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N], D: dace.float64[N]):
+    tmp1 = A * 2
+    tmp2 = B + 1
+    C[:] = tmp1 + tmp2
+    D[:] = tmp2 * 3
+
+
+@dace.program
+def loop(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N]):
+    for _ in range(3):
+        A[:] = A + 1
+    B[:] = B * 2
+    C[:] = A + B
+
+
+def _multistate():
+    """ Two states with independent work: ``C = 2 * D`` does not need to wait
+        for the first state. """
+    sdfg = dace.SDFG('openmp_tasks_multistate')
+    for name in 'ABCDE':
+        sdfg.add_array(name, [N], dace.float64)
+    s1 = sdfg.add_state()
+    s1.add_mapped_tasklet('b2a',
+                          dict(i='0:N'),
+                          dict(b=dace.Memlet('B[i]')),
+                          'a = b + 1',
+                          dict(a=dace.Memlet('A[i]')),
+                          external_edges=True)
+    s2 = sdfg.add_state_after(s1)
+    s2.add_mapped_tasklet('d2c',
+                          dict(i='0:N'),
+                          dict(d=dace.Memlet('D[i]')),
+                          'c = d * 2',
+                          dict(c=dace.Memlet('C[i]')),
+                          external_edges=True)
+    s2.add_mapped_tasklet('a2e',
+                          dict(i='0:N'),
+                          dict(a=dace.Memlet('A[i]')),
+                          'e = a * 3',
+                          dict(e=dace.Memlet('E[i]')),
+                          external_edges=True)
+    return sdfg
+
+
+def _nested_chain():
+    """ A task chain in a nested SDFG, followed by a conditional transition
+        that either skips the last state or jumps to the end. """
+    sdfg = dace.SDFG('openmp_tasks_nested_chain')
+    for name in 'ABCDEF':
+        sdfg.add_array(name, [N], dace.float64)
+    sdfg.add_symbol('flag', dace.int32)
+    s0 = sdfg.add_state()
+    nsdfg = s0.add_nested_sdfg(_multistate(), sdfg, set('BD'), set('ACE'))
+    for name in 'BD':
+        s0.add_edge(s0.add_read(name), None, nsdfg, name, dace.Memlet.from_array(name, sdfg.arrays[name]))
+    for name in 'ACE':
+        s0.add_edge(nsdfg, name, s0.add_write(name), None, dace.Memlet.from_array(name, sdfg.arrays[name]))
+    s1 = sdfg.add_state()
+    s1.add_mapped_tasklet('e2f',
+                          dict(i='0:N'),
+                          dict(e=dace.Memlet('E[i]')),
+                          'f = e + 1',
+                          dict(f=dace.Memlet('F[i]')),
+                          external_edges=True)
+    end = sdfg.add_state()
+    sdfg.add_edge(s0, s1, dace.InterstateEdge('flag != 0'))
+    sdfg.add_edge(s0, end, dace.InterstateEdge('flag == 0'))
+    return sdfg
+
+
+def _code(sdfg: dace.SDFG) -> str:
+    with dace.config.set_temporary('compiler', 'cpu', 'openmp_tasks', value=True):
+        return sdfg.generate_code()[0].clean_code
+
+
+def test_task_units():
+    sdfg = branches.to_sdfg(simplify=True)
+    units = openmp_tasks.task_units(sdfg, sdfg.start_state)
+    assert openmp_tasks.num_compute_units(units) == 4
+    maps = {tuple(sorted(u.reads)): u for u in units if isinstance(u.node, dace.nodes.MapEntry)}
+    assert maps[('A', )].writes == {'tmp1'}
+    assert maps[('B', )].writes == {'tmp2'}
+    assert maps[('tmp1', 'tmp2')].writes == {'C'}
+    assert maps[('tmp2', )].writes == {'D'}
+
+    # Only the access node of tmp2 orders the two consumers
+    tmp2 = next(i for i, u in enumerate(units) if isinstance(u.node, dace.nodes.AccessNode) and u.node.data == 'tmp2')
+    assert tmp2 in maps[('tmp2', )].predecessors
+    assert tmp2 in maps[('tmp1', 'tmp2')].predecessors
+
+
+def test_task_code():
+    code = _code(branches.to_sdfg(simplify=True))
+    tasks = [l.strip() for l in code.split('\n') if '#pragma omp task ' in l]
+    assert len(tasks) == 4
+    assert all('depend(out:' in t for t in tasks)
+    assert any('depend(in: tmp1[0], tmp2[0])' in t for t in tasks)
+    assert '#pragma omp taskloop' in code
+    assert '#pragma omp parallel for' not in code
+    # Task loops only take clauses supported by OpenMP 4.5
+    taskloops = [l.strip() for l in code.split('\n') if '#pragma omp taskloop' in l]
+    assert all(l in ('#pragma omp taskloop', '#pragma omp taskloop simd') for l in taskloops)
+
+    # Without the setting, no tasks are generated
+    code = branches.to_sdfg(simplify=True).generate_code()[0].clean_code
+    assert '#pragma omp task ' not in code
+
+
+def test_task_chain():
+    code = _code(_multistate())
+    # One parallel region for both states
+    assert code.count('#pragma omp parallel\n') == 1
+    assert code.count('#pragma omp task ') == 3
+
+    # States with control flow create tasks per state
+    code = _code(loop.to_sdfg(simplify=True))
+    assert '#pragma omp task ' in code
+
+
+def test_task_chain_control_flow():
+    # A nested chain of tasks followed by conditional transitions
+    sdfg = _nested_chain()
+    code = _code(sdfg)
+    assert code.count('#pragma omp parallel\n') == 1
+    assert code.count('#pragma omp task ') == 3
+    assert f'goto __state_{sdfg.sdfg_id}_' in code
+
+    with dace.config.set_temporary('compiler', 'cpu', 'openmp_tasks', value=True):
+        for flag in (0, 1):
+            A, B, D = np.zeros(20), np.random.rand(20), np.random.rand(20)
+            C, E, F = np.zeros(20), np.zeros(20), np.zeros(20)
+            sdfg(A=A, B=B, C=C, D=D, E=E, F=F, N=20, flag=flag)
+            assert np.allclose(C, D * 2)
+            assert np.allclose(E, (B + 1) * 3)
+            assert np.allclose(F, (B + 1) * 3 + 1 if flag else 0)
+
+
+def test_task_correctness():
+    with dace.config.set_temporary('compiler', 'cpu', 'openmp_tasks', value=True):
+        A, B = np.random.rand(20), np.random.rand(20)
+        C, D = np.zeros_like(A), np.zeros_like(A)
+        branches(A, B, C, D)
+        assert np.allclose(C, A * 2 + B + 1)
+        assert np.allclose(D, (B + 1) * 3)
+
+        A, B, C = np.random.rand(20), np.random.rand(20), np.zeros(20)
+        expected_a, expected_b = A + 3, B * 2
+        loop(A, B, C)
+        assert np.allclose(C, expected_a + expected_b)
+
+        A, B, D = np.zeros(20), np.random.rand(20), np.random.rand(20)
+        C, E = np.zeros(20), np.zeros(20)
+        _multistate()(A=A, B=B, C=C, D=D, E=E, N=20)
+        assert np.allclose(A, B + 1)
+        assert np.allclose(C, D * 2)
+        assert np.allclose(E, (B + 1) * 3)
+
+
+if __name__ == '__main__':
+    test_task_units()
+    test_task_code()
+    test_task_chain()
+    test_task_chain_control_flow()
+    test_task_correctness()
@@ -0,0 +1,82 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests parallel and tiled copies of large CPU arrays. """
+import dace
+import numpy as np
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+
+
+def copy_sdfg(name: str, shape, dst_strides=None) -> dace.SDFG:
+    sdfg = dace.SDFG(name)
+    sdfg.add_array('A', shape, dace.float64)
+    sdfg.add_array('B', shape, dace.float64, strides=dst_strides)
+    state = sdfg.add_state()
+    state.add_nedge(state.add_read('A'), state.add_write('B'), dace.Memlet.from_array('A', sdfg.arrays['A']))
+    return sdfg
+
+
+def test_generated_code():
+    with dace.config.set_temporary('compiler', 'cpu', 'parallel_copy', value=True):
+        sdfg = copy_sdfg('pcopy_symbolic', [N, M])
+        code = sdfg.generate_code()[0].clean_code
+        assert 'dace::ParallelCopyND<double, 1>::Copy(A, B, (M * N), 1, 1);' in code
+        assert 'if (((8 * M) * N) >= 1048576)' in code
+
+        # Static sizes are decided at code generation time
+        sdfg = copy_sdfg('pcopy_small', [20, 30])
+        assert 'ParallelCopyND' not in sdfg.generate_code()[0].clean_code
+        sdfg = copy_sdfg('pcopy_large', [2000, 3000])
+        code = sdfg.generate_code()[0].clean_code
+        assert 'ParallelCopyND' in code
+        assert '>= 1048576' not in code
+
+    # Parallel copies are disabled by default
+    assert 'ParallelCopyND' not in sdfg.generate_code()[0].clean_code
+
+
+def test_parallel_scope():
+    @dace.program
+    def copy_in_map(A: dace.float64[4, 2000, 3000], B: dace.float64[4, 2000, 3000]):
+        for i in dace.map[0:4]:
+            B[i] = A[i]
+
+    sdfg = copy_in_map.to_sdfg(simplify=True)
+    with dace.config.set_temporary('compiler', 'cpu', 'parallel_copy', value=True):
+        assert 'ParallelCopyND' not in sdfg.generate_code()[0].clean_code
+
+
+def test_transpose():
+    # Copy to a column-major array
+    sdfg = copy_sdfg('pcopy_transpose', [N, M], dst_strides=[1, N])
+    A = np.random.rand(300, 500)
+    B = np.asfortranarray(np.zeros((300, 500)))
+    with dace.config.set_temporary('compiler', 'cpu', 'parallel_copy', value=True), \
+            dace.config.set_temporary('compiler', 'cpu', 'parallel_copy_threshold', value=0):
+        code = sdfg.generate_code()[0].clean_code
+        assert 'dace::ParallelCopyND<double, 2>::Copy(A, B, N, M, 1, M, 1, N);' in code
+        sdfg(A=A, B=B, N=300, M=500)
+    assert np.allclose(A, B)
+
+
+def test_subset():
+    @dace.program
+    def copy_subset(A: dace.float64[N, M], B: dace.float64[N, M]):
+        B[1:N - 1, 2:M - 3] = A[1:N - 1, 2:M - 3]
+
+    A = np.random.rand(100, 200)
+    B = np.zeros_like(A)
+    with dace.config.set_temporary('compiler', 'cpu', 'parallel_copy', value=True), \
+            dace.config.set_temporary('compiler', 'cpu', 'parallel_copy_threshold', value=0):
+        sdfg = copy_subset.to_sdfg(simplify=True)
+        assert 'ParallelCopyND' in sdfg.generate_code()[0].clean_code
+        sdfg(A=A, B=B, N=100, M=200)
+    assert np.allclose(B[1:-1, 2:-3], A[1:-1, 2:-3])
+    assert np.allclose(B[0], 0) and np.allclose(B[:, -3:], 0)
+
+
+if __name__ == '__main__':
+    test_generated_code()
+    test_parallel_scope()
+    test_transpose()
+    test_subset()
@@ -0,0 +1,95 @@
+# Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+import dace
+import numpy as np
+import pytest
+from dace.libraries.fft import FFT
+
+_params = ['pure', pytest.param('FFTW', marks=pytest.mark.fftw)]
+
+
+def _make_fft_sdfg(in_shape, in_dtype, out_shape, out_dtype, impl, **kwargs):
+    sdfg = dace.SDFG('fft_test')
+    state = sdfg.add_state()
+    _, inarr = sdfg.add_array('A', in_shape, in_dtype)
+    _, outarr = sdfg.add_array('B', out_shape, out_dtype)
+    node = FFT('fft', **kwargs)
+    node.implementation = impl
+    state.add_node(node)
+    state.add_edge(state.add_read('A'), None, node, '_in', dace.Memlet.from_array('A', inarr))
+    state.add_edge(node, '_out', state.add_write('B'), None, dace.Memlet.from_array('B', outarr))
+    return sdfg
+
+
+def _crand(*shape):
+    return np.random.rand(*shape) + 1j * np.random.rand(*shape)
+
+
+@pytest.mark.parametrize('impl', _params)
+@pytest.mark.parametrize('n', [1, 16, 60, 17, 26])
+def test_fft_1d(impl, n):
+    sdfg = _make_fft_sdfg([n], dace.complex128, [n], dace.complex128, impl)
+    a = _crand(n)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.fft.fft(a))
+
+
+@pytest.mark.parametrize('impl', _params)
+@pytest.mark.parametrize('norm', ['backward', 'ortho', 'forward'])
+def test_ifft_axis(impl, norm):
+    sdfg = _make_fft_sdfg([12, 30], dace.complex128, [12, 30], dace.complex128, impl, axes=[0], inverse=True, norm=norm)
+    a = _crand(12, 30)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.fft.ifft(a, axis=0, norm=norm))
+
+
+@pytest.mark.parametrize('impl', _params)
+def test_fftn_single(impl):
+    sdfg = _make_fft_sdfg([8, 6, 5], dace.complex64, [8, 6, 5], dace.complex64, impl)
+    a = _crand(8, 6, 5).astype(np.complex64)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.fft.fftn(a), rtol=1e-4, atol=1e-4)
+
+
+@pytest.mark.parametrize('impl', _params)
+def test_rfftn(impl):
+    sdfg = _make_fft_sdfg([6, 10], dace.float64, [6, 6], dace.complex128, impl, kind='r2c')
+    a = np.random.rand(6, 10)
+    b = np.zeros((6, 6), dtype=np.complex128)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.fft.rfftn(a))
+
+
+@pytest.mark.parametrize('impl', _params)
+def test_irfftn(impl):
+    sdfg = _make_fft_sdfg([4, 5], dace.complex128, [4, 9], dace.float64, impl, kind='c2r', inverse=True)
+    a = _crand(4, 5)
+    a_copy = a.copy()
+    b = np.zeros((4, 9))
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.fft.irfftn(a, s=(4, 9)))
+    # The input must not be overwritten
+    assert np.allclose(a, a_copy)
+
+
+@pytest.mark.fftw
+def test_fftw_plan_reuse():
+    sdfg = _make_fft_sdfg([64, 32], dace.complex128, [64, 32], dace.complex128, 'FFTW', axes=[1])
+    csdfg = sdfg.compile()
+    for _ in range(3):
+        a = _crand(64, 32)
+        b = np.zeros_like(a)
+        csdfg(A=a, B=b)
+        assert np.allclose(b, np.fft.fft(a, axis=1))
+
+
+if __name__ == '__main__':
+    for n in [1, 16, 60, 17, 26]:
+        test_fft_1d('pure', n)
+    for norm in ['backward', 'ortho', 'forward']:
+        test_ifft_axis('pure', norm)
+    test_fftn_single('pure')
+    test_rfftn('pure')
+    test_irfftn('pure')
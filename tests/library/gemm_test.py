@@ -14,10 +14,9 @@ K = dace.symbol('K')
 N = dace.symbol('N')
 
 
-@pytest.mark.parametrize(
-    ('implementation', ),
-    [('pure', ), pytest.param('MKL', marks=pytest.mark.mkl),
-     pytest.param('cuBLAS', marks=pytest.mark.gpu)])
+@pytest.mark.parametrize(('implementation', ), [('pure', ), ('blocked', ),
+                                                pytest.param('MKL', marks=pytest.mark.mkl),
+                                                pytest.param('cuBLAS', marks=pytest.mark.gpu)])
 def test_gemm_no_c(implementation):
 
     Gemm.default_implementation = implementation
@@ -130,7 +129,10 @@ def run_test(implementation,
     assert diff <= 1e-5
 
 
-@pytest.mark.parametrize(('implementation', ), [('pure', ), ('MKL', ), pytest.param('cuBLAS', marks=pytest.mark.gpu)])
+@pytest.mark.parametrize(
+    ('implementation', ),
+    [('pure', ), ('blocked', ),
+     ('MKL', ), pytest.param('cuBLAS', marks=pytest.mark.gpu)])
 def test_library_gemm(implementation):
     param_grid_trans = dict(
         transA=[True, False],
@@ -175,4 +177,5 @@ if __name__ == "__main__":
     if len(sys.argv) > 1 and sys.argv[1] == 'gpu':
         test_library_gemm('cuBLAS')
     test_library_gemm('pure')
+    test_library_gemm('blocked')
     test_library_gemm('MKL')
@@ -68,6 +68,8 @@ def make_sdfg(implementation, dtype, storage=dace.StorageType.Default):
 
 
 @pytest.mark.parametrize("implementation, dtype, storage", [
+    pytest.param("pure", dace.float32, dace.StorageType.Default),
+    pytest.param("pure", dace.float64, dace.StorageType.Default),
     pytest.param("MKL", dace.float32, dace.StorageType.Default, marks=pytest.mark.mkl),
     pytest.param("MKL", dace.float64, dace.StorageType.Default, marks=pytest.mark.mkl),
     pytest.param("OpenBLAS", dace.float32, dace.StorageType.Default, marks=pytest.mark.lapack),
@@ -96,9 +98,33 @@ def test_getrf(implementation, dtype, storage):
         raise ValueError("Validation error!")
 
 
+@pytest.mark.parametrize("dtype", [dace.float32, dace.float64])
+def test_getrf_blocked(dtype):
+    # Spans several blocks of the pure expansion
+    sdfg = make_sdfg("pure", dtype)
+    getrf_sdfg = sdfg.compile()
+    np_dtype = getattr(np, dtype.to_string())
+
+    from scipy.linalg import lu_factor
+    size = 150
+    lapack_status = np.array([-1], dtype=np.int32)
+    A = np.random.rand(size, size).astype(np_dtype)
+    lu_ref, piv_ref = lu_factor(A)
+    pivots = np.zeros([size], dtype=np.int32)
+
+    getrf_sdfg(x=A, result=lapack_status, pivots=pivots, n=size)
+
+    rtol = 1e-4 if dtype == dace.float32 else 1e-10
+    assert lapack_status[0] == 0
+    assert np.array_equal(pivots - 1, piv_ref)
+    assert np.allclose(A, lu_ref, rtol=rtol, atol=rtol)
+
+
 ###############################################################################
 
 if __name__ == "__main__":
+    test_getrf("pure", dace.float64, dace.StorageType.Default)
+    test_getrf_blocked(dace.float64)
     test_getrf("MKL", dace.float32)
     test_getrf("MKL", dace.float64)
     test_getrf("cuSolverDn", dace.float32, dace.StorageType.GPU_Global)
@@ -57,6 +57,8 @@ def make_sdfg(implementation, dtype, storage=dace.StorageType.Default):
 
 
 @pytest.mark.parametrize("implementation, dtype", [
+    pytest.param("pure", dace.float32),
+    pytest.param("pure", dace.float64),
     pytest.param("MKL", dace.float32, marks=pytest.mark.mkl),
     pytest.param("MKL", dace.float64, marks=pytest.mark.mkl),
     pytest.param("OpenBLAS", dace.float32, marks=pytest.mark.lapack),
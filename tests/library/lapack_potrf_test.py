@@ -72,6 +72,8 @@ def make_sdfg(implementation, dtype, storage=dace.StorageType.Default):
 
 
 @pytest.mark.parametrize("implementation, dtype, storage", [
+    pytest.param("pure", dace.float32, dace.StorageType.Default),
+    pytest.param("pure", dace.float64, dace.StorageType.Default),
     pytest.param("MKL", dace.float32, dace.StorageType.Default, marks=pytest.mark.mkl),
     pytest.param("MKL", dace.float64, dace.StorageType.Default, marks=pytest.mark.mkl),
     pytest.param("OpenBLAS", dace.float32, dace.StorageType.Default, marks=pytest.mark.lapack),
@@ -101,9 +103,33 @@ def test_potrf(implementation, dtype, storage):
     assert (np.linalg.norm(cholesky_ref - np.tril(A)) / np.linalg.norm(cholesky_ref)) < rtol
 
 
+@pytest.mark.parametrize("dtype", [dace.float32, dace.float64])
+def test_potrf_blocked(dtype):
+    # Spans several blocks of the pure expansion
+    sdfg = make_sdfg("pure", dtype)
+    potrf_sdfg = sdfg.compile()
+    np_dtype = getattr(np, dtype.to_string())
+
+    size = 150
+    lapack_status = np.array([-1], dtype=np.int32)
+    A = generate_matrix(size, np_dtype) + size * np.eye(size, dtype=np_dtype)
+    upper = np.triu(A, 1)
+    cholesky_ref = np.linalg.cholesky(A)
+
+    potrf_sdfg(x=A, result=lapack_status, n=size)
+
+    rtol = 1e-5 if dtype == dace.float32 else 1e-12
+    assert lapack_status[0] == 0
+    assert (np.linalg.norm(cholesky_ref - np.tril(A)) / np.linalg.norm(cholesky_ref)) < rtol
+    # The strictly upper triangle is not referenced
+    assert np.array_equal(np.triu(A, 1), upper)
+
+
 ###############################################################################
 
 if __name__ == "__main__":
+    test_potrf("pure", dace.float64, dace.StorageType.Default)
+    test_potrf_blocked(dace.float64)
     test_potrf("MKL", dace.float32, dace.StorageType.Default)
     test_potrf("MKL", dace.float64, dace.StorageType.Default)
     test_potrf("cuSolverDn", dace.float32, dace.StorageType.GPU_Global)
@@ -63,6 +63,9 @@ def make_sdfg(implementation,
 
 
 @pytest.mark.parametrize("implementation, dtype, size, shape, overwrite, getri", [
+    pytest.param('pure', np.float64, 4, [[4, 4], [4, 4], [0, 0], [0, 0], [0, 1], [0, 1]], False, True),
+    pytest.param('pure', np.float64, 4, [[5, 5, 5], [5, 5, 5], [1, 3, 0], [2, 0, 1], [0, 2], [1, 2]], True, True),
+    pytest.param('pure', np.float64, 4, [[5, 5, 5], [5, 5, 5], [1, 3, 0], [2, 0, 1], [0, 2], [1, 2]], False, False),
     pytest.param(
         'MKL', np.float32, 4, [[4, 4], [4, 4], [0, 0], [0, 0], [0, 1], [0, 1]], False, True, marks=pytest.mark.mkl),
     pytest.param(
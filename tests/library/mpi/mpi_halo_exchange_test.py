@@ -0,0 +1,100 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace
+from dace.memlet import Memlet
+import dace.libraries.mpi as mpi
+import numpy as np
+import pytest
+
+###############################################################################
+
+
+def make_sdfg(dtype, halo, periodic):
+
+    n = dace.symbol("n")
+    m = dace.symbol("m")
+
+    sdfg = dace.SDFG("mpi_halo_exchange")
+    state = sdfg.add_state("dataflow")
+
+    sdfg.add_array("A", [n, m], dtype, transient=False)
+    inbuf = state.add_access("A")
+    outbuf = state.add_access("A")
+    halo_node = mpi.nodes.halo_exchange.HaloExchange("halo_exchange", halo=halo, periodic=periodic)
+
+    state.add_memlet_path(inbuf, halo_node, dst_conn="_inbuffer", memlet=Memlet.simple(inbuf, "0:n, 0:m"))
+    state.add_memlet_path(halo_node, outbuf, src_conn="_outbuffer", memlet=Memlet.simple(outbuf, "0:n, 0:m"))
+
+    return sdfg
+
+
+def _blocks(dims, coords, size, halo, periodic):
+    """ Returns the local block (with halos) of a global array that contains
+        the global index of every element, and the expected block after the
+        halo exchange. Halos outside a non-periodic global array stay -1. """
+    global_shape = [d * s for d, s in zip(dims, size)]
+    global_array = np.arange(np.prod(global_shape), dtype=np.float64).reshape(global_shape)
+    indices = [np.arange(c * s - h, (c + 1) * s + h) for c, s, h in zip(coords, size, halo)]
+    if periodic:
+        indices = [np.mod(i, g) for i, g in zip(indices, global_shape)]
+    valid = [(i >= 0) & (i < g) for i, g in zip(indices, global_shape)]
+    clipped = [np.clip(i, 0, g - 1) for i, g in zip(indices, global_shape)]
+    expected = np.where(np.outer(*valid), global_array[np.ix_(*clipped)], -1)
+
+    local = np.full_like(expected, -1)
+    interior = tuple(slice(h, h + s) for h, s in zip(halo, size))
+    local[interior] = expected[interior]
+    return local, expected
+
+
+def _test_halo_exchange(sdfg, halo, periodic):
+    from mpi4py import MPI as MPI4PY
+    comm = MPI4PY.COMM_WORLD
+    rank = comm.Get_rank()
+    commsize = comm.Get_size()
+    mpi_sdfg = None
+    if commsize < 2:
+        raise ValueError("This test is supposed to be run with at least two processes!")
+    for r in range(0, commsize):
+        if r == rank:
+            mpi_sdfg = sdfg.compile()
+        comm.Barrier()
+
+    # The process grid is laid out in row-major order
+    dims = MPI4PY.Compute_dims(commsize, 2)
+    coords = np.unravel_index(rank, dims)
+    size = [8, 6]
+    A, expected = _blocks(dims, coords, size, halo, periodic)
+    mpi_sdfg(A=A, **{str(s): v for s, v in zip(sdfg.arrays['A'].shape, A.shape)})
+    assert np.array_equal(A, expected)
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+@pytest.mark.mpi
+def test_mpi(periodic):
+    halo = [2, 1]
+    _test_halo_exchange(make_sdfg(dace.float64, halo, [periodic] * 2), halo, periodic)
+
+
+###############################################################################
+
+N = dace.symbol('N', dtype=dace.int64)
+M = dace.symbol('M', dtype=dace.int64)
+
+
+@dace.program
+def dace_halo_exchange(A: dace.float64[N, M]):
+    dace.comm.HaloExchange(A, [2, 1], periodic=True)
+
+
+@pytest.mark.mpi
+def test_dace_halo_exchange():
+    _test_halo_exchange(dace_halo_exchange.to_sdfg(), [2, 1], True)
+
+
+###############################################################################
+
+if __name__ == "__main__":
+    test_mpi(False)
+    test_mpi(True)
+    test_dace_halo_exchange()
+###############################################################################
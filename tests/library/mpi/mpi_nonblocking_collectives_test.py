@@ -0,0 +1,113 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace
+import numpy as np
+import pytest
+from dace.transformation.interstate import CommunicationOverlap
+
+###############################################################################
+
+N = dace.symbol('N', dtype=dace.int64)
+P = dace.symbol('P', dtype=dace.int64)
+MPI_Request = dace.opaque('MPI_Request')
+
+
+@dace.program
+def dace_iallreduce(A: dace.float64[N], B: dace.float64[N]):
+    req = np.empty([1], dtype=MPI_Request)
+    dace.comm.Iallreduce(A, B, req)
+    dace.comm.Wait(req)
+
+
+@dace.program
+def dace_ibcast(A: dace.float32[N]):
+    req = np.empty([1], dtype=MPI_Request)
+    dace.comm.Ibcast(A, req, root=0)
+    dace.comm.Wait(req)
+
+
+@dace.program
+def dace_iallgather(A: dace.float64[N], B: dace.float64[N * P]):
+    req = np.empty([1], dtype=MPI_Request)
+    dace.comm.Iallgather(A, B, req)
+    dace.comm.Wait(req)
+
+
+@dace.program
+def dace_overlap(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N], D: dace.float64[N]):
+    req = np.empty([1], dtype=MPI_Request)
+    A[:] = A + 1
+    dace.comm.Iallreduce(A, B, req)
+    C[:] = C * 2
+    dace.comm.Wait(req)
+    D[:] = B + C
+
+
+def _compile(sdfg: dace.SDFG):
+    from mpi4py import MPI as MPI4PY
+    comm = MPI4PY.COMM_WORLD
+    if comm.Get_size() < 2:
+        raise ValueError("This test is supposed to be run with at least two processes!")
+    mpi_sdfg = None
+    for r in range(0, comm.Get_size()):
+        if r == comm.Get_rank():
+            mpi_sdfg = sdfg.compile()
+        comm.Barrier()
+    return mpi_sdfg, comm.Get_rank(), comm.Get_size()
+
+
+@pytest.mark.mpi
+def test_dace_iallreduce():
+    mpi_sdfg, rank, commsize = _compile(dace_iallreduce.to_sdfg())
+    length = 128
+    A = np.full([length], rank + 1, dtype=np.float64)
+    B = np.zeros([length], dtype=np.float64)
+    mpi_sdfg(A=A, B=B, N=length)
+    assert np.allclose(B, commsize * (commsize + 1) / 2)
+
+
+@pytest.mark.mpi
+def test_dace_ibcast():
+    mpi_sdfg, rank, commsize = _compile(dace_ibcast.to_sdfg())
+    length = 128
+    if rank == 0:
+        A = np.full([length], np.pi, dtype=np.float32)
+    else:
+        A = np.random.randn(length).astype(np.float32)
+    mpi_sdfg(A=A, N=length)
+    assert np.allclose(A, np.full([length], np.pi, dtype=np.float32))
+
+
+@pytest.mark.mpi
+def test_dace_iallgather():
+    mpi_sdfg, rank, commsize = _compile(dace_iallgather.to_sdfg())
+    length = 128
+    A = np.full([length], rank, dtype=np.float64)
+    B = np.zeros([length * commsize], dtype=np.float64)
+    mpi_sdfg(A=A, B=B, N=length, P=commsize)
+    assert np.allclose(B, np.repeat(np.arange(commsize), length))
+
+
+@pytest.mark.mpi
+def test_dace_overlap():
+    sdfg = dace_overlap.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations_repeated(CommunicationOverlap) == 1
+    mpi_sdfg, rank, commsize = _compile(sdfg)
+    length = 128
+    A = np.full([length], rank, dtype=np.float64)
+    B = np.zeros([length], dtype=np.float64)
+    C = np.random.rand(length)
+    D = np.zeros([length], dtype=np.float64)
+    C_ref = C * 2
+    mpi_sdfg(A=A, B=B, C=C, D=D, N=length)
+    assert np.allclose(B, commsize * (commsize + 1) / 2)
+    assert np.allclose(D, B + C_ref)
+
+
+###############################################################################
+
+if __name__ == "__main__":
+    test_dace_iallreduce()
+    test_dace_ibcast()
+    test_dace_iallgather()
+    test_dace_overlap()
+###############################################################################
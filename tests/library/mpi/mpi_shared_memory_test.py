@@ -0,0 +1,128 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the shared-memory implementation of the MPI library nodes, which
+    runs on a single node without MPI. """
+import dace
+from dace.library import change_default
+import dace.libraries.mpi as mpi
+from dace.libraries.mpi import shm
+from dace.sdfg.utils import load_precompiled_sdfg
+import numpy as np
+import pytest
+import sys
+
+###############################################################################
+
+N = dace.symbol('N', dtype=dace.int64)
+P = dace.symbol('P', dtype=dace.int64)
+myrank = dace.symbol('myrank', dtype=dace.int32)
+left = dace.symbol('left', dtype=dace.int32)
+right = dace.symbol('right', dtype=dace.int32)
+
+
+@dace.program
+def shm_collectives(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N * P], D: dace.float64[N * P],
+                    E: dace.float64[N], F: dace.float64[N]):
+    dace.comm.Bcast(A, root=P - 1)
+    dace.comm.Allreduce(B, F)
+    dace.comm.Scatter(C, E, root=0)
+    dace.comm.Gather(E, D, root=0)
+
+
+@dace.program
+def shm_ring(A: dace.float64[N], B: dace.float64[N]):
+    if myrank % 2 == 0:
+        dace.comm.Send(A, right, tag=42)
+        dace.comm.Recv(B, left, tag=42)
+    else:
+        dace.comm.Recv(B, left, tag=42)
+        dace.comm.Send(A, right, tag=42)
+
+
+def check_collectives(csdfg, rank, size):
+    n = 1000
+    A = np.full([n], np.pi if rank == size - 1 else 0, dtype=np.float64)
+    B = np.arange(n, dtype=np.float64) * (rank + 1)
+    C = np.arange(n * size, dtype=np.float64) if rank == 0 else np.zeros([n * size])
+    D = np.zeros([n * size])
+    E = np.zeros([n])
+    F = np.zeros([n])
+    csdfg(A=A, B=B, C=C, D=D, E=E, F=F, N=n, P=size)
+    assert np.allclose(A, np.pi)
+    assert np.allclose(F, np.arange(n) * size * (size + 1) / 2)
+    assert np.allclose(E, np.arange(rank * n, (rank + 1) * n))
+    if rank == 0:
+        assert np.allclose(D, np.arange(n * size))
+
+
+def check_ring(csdfg, rank, size):
+    n = 100000
+    A = np.full([n], rank, dtype=np.float64)
+    B = np.full([n], -1, dtype=np.float64)
+    csdfg(A=A, B=B, N=n, myrank=rank, left=(rank - 1) % size, right=(rank + 1) % size)
+    assert np.allclose(B, (rank - 1) % size)
+
+
+def _launch(program, check, **kwargs):
+    with change_default(mpi, 'SharedMemory'):
+        sdfg = program.to_sdfg()
+        sdfg.expand_library_nodes()
+    sdfg.compile()
+    # Every rank loads the same compiled program
+    assert shm.launch(4, [sys.executable, __file__, check.__name__, sdfg.build_folder], **kwargs) == 0
+
+
+@pytest.mark.parametrize('single_copy', [True, False])
+def test_collectives(single_copy):
+    _launch(shm_collectives, check_collectives, chunk_size=4096, single_copy=single_copy)
+
+
+@pytest.mark.parametrize('single_copy', [True, False])
+def test_send_recv(single_copy):
+    _launch(shm_ring, check_ring, chunk_size=4096, single_copy=single_copy)
+
+
+def test_single_rank():
+    # Without the launcher, programs run as a single rank
+    with change_default(mpi, 'SharedMemory'):
+        sdfg = shm_collectives.to_sdfg()
+        sdfg.expand_library_nodes()
+    check_collectives(sdfg.compile(), 0, 1)
+
+
+@dace.program
+def shm_allreduce_max(A: dace.float64[N], B: dace.float64[N]):
+    dace.comm.Allreduce(A, B, op='MPI_MAX')
+
+
+@pytest.mark.parametrize('implementation', [None, 'SharedMemory'])
+def test_serialized_reduction(implementation):
+    # The reduction operation and the library default must survive serialization
+    sdfg = dace.SDFG.from_json(shm_allreduce_max.to_sdfg().to_json())
+    node = next(n for n, _ in sdfg.all_nodes_recursive() if isinstance(n, mpi.Allreduce))
+    assert node.op == 'MPI_MAX'
+    if implementation is None:
+        sdfg.expand_library_nodes()
+        expected = 'MPI_MAX'
+    else:
+        with change_default(mpi, implementation):
+            sdfg.expand_library_nodes()
+        expected = 'dace::shm::Max'
+    tasklets = [n for n, _ in sdfg.all_nodes_recursive() if isinstance(n, dace.nodes.Tasklet)]
+    assert any(expected in t.code.as_string for t in tasklets)
+
+
+###############################################################################
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        # Launched as a rank
+        globals()[sys.argv[1]](load_precompiled_sdfg(sys.argv[2]), shm.rank(), shm.size())
+    else:
+        test_collectives(True)
+        test_collectives(False)
+        test_send_recv(True)
+        test_send_recv(False)
+        test_single_rank()
+        test_serialized_reduction(None)
+        test_serialized_reduction('SharedMemory')
+###############################################################################
@@ -5,6 +5,7 @@ import pytest
 import dace.libraries.standard as std
 
 _params = ['pure', 'CUDA (device)', 'pure-seq']
+_cpu_params = ['pure', 'OpenMP', 'OpenMP (tree)']
 
 
 @pytest.mark.gpu
@@ -26,6 +27,87 @@ def test_multidim_gpu(impl):
     assert np.allclose(b, np.sum(a, axis=(0, 2, 3)))
 
 
+def _set_reduce_implementation(sdfg: dace.SDFG, impl: str):
+    for node, _ in sdfg.all_nodes_recursive():
+        if isinstance(node, std.Reduce):
+            node.implementation = impl
+
+
+@pytest.mark.parametrize('impl', _cpu_params)
+def test_custom_wcr_cpu(impl):
+    @dace.program
+    def custommin(a: dace.float64[1000], b: dace.float64[1]):
+        dace.reduce(lambda x, y: x if x < y else y, a, b, identity=1e30)
+
+    a = np.random.rand(1000)
+    b = np.zeros([1])
+    sdfg = custommin.to_sdfg()
+    _set_reduce_implementation(sdfg, impl)
+    sdfg(a=a, b=b)
+
+    assert np.allclose(b, np.min(a))
+
+
+@pytest.mark.parametrize('impl', _cpu_params)
+def test_custom_wcr_multiaxis_cpu(impl):
+    @dace.program
+    def custommin_axes(a: dace.float64[20, 30, 40], b: dace.float64[30]):
+        dace.reduce(lambda x, y: x if x < y else y, a, b, axis=(0, 2))
+
+    a = np.random.rand(20, 30, 40)
+    b = np.full([30], 0.5)
+    sdfg = custommin_axes.to_sdfg()
+    _set_reduce_implementation(sdfg, impl)
+    sdfg(a=a, b=b)
+
+    # Without identity, the result is accumulated into the existing output
+    assert np.allclose(b, np.minimum(np.min(a, axis=(0, 2)), 0.5))
+
+
+def test_custom_wcr_noncommutative_cpu():
+    @dace.program
+    def lastelem(a: dace.float64[4, 5000], b: dace.float64[4]):
+        dace.reduce(lambda x, y: y, a, b, axis=1)
+
+    a = np.random.rand(4, 5000)
+    b = np.zeros([4])
+    sdfg = lastelem.to_sdfg()
+    _set_reduce_implementation(sdfg, 'OpenMP (tree)')
+    sdfg(a=a, b=b)
+
+    assert np.allclose(b, a[:, -1])
+
+
+@pytest.mark.parametrize('impl', ['pure', 'OpenMP'])
+def test_struct_argmax_cpu(impl):
+    valindex = dace.struct('valindex', value=dace.float64, index=dace.int64)
+    sdfg = dace.SDFG('struct_argmax_' + impl.replace(' ', '_'))
+    state = sdfg.add_state()
+    sdfg.add_array('A', [3000], valindex)
+    sdfg.add_array('B', [1], valindex)
+    red = state.add_reduce('lambda a, b: a if a.value >= b.value else b', None)
+    red.implementation = impl
+    state.add_nedge(state.add_read('A'), red, dace.Memlet('A[0:3000]'))
+    state.add_nedge(red, state.add_write('B'), dace.Memlet('B[0]'))
+
+    dtype = np.dtype(valindex.as_ctypes())
+    a = np.zeros([3000], dtype=dtype)
+    a['value'] = np.random.rand(3000)
+    a['index'] = np.arange(3000)
+    b = np.zeros([1], dtype=dtype)
+    b['value'] = -1
+    sdfg(A=a, B=b)
+
+    assert b[0]['index'] == np.argmax(a['value'])
+    assert b[0]['value'] == np.max(a['value'])
+
+
 if __name__ == '__main__':
     for p in _params:
         test_multidim_gpu(p)
+    for p in _cpu_params:
+        test_custom_wcr_cpu(p)
+        test_custom_wcr_multiaxis_cpu(p)
+    test_custom_wcr_noncommutative_cpu()
+    test_struct_argmax_cpu('pure')
+    test_struct_argmax_cpu('OpenMP')
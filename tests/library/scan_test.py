@@ -0,0 +1,66 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace
+import numpy as np
+import pytest
+import dace.libraries.standard as std
+
+_params = ['pure', 'OpenMP']
+
+
+def _make_scan_sdfg(shape, axis, wcr, identity=None, exclusive=False, impl='pure'):
+    sdfg = dace.SDFG('scan_test')
+    state = sdfg.add_state()
+    _, inarr = sdfg.add_array('A', shape, dace.float64)
+    _, outarr = sdfg.add_array('B', shape, dace.float64)
+    node = std.Scan(wcr, axis=axis, identity=identity, exclusive=exclusive)
+    node.implementation = impl
+    state.add_node(node)
+    state.add_edge(state.add_read('A'), None, node, '_in', dace.Memlet.from_array('A', inarr))
+    state.add_edge(node, '_out', state.add_write('B'), None, dace.Memlet.from_array('B', outarr))
+    return sdfg
+
+
+@pytest.mark.parametrize('impl', _params)
+def test_inclusive_1d(impl):
+    sdfg = _make_scan_sdfg([1000], 0, 'lambda a, b: a + b', impl=impl)
+    a = np.random.rand(1000)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.cumsum(a))
+
+
+@pytest.mark.parametrize('impl', _params)
+def test_exclusive_1d(impl):
+    sdfg = _make_scan_sdfg([1000], 0, 'lambda a, b: a + b', identity=0, exclusive=True, impl=impl)
+    a = np.random.rand(1000)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.cumsum(a) - a)
+
+
+@pytest.mark.parametrize('impl', _params)
+@pytest.mark.parametrize('axis', [0, 1, 2])
+def test_inclusive_axis(impl, axis):
+    sdfg = _make_scan_sdfg([6, 7, 8], axis, 'lambda a, b: a + b', impl=impl)
+    a = np.random.rand(6, 7, 8)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.cumsum(a, axis=axis))
+
+
+@pytest.mark.parametrize('impl', _params)
+def test_custom_wcr(impl):
+    sdfg = _make_scan_sdfg([20, 300], 1, 'lambda a, b: max(a, b)', impl=impl)
+    a = np.random.rand(20, 300)
+    b = np.zeros_like(a)
+    sdfg(A=a, B=b)
+    assert np.allclose(b, np.maximum.accumulate(a, axis=1))
+
+
+if __name__ == '__main__':
+    for p in _params:
+        test_inclusive_1d(p)
+        test_exclusive_1d(p)
+        for axis in range(3):
+            test_inclusive_axis(p, axis)
+        test_custom_wcr(p)
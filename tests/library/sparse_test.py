@@ -0,0 +1,110 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace
+import numpy as np
+import pytest
+import scipy.sparse
+from dace.libraries.sparse import SpMM, SpMV
+from dace.libraries.sparse.sparse_helpers import add_sparse_input
+
+M, N, K, nnz = (dace.symbol(s) for s in ('M', 'N', 'K', 'nnz'))
+
+_impls = ['pure', 'OpenMP', pytest.param('MKL', marks=pytest.mark.mkl)]
+
+
+def _make_sdfg(fmt, impl, matrix, beta, dtype=dace.float64):
+    sdfg = dace.SDFG(f'sparse_{fmt}_{impl}_{"spmm" if matrix else "spmv"}')
+    state = sdfg.add_state()
+    sdfg.add_sparse('A', dace.data.CSR(dtype, [M, K], nnz) if fmt == 'CSR' else dace.data.COO(dtype, [M, K], nnz))
+    if matrix:
+        _, barr = sdfg.add_array('B', [K, N], dtype)
+        _, carr = sdfg.add_array('C', [M, N], dtype)
+        node = SpMM('spmm', format=fmt, alpha=2, beta=beta)
+        conns = '_b', '_c'
+    else:
+        _, barr = sdfg.add_array('B', [K], dtype)
+        _, carr = sdfg.add_array('C', [M], dtype)
+        node = SpMV('spmv', format=fmt, alpha=2, beta=beta)
+        conns = '_x', '_y'
+    node.implementation = impl
+    add_sparse_input(state, 'A', node)
+    state.add_edge(state.add_read('B'), None, node, conns[0], dace.Memlet.from_array('B', barr))
+    if beta != 0:
+        state.add_edge(state.add_read('C'), None, node, conns[1] + 'in', dace.Memlet.from_array('C', carr))
+    state.add_edge(node, conns[1], state.add_write('C'), None, dace.Memlet.from_array('C', carr))
+    return sdfg
+
+
+def _random_matrix(fmt, rows, cols):
+    A = scipy.sparse.random(rows, cols, density=0.05, format='lil', random_state=0)
+    A[3, :] = 1  # A dense row
+    A[rows // 2:rows // 2 + 10, :] = 0  # Empty rows
+    A = A.asformat(fmt.lower())
+    if fmt == 'COO':
+        # Elements of COO matrices may be stored in any order
+        perm = np.random.permutation(A.nnz)
+        A = scipy.sparse.coo_matrix((A.data[perm], (A.row[perm], A.col[perm])), shape=A.shape)
+    return A
+
+
+@pytest.mark.parametrize('impl', _impls)
+@pytest.mark.parametrize('fmt', ['CSR', 'COO'])
+@pytest.mark.parametrize('beta', [0, 3])
+def test_spmv(impl, fmt, beta):
+    A = _random_matrix(fmt, 200, 150)
+    x = np.random.rand(150)
+    y = np.random.rand(200)
+    ref = 2 * (A @ x) + beta * y
+    # Sparse matrices are passed directly, and their sizes are inferred
+    _make_sdfg(fmt, impl, False, beta)(A=A, B=x, C=y)
+    assert np.allclose(y, ref)
+
+
+@pytest.mark.parametrize('impl', _impls)
+@pytest.mark.parametrize('fmt', ['CSR', 'COO'])
+@pytest.mark.parametrize('beta', [0, 3])
+def test_spmm(impl, fmt, beta):
+    A = _random_matrix(fmt, 200, 150)
+    B = np.random.rand(150, 7)
+    C = np.random.rand(200, 7)
+    ref = 2 * (A @ B) + beta * C
+    _make_sdfg(fmt, impl, True, beta)(A=A, B=B, C=C, N=7)
+    assert np.allclose(C, ref)
+
+
+def test_descriptors():
+    A = _random_matrix('CSR', 20, 10)
+    desc = dace.data.Sparse.from_matrix(A)
+    assert isinstance(desc, dace.data.CSR)
+    assert tuple(desc.shape) == (20, 10) and desc.nnz == A.nnz
+    assert isinstance(dace.data.Sparse.from_matrix(A.tocoo()), dace.data.COO)
+
+    # Sparse matrices are only supported as arguments of SDFGs that contain
+    # their descriptors, not as general data (e.g., in the Python frontend)
+    with pytest.raises(TypeError):
+        dace.data.create_datadescriptor(A)
+
+    # Arguments own their data even if the matrix members are views
+    V = scipy.sparse.csr_matrix((A.data[:], A.indices[:], A.indptr[:]), shape=A.shape)
+    assert V.data.base is not None
+    args = dace.data.CSR(dace.float64, [M, K], nnz).arguments('A', V)
+    assert all(args['A_' + m].base is None for m in ('indptr', 'indices', 'data'))
+    assert args['M'] == 20 and args['nnz'] == A.nnz
+
+    sdfg = dace.SDFG('sparse_descriptors')
+    name, _ = sdfg.add_sparse('A', dace.data.COO(dace.float32, [M, K], nnz))
+    assert set(sdfg.arrays.keys()) == {'A_row', 'A_col', 'A_data'}
+    assert sdfg.add_sparse('A', dace.data.COO(dace.float32, [M, K], nnz), find_new_name=True)[0] != name
+
+    # Sparse matrices are serialized with the SDFG
+    loaded = dace.SDFG.from_json(sdfg.to_json())
+    assert isinstance(loaded.sparse_arrays['A'], dace.data.COO)
+    assert loaded.sparse_arrays['A'].nnz == nnz
+
+
+if __name__ == '__main__':
+    for impl in ['pure', 'OpenMP']:
+        for fmt in ['CSR', 'COO']:
+            for beta in [0, 3]:
+                test_spmv(impl, fmt, beta)
+                test_spmm(impl, fmt, beta)
+    test_descriptors()
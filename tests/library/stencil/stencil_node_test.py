@@ -117,6 +117,51 @@ def test_stencil_node_2d():
     run_stencil_2d(make_sdfg_2d("pure", 1), 16, 32, False)
 
 
+def make_sdfg_2d_boundary(boundary_conditions, split_boundaries: bool, tile_sizes=None):
+    name = "stencil_node_test_2d_boundary_" + ("split" if split_boundaries else "nosplit")
+    if tile_sizes:
+        name += "_tiled"
+    sdfg = dace.SDFG(name)
+    _, a_desc = sdfg.add_array("a", (ROWS, COLS), dtype=DTYPE)
+    _, res_desc = sdfg.add_array("res", (ROWS, COLS), dtype=DTYPE)
+    state = sdfg.add_state("stencil_node_test_2d_boundary")
+    stencil_node = Stencil("stencil_test",
+                           "res[0, 0] = a[-2, 0] + 2 * a[1, 0] + 3 * a[0, -1] + 4 * a[0, 3]",
+                           boundary_conditions=boundary_conditions,
+                           split_boundaries=split_boundaries,
+                           tile_sizes=tile_sizes)
+    state.add_node(stencil_node)
+    state.add_memlet_path(state.add_read("a"), stencil_node, dst_conn="a", memlet=dace.Memlet.from_array("a", a_desc))
+    state.add_memlet_path(stencil_node,
+                          state.add_write("res"),
+                          src_conn="res",
+                          memlet=dace.Memlet.from_array("res", res_desc))
+    sdfg.expand_library_nodes()
+    return sdfg
+
+
+def test_stencil_node_2d_boundary_split():
+    rows, cols = 13, 21
+    a = np.random.rand(rows, cols).astype(DTYPE)
+    for boundary_conditions, value in (({}, None), ({"a": {"btype": "constant", "value": 0.5}}, 0.5)):
+        pad = np.pad(a, ((2, 1), (1, 3)), constant_values=value or 0)
+        expected = (pad[:-3, 1:-3] + 2 * pad[3:, 1:-3] + 3 * pad[2:-1, :-4] + 4 * pad[2:-1, 4:])
+        for split_boundaries, tile_sizes in ((False, None), (True, None), (True, [4, 8])):
+            sdfg = make_sdfg_2d_boundary(boundary_conditions, split_boundaries, tile_sizes)
+            maps = [n for n in sdfg.all_nodes_recursive() if isinstance(n[0], dace.nodes.MapEntry)]
+            # Interior, two boundary regions per dimension, and tiles
+            assert len(maps) == (1 if not split_boundaries else 5 if not tile_sizes else 6)
+            res = np.full((rows, cols), -1, dtype=DTYPE)
+            sdfg(a=a, res=res, rows=rows, cols=cols)
+            if boundary_conditions:
+                assert np.allclose(res, expected)
+            else:
+                # Shrink boundary condition: only the interior is written
+                assert np.allclose(res[2:-1, 1:-3], expected[2:-1, 1:-3])
+                assert np.all(res[:2] == -1) and np.all(res[-1:] == -1)
+                assert np.all(res[:, :1] == -1) and np.all(res[:, -3:] == -1)
+
+
 def stencil_node_2d_fpga_array(vector_length: int):
     sdfg = make_sdfg_2d(dace.Config.get("compiler", "fpga", "vendor"), vector_length)
     sdfg.specialize({"cols": 8})
@@ -140,5 +185,6 @@ if __name__ == "__main__":
     test_stencil_node_1d()
     test_stencil_node_1d_fpga_array(None)
     test_stencil_node_2d()
+    test_stencil_node_2d_boundary_split()
     test_stencil_node_2d_fpga_array(None)
     test_stencil_node_2d_fpga_array_vectorized(None)
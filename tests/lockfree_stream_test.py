@@ -0,0 +1,121 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the selection of lock-free stream implementations based on the number
+    of producers and consumers of a stream. """
+import dace
+import numpy as np
+from dace.sdfg.analysis import stream_analysis
+
+N = dace.symbol('N')
+
+
+def _fibonacci_sdfg(num_pes: int) -> dace.SDFG:
+    """ Fibonacci recursion where the consume scope pushes to its own stream. """
+    sdfg = dace.SDFG(f'lockfree_fib_{num_pes}')
+    sdfg.add_array('iv', [1], dace.int32)
+    sdfg.add_array('res', [1], dace.float32)
+    sdfg.add_stream('S', dace.int32, transient=True)
+
+    init = sdfg.add_state()
+    init.add_nedge(init.add_read('iv'), init.add_write('S'), dace.Memlet('S[0]'))
+
+    state = sdfg.add_state_after(init)
+    stream = state.add_read('S')
+    stream_out = state.add_access('S')
+    output = state.add_write('res')
+    consume_entry, consume_exit = state.add_consume('cons', ('p', str(num_pes)))
+    tasklet = state.add_tasklet('fibonacci', {'s'}, {'sout', 'val'}, """
+if s == 1:
+    val = 1
+elif s > 1:
+    sout = s - 1
+    sout = s - 2
+""")
+
+    state.add_edge(stream, None, consume_entry, 'IN_stream', dace.Memlet('S[0]'))
+    state.add_edge(consume_entry, 'OUT_stream', tasklet, 's', dace.Memlet('S[0]'))
+    state.add_memlet_path(tasklet, consume_exit, stream_out, src_conn='sout', memlet=dace.Memlet('S[0]', dynamic=True))
+    state.add_memlet_path(tasklet,
+                          consume_exit,
+                          output,
+                          src_conn='val',
+                          memlet=dace.Memlet('res[0]', wcr='lambda a, b: a + b', dynamic=True))
+    return sdfg
+
+
+def _gather_sdfg() -> dace.SDFG:
+    """ A parallel map pushes positive elements to a stream, which a single
+        processing element consumes. """
+    sdfg = dace.SDFG('lockfree_gather')
+    sdfg.add_array('A', [N], dace.int32)
+    sdfg.add_array('res', [1], dace.int32)
+    sdfg.add_stream('S', dace.int32, transient=True)
+
+    produce = sdfg.add_state()
+    produce.add_mapped_tasklet('push',
+                               dict(i='0:N'),
+                               dict(a=dace.Memlet('A[i]')),
+                               'if a > 0:\n    s = a',
+                               dict(s=dace.Memlet('S[0]', dynamic=True)),
+                               schedule=dace.ScheduleType.CPU_Multicore,
+                               external_edges=True)
+
+    consume = sdfg.add_state_after(produce)
+    stream = consume.add_read('S')
+    output = consume.add_write('res')
+    consume_entry, consume_exit = consume.add_consume('cons', ('p', '1'))
+    tasklet = consume.add_tasklet('add', {'s'}, {'out'}, 'out = s')
+    consume.add_edge(stream, None, consume_entry, 'IN_stream', dace.Memlet('S[0]'))
+    consume.add_edge(consume_entry, 'OUT_stream', tasklet, 's', dace.Memlet('S[0]'))
+    consume.add_memlet_path(tasklet,
+                            consume_exit,
+                            output,
+                            src_conn='out',
+                            memlet=dace.Memlet('res[0]', wcr='lambda a, b: a + b'))
+    return sdfg
+
+
+def _stream_declaration(sdfg: dace.SDFG) -> str:
+    code = sdfg.generate_code()[0].clean_code
+    return next(l.strip() for l in code.split('\n') if 'Stream<int> S' in l)
+
+
+def test_stream_concurrency():
+    sdfg = _fibonacci_sdfg(1)
+    assert stream_analysis.stream_concurrency(sdfg, 'S') == (False, False)
+    sdfg = _fibonacci_sdfg(4)
+    assert stream_analysis.stream_concurrency(sdfg, 'S') == (True, True)
+    sdfg = _gather_sdfg()
+    assert stream_analysis.stream_concurrency(sdfg, 'S') == (True, False)
+
+
+def test_stream_class():
+    with dace.config.set_temporary('compiler', 'cpu', 'lockfree_streams', value=True):
+        assert _stream_declaration(_fibonacci_sdfg(1)).startswith('dace::SPSCStream<int>')
+        assert _stream_declaration(_fibonacci_sdfg(4)).startswith('dace::Stream<int>')
+        assert _stream_declaration(_gather_sdfg()).startswith('dace::MPSCStream<int>')
+
+    # Lock-free streams are disabled by default
+    assert _stream_declaration(_fibonacci_sdfg(1)).startswith('dace::Stream<int>')
+
+
+def test_spsc_consume():
+    iv = np.array([10], dtype=np.int32)
+    res = np.zeros([1], dtype=np.float32)
+    with dace.config.set_temporary('compiler', 'cpu', 'lockfree_streams', value=True):
+        _fibonacci_sdfg(1)(iv=iv, res=res)
+    assert res[0] == 55
+
+
+def test_mpsc_consume():
+    A = np.random.randint(-10, 10, size=1000).astype(np.int32)
+    res = np.zeros([1], dtype=np.int32)
+    with dace.config.set_temporary('compiler', 'cpu', 'lockfree_streams', value=True):
+        _gather_sdfg()(A=A, res=res, N=A.shape[0])
+    assert res[0] == np.sum(A[A > 0])
+
+
+if __name__ == '__main__':
+    test_stream_concurrency()
+    test_stream_class()
+    test_spsc_consume()
+    test_mpsc_consume()
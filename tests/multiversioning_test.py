@@ -0,0 +1,64 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests runtime multi-versioning of SDFGs on symbol values. """
+import dace
+import numpy as np
+from dace.sdfg.multiversioning import MultipleOf, get_versions, version_condition
+from dace.transformation.dataflow import Vectorization
+
+N = dace.symbol('N')
+
+
+@dace.program
+def axpy(A: dace.float64[N], B: dace.float64[N], out: dace.float64[N]):
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            a << A[i]
+            b << B[i]
+            o >> out[i]
+            o = 2 * a + b
+
+
+def test_conditions():
+    assert version_condition({'N': 16}) == '(N == 16)'
+    assert version_condition({'N': (1, 64)}) == '(N >= 1) and (N <= 64)'
+    assert version_condition({'N': MultipleOf(8)}) == '(N % 8 == 0)'
+    assert version_condition({}) == 'True'
+
+
+def test_generated_code():
+    sdfg = axpy.to_sdfg(simplify=True)
+    msdfg = sdfg.multiversion([{'N': 16}, {'N': MultipleOf(8)}])
+    msdfg.validate()
+    assert msdfg.name == sdfg.name
+
+    versions = get_versions(msdfg)
+    assert [v.name for v in versions] == [f'{sdfg.name}_version_0', f'{sdfg.name}_version_1', f'{sdfg.name}_generic']
+    assert versions[0].constants['N'] == 16
+    assert '__dace_N_div8' in versions[1].symbols
+    assert 'N' not in versions[1].symbols
+
+    code = msdfg.generate_code()[0].clean_code
+    assert 'constexpr long long N = 16;' in code
+    assert '__dace_N_div8' in code
+
+
+def test_run():
+    sdfg = axpy.to_sdfg(simplify=True)
+    msdfg = sdfg.multiversion([{'N': 16}, {'N': MultipleOf(8)}, {'N': (1, 64)}])
+    # Versions can be optimized separately: the version for multiples of the
+    # vector length does not need a remainder loop
+    assert get_versions(msdfg)[1].apply_transformations(Vectorization, options=dict(vector_len=8)) == 1
+
+    func = msdfg.compile()
+    for n in (1, 7, 8, 16, 24, 63, 64, 65, 80, 101):
+        A = np.random.rand(n)
+        B = np.random.rand(n)
+        out = np.zeros(n)
+        func(A=A, B=B, out=out, N=n)
+        assert np.allclose(out, 2 * A + B)
+
+
+if __name__ == '__main__':
+    test_conditions()
+    test_generated_code()
+    test_run()
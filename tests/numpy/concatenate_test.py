@@ -0,0 +1,89 @@
+# Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+import numpy as np
+import dace
+from common import compare_numpy_output
+
+
+@compare_numpy_output()
+def test_concatenate_axis0(A: dace.float64[10, 4], B: dace.float64[6, 4]):
+    return np.concatenate((A, B))
+
+
+@compare_numpy_output()
+def test_concatenate_axis1(A: dace.float64[10, 4], B: dace.float64[10, 3], C: dace.float64[10, 5]):
+    return np.concatenate([A, B, C], axis=-1)
+
+
+@compare_numpy_output()
+def test_stack_axis0(A: dace.float64[10, 4], B: dace.float64[10, 4]):
+    return np.stack((A, B))
+
+
+@compare_numpy_output()
+def test_stack_axis2(A: dace.float64[10, 4], B: dace.float64[10, 4]):
+    return np.stack((A, B), axis=2)
+
+
+@compare_numpy_output()
+def test_split_sections(A: dace.float64[12, 5]):
+    a, b, c = np.split(A, 3)
+    return a + 2 * b + 3 * c
+
+
+@compare_numpy_output()
+def test_split_indices(A: dace.float64[6, 10]):
+    a, b, c = np.split(A, [2, 7], axis=1)
+    return np.sum(a) + np.sum(b) * 2 + np.sum(c) * 3
+
+
+@compare_numpy_output()
+def test_split_negative_indices(A: dace.float64[10, 4]):
+    a, b, c = np.split(A, [-7, -3])
+    return np.sum(a) + np.sum(b) * 2 + np.sum(c) * 3
+
+
+@compare_numpy_output()
+def test_array_split_uneven(A: dace.float64[10, 4]):
+    a, b, c = np.array_split(A, 3)
+    return a[1:] - b + c
+
+
+def test_concatenate_no_intermediate():
+    @dace.program
+    def concat_tmp(A: dace.float64[10, 4], B: dace.float64[6, 4]):
+        return np.concatenate((A + 1, B * 2))
+
+    sdfg = concat_tmp.to_sdfg()
+    # Producers should write directly into the output slices
+    assert all(sdfg.arrays[n.data].transient is False for state in sdfg.nodes() for n in state.data_nodes()
+               if n.data != '__return')
+
+    A = np.random.rand(10, 4)
+    B = np.random.rand(6, 4)
+    assert np.allclose(sdfg(A=A, B=B), np.concatenate((A + 1, B * 2)))
+
+
+def test_split_write_through():
+    @dace.program
+    def split_write(A: dace.float64[12]):
+        a, b = np.split(A, 2)
+        a[:] = b + 1
+
+    A = np.random.rand(12)
+    expected = A.copy()
+    expected[:6] = expected[6:] + 1
+    split_write(A)
+    assert np.allclose(A, expected)
+
+
+if __name__ == '__main__':
+    test_concatenate_axis0()
+    test_concatenate_axis1()
+    test_stack_axis0()
+    test_stack_axis2()
+    test_split_sections()
+    test_split_indices()
+    test_split_negative_indices()
+    test_array_split_uneven()
+    test_concatenate_no_intermediate()
+    test_split_write_through()
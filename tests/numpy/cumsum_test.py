@@ -0,0 +1,43 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+import dace
+import numpy as np
+from common import compare_numpy_output
+
+
+@compare_numpy_output()
+def test_cumsum_1d(A: dace.float64[20]):
+    return np.cumsum(A)
+
+
+@compare_numpy_output()
+def test_cumsum_flatten(A: dace.float64[10, 5, 3]):
+    return np.cumsum(A)
+
+
+@compare_numpy_output()
+def test_cumsum_axis(A: dace.float64[10, 5, 3]):
+    return np.cumsum(A, axis=1)
+
+
+@compare_numpy_output()
+def test_cumsum_negative_axis(A: dace.int64[10, 5]):
+    return np.cumsum(A, axis=-1)
+
+
+@compare_numpy_output()
+def test_cumprod_1d(A: dace.float64[10]):
+    return np.cumprod(A)
+
+
+@compare_numpy_output()
+def test_cumprod_axis(A: dace.float64[10, 5]):
+    return np.cumprod(A, axis=0)
+
+
+if __name__ == '__main__':
+    test_cumsum_1d()
+    test_cumsum_flatten()
+    test_cumsum_axis()
+    test_cumsum_negative_axis()
+    test_cumprod_1d()
+    test_cumprod_axis()
@@ -45,11 +45,8 @@ def test_opteinsum_sym():
         return np.einsum('bdik,acaj,ikab,ajac,ikbd->', A, B, C, D, E, optimize=True)
 
     A, B, C, D, E = tuple(np.random.rand(10, 10, 10, 10) for _ in range(5))
-    try:
-        einsumtest(A, B, C, D, E)
-        raise AssertionError('Exception should have been raised')
-    except ValueError:
-        print('Exception successfully caught')
+
+    assert np.allclose(einsumtest(A, B, C, D, E), np.einsum('bdik,acaj,ikab,ajac,ikbd->', A, B, C, D, E))
 
 
 def test_opteinsum():
@@ -65,9 +62,53 @@ def test_opteinsum():
     assert np.allclose(einsumtest(A, B, C, D, E), np.einsum('bdik,acaj,ikab,ajac,ikbd->', A, B, C, D, E))
 
 
+def test_permuted_contraction():
+    @dace.program
+    def einsumtest(A: dace.float64[4, M, N], B: dace.float64[N, 4, 5]):
+        return np.einsum('bik,kbj->ijb', A, B)
+
+    A = np.random.rand(4, 10, 20)
+    B = np.random.rand(20, 4, 5)
+    assert np.allclose(einsumtest(A, B), np.einsum('bik,kbj->ijb', A, B))
+
+
+def test_multi_index_contraction():
+    @dace.program
+    def einsumtest(A: dace.float64[2, 3, 4, 5], B: dace.float64[5, 4, 6, 7]):
+        return np.einsum('abcd,dcef->fbea', A, B)
+
+    A = np.random.rand(2, 3, 4, 5)
+    B = np.random.rand(5, 4, 6, 7)
+    assert np.allclose(einsumtest(A, B), np.einsum('abcd,dcef->fbea', A, B))
+
+
+def test_tensordot():
+    @dace.program
+    def tdot(A: dace.float64[3, 4, 5], B: dace.float64[4, 5, 6]):
+        return np.tensordot(A, B)
+
+    A = np.random.rand(3, 4, 5)
+    B = np.random.rand(4, 5, 6)
+    assert np.allclose(tdot(A, B), np.tensordot(A, B))
+
+
+def test_tensordot_axes():
+    @dace.program
+    def tdot(A: dace.float64[5, 4, 3], B: dace.float64[4, 5, 2]):
+        return np.tensordot(A, B, axes=([1, 0], [0, 1]))
+
+    A = np.random.rand(5, 4, 3)
+    B = np.random.rand(4, 5, 2)
+    assert np.allclose(tdot(A, B), np.tensordot(A, B, axes=([1, 0], [0, 1])))
+
+
 if __name__ == '__main__':
     test_general_einsum()
     test_matmul()
     test_batch_matmul()
     test_opteinsum_sym()
     test_opteinsum()
+    test_permuted_contraction()
+    test_multi_index_contraction()
+    test_tensordot()
+    test_tensordot_axes()
@@ -0,0 +1,61 @@
+# Copyright 2019-2022 ETH Zurich and the DaCe authors. All rights reserved.
+import numpy as np
+import dace
+from common import compare_numpy_output
+
+
+@compare_numpy_output()
+def test_fft(A: dace.complex128[10, 16]):
+    return np.fft.fft(A)
+
+
+@compare_numpy_output()
+def test_ifft_axis(A: dace.complex128[12, 7]):
+    return np.fft.ifft(A, axis=0)
+
+
+@compare_numpy_output()
+def test_fft2_ortho(A: dace.complex128[8, 12]):
+    return np.fft.fft2(A, norm='ortho')
+
+
+@compare_numpy_output()
+def test_ifftn(A: dace.complex128[4, 6, 5]):
+    return np.fft.ifftn(A, axes=(0, 2))
+
+
+@compare_numpy_output()
+def test_fft_real_input(A: dace.float64[20]):
+    return np.fft.fft(A)
+
+
+@compare_numpy_output()
+def test_rfft(A: dace.float64[5, 18]):
+    return np.fft.rfft(A)
+
+
+@compare_numpy_output()
+def test_irfft(A: dace.complex128[6, 10]):
+    return np.fft.irfft(A)
+
+
+@compare_numpy_output()
+def test_irfft_odd(A: dace.complex128[6, 10]):
+    return np.fft.irfft(A, n=19)
+
+
+@compare_numpy_output()
+def test_rfftn_roundtrip(A: dace.float64[8, 6]):
+    return np.fft.irfftn(np.fft.rfftn(A), s=(8, 6))
+
+
+if __name__ == '__main__':
+    test_fft()
+    test_ifft_axis()
+    test_fft2_ortho()
+    test_ifftn()
+    test_fft_real_input()
+    test_rfft()
+    test_irfft()
+    test_irfft_odd()
+    test_rfftn_roundtrip()
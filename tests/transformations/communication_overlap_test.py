@@ -0,0 +1,141 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the overlapping of non-blocking MPI collectives with computation. """
+import dace
+import numpy as np
+from dace.libraries.mpi import nodes as mpi
+from dace.transformation.interstate import CommunicationOverlap
+
+N = dace.symbol('N')
+MPI_Request = dace.opaque('MPI_Request')
+
+
+def _state_order(sdfg: dace.SDFG):
+    """ Returns the states of a linear SDFG in execution order. """
+    states = [sdfg.start_state]
+    while sdfg.out_degree(states[-1]) > 0:
+        states.append(sdfg.out_edges(states[-1])[0].dst)
+    return states
+
+
+def _position(states, nodetype):
+    positions = [i for i, s in enumerate(states) if any(isinstance(n, nodetype) for n in s.nodes())]
+    assert len(positions) == 1
+    return positions[0]
+
+
+def _reads(state: dace.SDFGState):
+    return {n.data for n in state.data_nodes() if state.out_degree(n) > 0}
+
+
+def _writes(state: dace.SDFGState):
+    return {n.data for n in state.data_nodes() if state.in_degree(n) > 0}
+
+
+@dace.program
+def fused(a: dace.float64[N], b: dace.float64[N], c: dace.float64[N], d: dace.float64[N], e: dace.float64[N]):
+    req = np.empty([1], dtype=MPI_Request)
+    a[:] = a + 1
+    dace.comm.Iallreduce(a, b, req)
+    c[:] = d * 2
+    dace.comm.Wait(req)
+    e[:] = c + 1
+    b[:] = b + e
+
+
+def test_split_state():
+    sdfg = fused.to_sdfg(simplify=True)
+    assert sdfg.number_of_nodes() == 1
+    assert sdfg.apply_transformations_repeated(CommunicationOverlap) == 1
+    sdfg.validate()
+
+    states = _state_order(sdfg)
+    start = _position(states, mpi.Iallreduce)
+    wait = _position(states, mpi.Wait)
+    assert start < wait
+
+    # The input is computed before the operation starts
+    assert 'a' in _writes(states[start - 1])
+    # Independent computation runs while the operation is in flight
+    assert all(not _writes(s) & {'a', 'b'} for s in states[start + 1:wait])
+    assert any('c' in _writes(s) for s in states[start + 1:wait])
+    assert any('e' in _writes(s) for s in states[start + 1:wait])
+    # The result is only used after the wait
+    assert any('b' in _writes(s) for s in states[wait + 1:])
+
+    # Nothing left to overlap
+    assert sdfg.apply_transformations_repeated(CommunicationOverlap) == 0
+
+
+@dace.program
+def inflight_input(a: dace.float64[N], b: dace.float64[N], c: dace.float64[N]):
+    req = np.empty([1], dtype=MPI_Request)
+    dace.comm.Iallreduce(a, b, req)
+    c[:] = a * 2
+    a[:] = c + 1
+    dace.comm.Wait(req)
+
+
+def test_inflight_input():
+    sdfg = inflight_input.to_sdfg(simplify=True)
+    sdfg.apply_transformations_repeated(CommunicationOverlap)
+    sdfg.validate()
+
+    # The input buffer can be read, but not modified, before the wait
+    states = _state_order(sdfg)
+    start = _position(states, mpi.Iallreduce)
+    wait = _position(states, mpi.Wait)
+    assert any('a' in _reads(s) for s in states[start + 1:wait])
+    assert all('a' not in _writes(s) for s in states[start + 1:wait])
+    assert any('a' in _writes(s) for s in states[wait + 1:])
+
+
+def _add_scale(state: dace.SDFGState, src: str, dst: str):
+    state.add_mapped_tasklet('scale', {'i': '0:N'}, {'inp': dace.Memlet(f'{src}[i]')},
+                             'out = 2 * inp', {'out': dace.Memlet(f'{dst}[i]')},
+                             external_edges=True)
+
+
+def make_multistate_sdfg():
+    sdfg = dace.SDFG('overlap_multistate')
+    for name in 'abcdxy':
+        sdfg.add_array(name, [N], dace.float64)
+    sdfg.add_array('req', [1], MPI_Request, transient=True)
+
+    s0 = sdfg.add_state('independent_before')
+    _add_scale(s0, 'x', 'y')
+
+    s1 = sdfg.add_state_after(s0, 'start')
+    node = mpi.Iallreduce('iallreduce')
+    s1.add_edge(s1.add_read('a'), None, node, '_inbuffer', dace.Memlet('a[0:N]'))
+    s1.add_edge(node, '_outbuffer', s1.add_write('b'), None, dace.Memlet('b[0:N]'))
+    s1.add_edge(node, '_request', s1.add_write('req'), None, dace.Memlet('req[0]'))
+
+    s2 = sdfg.add_state_after(s1, 'wait')
+    wait = mpi.Wait('wait')
+    src = sdfg.add_temp_transient([1], dace.int32)
+    tag = sdfg.add_temp_transient([1], dace.int32)
+    s2.add_edge(s2.add_read('req'), None, wait, '_request', dace.Memlet('req[0]'))
+    s2.add_edge(wait, '_stat_source', s2.add_write(src[0]), None, dace.Memlet.from_array(*src))
+    s2.add_edge(wait, '_stat_tag', s2.add_write(tag[0]), None, dace.Memlet.from_array(*tag))
+
+    s3 = sdfg.add_state_after(s2, 'independent_after')
+    _add_scale(s3, 'c', 'd')
+
+    s4 = sdfg.add_state_after(s3, 'dependent_after')
+    _add_scale(s4, 'b', 'c')
+    return sdfg
+
+
+def test_hoist_and_sink():
+    sdfg = make_multistate_sdfg()
+    assert sdfg.apply_transformations(CommunicationOverlap) == 1
+    sdfg.validate()
+
+    labels = [s.label for s in _state_order(sdfg) if s.number_of_nodes() > 0]
+    assert labels == ['start_start', 'independent_before', 'independent_after', 'wait_wait', 'dependent_after']
+
+
+if __name__ == '__main__':
+    test_split_state()
+    test_inflight_input()
+    test_hoist_and_sink()
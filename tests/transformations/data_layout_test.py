@@ -0,0 +1,131 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the data-layout transformations. """
+import dace
+import numpy as np
+from dace.transformation.interstate import ArrayLayout, StructToSoA
+from dace.transformation.interstate.data_layout import preferred_layout
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+point = dace.struct('point', x=dace.float64, y=dace.float64, z=dace.float64)
+
+
+@dace.program
+def columnwise(A: dace.float64[N, M], C: dace.float64[M, N], B: dace.float64[N, M]):
+    tmp = np.ndarray([M, N], dtype=np.float64)
+    for i, j in dace.map[0:N, 0:M]:
+        tmp[j, i] = A[i, j] * 2 + C[j, i]
+    for i, j in dace.map[0:N, 0:M]:
+        B[i, j] = tmp[j, i] + 1
+
+
+@dace.program
+def rowwise(A: dace.float64[128, 256], B: dace.float64[128, 256]):
+    tmp = np.ndarray([128, 256], dtype=np.float64)
+    for i, j in dace.map[0:128, 0:256]:
+        tmp[i, j] = A[i, j] * 2
+    for i, j in dace.map[0:128, 0:256]:
+        B[i, j] = tmp[i, j] + 1
+
+
+def _points_sdfg(name: str, whole_struct: bool = False):
+    sdfg = dace.SDFG(name)
+    sdfg.add_array('A', [N], dace.float64)
+    sdfg.add_array('B', [N], dace.float64)
+    sdfg.add_array('Q', [N], point)
+    sdfg.add_transient('P', [N], point)
+    init = sdfg.add_state()
+    init.add_mapped_tasklet('init',
+                            dict(i='0:N'), {'a': dace.Memlet('A[i]')},
+                            'p.x = a\np.y = 2 * a\np.z = 0', {'p': dace.Memlet('P[i]')},
+                            external_edges=True)
+    use = sdfg.add_state_after(init)
+    code = 'b = p.x + p.y * q.y' if not whole_struct else 'b = f(p)'
+    use.add_mapped_tasklet('use',
+                           dict(i='0:N'), {
+                               'p': dace.Memlet('P[i]'),
+                               'q': dace.Memlet('Q[i]')
+                           },
+                           code, {'b': dace.Memlet('B[i]')},
+                           external_edges=True)
+    return sdfg
+
+
+def test_preferred_layout():
+    sdfg = columnwise.to_sdfg()
+    # Consecutive iterations access consecutive rows of tmp and C
+    assert preferred_layout(sdfg, 'tmp') == ([1, 0], 0)
+    assert preferred_layout(sdfg, 'C') == ([1, 0], 0)
+    assert preferred_layout(sdfg, 'A') == ([0, 1], 0)
+
+    # Rows of 2 KiB are padded by a cache line
+    assert preferred_layout(rowwise.to_sdfg(), 'tmp') == ([0, 1], 8)
+
+
+def test_array_layout():
+    sdfg = columnwise.to_sdfg()
+    assert sdfg.apply_transformations(ArrayLayout) == 1
+    assert tuple(sdfg.arrays['tmp'].strides) == (1, M)
+    assert tuple(sdfg.arrays['C'].strides) == (N, 1)
+
+    # Arguments are changed through copies
+    assert sdfg.apply_transformations(ArrayLayout, options={'copy_arguments': True}) == 1
+    assert tuple(sdfg.arrays['C'].strides) == (N, 1)
+    assert sdfg.start_state.label == 'copy_in'
+
+    n, m = 50, 128
+    A = np.random.rand(n, m)
+    C = np.random.rand(m, n)
+    B = np.zeros((n, m))
+    sdfg(A=A, B=B, C=C, N=n, M=m)
+    assert np.allclose(B, 2 * A + C.T + 1)
+
+
+def test_explicit_layout():
+    sdfg = columnwise.to_sdfg()
+    sdfg.apply_transformations(ArrayLayout, options={'array': 'tmp', 'permutation': [1, 0], 'padding': 3})
+    assert tuple(sdfg.arrays['tmp'].strides) == (1, M + 3)
+    assert sdfg.arrays['tmp'].total_size == N * (M + 3)
+
+    n, m = 50, 128
+    A = np.random.rand(n, m)
+    C = np.random.rand(m, n)
+    B = np.zeros((n, m))
+    sdfg(A=A, B=B, C=C, N=n, M=m)
+    assert np.allclose(B, 2 * A + C.T + 1)
+
+
+def test_struct_to_soa():
+    sdfg = _points_sdfg('struct_to_soa')
+    assert sdfg.apply_transformations(StructToSoA) == 1
+    assert 'P' not in sdfg.arrays
+    assert all(sdfg.arrays[f'P_{f}'].dtype == dace.float64 for f in 'xyz')
+
+    # Arguments are converted through copies
+    assert sdfg.apply_transformations(StructToSoA, options={'copy_arguments': True}) == 1
+    assert all(f'Q_{f}' in sdfg.arrays for f in 'xyz')
+    sdfg.validate()
+
+    n = 100
+    A = np.random.rand(n)
+    B = np.zeros(n)
+    Q = np.zeros(n, dtype=np.dtype(point.as_ctypes()))
+    Q['x'] = 7
+    Q['y'] = np.random.rand(n)
+    sdfg(A=A, B=B, Q=Q, N=n)
+    assert np.allclose(B, A + 2 * A * Q['y'])
+    assert np.allclose(Q['x'], 7)
+
+
+def test_struct_not_convertible():
+    # Structs used as a whole cannot be converted
+    sdfg = _points_sdfg('struct_whole', whole_struct=True)
+    assert sdfg.apply_transformations(StructToSoA) == 0
+
+
+if __name__ == '__main__':
+    test_preferred_layout()
+    test_array_layout()
+    test_explicit_layout()
+    test_struct_to_soa()
+    test_struct_not_convertible()
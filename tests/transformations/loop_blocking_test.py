@@ -0,0 +1,129 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests loop tiling, interchange, skewing, and temporal blocking of state
+    machine for-loops. """
+import dace
+import numpy as np
+from dace.transformation.interstate import LoopTiling, LoopInterchange, LoopSkewing, TemporalBlocking
+from dace.transformation.interstate.loop_blocking import ForLoop, loop_dependences
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+T = dace.symbol('T')
+
+
+@dace.program
+def prefix_sum(A: dace.float64[N]):
+    for i in range(1, N):
+        A[i] = A[i] + A[i - 1]
+
+
+@dace.program
+def rowdep(A: dace.float64[N, M]):
+    for i in range(1, N):
+        for j in range(M):
+            A[i, j] = A[i - 1, j] + 1
+
+
+@dace.program
+def diagdep(A: dace.float64[N, M]):
+    for i in range(1, N):
+        for j in range(M - 1):
+            A[i, j] = A[i - 1, j + 1] + 1
+
+
+@dace.program
+def seidel(A: dace.float64[N]):
+    for t in range(T):
+        for i in range(1, N - 1):
+            A[i] = (A[i - 1] + A[i] + A[i + 1]) / 3
+
+
+def _outer_loop(sdfg: dace.SDFG) -> ForLoop:
+    guard = next(e.dst for e in sdfg.out_edges(sdfg.start_state))
+    begin, exit_state = (e.dst for e in sdfg.out_edges(guard))
+    if exit_state.label.startswith('endfor'):
+        return ForLoop(sdfg, guard, begin, exit_state)
+    return ForLoop(sdfg, guard, exit_state, begin)
+
+
+def test_dependences():
+    sdfg = seidel.to_sdfg(simplify=True)
+    outer = _outer_loop(sdfg)
+    inner = ForLoop.find_nested(sdfg, outer)
+    assert (outer.itervar, inner.itervar) == ('t', 'i')
+    deps = loop_dependences(sdfg, outer.states, ['t', 'i'])
+    assert deps == {(None, 0), (None, 1), (None, -1)}
+
+
+def test_tiling():
+    sdfg = prefix_sum.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(LoopTiling, options=dict(tile_size=4)) == 1
+    code = sdfg.generate_code()[0].clean_code
+    assert 'for (i_tile = 1; (i_tile <= (N - 1)); i_tile = (i_tile + 4))' in code
+    assert 'for (i = i_tile; (i <= min((N - 1), (i_tile + 3))); i = (i + 1))' in code
+
+    A = np.random.rand(23)
+    expected = np.cumsum(A)
+    sdfg(A=A, N=23)
+    assert np.allclose(A, expected)
+
+
+def test_interchange():
+    sdfg = rowdep.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(LoopInterchange) == 1
+    assert _outer_loop(sdfg).itervar == 'j'
+
+    A = np.random.rand(7, 9)
+    expected = A[0] + np.arange(7)[:, np.newaxis]
+    sdfg(A=A, N=7, M=9)
+    assert np.allclose(A, expected)
+
+
+def test_interchange_illegal():
+    # Interchanging would read A[i - 1, j + 1] before it is written
+    sdfg = diagdep.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(LoopInterchange) == 0
+    sdfg = seidel.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(LoopInterchange) == 0
+
+
+def test_skewing():
+    sdfg = diagdep.to_sdfg(simplify=True)
+    A = np.random.rand(7, 9)
+    expected = np.copy(A)
+    for i in range(1, 7):
+        expected[i, :-1] = expected[i - 1, 1:] + 1
+
+    assert sdfg.apply_transformations(LoopSkewing) == 1
+    inner = ForLoop.find_nested(sdfg, _outer_loop(sdfg))
+    assert inner.itervar == 'j_skewed'
+    assert str(inner.start) == 'i'
+    assert 'j' not in sdfg.free_symbols
+
+    sdfg(A=A, N=7, M=9)
+    assert np.allclose(A, expected)
+
+
+def test_temporal_blocking():
+    sdfg = seidel.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(TemporalBlocking, options=dict(tile_size=4)) == 1
+    code = sdfg.generate_code()[0].clean_code
+    assert 'for (i_skewed_tile = 1; (i_skewed_tile <= ((N + T) - 3)); i_skewed_tile = (i_skewed_tile + 4))' in code
+    assert 'i_skewed = (max(i_skewed_tile, t + 1))' in code
+
+    A = np.random.rand(21)
+    expected = np.copy(A)
+    for _ in range(5):
+        for i in range(1, 20):
+            expected[i] = (expected[i - 1] + expected[i] + expected[i + 1]) / 3
+    sdfg(A=A, N=21, T=5)
+    assert np.allclose(A, expected)
+
+
+if __name__ == '__main__':
+    test_dependences()
+    test_tiling()
+    test_interchange()
+    test_interchange_illegal()
+    test_skewing()
+    test_temporal_blocking()
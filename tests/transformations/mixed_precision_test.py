@@ -0,0 +1,99 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the automatic mixed-precision transformation. """
+import dace
+import numpy as np
+import pytest
+from dace.transformation.interstate import MixedPrecision
+from dace.transformation.interstate.mixed_precision import compare_precision, sensitivity_analysis
+
+N = dace.symbol('N')
+
+
+@dace.program
+def mixed(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N], D: dace.float64[1]):
+    tmp = np.ndarray([N], dtype=np.float64)
+    tmp2 = np.ndarray([N], dtype=np.float64)
+    tmp[:] = A * 2
+    tmp2[:] = tmp + 1.5
+    B[:] = tmp2 * A
+    C[:] = tmp2
+    acc = np.ndarray([1], dtype=np.float64)
+    acc[0] = 0
+    for i in dace.map[0:N]:
+        acc[0] += tmp[i]
+    D[:] = acc
+
+
+@dace.program
+def cancellation(A: dace.float64[N], B: dace.float64[N], C: dace.float64[N]):
+    small = np.ndarray([N], dtype=np.float64)
+    big = np.ndarray([N], dtype=np.float64)
+    small[:] = A * 2
+    big[:] = A + 10000
+    B[:] = small + 1
+    C[:] = big - 10000
+
+
+def _arguments(n=1000):
+    return dict(A=np.random.rand(n), B=np.zeros(n), C=np.zeros(n), D=np.zeros(1), N=n)
+
+
+def test_lowering():
+    sdfg = mixed.to_sdfg()
+    assert sdfg.apply_transformations(MixedPrecision) == 1
+    sdfg.validate()
+
+    # Arguments and accumulators keep their precision
+    assert sdfg.arrays['tmp'].dtype == dace.float32
+    assert sdfg.arrays['tmp2'].dtype == dace.float32
+    assert sdfg.arrays['acc'].dtype == dace.float64
+    assert all(sdfg.arrays[a].dtype == dace.float64 for a in 'ABCD')
+
+    args = _arguments()
+    A = args['A']
+    sdfg(**args)
+    assert np.allclose(args['B'], (A * 2 + 1.5) * A, rtol=1e-6)
+    assert np.allclose(args['C'], A * 2 + 1.5, rtol=1e-6)
+    assert np.allclose(args['D'], np.sum(A * 2), rtol=1e-6)
+
+
+def test_explicit_arrays():
+    sdfg = mixed.to_sdfg()
+    assert sdfg.apply_transformations(MixedPrecision, options={'arrays': ['tmp2']}) == 1
+    assert sdfg.arrays['tmp'].dtype == dace.float64
+    assert sdfg.arrays['tmp2'].dtype == dace.float32
+
+    with pytest.raises(ValueError):
+        sdfg.apply_transformations(MixedPrecision, options={'arrays': ['acc']})
+    with pytest.raises(ValueError):
+        sdfg.apply_transformations(MixedPrecision, options={'arrays': ['tmp', 'A']})
+
+
+def test_half_precision():
+    sdfg = mixed.to_sdfg()
+    lowered = mixed.to_sdfg()
+    lowered.name = 'mixed_half'
+    lowered.apply_transformations(MixedPrecision, options={'precision': dace.float16})
+    assert lowered.arrays['tmp'].dtype == dace.float16
+
+    errors = compare_precision(sdfg, lowered, _arguments())
+    assert set(errors.keys()) == {'B', 'C', 'D'}
+    assert 0 < max(errors.values()) < 1e-2
+
+
+def test_sensitivity_analysis():
+    sdfg = cancellation.to_sdfg()
+    args = _arguments()
+    del args['D']
+
+    # Lowering "big" loses the digits of A in float32
+    assert sensitivity_analysis(sdfg, args, tolerance=1e-5) == ['small']
+    assert sorted(sensitivity_analysis(sdfg, args, tolerance=1e-2)) == ['big', 'small']
+    assert sensitivity_analysis(sdfg, args, tolerance=1e-12) == []
+
+
+if __name__ == '__main__':
+    test_lowering()
+    test_explicit_arrays()
+    test_half_precision()
+    test_sensitivity_analysis()
@@ -0,0 +1,96 @@
+# Copyright 2019-2021 ETH Zurich and the DaCe authors. All rights reserved.
+""" Tests the software prefetching transformation. """
+import dace
+import numpy as np
+from dace.transformation.dataflow import SoftwarePrefetch
+
+N = dace.symbol('N')
+M = dace.symbol('M')
+H = dace.symbol('H')
+W = dace.symbol('W')
+nnz = dace.symbol('nnz')
+
+
+@dace.program
+def gather(A: dace.float64[N], idx: dace.int32[nnz], B: dace.float64[nnz]):
+    for i in dace.map[0:nnz]:
+        B[i] = A[idx[i]]
+
+
+@dace.program
+def spmv(A_row: dace.uint32[H + 1], A_col: dace.uint32[nnz], A_val: dace.float32[nnz], x: dace.float32[W],
+         b: dace.float32[H]):
+    @dace.mapscope(_[0:H])
+    def compute_row(i):
+        @dace.map(_[A_row[i]:A_row[i + 1]])
+        def compute(j):
+            a << A_val[j]
+            in_x << x[A_col[j]]
+            out >> b(1, lambda x, y: x + y)[i]
+            out = a * in_x
+
+
+@dace.program
+def colsum(A: dace.float64[N, M], B: dace.float64[M]):
+    for j in dace.map[0:M]:
+        for i in dace.map[0:N]:
+            with dace.tasklet:
+                a << A[i, j]
+                b >> B(1, lambda x, y: x + y)[j]
+                b = a
+
+
+@dace.program
+def axpy(A: dace.float64[N], B: dace.float64[N]):
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            a << A[i]
+            b >> B[i]
+            b = 2 * a
+
+
+def test_indirect_nested_sdfg():
+    sdfg = gather.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(SoftwarePrefetch) == 1
+    code = sdfg.generate_code()[0].clean_code
+    assert 'if ((i + 16) <= (nnz - 1)) DACE_PREFETCH(&__pf_A[__pf_idx[(i + 16)]], 0, 3);' in code
+
+    A = np.random.rand(100)
+    idx = np.random.randint(0, 100, size=50).astype(np.int32)
+    B = np.zeros(50)
+    sdfg(A=A, idx=idx, B=B, N=100, nnz=50)
+    assert np.allclose(B, A[idx])
+
+
+def test_indirect_tasklet():
+    sdfg = spmv.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(SoftwarePrefetch, options=dict(distance=8, locality=1)) == 1
+    code = sdfg.generate_code()[0].clean_code
+    # Indices are prefetched beyond the current row
+    assert 'if ((j + 8) <= (nnz - 1)) DACE_PREFETCH(&__pf_x[__pf_A_col[(j + 8)]], 0, 1);' in code
+
+
+def test_strided():
+    sdfg = colsum.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations_repeated(SoftwarePrefetch, options=dict(distance=4)) == 1
+    code = sdfg.generate_code()[0].clean_code
+    assert 'if ((i + 4) <= (N - 1)) DACE_PREFETCH(&__pf_A[(M * (i + 4))], 0, 3);' in code
+
+    A = np.random.rand(20, 30)
+    B = np.zeros(30)
+    sdfg(A=A, B=B, N=20, M=30)
+    assert np.allclose(B, np.sum(A, axis=0))
+
+
+def test_contiguous():
+    # Contiguous accesses are left to the hardware prefetcher
+    sdfg = axpy.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(SoftwarePrefetch) == 0
+    assert sdfg.apply_transformations(SoftwarePrefetch, options=dict(stride_threshold=8)) == 1
+
+
+if __name__ == '__main__':
+    test_indirect_nested_sdfg()
+    test_indirect_tasklet()
+    test_strided()
+    test_contiguous()
@@ -33,6 +33,24 @@ def tovec_uneven(A: dace.float64[N + 2]):
             b = a + a
 
 
+@dace.program
+def tovec_math(x: dace.float32[N], y: dace.float32[N]):
+    for i in dace.map[0:N]:
+        with dace.tasklet:
+            xx << x[i]
+            yy >> y[i]
+            yy = dace.math.exp(xx) + dace.math.sqrt(xx)
+
+
+@dace.program
+def tovec_17(A: dace.float64[17], B: dace.float64[17]):
+    for i in dace.map[0:17]:
+        with dace.tasklet:
+            a << A[i]
+            b >> B[i]
+            b = a * 3
+
+
 def test_vectorization():
     sdfg: dace.SDFG = tovec.to_sdfg()
     assert sdfg.apply_transformations(Vectorization, options={'vector_len': 2}) == 1
@@ -85,8 +103,58 @@ def test_propagate_parent():
     assert np.allclose(B.reshape(20), A * 2)
 
 
+def test_vectorization_masked_postamble():
+    sdfg: dace.SDFG = tovec_sym.to_sdfg()
+    sdfg.simplify()
+    assert sdfg.apply_transformations(Vectorization, options={'vector_len': 8, 'masked_postamble': True}) == 1
+    code = sdfg.generate_code()[0].clean_code
+    assert 'dace::simd::load_masked<float, 8>(&x[i], (N - i))' in code
+    assert 'dace::simd::store_masked<float, 8>(&z[i], out, (N - i));' in code
+    csdfg = sdfg.compile()
+
+    for N in range(24, 33):
+        x = np.random.rand(N).astype(np.float32)
+        y = np.random.rand(N).astype(np.float32)
+        z = np.random.rand(N).astype(np.float32)
+        expected = x + y + z
+
+        csdfg(x=x, y=y, z=z, N=N)
+        assert np.allclose(z, expected)
+
+
+def test_vectorization_masked_single_remainder():
+    # A remainder of one element is computed with scalars
+    sdfg: dace.SDFG = tovec_17.to_sdfg(simplify=True)
+    assert sdfg.apply_transformations(Vectorization, options={'vector_len': 4, 'masked_postamble': True}) == 1
+    code = sdfg.generate_code()[0].clean_code
+    assert 'load_masked' not in code
+    A = np.random.rand(17)
+    B = np.zeros_like(A)
+    sdfg(A=A, B=B)
+    assert np.allclose(B, A * 3)
+
+
+def test_vectorization_math():
+    # Compares vectorized math functions with the scalar versions
+    sdfg: dace.SDFG = tovec_math.to_sdfg(simplify=True)
+    x = np.random.rand(30).astype(np.float32)
+    expected = np.zeros_like(x)
+    sdfg(x=x, y=expected, N=30)
+
+    assert sdfg.apply_transformations(Vectorization, options={'vector_len': 8, 'masked_postamble': True}) == 1
+    sdfg.name += '_vectorized'
+    assert 'vec<float, 8>' in sdfg.generate_code()[0].code
+    y = np.zeros_like(x)
+    sdfg(x=x, y=y, N=30)
+    assert np.allclose(y, expected)
+    assert np.allclose(y, np.exp(x) + np.sqrt(x))
+
+
 if __name__ == '__main__':
     test_vectorization()
     test_vectorization_uneven()
     test_vectorization_postamble()
     test_propagate_parent()
+    test_vectorization_masked_postamble()
+    test_vectorization_masked_single_remainder()
+    test_vectorization_math()